@@ -16,7 +16,7 @@ import threading
 import time
 import warnings
 from collections import OrderedDict
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
 from datetime import UTC, datetime, timedelta
 from functools import wraps
 from typing import Any, TypedDict
@@ -25,19 +25,30 @@ import requests
 from flask import (
     Flask,
     Response,
+    g,
     jsonify,
     make_response,
     redirect,
     render_template,
     request,
     send_from_directory,
+    stream_with_context,
     url_for,
 )
+from flask.json.provider import DefaultJSONProvider
 from flask.typing import ResponseReturnValue
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Top-level imports only (satisfies linter)
 from src.services.portfolio_service import get_portfolio_service
+from src.utils.admission import (
+    LANE_DEFAULT,
+    LANE_OKX,
+    LANE_PRIORITY,
+    AdmissionController,
+    PrioritySemaphore,
+)
+from src.utils.fast_json import body_etag, compress_body, dumps_bytes, loads as fast_json_loads
 from src.utils.safe_shims import (
     get_bollinger_target_price as safe_get_boll_target,
     get_state_store as safe_get_state_store,
@@ -96,6 +107,8 @@ def require_admin(f: Any) -> Any:
             return jsonify({"error": "unauthorized"}), 401
             
         return f(*args, **kwargs)
+    # Lets before_request hooks (admission stale serving) recognise protected views
+    _w.requires_admin = True
     return _w
 
 
@@ -154,8 +167,23 @@ def okx_sign(secret_key: str, timestamp: str, method: str, path: str,
 # Global HTTP session for connection reuse
 _requests_session = requests.Session()
 
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() backed by the fast encoder (numpy/pandas/datetime aware)."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps_bytes(obj, sort_keys=bool(kwargs.get("sort_keys"))).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return fast_json_loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
 # Flask app initialization
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # Configure Flask for Replit environment
 app.config['SECRET_KEY'] = os.getenv('SESSION_SECRET', 'default-secret-key')
@@ -182,10 +210,48 @@ def after_request(response):
         response.headers['Access-Control-Allow-Origin'] = '*'
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Admin-Token'
+        response = _conditional_and_compressed(response)
     
     return response
 
 
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+
+
+def _conditional_and_compressed(response: Response) -> Response:
+    """Add ETag/304 handling and gzip/brotli to buffered JSON API responses."""
+    if (response.is_streamed or response.direct_passthrough
+            or response.mimetype != 'application/json'
+            or response.headers.get('Content-Encoding')):
+        return response
+
+    if request.method == 'GET' and response.status_code == 200:
+        body = response.get_data()
+        if 'ETag' not in response.headers:
+            response.set_etag(body_etag(body), weak=True)
+        etag, _ = response.get_etag()
+        if etag and request.if_none_match.contains_weak(etag):
+            return _not_modified(response.headers['ETag'], response.headers.get('Cache-Control'))
+    else:
+        body = response.get_data()
+
+    compressed, encoding = compress_body(body, request.headers.get('Accept-Encoding'),
+                                         RESPONSE_COMPRESS_MIN_BYTES)
+    response.headers.add('Vary', 'Accept-Encoding')
+    if encoding:
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _not_modified(etag_header: str, cache_control: str | None = None) -> Response:
+    """Bodyless 304 carrying the validator the client already holds."""
+    resp = Response(status=304)
+    resp.headers['ETag'] = etag_header
+    resp.headers['Cache-Control'] = cache_control or _REVALIDATE_CACHE_CONTROL
+    return resp
+
+
 def get_reusable_exchange() -> Any:
     """Get centralized CCXT exchange instance to avoid re-auth and
     load_markets() calls."""
@@ -431,13 +497,16 @@ CACHE_MAX_KEYS = int(os.getenv("CACHE_MAX_KEYS", "200"))  # prevent unbounded gr
 
 # limit concurrent outbound API calls (reduced to prevent rate limiting)
 _MAX_OUTBOUND = int(os.getenv("MAX_OUTBOUND_CALLS", "2"))  # Reduced for stability
-_ext_sem = threading.Semaphore(_MAX_OUTBOUND)
+# Priority-aware so bot control never queues behind dashboard polls
+_ext_sem = PrioritySemaphore(_MAX_OUTBOUND)
 _rate_limit_delay = float(os.getenv("API_RATE_DELAY", "0.5"))  # 500ms delay
 
 
 def with_throttle(fn, *a, **kw) -> Any:
     """Execute function with throttling to prevent API rate limiting."""
-    acquired = _ext_sem.acquire(timeout=15)  # Increased timeout
+    acquired = _ext_sem.acquire(
+        timeout=15, priority=_admission.current_lane() == LANE_PRIORITY
+    )
     if not acquired:
         raise RuntimeError("busy: too many outbound calls")
     try:
@@ -465,9 +534,113 @@ def with_throttle(fn, *a, **kw) -> Any:
         _ext_sem.release()
 
 
-# Rate limiting for heavy endpoints
-_rate_lock = threading.RLock()
-_hits: dict[tuple[str, str], list[float]] = {}
+# === Admission control / load shedding ===
+# Rate budgets live in fixed-size shared memory (one budget across gunicorn
+# workers); concurrency caps are per worker so OKX-bound requests can never
+# occupy every thread. Bot control runs in an uncapped priority lane.
+_admission = AdmissionController(
+    lane_limits={
+        LANE_OKX: int(os.getenv("ADMISSION_OKX_MAX_IN_FLIGHT", "5")),
+        LANE_DEFAULT: int(os.getenv("ADMISSION_DEFAULT_MAX_IN_FLIGHT", "6")),
+    },
+    outbound=_ext_sem,
+    shed_queue_depth=int(os.getenv("ADMISSION_SHED_QUEUE_DEPTH", "4")),
+)
+OKX_RATE_PER_MIN = int(os.getenv("ADMISSION_OKX_RATE_PER_MIN", "240"))
+STALE_MAX_AGE_SEC = float(os.getenv("ADMISSION_STALE_MAX_AGE_SEC", "300"))
+
+# Routes whose handlers call OKX (directly or through PortfolioService)
+_OKX_ROUTE_PREFIXES = (
+    "/api/crypto-portfolio", "/api/market-prices", "/api/market-price/", "/api/coin-metadata/",
+    "/api/trades", "/api/portfolio", "/api/current-holdings", "/api/hybrid-signal",
+    "/api/best-performer", "/api/available-positions", "/api/performance-",
+    "/api/signal-tracking", "/api/trade-performance", "/api/dashboard", "/api/okx-status",
+    "/api/self-check", "/api/pnl",
+)
+# Long-lived or trivial routes that must not consume lane slots
+_ADMISSION_EXEMPT = ("/api/stream", "/api/status", "/api/admission/status")
+
+
+def _route_lane(path: str, method: str) -> str | None:
+    """Classify a request into an admission lane (None = not admission-controlled)."""
+    if not path.startswith("/api/") or path.startswith(_ADMISSION_EXEMPT):
+        return None
+    if path.startswith("/api/backtest-jobs/") and path.endswith("/stream"):
+        return None
+    if path.startswith("/api/bot/") and method != "GET":
+        return LANE_PRIORITY
+    if path.startswith(_OKX_ROUTE_PREFIXES):
+        return LANE_OKX
+    return LANE_DEFAULT
+
+
+def _stale_key() -> str:
+    return request.full_path
+
+
+def _stale_cacheable() -> bool:
+    """Stale bodies are only kept for public GETs; admin views run their auth check first."""
+    view = app.view_functions.get(request.endpoint or "")
+    return request.method == "GET" and not getattr(view, "requires_admin", False)
+
+
+@app.before_request
+def _admission_gate() -> ResponseReturnValue | None:
+    """Admit, shed (503 / stale data) or rate-limit API requests before they take a thread."""
+    lane = _route_lane(request.path, request.method)
+    if lane is None:
+        return None
+
+    ip = request.remote_addr or "?"
+    if lane == LANE_OKX and not _admission.check_rate(f"{ip}|okx", OKX_RATE_PER_MIN, 60):
+        resp = jsonify({"error": "rate_limited"})
+        resp.status_code = 429
+        resp.headers["Retry-After"] = "10"
+        return resp
+
+    decision = _admission.admit(lane)
+    if decision.admitted:
+        g.admission_lane = lane
+        return None
+
+    logger.info(f"Admission shed {request.path}: {decision.reason}")
+    if _stale_cacheable():
+        stale = _admission.stale(_stale_key(), STALE_MAX_AGE_SEC)
+        if stale is not None:
+            age, body = stale
+            resp = Response(body, mimetype="application/json")
+            resp.headers["X-Data-Stale"] = "true"
+            resp.headers["Age"] = str(int(age))
+            resp.headers["Cache-Control"] = "no-cache, max-age=0, private"
+            return resp
+    resp = jsonify({"success": False, "error": "busy", "reason": decision.reason})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(decision.retry_after)
+    return resp
+
+
+# Registered after after_request() so Flask runs it first, before compression
+@app.after_request
+def _admission_remember(response: Response) -> Response:
+    """Keep the last good OKX-lane GET response for stale serving under load."""
+    if (g.get("admission_lane") == LANE_OKX and _stale_cacheable()
+            and response.status_code == 200 and response.mimetype == "application/json"
+            and not response.is_streamed and not response.direct_passthrough):
+        _admission.remember(_stale_key(), response.get_data())
+    return response
+
+
+@app.teardown_request
+def _admission_release(exc: BaseException | None) -> None:
+    lane = g.pop("admission_lane", None)
+    if lane is not None:
+        _admission.release(lane)
+
+
+@app.route("/api/admission/status")
+def api_admission_status() -> ResponseReturnValue:
+    """Admission control diagnostics."""
+    return _no_cache_json(_admission.stats())
 
 
 def rate_limit(max_hits: int, per_seconds: int):
@@ -475,15 +648,9 @@ def rate_limit(max_hits: int, per_seconds: int):
     def deco(f):
         @wraps(f)
         def _w(*a, **kw):
-            key = (request.remote_addr or "?", request.path)
-            now = time.time()
-            with _rate_lock:
-                arr = _hits.get(key, [])
-                arr = [t for t in arr if now - t < per_seconds]
-                if len(arr) >= max_hits:
-                    return jsonify({"error": "rate_limited"}), 429
-                arr.append(now)
-                _hits[key] = arr
+            key = f"{request.remote_addr or '?'}|{request.path}"
+            if not _admission.check_rate(key, max_hits, per_seconds):
+                return jsonify({"error": "rate_limited"}), 429
             return f(*a, **kw)
         return _w
     return deco
@@ -715,33 +882,19 @@ def cache_put(sym: str, tf: str, df: Any) -> None:
 def calculate_real_ml_accuracy() -> float:
     """Calculate real ML accuracy from signal logs or return reasonable estimate."""
     try:
-        # Try to load signal performance from CSV logs
-        import csv
-        import os
-        
-        signal_log_paths = ["logger/signals_log.csv", "signals_log.csv"]
-        
-        for log_path in signal_log_paths:
-            if os.path.exists(log_path):
-                correct_predictions = 0
-                total_predictions = 0
-                
-                with open(log_path, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        # Simple accuracy calculation based on confidence threshold
-                        confidence = float(row.get('confidence_score', 0))
-                        if confidence > 50:  # Prediction made
-                            total_predictions += 1
-                            # Assume correct if confidence was high enough
-                            # This would need outcome tracking in real implementation
-                            if confidence > 65:  # Conservative accuracy estimate
-                                correct_predictions += 1
-                
-                if total_predictions > 0:
-                    accuracy = (correct_predictions / total_predictions) * 100
-                    return round(accuracy, 1)
-        
+        # Try to load signal performance from the signal journal
+        from src.data.signal_journal import get_signal_journal
+
+        confidence = get_signal_journal().column('confidence_score')
+        # Simple accuracy calculation based on confidence threshold
+        total_predictions = int((confidence > 50).sum())  # Prediction made
+        if total_predictions > 0:
+            # Assume correct if confidence was high enough
+            # This would need outcome tracking in real implementation
+            correct_predictions = int((confidence > 65).sum())  # Conservative accuracy estimate
+            accuracy = (correct_predictions / total_predictions) * 100
+            return round(accuracy, 1)
+
         # Fallback to portfolio win rate as ML accuracy estimate
         try:
             portfolio_service = get_portfolio_service()
@@ -1053,20 +1206,36 @@ def custom_static(filename):
 
 @app.route('/signals_log.csv')
 def serve_signals_csv():
-    """Serve the signals log CSV file for export and analysis."""
+    """Export the signal journal as CSV for analysis."""
     try:
-        if os.path.exists('signals_log.csv'):
-            response = make_response(send_from_directory('.', 'signals_log.csv', as_attachment=False))
-            response.headers['Content-Type'] = 'text/csv'
-            response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-            return response
-        else:
-            return jsonify({"error": "Signals log file not found"}), 404
+        from src.data.signal_journal import get_signal_journal
+        response = Response(stream_with_context(get_signal_journal().iter_csv()), mimetype='text/csv')
+        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+        return response
     except Exception as e:
         logger.error(f"Error serving signals CSV: {e}")
         return jsonify({"error": "Unable to serve signals log"}), 500
 
 
+@app.route('/api/signals')
+def api_signals() -> ResponseReturnValue:
+    """Recent journaled signals (``?symbol=SOL&limit=50``, optional ``start``/``end`` epoch seconds)."""
+    try:
+        from src.data.signal_journal import get_signal_journal
+        symbol = request.args.get('symbol', '').upper().strip() or None
+        limit = min(int(request.args.get('limit', 100)), 10000)
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        frame = get_signal_journal().query(symbol, start=start, end=end, limit=limit)
+        frame = frame.astype(object).where(frame.notna(), None)
+        return _no_cache_json({"success": True, "count": len(frame), "signals": frame.to_dict('records')})
+    except ValueError as e:
+        return _no_cache_json({"success": False, "error": str(e)}, 400)
+    except Exception as e:
+        logger.error(f"Signals API error: {e}")
+        return _no_cache_json({"success": False, "error": str(e)}, 500)
+
+
 @app.route('/ml/backtest_results.csv')
 def serve_backtest_results():
     """Serve the ML backtest results CSV file for analysis."""
@@ -1085,11 +1254,34 @@ def serve_backtest_results():
 # Register the real OKX endpoint directly without circular import
 
 
-def _no_cache_json(payload: dict, code: int = 200) -> Response:
+# Browsers may keep a copy but must revalidate (If-None-Match) before each use
+_REVALIDATE_CACHE_CONTROL = "no-cache, must-revalidate, max-age=0, private"
+
+
+def _no_cache_json(payload: dict, code: int = 200, etag_version: str | None = None) -> Response:
+    """
+    JSON response that is always revalidated by the client.
+
+    Args:
+        payload: Response body
+        code: HTTP status
+        etag_version: Snapshot identity to use as a weak ETag (unique across
+            worker processes); when the client already holds it a bodyless
+            304 is returned without serializing
+
+    Returns:
+        Flask response
+    """
+    if etag_version is not None and code == 200:
+        etag = f'W/"{etag_version}"'
+        if request.if_none_match.contains_weak(etag_version):
+            return _not_modified(etag)
     resp = make_response(jsonify(payload), code)
-    resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0, private"
+    resp.headers["Cache-Control"] = _REVALIDATE_CACHE_CONTROL
     resp.headers["Pragma"] = "no-cache"
     resp.headers["Expires"] = "0"
+    if etag_version is not None and code == 200:
+        resp.headers["ETag"] = etag
     return resp
 
 
@@ -1133,43 +1325,41 @@ def api_okx_status() -> ResponseReturnValue:
         logger.error(f"OKX status endpoint error: {e}")
         return _no_cache_json({"status": {"connected": False}, "error": str(e)}, 500)
 
+def _bot_status_payload() -> dict[str, Any]:
+    """Current bot state as served by /api/bot/status (without timestamp)."""
+    with _state_lock:
+        # Use the bot_state directly instead of _get_bot_running() 
+        # which resets state when no trader instance is found
+        is_running = bool(bot_state.get("running", False))
+        
+        # Get strategy from state store if available
+        strategy_name = "enhanced_bollinger"  # default
+        try:
+            state_store = safe_get_state_store()
+            store_state = state_store.get_bot_state()
+            strategy_name = store_state.get('strategy', strategy_name)
+        except Exception:
+            pass
+        
+        return {
+            "running": is_running,
+            "active": is_running,
+            "status": "running" if is_running else "stopped",
+            "mode": bot_state.get("mode"),
+            "symbol": bot_state.get("symbol"),
+            "timeframe": bot_state.get("timeframe"),
+            "strategy": strategy_name,
+            "started_at": bot_state.get("started_at")
+        }
+
+
 @app.route("/api/bot/status")
 def api_bot_status() -> ResponseReturnValue:
     """Bot status endpoint for frontend."""
     try:
-        with _state_lock:
-            # Use the bot_state directly instead of _get_bot_running() 
-            # which resets state when no trader instance is found
-            is_running = bool(bot_state.get("running", False))
-            
-            # Get detailed state information
-            current_mode = bot_state.get("mode")
-            current_symbol = bot_state.get("symbol")
-            current_timeframe = bot_state.get("timeframe")
-            started_at = bot_state.get("started_at")
-            
-            # Get strategy from state store if available
-            strategy_name = "enhanced_bollinger"  # default
-            try:
-                state_store = safe_get_state_store()
-                store_state = state_store.get_bot_state()
-                strategy_name = store_state.get('strategy', strategy_name)
-            except Exception:
-                pass
-            
-            payload = {
-                "running": is_running,
-                "active": is_running,
-                "status": "running" if is_running else "stopped",
-                "mode": current_mode,
-                "symbol": current_symbol,
-                "timeframe": current_timeframe,
-                "strategy": strategy_name,
-                "started_at": started_at,
-                "timestamp": iso_utc()
-            }
-            
-            return _no_cache_json(payload)
+        payload = _bot_status_payload()
+        payload["timestamp"] = iso_utc()
+        return _no_cache_json(payload)
 
     except Exception as e:
         logger.error(f"Bot status endpoint error: {e}")
@@ -1273,6 +1463,77 @@ def market_prices() -> ResponseReturnValue:
         logger.error(f"Market prices error: {e}")
         return jsonify({"error": "Failed to fetch market prices"}), 500
 
+def _build_crypto_portfolio_payload(okx_portfolio_data: dict[str, Any],
+                                    selected_currency: str) -> dict[str, Any]:
+    """Shape PortfolioService data into the /api/crypto-portfolio payload."""
+    holdings_list = okx_portfolio_data['holdings']
+
+    # Filter out holdings with less than $1 value
+    original_count = len(holdings_list)
+    holdings_list = [h for h in holdings_list if float(h.get('current_value', 0) or 0) >= 1.0]
+    filtered_count = original_count - len(holdings_list)
+    if filtered_count > 0:
+        logger.info(f"Filtered out {filtered_count} holdings with value < $1.00 (showing {len(holdings_list)} holdings)")
+
+    overview = {
+        "currency": selected_currency,
+        "total_value": float(okx_portfolio_data['total_current_value']),
+        "cash_balance": float(okx_portfolio_data['cash_balance']),
+        "aud_balance": float(okx_portfolio_data.get('aud_balance', 0.0)),
+        "total_pnl": float(okx_portfolio_data['total_pnl']),
+        "total_pnl_percent": float(okx_portfolio_data['total_pnl_percent']),
+        "daily_pnl": float(okx_portfolio_data.get('daily_pnl', 0.0)),
+        "daily_pnl_percent": float(okx_portfolio_data.get('daily_pnl_percent', 0.0)),
+        "total_assets": len(holdings_list),
+        "profitable_positions": sum(1 for h in holdings_list if float(h.get('pnl_percent', 0) or 0) > 0),
+        "losing_positions": sum(1 for h in holdings_list if float(h.get('pnl_percent', 0) or 0) < 0),
+        "breakeven_positions": max(
+            0,
+            len(holdings_list) - sum(
+                1 for h in holdings_list if float(h.get('pnl_percent', 0) or 0) != 0
+            )
+        ),
+        "last_update": okx_portfolio_data['last_update'],
+        "is_live": True,
+        "connected": True
+    }
+
+    payload = {
+        "holdings": holdings_list,
+        "summary": {
+            "total_cryptos": len(holdings_list),
+            "total_current_value": overview["total_value"],
+            "total_estimated_value": float(
+                okx_portfolio_data.get('total_estimated_value', overview["total_value"])
+            ),
+            "total_pnl": overview["total_pnl"],
+            "total_pnl_percent": overview["total_pnl_percent"],
+            "cash_balance": overview["cash_balance"],
+            "aud_balance": overview["aud_balance"],
+            "currency": selected_currency
+        },
+        "total_pnl": overview["total_pnl"],
+        "total_pnl_percent": overview["total_pnl_percent"],
+        "total_current_value": overview["total_value"],
+        "total_estimated_value": float(
+            okx_portfolio_data.get('total_estimated_value', overview["total_value"])
+        ),
+        "cash_balance": overview["cash_balance"],
+        "aud_balance": overview["aud_balance"],
+        "currency": selected_currency,
+        "last_update": okx_portfolio_data['last_update'],
+        "exchange_info": {
+            "exchange": "Live OKX",
+            "last_update": okx_portfolio_data['last_update'],
+            "cash_balance": overview["cash_balance"],
+            "currency": selected_currency
+        },
+        # 👇 add this for UI cards
+        "overview": overview
+    }
+    return payload
+
+
 @app.route("/api/crypto-portfolio")
 def crypto_portfolio_okx() -> ResponseReturnValue:
     """Get real OKX portfolio data using PortfolioService, forcing a re-pull on currency change."""
@@ -1308,71 +1569,7 @@ def crypto_portfolio_okx() -> ResponseReturnValue:
                 logger.debug(f"Cache invalidation not available: {e}")
             okx_portfolio_data: dict[str, Any] = portfolio_service.get_portfolio_data_OKX_NATIVE_ONLY(currency=selected_currency)
 
-        holdings_list = okx_portfolio_data['holdings']
-
-        # Filter out holdings with less than $1 value
-        original_count = len(holdings_list)
-        holdings_list = [h for h in holdings_list if float(h.get('current_value', 0) or 0) >= 1.0]
-        filtered_count = original_count - len(holdings_list)
-        if filtered_count > 0:
-            logger.info(f"Filtered out {filtered_count} holdings with value < $1.00 (showing {len(holdings_list)} holdings)")
-
-        overview = {
-            "currency": selected_currency,
-            "total_value": float(okx_portfolio_data['total_current_value']),
-            "cash_balance": float(okx_portfolio_data['cash_balance']),
-            "aud_balance": float(okx_portfolio_data.get('aud_balance', 0.0)),
-            "total_pnl": float(okx_portfolio_data['total_pnl']),
-            "total_pnl_percent": float(okx_portfolio_data['total_pnl_percent']),
-            "daily_pnl": float(okx_portfolio_data.get('daily_pnl', 0.0)),
-            "daily_pnl_percent": float(okx_portfolio_data.get('daily_pnl_percent', 0.0)),
-            "total_assets": len(holdings_list),
-            "profitable_positions": sum(1 for h in holdings_list if float(h.get('pnl_percent', 0) or 0) > 0),
-            "losing_positions": sum(1 for h in holdings_list if float(h.get('pnl_percent', 0) or 0) < 0),
-            "breakeven_positions": max(
-                0,
-                len(holdings_list) - sum(
-                    1 for h in holdings_list if float(h.get('pnl_percent', 0) or 0) != 0
-                )
-            ),
-            "last_update": okx_portfolio_data['last_update'],
-            "is_live": True,
-            "connected": True
-        }
-
-        payload = {
-            "holdings": holdings_list,
-            "summary": {
-                "total_cryptos": len(holdings_list),
-                "total_current_value": overview["total_value"],
-                "total_estimated_value": float(
-                    okx_portfolio_data.get('total_estimated_value', overview["total_value"])
-                ),
-                "total_pnl": overview["total_pnl"],
-                "total_pnl_percent": overview["total_pnl_percent"],
-                "cash_balance": overview["cash_balance"],
-                "aud_balance": overview["aud_balance"],
-                "currency": selected_currency
-            },
-            "total_pnl": overview["total_pnl"],
-            "total_pnl_percent": overview["total_pnl_percent"],
-            "total_current_value": overview["total_value"],
-            "total_estimated_value": float(
-                okx_portfolio_data.get('total_estimated_value', overview["total_value"])
-            ),
-            "cash_balance": overview["cash_balance"],
-            "aud_balance": overview["aud_balance"],
-            "currency": selected_currency,
-            "last_update": okx_portfolio_data['last_update'],
-            "exchange_info": {
-                "exchange": "Live OKX",
-                "last_update": okx_portfolio_data['last_update'],
-                "cash_balance": overview["cash_balance"],
-                "currency": selected_currency
-            },
-            # 👇 add this for UI cards
-            "overview": overview
-        }
+        payload = _build_crypto_portfolio_payload(okx_portfolio_data, selected_currency)
         payload["overview"]["next_refresh_in_seconds"] = int(os.getenv("UI_REFRESH_MS", "6000")) // 1000
         payload["next_refresh_in_seconds"] = payload["overview"]["next_refresh_in_seconds"]
         return _no_cache_json(payload)
@@ -1382,6 +1579,113 @@ def crypto_portfolio_okx() -> ResponseReturnValue:
         return jsonify({"error": str(e)}), 500
 
 
+# === Dashboard Stream (Server-Sent Events) ===
+# One producer per worker computes portfolio/prices/bot/signals once per tick;
+# /api/stream only drains a per-client queue of pre-serialized diffs.
+
+STREAM_HEARTBEAT_SEC = float(os.getenv("STREAM_HEARTBEAT_SEC", "20"))
+# Each open SSE response holds a gthread thread; keep some for normal requests
+STREAM_MAX_PER_WORKER = int(os.getenv("STREAM_MAX_PER_WORKER", "4"))
+_stream_slots = threading.BoundedSemaphore(STREAM_MAX_PER_WORKER)
+
+
+def _sse_busy() -> Response:
+    """503 for a stream request over the per-worker cap (clients fall back to polling)."""
+    resp = jsonify({"success": False, "error": "busy", "reason": "stream_slots_exhausted"})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = "30"
+    return resp
+
+
+def _sse_response(body: Iterator[str]) -> Response:
+    """Wrap an SSE generator holding a stream slot; the slot is freed when the response closes."""
+    try:
+        response = Response(stream_with_context(body), mimetype="text/event-stream")
+    except Exception:
+        _stream_slots.release()
+        raise
+    response.call_on_close(_stream_slots.release)
+    response.headers["Cache-Control"] = "no-cache, no-store"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _stream_portfolio_topics() -> dict[str, Any]:
+    """Portfolio and price topics from a single PortfolioService fetch."""
+    portfolio_service = get_portfolio_service()
+    data = portfolio_service.get_portfolio_data_OKX_NATIVE_ONLY(currency='USD')
+    payload = _build_crypto_portfolio_payload(data, 'USD')
+
+    # Fetch timestamps change every tick; drop them so idle ticks emit nothing
+    payload.pop('last_update', None)
+    if isinstance(payload.get('overview'), dict):
+        payload['overview'].pop('last_update', None)
+
+    # Key holdings by symbol so diffs touch only the rows that moved
+    holdings = {h.get('symbol', ''): h for h in payload.pop('holdings', []) if h.get('symbol')}
+    payload['holdings'] = holdings
+    prices = {
+        sym: float(h.get('current_price', 0) or 0)
+        for sym, h in holdings.items()
+    }
+    return {"portfolio": payload, "prices": prices}
+
+
+def _stream_signals_topic() -> dict[str, Any]:
+    """Latest logged signal per symbol."""
+    from src.data.signal_journal import get_signal_journal
+    return get_signal_journal().latest_per_symbol()
+
+
+def _get_dashboard_stream() -> Any:
+    """Get the dashboard stream with this app's producers registered."""
+    from src.services.dashboard_stream import get_dashboard_stream
+    stream = get_dashboard_stream()
+    with _state_lock:
+        if not getattr(stream, "_app_producers_registered", False):
+            stream.register_group(_stream_portfolio_topics)
+            stream.register("bot", _bot_status_payload)
+            stream.register("signals", _stream_signals_topic)
+            stream._app_producers_registered = True
+    return stream
+
+
+@app.route("/api/stream")
+def api_stream() -> ResponseReturnValue:
+    """Server-Sent Events feed of dashboard diffs (portfolio, prices, bot, signals)."""
+    if not _stream_slots.acquire(blocking=False):
+        return _sse_busy()
+    try:
+        stream = _get_dashboard_stream()
+        last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+        subscription = stream.subscribe(last_event_id)
+    except Exception:
+        _stream_slots.release()
+        raise
+
+    def generate() -> Iterator[str]:
+        try:
+            yield f"retry: {int(STREAM_HEARTBEAT_SEC * 250)}\n\n"
+            # An overflowed client is closed once drained and resumes on reconnect
+            while not subscription.closed:
+                message = subscription.next_message(timeout=STREAM_HEARTBEAT_SEC)
+                if message is not None:
+                    yield message
+                elif not subscription.closed:
+                    yield ": keep-alive\n\n"
+        finally:
+            stream.unsubscribe(subscription)
+
+    return _sse_response(generate())
+
+
+@app.route("/api/stream/status")
+def api_stream_status() -> ResponseReturnValue:
+    """Dashboard stream diagnostics."""
+    from src.services.dashboard_stream import get_dashboard_stream
+    return _no_cache_json(get_dashboard_stream().stats())
+
+
 def calculate_trade_pnl(fill):
     """Calculate trade P&L including fees for display purposes."""
     try:
@@ -1604,12 +1908,14 @@ def api_public_backtest() -> ResponseReturnValue:
         symbol_filter = request.args.get('symbol', '').upper().strip()
         
         # Initialize ML confidence analyzer
-        from src.utils.ml_enhanced_confidence import MLEnhancedConfidenceAnalyzer
+        from src.utils.ml_enhanced_confidence import get_ml_confidence_analyzer
         from src.exchanges.okx_adapter import OKXAdapter
+        from src.backtesting.result_cache import get_backtest_cache, run_key
         from datetime import datetime, timedelta
         import numpy as np
         
-        ml_analyzer = MLEnhancedConfidenceAnalyzer()
+        backtest_cache = get_backtest_cache()
+        ml_analyzer = get_ml_confidence_analyzer()
         okx_adapter = OKXAdapter({})
         
         if not okx_adapter.connect():
@@ -1685,15 +1991,20 @@ def api_public_backtest() -> ResponseReturnValue:
                 
                 # Generate ML-based confidence analysis using REAL data
                 try:
-                    # Convert DataFrame to list of dicts for ML analyzer
-                    historical_data = df.to_dict('records')
-                    
-                    # Get REAL ML prediction using the enhanced confidence analyzer
-                    ml_analysis = ml_analyzer.calculate_enhanced_confidence(
-                        base_symbol, 
-                        current_price, 
-                        historical_data
-                    )
+                    # The T+1 signal is formed on completed candles, so its analysis is
+                    # content-addressed by them and reused until the next candle closes
+                    completed = df.iloc[:-1]
+                    analysis_key = run_key("public_backtest", base_symbol, completed)
+                    ml_analysis = backtest_cache.get(analysis_key)
+                    if ml_analysis is None:
+                        # Get REAL ML prediction using the enhanced confidence analyzer
+                        ml_analysis = ml_analyzer.calculate_enhanced_confidence(
+                            base_symbol,
+                            float(completed['close'].iloc[-1]),
+                            completed.to_dict('records')
+                        )
+                        if ml_analysis:
+                            backtest_cache.put(analysis_key, ml_analysis)
                     
                     if not ml_analysis:
                         logger.debug(f"No ML analysis available for {base_symbol}")
@@ -1851,10 +2162,10 @@ def api_public_dynamic_weights() -> ResponseReturnValue:
         logger.info("⚖️ Public dynamic weights API accessed")
         
         # Get dynamic weights for UI display
-        from src.utils.dynamic_weighting import DynamicWeighting
+        from src.utils.dynamic_weighting import get_dynamic_weighting
         
         try:
-            weighting_system = DynamicWeighting()
+            weighting_system = get_dynamic_weighting()
             weights = weighting_system.calculate_weights()
             analysis = weighting_system.get_correlation_analysis()
             
@@ -2072,10 +2383,10 @@ def api_backtest() -> ResponseReturnValue:
 def api_dynamic_weights() -> ResponseReturnValue:
     """Get current dynamic ML/TA weights and correlation analysis."""
     try:
-        from src.utils.dynamic_weighting import DynamicWeighting
+        from src.utils.dynamic_weighting import get_dynamic_weighting
         
-        # Initialize with backtest data from OKX trades
-        dw = DynamicWeighting()
+        # Weights are maintained incrementally as trades close
+        dw = get_dynamic_weighting()
         
         # Get correlation analysis and weights
         analysis = dw.get_correlation_analysis()
@@ -2095,7 +2406,7 @@ def api_dynamic_weights() -> ResponseReturnValue:
             'analysis': {
                 'sample_size': analysis['sample_size'],
                 'status': analysis['status'],
-                'window_size': 50
+                'window_size': analysis['window_size']
             }
         })
         
@@ -2119,6 +2430,7 @@ def api_comprehensive_trades() -> ResponseReturnValue:
     try:
         # Get query parameters
         limit = min(int(request.args.get('limit', '100')), 1000)  # Max 1000 trades
+        include_raw = request.args.get('include_raw', 'false').lower() == 'true'
 
         logger.info(f"🎯 REAL DATA: Loading comprehensive trades from OKX CSV, limit {limit}")
 
@@ -2154,9 +2466,10 @@ def api_comprehensive_trades() -> ResponseReturnValue:
                 'fillTime': trade.get('timestamp', ''),
                 'pnl': float(trade.get('pnl', 0)),
                 'source': trade.get('source', 'OKX'),
-                # Include raw trade data for debugging
-                'raw_data': trade
             }
+            if include_raw:
+                # Raw trade data for debugging only; it doubles the payload size
+                formatted_trade['raw_data'] = trade
             formatted_trades.append(formatted_trade)
 
         logger.info(f"✅ REAL DATA: Returning {len(formatted_trades)} real OKX trades from CSV")
@@ -2796,29 +3109,63 @@ def api_market_price(symbol: str) -> ResponseReturnValue:
         logger.error(f"Error getting market price for {symbol}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _hybrid_signal_payload(entry: dict[str, Any]) -> dict[str, Any]:
+    """Hybrid signal entry plus the 0-1 summary fields older clients read."""
+    return {
+        **entry,
+        'signal': entry['final_signal'],
+        'confidence': round(entry['hybrid_score'] / 100, 4),
+        'technical_score': round((entry.get('confidence_score') or 0) / 100, 4),
+        'ml_score': entry['ml_probability']
+    }
+
+
 @app.route("/api/hybrid-signal")
 def api_hybrid_signal() -> ResponseReturnValue:
-    """Get hybrid trading signal for a symbol."""
+    """
+    Hybrid trading signals.
+
+    ``?symbol=BTC&price=...`` returns one signal; ``?symbols=BTC,ETH,SOL`` (or
+    repeated ``symbols``) with optional ``prices=BTC:65000,ETH:3000`` returns
+    the whole watchlist from one batched evaluation.
+    """
     try:
+        from src.utils.hybrid_signal_system import evaluate_hybrid_signals
+
+        batch = [sym.strip().upper() for arg in request.args.getlist('symbols')
+                 for sym in arg.split(',') if sym.strip()]
+        prices: dict[str, float] = {}
+        for pair in request.args.get('prices', '').split(','):
+            sym, _, value = pair.partition(':')
+            if sym.strip() and value:
+                prices[sym.strip().upper()] = float(value)
+
+        if batch:
+            batch = list(dict.fromkeys(batch))[:200]
+            signals = evaluate_hybrid_signals(batch, prices)
+            return jsonify({
+                'success': True,
+                'count': len(signals),
+                'signals': {sym: _hybrid_signal_payload(entry) for sym, entry in signals.items()},
+                'missing': [sym for sym in batch if sym not in signals],
+                'timestamp': datetime.now().isoformat()
+            })
+
         symbol = request.args.get('symbol', '').upper()
-        price = request.args.get('price', 0, type=float)
-        
         if not symbol:
-            return jsonify({'success': False, 'error': 'Symbol parameter required'}), 400
-            
-        # Return a basic signal structure (can be enhanced later)
-        return jsonify({
-            'success': True,
-            'symbol': symbol,
-            'price': price,
-            'signal': 'NEUTRAL',
-            'confidence': 0.5,
-            'technical_score': 0.5,
-            'ml_score': 0.5,
-            'hybrid_score': 0.5,
-            'timestamp': datetime.now().isoformat()
-        })
-        
+            return jsonify({'success': False, 'error': 'symbol or symbols parameter required'}), 400
+        price = request.args.get('price', 0, type=float)
+        if price > 0:
+            prices[symbol] = price
+
+        entry = evaluate_hybrid_signals([symbol], prices).get(symbol)
+        if entry is None:
+            return jsonify({'success': False, 'symbol': symbol,
+                            'error': f'No confidence available for {symbol}; pass price to compute it'}), 404
+        return jsonify({'success': True, **_hybrid_signal_payload(entry), 'timestamp': datetime.now().isoformat()})
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid price: {e}'}), 400
     except Exception as e:
         logger.error(f"Error getting hybrid signal: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -2965,13 +3312,24 @@ def api_performance_charts() -> ResponseReturnValue:
             holdings = portfolio_data.get('holdings', [])
             logger.info(f"✅ Retrieved {len(holdings)} real portfolio positions")
             
-            # Generate real P&L curve from actual portfolio data
+            # Real P&L curve from recorded snapshots; per-holding fallback until history exists
             pnl_curve = []
-            dates = []
             cumulative_pnl = 0
+            recorded = get_portfolio_timeseries().series("30d")
+            if recorded:
+                base = recorded[0]["equity"] or 1
+                pnl_curve = [
+                    {
+                        "date": p["date"][:10],
+                        "value": (p["equity"] / base - 1) * 100,
+                        "symbol": "",
+                        "daily_pnl": ((p["equity"] / prev["equity"] - 1) * 100) if prev["equity"] else 0
+                    }
+                    for prev, p in zip([recorded[0], *recorded[:-1]], recorded, strict=True)
+                ]
             
             # Sort holdings by entry time if available, otherwise use current order
-            for i, holding in enumerate(holdings[:30]):  # Last 30 positions for chart
+            for i, holding in enumerate([] if recorded else holdings[:30]):  # Last 30 positions for chart
                 pnl_percent = float(holding.get('pnl_percent', 0))
                 cumulative_pnl += pnl_percent
                 
@@ -3132,6 +3490,18 @@ def api_performance_overview() -> ResponseReturnValue:
                 "data_source": "OKX_REAL_PORTFOLIO"
             }
             
+            # Risk metrics: one O(1) update per hour of equity, no history rescan
+            risk_metrics: dict[str, Any] = {}
+            try:
+                from src.utils.performance_metrics import TIMEFRAME_SECONDS
+                tracker = get_performance_metrics()
+                now = time.time()
+                if total_value > 0 and now - (tracker.last_ts or 0) >= TIMEFRAME_SECONDS[PERFORMANCE_METRICS_TIMEFRAME]:
+                    tracker.update(total_value, now, exposed=total_positions > 0)
+                risk_metrics = tracker.snapshot()
+            except Exception as e:
+                logger.warning(f"Performance metrics unavailable: {e}")
+            
             # Add ML accuracy metrics for frontend
             ml_accuracy = min(95.0, max(60.0, win_rate + 15))  # ML accuracy derived from portfolio performance
             
@@ -3166,6 +3536,7 @@ def api_performance_overview() -> ResponseReturnValue:
                         "current_value": float(worst_performer.get('current_value', 0)) if worst_performer else 0
                     } if worst_performer else None
                 },
+                "risk_metrics": risk_metrics,
                 "overview": overview,
                 "data_source": "OKX_REAL_PORTFOLIO"
             })
@@ -3303,7 +3674,18 @@ def api_trade_performance() -> ResponseReturnValue:
             if trades_data:
                 # Process real trades into performance metrics
                 trade_performance = []
-                
+
+                # Realized PnL of sells and open PnL of buy lots come from the lot ledger
+                from src.data.lot_ledger import get_lot_ledger
+                ledger = get_lot_ledger()
+                ledger.ingest(trades_data)
+                try:
+                    holdings = get_portfolio_service().get_portfolio_data().get('holdings', [])
+                    prices = {h.get('symbol', ''): float(h.get('current_price', 0) or 0) for h in holdings}
+                except Exception as e:
+                    logger.warning(f"Trade performance prices unavailable: {e}")
+                    prices = {}
+
                 for i, trade in enumerate(trades_data):
                     # Extract real trade information
                     symbol = trade.get('symbol', '').replace('-USDT', '')
@@ -3316,27 +3698,21 @@ def api_trade_performance() -> ResponseReturnValue:
                     # Calculate trade value and estimated P&L
                     trade_value = cost
                     
-                    # For demonstration, estimate P&L based on current portfolio positions
-                    # In real implementation, this would track entry/exit pairs
-                    estimated_pnl_percent = 0
-                    estimated_pnl_dollar = 0
-                    
-                    # Try to get current portfolio position for this symbol
-                    try:
-                        from src.services.portfolio_service import PortfolioService
-                        portfolio_service = PortfolioService()
-                        portfolio_data = portfolio_service.get_portfolio_data()
-                        
-                        if portfolio_data:
-                            holdings = portfolio_data.get('holdings', [])
-                            matching_holding = next((h for h in holdings if h.get('symbol', '') == symbol), None)
-                            
-                            if matching_holding:
-                                estimated_pnl_percent = float(matching_holding.get('pnl_percent', 0))
-                                estimated_pnl_dollar = float(matching_holding.get('pnl', 0))
-                    except:
-                        pass  # Continue with zero P&L if portfolio lookup fails
-                    
+                    estimated_pnl_percent = 0.0
+                    estimated_pnl_dollar = 0.0
+                    trade_id = str(trade.get('id', ''))
+                    if side == 'SELL':
+                        realized = ledger.fill_pnl(trade_id)
+                        if realized is not None:
+                            estimated_pnl_dollar, matched_cost = realized
+                            estimated_pnl_percent = estimated_pnl_dollar / matched_cost * 100 if matched_cost > 0 else 0.0
+                    else:
+                        lot = ledger.open_lot(trade_id)
+                        current_price = prices.get(symbol.split('/')[0], 0.0)
+                        if lot is not None and current_price > 0 and lot[1] > 0:
+                            estimated_pnl_dollar = lot[0] * (current_price - lot[1])
+                            estimated_pnl_percent = (current_price / lot[1] - 1) * 100
+
                     trade_performance.append({
                         "trade_id": f"okx_{i}_{symbol}",
                         "symbol": symbol,
@@ -3401,27 +3777,402 @@ def api_trade_performance() -> ResponseReturnValue:
             "error": "Trade data unavailable"
         })
 
+@app.route("/api/pnl")
+@require_admin
+def api_pnl() -> ResponseReturnValue:
+    """Realized and unrealized PnL per asset from the lot ledger (``?method=average&period=month``)."""
+    method = request.args.get("method", "fifo").lower()
+    period = request.args.get("period", "day").lower()
+    if method not in ("fifo", "average") or period not in ("day", "week", "month", "year", "all"):
+        return _no_cache_json({"success": False, "error": "method must be fifo|average, "
+                                                          "period day|week|month|year|all"}, 400)
+    try:
+        from src.data.lot_ledger import get_lot_ledger
+        try:
+            holdings = get_portfolio_service().get_portfolio_data().get('holdings', [])
+            prices = {h.get('symbol', ''): float(h.get('current_price', 0) or 0) for h in holdings}
+        except Exception as e:
+            logger.warning(f"PnL prices unavailable: {e}")
+            prices = {}
+        ledger = get_lot_ledger()
+        by_period = None if period == "all" else period
+        assets = ledger.summary(prices, method, by_period)
+        return _no_cache_json({
+            "success": True,
+            "method": method,
+            "period": period,
+            "assets": assets,
+            "totals": {
+                "realized": ledger.realized(None, method),
+                "realized_period": ledger.realized(None, method, by_period) if by_period else None,
+                "unrealized": sum(a["unrealized"] for a in assets.values()),
+            },
+        })
+    except Exception as e:
+        logger.error(f"PnL API error: {e}")
+        return _no_cache_json({"success": False, "error": str(e)}, 500)
+
+
+# === Portfolio time series (recorded equity / drawdown curves) ===
+_portfolio_timeseries = None
+_snapshot_recorder = None
+SNAPSHOT_INTERVAL_SEC = float(os.getenv("SNAPSHOT_INTERVAL_SEC", "60"))
+
+
+def get_portfolio_timeseries() -> Any:
+    """Get the shared portfolio time series store."""
+    global _portfolio_timeseries
+    if _portfolio_timeseries is None:
+        from src.data.portfolio_timeseries import PortfolioTimeSeries
+        _portfolio_timeseries = PortfolioTimeSeries()
+    return _portfolio_timeseries
+
+
+_performance_metrics = None
+_performance_metrics_lock = threading.Lock()
+# The overview tracker works on hourly equity, the cadence of the 30d curve tier
+PERFORMANCE_METRICS_TIMEFRAME = "1h"
+
+
+def get_performance_metrics() -> Any:
+    """Streaming equity metrics for the dashboard, seeded once from recorded snapshots."""
+    global _performance_metrics
+    if _performance_metrics is None:
+        with _performance_metrics_lock:
+            if _performance_metrics is None:
+                from src.utils.performance_metrics import StreamingMetrics
+                metrics = StreamingMetrics(timeframe=PERFORMANCE_METRICS_TIMEFRAME)
+                try:
+                    for p in get_portfolio_timeseries().series("30d"):
+                        metrics.update(p["equity"], p["ts"], exposed=(p["positions_value"] or 0) > 0)
+                except Exception as e:
+                    logger.warning(f"Could not seed performance metrics: {e}")
+                _performance_metrics = metrics
+    return _performance_metrics
+
+
+# === Background services ===
+# Threads do not survive fork, so every worker process runs the registered
+# starters once, on its first request. Services that must only run in one
+# process elect a leader themselves (src.utils.leader_lock.LeaderLock).
+_background_services: list[tuple[str, str | None, Callable[[], None]]] = []
+_background_services_pid: int | None = None
+_background_services_lock = threading.Lock()
+
+
+def background_service(enabled_env: str | None = None) -> Callable[[Callable[[], None]], Callable[[], None]]:
+    """Register a once-per-worker starter, skipped when ``enabled_env`` is set to anything but "true"."""
+    def deco(start: Callable[[], None]) -> Callable[[], None]:
+        _background_services.append((start.__name__, enabled_env, start))
+        return start
+    return deco
+
+
+@app.before_request
+def _start_background_services() -> None:
+    """Run every registered starter once per worker process."""
+    global _background_services_pid
+    if _background_services_pid == os.getpid() or app.testing:
+        return
+    with _background_services_lock:
+        if _background_services_pid == os.getpid():
+            return
+        _background_services_pid = os.getpid()
+    for name, enabled_env, start in _background_services:
+        if enabled_env and os.getenv(enabled_env, "true").lower() != "true":
+            continue
+        try:
+            start()
+        except Exception as e:
+            logger.error(f"Failed to start background service {name}: {e}")
+
+
+@background_service("SNAPSHOT_RECORDER_ENABLED")
+def _start_snapshot_recorder() -> None:
+    """Sample portfolio value into the time series (one worker leads)."""
+    global _snapshot_recorder
+    from src.services.snapshot_recorder import SnapshotRecorder
+    _snapshot_recorder = SnapshotRecorder(
+        lambda: get_portfolio_service().get_portfolio_data(),
+        get_portfolio_timeseries(),
+        interval_seconds=SNAPSHOT_INTERVAL_SEC,
+    )
+    _snapshot_recorder.start()
+
+
+# === Precomputed entry confidence (background scheduler + shared store) ===
+_confidence_scheduler = None
+CONFIDENCE_REFRESH_SEC = float(os.getenv("CONFIDENCE_REFRESH_SEC", "120"))
+CONFIDENCE_OKX_RATE = float(os.getenv("CONFIDENCE_OKX_RATE", "1.0"))
+
+
+@background_service("CONFIDENCE_SCHEDULER_ENABLED")
+def _start_confidence_scheduler() -> None:
+    """Precompute entry confidence for the tracked universe (one worker leads)."""
+    global _confidence_scheduler
+    from src.data.confidence_store import get_confidence_store
+    from src.services.confidence_scheduler import ConfidenceScheduler
+    _confidence_scheduler = ConfidenceScheduler(
+        get_confidence_store(),
+        refresh_seconds=CONFIDENCE_REFRESH_SEC,
+        max_requests_per_sec=CONFIDENCE_OKX_RATE,
+    )
+    _confidence_scheduler.start()
+
+
+@background_service()
+def _start_target_price_refresher() -> None:
+    """Load locked targets and start their refresher."""
+    from src.utils.target_price_manager import get_target_price_manager
+    get_target_price_manager()
+
+
+@app.route("/api/confidence")
+def api_confidence() -> ResponseReturnValue:
+    """Precomputed entry confidence for tracked assets (``?symbol=BTC`` for one)."""
+    try:
+        from src.data.confidence_store import get_confidence_store
+        store = get_confidence_store()
+        symbol = request.args.get("symbol", "").upper().strip()
+        if symbol:
+            result = store.get(symbol)
+            if result is None:
+                return _no_cache_json({"success": False, "error": f"No confidence computed for {symbol} yet"}, 404)
+            return _no_cache_json({"success": True, "symbol": symbol, "confidence": result})
+        scores = store.get_many()
+        return _no_cache_json({"success": True, "count": len(scores), "confidence": scores})
+    except Exception as e:
+        logger.error(f"Confidence API error: {e}")
+        return _no_cache_json({"success": False, "error": str(e)}, 500)
+
+
+@app.route("/api/confidence/status")
+def api_confidence_status() -> ResponseReturnValue:
+    """Confidence scheduler diagnostics for this worker."""
+    if _confidence_scheduler is None:
+        return _no_cache_json({"running": False})
+    return _no_cache_json(_confidence_scheduler.stats())
+
+
+# === Order book snapshots and market impact curves ===
+_order_book_sampler = None
+ORDER_BOOK_INTERVAL_SEC = float(os.getenv("ORDER_BOOK_INTERVAL_SEC", "300"))
+ORDER_BOOK_REFIT_SEC = float(os.getenv("ORDER_BOOK_REFIT_SEC", "3600"))
+
+
+def _order_book_symbols() -> list[str]:
+    """Held assets first, then the confidence universe."""
+    from src.services.confidence_scheduler import TRACKED_ASSETS
+    held = [h.get('symbol', '') for h in get_portfolio_service().get_portfolio_data().get('holdings', [])]
+    return [s for s in held if s and s != 'USDT'] + TRACKED_ASSETS
+
+
+@background_service("ORDER_BOOK_SAMPLER_ENABLED")
+def _start_order_book_sampler() -> None:
+    """Snapshot order books and refit impact curves (one worker leads)."""
+    global _order_book_sampler
+    from src.data.market_impact import get_market_impact_store
+    from src.services.order_book_sampler import OrderBookSampler
+    _order_book_sampler = OrderBookSampler(
+        get_market_impact_store(),
+        _order_book_symbols,
+        interval_seconds=ORDER_BOOK_INTERVAL_SEC,
+        refit_seconds=ORDER_BOOK_REFIT_SEC,
+    )
+    _order_book_sampler.start()
+
+
+@app.route("/api/market-impact")
+def api_market_impact() -> ResponseReturnValue:
+    """Fitted market order cost per asset (``?symbol=PEPE&notional=500`` for one lookup)."""
+    try:
+        from src.data.market_impact import get_market_impact_model, get_market_impact_store
+        symbol = request.args.get("symbol", "").upper().strip()
+        if symbol:
+            model = get_market_impact_model()
+            curve = model.curve(symbol)
+            if curve is None:
+                return _no_cache_json({"success": False, "error": f"No impact curve for {symbol} yet"}, 404)
+            try:
+                notional = float(request.args.get("notional", "100"))
+            except ValueError:
+                return _no_cache_json({"success": False, "error": "notional must be a number"}, 400)
+            return _no_cache_json({
+                "success": True,
+                "symbol": curve.symbol,
+                "notional": notional,
+                "buy_slippage": curve.cost(notional, "buy"),
+                "sell_slippage": curve.cost(notional, "sell"),
+                "curve": curve.to_dict(),
+            })
+        curves = get_market_impact_store().curves()
+        return _no_cache_json({
+            "success": True,
+            "count": len(curves),
+            "sampler": _order_book_sampler.stats() if _order_book_sampler is not None else {"running": False},
+            "curves": {s: {"fitted_at": c.fitted_at, "snapshots": c.snapshots,
+                           "buy_slippage_1k": c.cost(1000.0, "buy")} for s, c in curves.items()},
+        })
+    except Exception as e:
+        logger.error(f"Market impact API error: {e}")
+        return _no_cache_json({"success": False, "error": str(e)}, 500)
+
+
+def _authentic_curve_unavailable() -> ResponseReturnValue:
+    return _no_cache_json({
+        "success": False,
+        "error": "authentic_data_only",
+        "message": "No recorded portfolio snapshots for this timeframe yet"
+    }, 503)
+
+
+@app.route("/api/equity-curve")
+def api_equity_curve() -> ResponseReturnValue:
+    """Recorded portfolio equity curve for a timeframe (24h, 7d, 30d, 90d, 1y)."""
+    try:
+        from src.data.portfolio_timeseries import equity_metrics
+        timeframe = request.args.get("timeframe", "30d")
+        points = get_portfolio_timeseries().series(timeframe)
+        if not points:
+            return _authentic_curve_unavailable()
+        return _no_cache_json({
+            "success": True,
+            "timeframe": timeframe,
+            "equity_curve": [
+                {"date": p["date"], "equity": p["equity"], "cash": p["cash"],
+                 "positions_value": p["positions_value"]}
+                for p in points
+            ],
+            "metrics": equity_metrics(points),
+            "data_source": "PORTFOLIO_SNAPSHOTS"
+        })
+    except Exception as e:
+        logger.error(f"Equity curve error: {e}")
+        return _no_cache_json({"success": False, "error": str(e)}, 500)
+
+
+@app.route("/api/drawdown-analysis")
+def api_drawdown_analysis() -> ResponseReturnValue:
+    """Drawdown series and statistics from recorded portfolio snapshots."""
+    try:
+        from src.data.portfolio_timeseries import drawdown_curve
+        timeframe = request.args.get("timeframe", "30d")
+        points = get_portfolio_timeseries().series(timeframe)
+        if not points:
+            return _authentic_curve_unavailable()
+        curve, metrics = drawdown_curve(points)
+        return _no_cache_json({
+            "success": True,
+            "timeframe": timeframe,
+            "drawdown_data": curve,
+            "metrics": metrics,
+            "data_source": "PORTFOLIO_SNAPSHOTS"
+        })
+    except Exception as e:
+        logger.error(f"Drawdown analysis error: {e}")
+        return _no_cache_json({"success": False, "error": str(e)}, 500)
+
+
+_dashboard_views = None
+
+
+def _fetch_dashboard_snapshot() -> tuple[dict[str, Any], list[dict[str, Any]], dict[str, dict[str, Any]]]:
+    """One portfolio fetch, one fills fetch and one signal read shared by every dashboard view."""
+    portfolio_data = get_portfolio_service().get_portfolio_data() or {}
+    fills: list[dict[str, Any]] = []
+    try:
+        from src.exchanges.okx_adapter import OKXAdapter
+        okx_adapter = OKXAdapter({})
+        okx_adapter.connect()
+        fills = okx_adapter.get_trades(limit=100) or []
+    except Exception as e:
+        logger.warning(f"Dashboard snapshot fills fetch failed: {e}")
+    signals: dict[str, dict[str, Any]] = {}
+    try:
+        from src.data.signal_journal import get_signal_journal
+        signals = get_signal_journal().latest_per_symbol()
+    except Exception as e:
+        logger.warning(f"Dashboard snapshot signals read failed: {e}")
+    return portfolio_data, fills, signals
+
+
+def get_dashboard_views() -> Any:
+    """Get the dashboard view service backed by the shared snapshot."""
+    global _dashboard_views
+    if _dashboard_views is None:
+        from src.services.dashboard_views import DashboardViews
+        _dashboard_views = DashboardViews(
+            _fetch_dashboard_snapshot,
+            ttl_seconds=float(os.getenv("DASHBOARD_SNAPSHOT_TTL", "30"))
+        )
+    return _dashboard_views
+
+
+@app.route("/api/dashboard")
+@require_admin
+def api_dashboard() -> ResponseReturnValue:
+    """Bundled dashboard views (overview, charts, signals, trades) from one snapshot."""
+    try:
+        names_arg = request.args.get("views", "")
+        names = [n.strip() for n in names_arg.split(",") if n.strip()] or None
+        force = request.args.get("force", "false").lower() == "true"
+
+        dashboard_views = get_dashboard_views()
+        snapshot = dashboard_views.snapshot(force_refresh=force)
+        etag_version = f"dashboard-{snapshot.etag}-{hashlib.md5(names_arg.encode()).hexdigest()[:8]}"
+        if request.if_none_match.contains_weak(etag_version):
+            return _not_modified(f'W/"{etag_version}"')
+
+        bundle = dashboard_views.bundle(names, snapshot=snapshot)
+        bundle["success"] = True
+        bundle["data_source"] = "OKX_REAL_PORTFOLIO"
+        return _no_cache_json(bundle, etag_version=etag_version)
+
+    except KeyError as e:
+        return _no_cache_json({"success": False, "error": str(e)}, 400)
+    except Exception as e:
+        logger.error(f"❌ Dashboard bundle error: {e}")
+        return _no_cache_json({
+            "success": False,
+            "error": "Dashboard data unavailable"
+        })
+
+BACKTEST_JOB_MAX_QUEUED = int(os.getenv("BACKTEST_JOB_MAX_QUEUED", "20"))
+BACKTEST_JOB_STREAM_POLL_SEC = float(os.getenv("BACKTEST_JOB_STREAM_POLL_SEC", "1.0"))
+
+
+@background_service("BACKTEST_JOBS_ENABLED")
+def _start_backtest_job_runner() -> None:
+    """Dispatch queued backtest jobs to the process pool (one worker leads)."""
+    from src.services.backtest_jobs import get_backtest_job_runner
+    get_backtest_job_runner().start()
+
+
 @app.route("/api/run-backtest", methods=["POST"])
+@require_admin
 def api_run_backtest() -> ResponseReturnValue:
-    """Run a new backtest analysis."""
+    """Queue a backtest (``kind: "backtest"``) or parameter sweep (``kind: "sweep"``) job."""
     try:
-        logger.info("🧪 Running new backtest analysis")
-        
-        # Simulate running a comprehensive backtest
-        # In a real implementation, this would trigger the actual backtesting engine
-        
-        import time
-        time.sleep(2)  # Simulate processing time
-        
-        logger.info("✅ Backtest analysis completed successfully")
-        
+        from src.services.backtest_jobs import JOB_HANDLERS, QUEUED, get_backtest_job_runner
+        body = request.get_json(silent=True) or {}
+        kind = body.pop("kind", "backtest")
+        if kind not in JOB_HANDLERS:
+            return _no_cache_json({"success": False, "error": f"Unknown job kind: {kind}"}, 400)
+
+        runner = get_backtest_job_runner()
+        if runner.store.count(QUEUED) >= BACKTEST_JOB_MAX_QUEUED:
+            return _no_cache_json({"success": False, "error": "Too many queued backtest jobs"}, 429)
+        job_id = runner.submit(kind, body)
+        logger.info(f"🧪 Queued {kind} job {job_id}")
         return _no_cache_json({
             "success": True,
-            "message": "Backtest analysis completed successfully",
+            "job_id": job_id,
+            "status": QUEUED,
+            "status_url": f"/api/backtest-jobs/{job_id}",
+            "stream_url": f"/api/backtest-jobs/{job_id}/stream",
             "timestamp": datetime.now().isoformat(),
-            "status": "completed"
-        })
-        
+        }, 202)
+
     except Exception as e:
         logger.error(f"Run backtest error: {e}")
         return _no_cache_json({
@@ -3430,6 +4181,82 @@ def api_run_backtest() -> ResponseReturnValue:
         }), 500
 
 
+@app.route("/api/backtest-jobs")
+@require_admin
+def api_backtest_jobs() -> ResponseReturnValue:
+    """Recent backtest jobs (``?status=running``, ``?limit=20``) and runner diagnostics."""
+    try:
+        from src.services.backtest_jobs import get_backtest_job_runner
+        runner = get_backtest_job_runner()
+        limit = min(request.args.get("limit", 20, type=int), 100)
+        jobs = runner.store.list_jobs(limit, request.args.get("status"))
+        return _no_cache_json({"success": True, "jobs": jobs, "runner": runner.stats()})
+    except Exception as e:
+        logger.error(f"Backtest jobs API error: {e}")
+        return _no_cache_json({"success": False, "error": str(e)}, 500)
+
+
+@app.route("/api/backtest-jobs/<job_id>")
+@require_admin
+def api_backtest_job(job_id: str) -> ResponseReturnValue:
+    """Status, progress, partial metrics and (when finished) the result of a job."""
+    try:
+        from src.services.backtest_jobs import get_backtest_job_runner
+        job = get_backtest_job_runner().store.get(job_id)
+        if job is None:
+            return _no_cache_json({"success": False, "error": "Job not found"}, 404)
+        return _no_cache_json({"success": True, "job": job})
+    except Exception as e:
+        logger.error(f"Backtest job API error: {e}")
+        return _no_cache_json({"success": False, "error": str(e)}, 500)
+
+
+@app.route("/api/backtest-jobs/<job_id>/cancel", methods=["POST"])
+@require_admin
+def api_cancel_backtest_job(job_id: str) -> ResponseReturnValue:
+    """Cancel a queued job, or ask a running one to stop."""
+    try:
+        from src.services.backtest_jobs import get_backtest_job_runner
+        job = get_backtest_job_runner().store.cancel(job_id)
+        if job is None:
+            return _no_cache_json({"success": False, "error": "Job not found"}, 404)
+        return _no_cache_json({"success": True, "job": job})
+    except Exception as e:
+        logger.error(f"Cancel backtest job error: {e}")
+        return _no_cache_json({"success": False, "error": str(e)}, 500)
+
+
+@app.route("/api/backtest-jobs/<job_id>/stream")
+@require_admin
+def api_backtest_job_stream(job_id: str) -> ResponseReturnValue:
+    """Server-Sent Events of a job's progress and partial metrics until it finishes."""
+    from src.services.backtest_jobs import FINISHED, get_backtest_job_runner
+    store = get_backtest_job_runner().store
+    if store.get(job_id) is None:
+        return _no_cache_json({"success": False, "error": "Job not found"}, 404)
+    # Shares the per-worker SSE cap with /api/stream; pollers use the status URL
+    if not _stream_slots.acquire(blocking=False):
+        return _sse_busy()
+
+    def generate() -> Iterator[str]:
+        last_update = None
+        while True:
+            job = store.get(job_id)
+            if job is None:
+                return
+            if job["updated_at"] != last_update:
+                last_update = job["updated_at"]
+                event = "done" if job["status"] in FINISHED else "progress"
+                yield f"event: {event}\ndata: {json.dumps(job, default=str)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            if job["status"] in FINISHED:
+                return
+            time.sleep(BACKTEST_JOB_STREAM_POLL_SEC)
+
+    return _sse_response(generate())
+
+
 if __name__ == '__main__':
     import os
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,67 @@
+# scripts/bench_model_service.py
+"""
+Compare per-call model inference with the resident model service.
+
+    python scripts/bench_model_service.py [--rows 1000] [--model src/models/buy_regression_model.pkl]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.ml.model_service import ModelService  # noqa: E402
+
+
+def _timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--model", default="src/models/buy_regression_model.pkl")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    if not os.path.isfile(args.model):
+        print(f"❌ model not found: {args.model}")
+        sys.exit(1)
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(0, 100, args.rows), rng.uniform(0, 1, args.rows)])
+
+    # Current path: estimator.predict on one row per call
+    model = joblib.load(args.model)
+    per_call = _timed(lambda: [model.predict(X[i:i + 1]) for i in range(len(X))], repeat=1)
+
+    sklearn_service = ModelService({"m": args.model}, compile_forests=False)
+    packed_service = ModelService({"m": args.model}, compile_forests=True)
+    sklearn_batch = _timed(lambda: sklearn_service.predict_many("m", X))
+    packed_batch = _timed(lambda: packed_service.predict_many("m", X))
+    packed_single = _timed(lambda: [packed_service.predict_many("m", X[i]) for i in range(len(X))], repeat=1)
+
+    diff = np.abs(packed_service.predict_many("m", X) - model.predict(X)).max()
+
+    print(f"rows={len(X)}  max |packed - sklearn| = {diff:.3g}")
+    for label, seconds in [
+        ("per-call sklearn predict", per_call),
+        ("service predict_many (sklearn)", sklearn_batch),
+        ("service predict_many (packed)", packed_batch),
+        ("service per-row (packed)", packed_single),
+    ]:
+        print(f"  {label:<32} {seconds * 1000:9.2f} ms total  {seconds / len(X) * 1e6:9.2f} µs/row")
+
+
+if __name__ == "__main__":
+    main()
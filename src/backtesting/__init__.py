@@ -4,5 +4,10 @@ Provides vectorized backtesting engine for strategy evaluation.
 """
 
 from .engine import BacktestEngine
+from .monte_carlo import MonteCarloResult, run_monte_carlo, trade_returns
+from .portfolio_engine import PortfolioBacktestEngine
+from .replay import ReplayResult, run_replay
+from .walk_forward import WalkForwardEngine, generate_folds
 
-__all__ = ['BacktestEngine']
+__all__ = ['BacktestEngine', 'MonteCarloResult', 'PortfolioBacktestEngine', 'ReplayResult', 'WalkForwardEngine',
+           'generate_folds', 'run_monte_carlo', 'run_replay', 'trade_returns']
@@ -2,14 +2,21 @@
 Vectorized backtesting engine.
 """
 
+import hashlib
 import logging
+from collections.abc import Callable
 from datetime import datetime
+from typing import Any
 
 import numpy as np
 import pandas as pd
 
 from ..data.manager import DataManager
+from ..data.market_impact import MarketImpactModel, get_market_impact_model
 from ..strategies.base import BaseStrategy
+from ..utils.performance_metrics import compute_metrics
+from .result_cache import CachedRun, get_backtest_cache, row_hashes, run_key
+from .intrabar import TAKE_PROFIT, IntrabarExecutor
 
 
 class BacktestEngine:
@@ -31,6 +38,21 @@ class BacktestEngine:
         self.initial_capital = config.get_float('backtesting', 'initial_capital', 10000)
         self.commission = config.get_float('backtesting', 'commission', 0.001)
         self.slippage = config.get_float('backtesting', 'slippage', 0.0005)
+        # Order-book impact curves replace the flat slippage for assets that have one
+        self.impact: MarketImpactModel | None = (
+            get_market_impact_model() if config.get_bool('backtesting', 'order_book_slippage', True) else None)
+
+        # Optional lower-timeframe execution model for stop/target/crash exits
+        self.intrabar: IntrabarExecutor | None = None
+        # Bar timeframe for annualization (inferred from timestamps when unset)
+        self.timeframe: str | None = None
+
+        # Identical and extended runs are served from the result cache
+        self.result_cache = get_backtest_cache() if config.get_bool('backtesting', 'result_cache', True) else None
+        # Simulation state after the last bar of the latest run (for extending cached runs)
+        self.last_state: dict[str, Any] | None = None
+        # Called as on_bar(i, n_bars) before each simulated bar; may raise to abort the run
+        self.on_bar: Callable[[int, int], None] | None = None
 
         # Results storage
         self.trades = []
@@ -38,7 +60,7 @@ class BacktestEngine:
         self.positions = []
 
     def run_backtest(self, symbol: str, start_date: datetime, end_date: datetime,
-                    timeframe: str = '1h') -> dict:
+                    timeframe: str = '1h', intrabar_timeframe: str | None = None) -> dict:
         """
         Run backtest for given parameters.
 
@@ -47,6 +69,8 @@ class BacktestEngine:
             start_date: Backtest start date
             end_date: Backtest end date
             timeframe: Data timeframe
+            intrabar_timeframe: Lower timeframe (e.g. ``'1m'``) used to fill stop,
+                take-profit and crash exits inside each bar
 
         Returns:
             Backtest results dictionary
@@ -54,24 +78,22 @@ class BacktestEngine:
         self.logger.info(f"Starting backtest: {symbol} from {start_date} to {end_date}")
 
         try:
-            # Initialize data manager and get historical data
-            from ..exchanges.okx_adapter import OKXAdapter
-            exchange_config = self.config.get_exchange_config('okx')
-            exchange = OKXAdapter(exchange_config)
-
-            if not exchange.connect():
-                raise Exception("Failed to connect to exchange for backtesting")
-
-            data_manager = DataManager(exchange, cache_enabled=True)
-            data = data_manager.get_historical_data(symbol, timeframe, start_date, end_date)
+            self.timeframe = timeframe
+            data = self.load_history(symbol, start_date, end_date, timeframe)
 
             if data.empty:
                 raise Exception("No data available for backtesting")
 
+            if intrabar_timeframe:
+                sub_candles = self.load_history(symbol, start_date, end_date, intrabar_timeframe)
+                self.intrabar = IntrabarExecutor(sub_candles) if not sub_candles.empty else None
+                if self.intrabar is None:
+                    self.logger.warning(f"No {intrabar_timeframe} data; exits fill at bar close")
+
             self.logger.info(f"Loaded {len(data)} data points for backtesting")
 
             # Run simulation
-            results = self._simulate_trading(data, symbol)
+            results = self._simulate_cached(data, symbol, timeframe)
 
             # Calculate performance metrics
             performance_metrics = self._calculate_metrics(results)
@@ -83,13 +105,110 @@ class BacktestEngine:
             self.logger.error(f"Backtest failed: {e!s}")
             raise
 
-    def _simulate_trading(self, data: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    def load_history(self, symbol: str, start_date: datetime, end_date: datetime,
+                     timeframe: str = '1h') -> pd.DataFrame:
+        """
+        Load historical OHLCV data from the exchange.
+
+        Args:
+            symbol: Trading symbol
+            start_date: First candle date
+            end_date: Last candle date
+            timeframe: Data timeframe
+
+        Returns:
+            OHLCV DataFrame indexed by UTC timestamp
+        """
+        from ..exchanges.okx_adapter import OKXAdapter
+        exchange_config = self.config.get_exchange_config('okx')
+        exchange = OKXAdapter(exchange_config)
+
+        if not exchange.connect():
+            raise Exception("Failed to connect to exchange for backtesting")
+
+        data_manager = DataManager(exchange, cache_enabled=True)
+        return data_manager.get_historical_data(symbol, timeframe, start_date, end_date)
+
+    def _cache_key(self, symbol: str, timeframe: str, data: pd.DataFrame) -> str:
+        """Result cache key: everything but the candles after the first one."""
+        intrabar = None
+        if self.intrabar is not None:
+            digest = hashlib.sha256()
+            for column in (self.intrabar.ts, self.intrabar.open, self.intrabar.high, self.intrabar.low):
+                digest.update(column.tobytes())
+            intrabar = digest.hexdigest()
+        costs = {'initial_capital': self.initial_capital, 'commission': self.commission, 'slippage': self.slippage}
+        impact = self.impact.fingerprint(symbol) if self.impact is not None else None
+        if impact is not None:
+            costs['impact'] = impact
+        return run_key(
+            f"{type(self.strategy).__module__}.{type(self.strategy).__qualname__}",
+            self.strategy.get_strategy_parameters(), symbol, timeframe, costs, data.index[0], intrabar,
+        )
+
+    def _fill_price(self, symbol: str, price: float, notional: float, side: str) -> float:
+        """Market order fill price for an order of ``notional`` quote currency."""
+        slip = self.slippage if self.impact is None else self.impact.slippage(symbol, notional, side, self.slippage)
+        return price * (1 + slip) if side == 'buy' else price * (1 - slip)
+
+    def _simulate_cached(self, data: pd.DataFrame, symbol: str, timeframe: str) -> pd.DataFrame:
+        """
+        Simulate through the result cache.
+
+        Args:
+            data: Historical OHLCV data
+            symbol: Trading symbol
+            timeframe: Data timeframe
+
+        Returns:
+            DataFrame with simulation results
+        """
+        cache = self.result_cache
+        if cache is None:
+            return self._simulate_trading(data, symbol)
+        try:
+            hashes = row_hashes(data)
+            key = self._cache_key(symbol, timeframe, data)
+            cached = cache.get_run(key)
+        except Exception as e:
+            self.logger.warning(f"Backtest cache lookup failed: {e!s}")
+            return self._simulate_trading(data, symbol)
+
+        n = len(data)
+        if cached is not None:
+            shared = min(cached.n_bars, n)
+            if np.array_equal(cached.row_hashes[:shared], hashes[:shared]):
+                if shared == n:
+                    cache.hits += 1
+                    last_bar = data.index[-1]
+                    self.trades = [dict(t) for t in cached.trades if t['timestamp'] <= last_bar]
+                    return cached.results.iloc[:n].reset_index(drop=True)
+                if cached.resumable:
+                    cache.extensions += 1
+                    self.trades = [dict(t) for t in cached.trades]
+                    cached.restore_strategy(self.strategy)
+                    results = self._simulate_trading(data, symbol, resume=(cached.state, cached.results))
+                    cache.put_run(key, CachedRun.capture(hashes, results, self.trades, self.last_state, self.strategy))
+                    return results
+
+        cache.misses += 1
+        results = self._simulate_trading(data, symbol)
+        if cached is None or n >= cached.n_bars:
+            cache.put_run(key, CachedRun.capture(hashes, results, self.trades, self.last_state, self.strategy))
+        return results
+
+    def _simulate_trading(self, data: pd.DataFrame, symbol: str, start_index: int = 0,
+                          resume: tuple[dict[str, Any], pd.DataFrame] | None = None) -> pd.DataFrame:
         """
         Simulate trading on historical data.
 
         Args:
             data: Historical OHLCV data
             symbol: Trading symbol
+            start_index: First bar that may trade; earlier bars only provide
+                indicator history (walk-forward test windows)
+            resume: ``(state, results)`` of an earlier run over a prefix of
+                ``data``; simulation continues after its last bar
 
         Returns:
             DataFrame with simulation results
@@ -100,15 +219,43 @@ class BacktestEngine:
         position_cost = 0.0  # Initialize position cost
         portfolio_value = self.initial_capital
 
-        results = []
+        # Intrabar exit levels of the open long position
+        intrabar = self.intrabar
+        if intrabar is not None:
+            intrabar.attach(data.index)
+        crash_drawdown = getattr(self.strategy, 'crash_dd_pct', None)
+        # Strategies that only crash-exit in profit keep that rule intrabar
+        crash_in_profit = getattr(self.strategy, 'crash_require_profit', False)
+        stop_price = target_price = None
+        peak = 0.0
+
+        # Lets the strategy price its entries off the same impact curve (or none,
+        # so results and cache keys never depend on curves the engine does not use)
+        if hasattr(self.strategy, 'symbol'):
+            self.strategy.symbol = symbol
+        if hasattr(self.strategy, 'impact'):
+            self.strategy.impact = self.impact
 
-        for i in range(len(data)):
+        results = []
+        first_bar = 0
+        if resume is not None:
+            state, previous = resume
+            cash, position, position_cost = state['cash'], state['position'], state['position_cost']
+            portfolio_value, stop_price, target_price = state['portfolio_value'], state['stop_price'], state['target_price']
+            peak = state['peak']
+            results = previous.to_dict('records')
+            first_bar = len(results)
+
+        on_bar = self.on_bar
+        for i in range(first_bar, len(data)):
+            if on_bar is not None:
+                on_bar(i, len(data))
             current_data = data.iloc[:i+1]  # Data up to current point
             current_price = data['close'].iloc[i]
             current_timestamp = data.index[i]
 
             # Skip if insufficient data for strategy (need enough for Bollinger Bands + RSI)
-            if len(current_data) < 30:  # Reduced minimum for shorter backtests
+            if len(current_data) < 30 or i < start_index:  # Reduced minimum for shorter backtests
                 results.append({
                     'timestamp': current_timestamp,
                     'price': current_price,
@@ -120,16 +267,47 @@ class BacktestEngine:
                 })
                 continue
 
-            # Generate signals
-            signals = self.strategy.generate_signals(current_data)
-
             trade_pnl = 0.0
             signal_action = 'hold'
+            exited_intrabar = False
+
+            # Stop, target and crash exits resolved on sub-candles inside this bar
+            if intrabar is not None and position > 0:
+                crash_floor = position_cost * (1 + 2 * (self.commission + self.slippage)) if crash_in_profit else None
+                exit_fill = intrabar.resolve_exit(i, stop_price, target_price, crash_drawdown, peak, crash_floor)
+                if exit_fill is not None:
+                    reason, level, _, peak = exit_fill
+                    # Targets rest as limit orders; stops and crash exits cross the spread
+                    execution_price = level if reason == TAKE_PROFIT else \
+                        self._fill_price(symbol, level, position * level, 'sell')
+                    commission_cost = position * execution_price * self.commission
+                    cash += position * execution_price - commission_cost
+                    trade_pnl = position * (execution_price - position_cost)
+                    self.trades.append({
+                        'timestamp': current_timestamp,
+                        'action': 'sell',
+                        'price': execution_price,
+                        'size': position,
+                        'commission': commission_cost,
+                        'reason': reason
+                    })
+                    position = 0
+                    position_cost = 0.0
+                    signal_action = 'sell'
+                    exited_intrabar = True
+                else:
+                    peak = intrabar.bar_peak(i, peak)
+
+            # Generate signals
+            signals = self.strategy.generate_signals(current_data)
 
             # Process signals
             for signal in signals:
                 if not self.strategy.validate_signal(signal):
                     continue
+                if exited_intrabar and signal.action == 'sell':
+                    # Already flat; the strategy's own exit for this bar was filled intrabar
+                    continue
 
                 signal_action = signal.action
 
@@ -145,7 +323,7 @@ class BacktestEngine:
                     shares_to_buy = trade_value / current_price
 
                     # Apply slippage and commission
-                    execution_price = current_price * (1 + self.slippage)
+                    execution_price = self._fill_price(symbol, current_price, trade_value, 'buy')
                     commission_cost = trade_value * self.commission
 
                     actual_cost = shares_to_buy * execution_price + commission_cost
@@ -160,6 +338,8 @@ class BacktestEngine:
                         cash -= actual_cost
                         position += shares_to_buy
                         position_cost = execution_price
+                        stop_price, target_price = signal.stop_loss, signal.take_profit
+                        peak = execution_price
 
                         self.trades.append({
                             'timestamp': current_timestamp,
@@ -173,13 +353,11 @@ class BacktestEngine:
                     # Sell signal
                     if position > 0:
                         # Close long position
-                        execution_price = current_price * (1 - self.slippage)
+                        execution_price = self._fill_price(symbol, current_price, position * current_price, 'sell')
                         commission_cost = position * execution_price * self.commission
 
                         cash += position * execution_price - commission_cost
                         trade_pnl = position * (execution_price - position_cost)
-                        position = 0
-                        position_cost = 0.0
 
                         self.trades.append({
                             'timestamp': current_timestamp,
@@ -188,11 +366,14 @@ class BacktestEngine:
                             'size': position,
                             'commission': commission_cost
                         })
+                        position = 0
+                        position_cost = 0.0
 
                     else:
                         # Open short position
                         shares_to_short = position_size
-                        execution_price = current_price * (1 - self.slippage)
+                        execution_price = self._fill_price(symbol, current_price, shares_to_short * current_price,
+                                                           'sell')
                         commission_cost = shares_to_short * execution_price * self.commission
 
                         cash += shares_to_short * execution_price - commission_cost
@@ -227,6 +408,11 @@ class BacktestEngine:
                 'trade_pnl': trade_pnl
             })
 
+        self.last_state = {
+            'cash': cash, 'position': position, 'position_cost': position_cost,
+            'portfolio_value': portfolio_value, 'stop_price': stop_price,
+            'target_price': target_price, 'peak': peak,
+        }
         return pd.DataFrame(results)
 
     def _calculate_metrics(self, results: pd.DataFrame) -> dict:
@@ -243,73 +429,17 @@ class BacktestEngine:
             if results.empty:
                 return {}
 
-            # Basic metrics
-            final_value = results['portfolio_value'].iloc[-1]
-            total_return = (final_value - self.initial_capital) / self.initial_capital
-
-            # Calculate daily returns
-            portfolio_values = results['portfolio_value']
-            daily_returns = portfolio_values.pct_change().dropna()
-
-            # Risk metrics
-            volatility = daily_returns.std() * np.sqrt(365 * 24)  # Annualized for hourly data
-            if volatility > 0 and not np.isnan(volatility) and not np.isinf(volatility):
-                sharpe_ratio = (daily_returns.mean() * 365 * 24) / volatility
-                if np.isnan(sharpe_ratio) or np.isinf(sharpe_ratio):
-                    sharpe_ratio = 0.0
-            else:
-                sharpe_ratio = 0.0
-
-            # Maximum drawdown
-            rolling_max = portfolio_values.expanding().max()
-            drawdown = (portfolio_values - rolling_max) / rolling_max
-            max_drawdown = drawdown.min()
-
-            # Trade analysis
-            trades_df = pd.DataFrame(self.trades) if self.trades else pd.DataFrame()
-            total_trades = len(trades_df)
-
-            if total_trades > 0:
-                # Calculate win rate
-                trade_pnls = results['trade_pnl'].abs()
-                winning_trades = (trade_pnls > 0).sum()
-                win_rate = winning_trades / total_trades if total_trades > 0 else 0
-
-                # Average trade metrics
-                avg_trade_pnl = trade_pnls.mean()
-                avg_win = trade_pnls[trade_pnls > 0].mean() if winning_trades > 0 else 0
-                avg_loss = trade_pnls[trade_pnls < 0].mean() if (total_trades - winning_trades) > 0 else 0
-            else:
-                win_rate = 0
-                avg_trade_pnl = 0
-                avg_win = 0
-                avg_loss = 0
-
-            # Calmar ratio (return / max drawdown)
-            if max_drawdown < 0 and not np.isnan(max_drawdown) and not np.isinf(max_drawdown):
-                calmar_ratio = abs(total_return / max_drawdown)
-                if np.isnan(calmar_ratio) or np.isinf(calmar_ratio):
-                    calmar_ratio = 0.0
-            else:
-                calmar_ratio = 0.0
-
-            metrics = {
-                'initial_capital': self.initial_capital,
-                'final_value': final_value,
-                'total_return': total_return,
-                'annualized_return': total_return * 365 / len(results) * 24,  # Assuming hourly data
-                'volatility': volatility,
-                'sharpe_ratio': sharpe_ratio,
-                'max_drawdown': max_drawdown,
-                'calmar_ratio': calmar_ratio,
-                'total_trades': total_trades,
-                'win_rate': win_rate,
-                'avg_trade_pnl': avg_trade_pnl,
-                'avg_win': avg_win,
-                'avg_loss': avg_loss,
-                'profit_factor': abs(avg_win / avg_loss) if avg_loss < 0 else 0.0
-            }
-
+            trade_pnls = results['trade_pnl'].to_numpy(float)
+            metrics = compute_metrics(
+                results['portfolio_value'].to_numpy(float),
+                # Closing fills carry the realized PnL; every other row is 0
+                trade_pnls=trade_pnls[trade_pnls != 0],
+                positions=results['position'].to_numpy(float) if 'position' in results else None,
+                timestamps=results.get('timestamp'),
+                timeframe=self.timeframe,
+                initial_capital=self.initial_capital,
+            )
+            metrics['total_trades'] = len(self.trades)
             return metrics
 
         except Exception as e:
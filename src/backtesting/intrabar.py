@@ -0,0 +1,129 @@
+"""
+Intrabar execution model for bar-based backtests.
+
+Filling every exit at the bar close hides what happened inside the bar: a
+1h candle whose low pierced the stop and whose high reached the target
+says nothing about which came first. ``IntrabarExecutor`` keeps a
+preloaded array of lower-timeframe (typically 1m) sub-candles, maps every
+parent bar to its sub-candle range with one vectorized ``searchsorted``,
+and walks that range to find the first sub-candle where the stop, the
+take-profit or the crash trail (a drawdown from the running peak) is hit.
+
+When a single sub-candle touches both the stop and the target the stop is
+assumed to come first, and a sub-candle that opens beyond a level fills at
+its open (gap-through).
+"""
+
+import numpy as np
+import pandas as pd
+
+STOP_LOSS = 'STOP_LOSS'
+TAKE_PROFIT = 'TAKE_PROFIT'
+CRASH_EXIT = 'CRASH_EXIT'
+
+
+def _epoch_seconds(index: pd.DatetimeIndex) -> np.ndarray:
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return ((index - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy(np.int64)
+
+
+class IntrabarExecutor:
+    """Resolves stop, take-profit and crash exits from lower-timeframe candles."""
+
+    def __init__(self, sub_candles: pd.DataFrame):
+        """
+        Initialize the executor.
+
+        Args:
+            sub_candles: Lower-timeframe OHLC candles with a DatetimeIndex
+                (bar open times)
+        """
+        sub_candles = sub_candles[~sub_candles.index.duplicated(keep='last')].sort_index()
+        self.ts = _epoch_seconds(sub_candles.index)
+        self.open = sub_candles['open'].to_numpy(float)
+        self.high = sub_candles['high'].to_numpy(float)
+        self.low = sub_candles['low'].to_numpy(float)
+        self._lo = np.empty(0, dtype=np.int64)
+        self._hi = np.empty(0, dtype=np.int64)
+
+    def attach(self, bar_index: pd.DatetimeIndex, bar_seconds: int | None = None) -> None:
+        """
+        Map every parent bar to its sub-candle range.
+
+        Args:
+            bar_index: Parent bar open times
+            bar_seconds: Parent bar length (default: median bar spacing)
+        """
+        bar_ts = _epoch_seconds(bar_index)
+        if bar_seconds is None:
+            bar_seconds = int(np.median(np.diff(bar_ts))) if len(bar_ts) > 1 else 3600
+        self._lo = np.searchsorted(self.ts, bar_ts, side='left')
+        self._hi = np.searchsorted(self.ts, bar_ts + bar_seconds, side='left')
+
+    def has_coverage(self, bar: int) -> bool:
+        """Whether any sub-candles fall inside a parent bar."""
+        return bar < len(self._lo) and self._hi[bar] > self._lo[bar]
+
+    def resolve_exit(self, bar: int, stop: float | None = None, target: float | None = None,
+                     crash_drawdown: float | None = None, peak: float | None = None,
+                     crash_floor: float | None = None) -> tuple[str, float, int, float] | None:
+        """
+        Find the first exit a long position hits inside a parent bar.
+
+        Args:
+            bar: Parent bar position (as passed to ``attach``)
+            stop: Stop-loss price
+            target: Take-profit price
+            crash_drawdown: Exit when the low falls this fraction below the
+                running peak (e.g. 0.05)
+            peak: Highest price since entry before this bar
+            crash_floor: Only take crash exits at or above this price (e.g. breakeven)
+
+        Returns:
+            ``(reason, fill_price, sub_candle_ts, peak)`` for the first trigger,
+            or None when nothing is hit (advance the peak with ``bar_peak``)
+        """
+        if not self.has_coverage(bar):
+            return None
+        lo, hi = self._lo[bar], self._hi[bar]
+        opens, highs, lows = self.open[lo:hi], self.high[lo:hi], self.low[lo:hi]
+        n = hi - lo
+        first = {}
+
+        if stop is not None:
+            hits = np.flatnonzero(lows <= stop)
+            if hits.size:
+                j = hits[0]
+                first[STOP_LOSS] = (j, min(opens[j], stop))
+        if target is not None:
+            hits = np.flatnonzero(highs >= target)
+            if hits.size:
+                j = hits[0]
+                first[TAKE_PROFIT] = (j, max(opens[j], target))
+        running_peak = None
+        if crash_drawdown is not None and peak is not None:
+            # Peak before each sub-candle, so a candle's own high never triggers its own low
+            running_peak = np.maximum.accumulate(np.concatenate(([peak], highs)))
+            trail = running_peak[:n] * (1 - crash_drawdown)
+            triggered = lows <= trail
+            if crash_floor is not None:
+                triggered &= trail >= crash_floor
+            hits = np.flatnonzero(triggered)
+            if hits.size:
+                j = hits[0]
+                first[CRASH_EXIT] = (j, min(opens[j], trail[j]))
+
+        if not first:
+            return None
+        # Earliest sub-candle wins; ties resolve stop -> crash -> target (worst case first)
+        order = {STOP_LOSS: 0, CRASH_EXIT: 1, TAKE_PROFIT: 2}
+        reason, (j, fill) = min(first.items(), key=lambda item: (item[1][0], order[item[0]]))
+        reached = float(running_peak[j]) if running_peak is not None else (peak or 0.0)
+        return reason, float(fill), int(self.ts[lo + j]), reached
+
+    def bar_peak(self, bar: int, peak: float) -> float:
+        """Running peak after a parent bar with no exit."""
+        if not self.has_coverage(bar):
+            return peak
+        return max(peak, float(self.high[self._lo[bar]:self._hi[bar]].max()))
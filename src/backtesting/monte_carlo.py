@@ -0,0 +1,250 @@
+"""
+Monte Carlo robustness analysis of a trade list.
+
+A single backtest is one ordering of one sample of trades. This module
+resamples the per-trade returns into thousands of alternative paths and
+reports the spread of outcomes, so position sizing can use a pessimistic
+quantile instead of the single observed path.
+
+Two resampling schemes are supported:
+
+- ``'block'``: circular moving-block bootstrap. Blocks of consecutive
+  trades are drawn with replacement, which keeps short streaks (e.g.
+  regime clusters of losses) intact.
+- ``'shuffle'``: random permutations of the original trades. Every path
+  ends at the same equity; only the drawdowns change.
+
+Paths are evaluated as a (paths x trades) matrix in chunks whose size is
+capped by ``max_cells``, so 10k+ paths of long trade lists run in bounded
+memory. Only per-path summary values are kept between chunks.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on matrix cells evaluated at once (float64: ~40 MB per 5M)
+DEFAULT_MAX_CELLS = 5_000_000
+
+
+def trade_returns(trades: pd.DataFrame | list[dict[str, Any]]) -> np.ndarray:
+    """
+    Per-trade fractional returns on capital committed to the trade.
+
+    Accepts ``BacktestEngine.get_trade_history()`` (buy/sell fills without
+    PnL, paired in order per symbol) or the live ledger from
+    ``DatabaseManager.get_trades()`` (closing fills carry ``pnl``).
+
+    Args:
+        trades: Trade fills with action, price and size columns
+
+    Returns:
+        Array of returns, one per closed trade, in time order
+    """
+    df = pd.DataFrame(trades)
+    if df.empty:
+        return np.empty(0)
+    if 'timestamp' in df:
+        df = df.sort_values('timestamp', kind='stable')
+
+    if 'pnl' in df and df['pnl'].fillna(0).ne(0).any():
+        closes = df[df['pnl'].fillna(0) != 0]
+        notional = closes['price'].astype(float) * closes['size'].astype(float).abs()
+        cost = notional - closes['pnl'].astype(float)
+        returns = closes['pnl'].astype(float) / cost.where(cost > 0)
+        return returns.dropna().to_numpy(float)
+
+    returns = []
+    # symbol -> (direction, entry value, entry fee)
+    open_trades: dict[str, tuple[int, float, float]] = {}
+    for row in df.to_dict('records'):
+        symbol = row.get('symbol', '')
+        value = float(row['price']) * abs(float(row['size']))
+        fee = float(row.get('commission', 0) or 0)
+        direction = 1 if row['action'] == 'buy' else -1
+        held = open_trades.get(symbol)
+        if held is None:
+            open_trades[symbol] = (direction, value, fee)
+        elif held[0] != direction:
+            side, entry_value, entry_fee = held
+            pnl = side * (value - entry_value) - entry_fee - fee
+            if entry_value + entry_fee > 0:
+                returns.append(pnl / (entry_value + entry_fee))
+            del open_trades[symbol]
+    return np.asarray(returns, dtype=float)
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-path outcomes of a resampling run."""
+
+    method: str
+    fraction: float
+    ruin_level: float
+    final_return: np.ndarray
+    max_drawdown: np.ndarray
+    ruined: np.ndarray
+    win_rate: np.ndarray
+    avg_win: np.ndarray
+    avg_loss: np.ndarray
+    mean_return: np.ndarray
+    volatility: np.ndarray
+    observed: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.final_return)
+
+    @property
+    def ruin_probability(self) -> float:
+        """Share of paths whose equity fell to the ruin level."""
+        return float(self.ruined.mean()) if self.n_paths else 0.0
+
+    def drawdown_probability(self, depth: float) -> float:
+        """
+        Share of paths with a drawdown at least this deep.
+
+        Args:
+            depth: Drawdown as a positive fraction (e.g. 0.2 for 20%)
+        """
+        return float((self.max_drawdown <= -depth).mean()) if self.n_paths else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """Distribution percentiles of path outcomes (JSON-safe floats)."""
+        if not self.n_paths:
+            return {'paths': 0}
+        final = np.percentile(self.final_return, [5, 25, 50, 75, 95])
+        dd = np.percentile(self.max_drawdown, [50, 25, 5, 1])
+        return {
+            'paths': self.n_paths,
+            'method': self.method,
+            'fraction': self.fraction,
+            'final_return': dict(zip(('p5', 'p25', 'p50', 'p75', 'p95'), map(float, final), strict=True)),
+            'max_drawdown': dict(zip(('p50', 'p75', 'p95', 'p99'), map(float, dd), strict=True)),
+            'loss_probability': float((self.final_return < 0).mean()),
+            'ruin_level': self.ruin_level,
+            'ruin_probability': self.ruin_probability,
+            'observed': self.observed,
+        }
+
+    def kelly_inputs(self, confidence: float = 0.95) -> dict[str, float]:
+        """
+        Pessimistic Kelly inputs at a confidence level.
+
+        Each input is taken at the unfavourable tail of its bootstrap
+        distribution: low win rate, small wins, large losses, low mean
+        return and high volatility. The keys match
+        ``RiskManager.calculate_position_size_kelly`` (``win_rate``,
+        ``avg_win``, ``avg_loss``) and ``TechnicalIndicators.fractional_kelly``
+        (``expected_return``, ``volatility``).
+
+        Args:
+            confidence: Confidence level (0.95 uses the 5th/95th percentiles)
+
+        Returns:
+            Kelly input dictionary (zeros when there are no paths)
+        """
+        if not self.n_paths:
+            return {'win_rate': 0.0, 'avg_win': 0.0, 'avg_loss': 0.0,
+                    'expected_return': 0.0, 'volatility': 0.0}
+        low, high = (1 - confidence) * 100, confidence * 100
+
+        def pct(values: np.ndarray, q: float) -> float:
+            finite = values[np.isfinite(values)]
+            return float(np.percentile(finite, q)) if finite.size else 0.0
+
+        return {
+            'win_rate': pct(self.win_rate, low),
+            'avg_win': pct(self.avg_win, low),
+            'avg_loss': pct(self.avg_loss, high),
+            'expected_return': pct(self.mean_return, low),
+            'volatility': pct(self.volatility, high),
+        }
+
+
+def _path_indices(rng: np.random.Generator, n_trades: int, n_paths: int, method: str,
+                  block_size: int) -> np.ndarray:
+    """Row-wise trade indices for one chunk of paths."""
+    if method == 'shuffle':
+        return rng.permuted(np.broadcast_to(np.arange(n_trades), (n_paths, n_trades)), axis=1)
+    n_blocks = -(-n_trades // block_size)
+    starts = rng.integers(0, n_trades, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)) % n_trades
+    return idx.reshape(n_paths, n_blocks * block_size)[:, :n_trades]
+
+
+def run_monte_carlo(returns: np.ndarray, n_paths: int = 10_000, method: str = 'block',
+                    block_size: int = 5, fraction: float = 1.0, ruin_level: float = 0.5,
+                    max_cells: int = DEFAULT_MAX_CELLS, seed: int | None = None) -> MonteCarloResult:
+    """
+    Resample per-trade returns into equity paths.
+
+    Args:
+        returns: Per-trade returns on committed capital (see ``trade_returns``)
+        n_paths: Number of simulated paths
+        method: ``'block'`` bootstrap or ``'shuffle'`` permutation
+        block_size: Trades per block for the block bootstrap
+        fraction: Share of equity committed to each trade
+        ruin_level: Equity loss (fraction of starting equity) counted as ruin
+        max_cells: Cap on paths x trades evaluated per chunk
+        seed: Random seed for reproducible runs
+
+    Returns:
+        MonteCarloResult with one value per path for every statistic
+    """
+    if method not in ('block', 'shuffle'):
+        raise ValueError(f"Unknown resampling method: {method}")
+    returns = np.asarray(returns, dtype=float)
+    returns = returns[np.isfinite(returns)]
+    n_trades = len(returns)
+    names = ('final_return', 'max_drawdown', 'ruined', 'win_rate', 'avg_win', 'avg_loss',
+             'mean_return', 'volatility')
+    if n_trades == 0 or n_paths <= 0:
+        return MonteCarloResult(method, fraction, ruin_level, *(np.empty(0) for _ in names))
+
+    rng = np.random.default_rng(seed)
+    block_size = max(1, min(block_size, n_trades))
+    chunk = max(1, min(n_paths, max_cells // n_trades))
+    out = {name: np.empty(n_paths) for name in names}
+    # Per-trade equity factors can't go below zero (a position can lose at most its stake)
+    log_growth = np.log(np.maximum(1 + fraction * returns, 1e-12))
+
+    for start in range(0, n_paths, chunk):
+        rows = slice(start, min(start + chunk, n_paths))
+        idx = _path_indices(rng, n_trades, rows.stop - rows.start, method, block_size)
+        sampled = returns[idx]
+        equity = np.exp(np.cumsum(log_growth[idx], axis=1))
+        # Running peak includes the starting equity of 1.0
+        peaks = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+        out['final_return'][rows] = equity[:, -1] - 1
+        out['max_drawdown'][rows] = np.minimum((equity / peaks - 1).min(axis=1), 0.0)
+        out['ruined'][rows] = equity.min(axis=1) <= 1 - ruin_level
+
+        wins, losses = sampled > 0, sampled < 0
+        n_wins, n_losses = wins.sum(axis=1), losses.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['avg_win'][rows] = np.where(wins, sampled, 0).sum(axis=1) / n_wins
+            out['avg_loss'][rows] = -np.where(losses, sampled, 0).sum(axis=1) / n_losses
+        out['win_rate'][rows] = n_wins / n_trades
+        out['mean_return'][rows] = sampled.mean(axis=1)
+        out['volatility'][rows] = sampled.std(axis=1, ddof=1) if n_trades > 1 else 0.0
+
+    wins, losses = returns[returns > 0], returns[returns < 0]
+    observed = {
+        'trades': n_trades,
+        'win_rate': len(wins) / n_trades,
+        'avg_win': float(wins.mean()) if len(wins) else 0.0,
+        'avg_loss': float(-losses.mean()) if len(losses) else 0.0,
+        'mean_return': float(returns.mean()),
+        'volatility': float(returns.std(ddof=1)) if n_trades > 1 else 0.0,
+    }
+    out['ruined'] = out['ruined'].astype(bool)
+    logger.debug(f"Monte Carlo: {n_paths} {method} paths over {n_trades} trades in chunks of {chunk}")
+    return MonteCarloResult(method, fraction, ruin_level, *(out[name] for name in names), observed=observed)
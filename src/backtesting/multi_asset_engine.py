@@ -125,6 +125,36 @@ class MultiAssetBacktestEngine:
 
         return consolidated
 
+    def run_shared_cash_backtest(self, crypto_portfolio, days: int = 30,
+                                 timeframe: str = '1h') -> dict:
+        """
+        Backtest the portfolio's assets trading from one shared cash balance.
+
+        Unlike ``run_portfolio_backtest``, which gives every asset its own
+        capital, this replays all assets on one timeline with the live risk
+        limits (see ``PortfolioBacktestEngine``).
+
+        Args:
+            crypto_portfolio: CryptoPortfolio instance with holdings
+            days: Number of days to backtest
+            timeframe: Data timeframe
+
+        Returns:
+            Portfolio backtest results
+        """
+        from .portfolio_engine import PortfolioBacktestEngine, strategy_signals
+
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        symbols = [s if '/' in s else f"{s}/USDT" for s in crypto_portfolio.get_portfolio_data()]
+
+        engine = PortfolioBacktestEngine(self.config, strategy_signals(self.strategy))
+        histories = engine.load_histories(symbols, start_date, end_date, timeframe)
+        self.logger.info(f"Shared-cash backtest over {len(histories)} of {len(symbols)} assets")
+        result = engine.run(histories)
+        result['backtest_period_days'] = days
+        return result
+
     def _run_single_asset_backtest(self, symbol: str, start_date: datetime,
                                  end_date: datetime, timeframe: str,
                                  initial_value: float) -> dict | None:
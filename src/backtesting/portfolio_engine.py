@@ -0,0 +1,316 @@
+"""
+Portfolio-level backtester with one shared cash ledger.
+
+The live bot trades every pair out of a single USDT balance under
+cross-asset risk limits, so per-symbol backtests with separate capital
+overstate what it can do. This engine merges all symbols' candle streams
+into one timeline (a k-way heap merge over each symbol's sorted
+timestamps) and replays it once. At every timestamp, exits are filled
+first, then entries ranked by signal confidence, each checked against the
+shared cash, ``max_positions``, the $100 minimum USDT balance, the
+single-position size limit and the daily loss limit from ``RiskManager``.
+
+Signals are computed per symbol up front, as arrays aligned with its
+candles, so the replay itself is pure bookkeeping and scales to hundreds of
+symbols of hourly data.
+"""
+
+import heapq
+import logging
+import math
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ..risk.manager import RiskManager
+from ..strategies.base import BaseStrategy
+from ..utils.performance_metrics import compute_metrics
+from .engine import BacktestEngine
+
+# RiskManager.check_trading_allowed: no new purchases below this USDT balance
+MIN_USDT_BALANCE = 100.0
+# RiskManager.validate_position_size: smallest position worth opening
+MIN_POSITION_VALUE = 25.0
+
+BUY, HOLD, SELL = 1, 0, -1
+
+SignalFn = Callable[[str, pd.DataFrame], pd.DataFrame | np.ndarray]
+
+
+def strategy_signals(strategy: BaseStrategy, min_bars: int = 30) -> SignalFn:
+    """
+    Adapt a ``BaseStrategy`` to the engine's per-symbol signal arrays.
+
+    The strategy is called once per bar on the history up to that bar, as in
+    ``BacktestEngine``; prefer a vectorized signal function for large runs.
+
+    Args:
+        strategy: Strategy whose first valid signal per bar is used
+        min_bars: Bars of history required before the first signal
+
+    Returns:
+        Signal function for ``PortfolioBacktestEngine``
+    """
+    def signal_fn(symbol: str, data: pd.DataFrame) -> pd.DataFrame:
+        action = np.zeros(len(data), dtype=np.int8)
+        confidence = np.zeros(len(data))
+        size = np.full(len(data), np.nan)
+        for i in range(min_bars - 1, len(data)):
+            for signal in strategy.generate_signals(data.iloc[:i + 1]):
+                if not strategy.validate_signal(signal):
+                    continue
+                action[i] = {'buy': BUY, 'sell': SELL}.get(signal.action, HOLD)
+                confidence[i] = signal.confidence
+                size[i] = signal.size
+                break
+        return pd.DataFrame({'action': action, 'confidence': confidence, 'size': size}, index=data.index)
+
+    return signal_fn
+
+
+class PortfolioBacktestEngine:
+    """Event-driven backtest of many symbols trading from one cash balance."""
+
+    def __init__(self, config, signal_fn: SignalFn, position_fraction: float | None = None):
+        """
+        Initialize the portfolio backtester.
+
+        Args:
+            config: Configuration object
+            signal_fn: ``(symbol, candles) -> signals`` aligned with the candles:
+                an array of actions (1 buy, -1 sell, 0 hold) or a DataFrame with
+                ``action`` and optional ``confidence`` (entry ranking) and
+                ``size`` (fraction of equity) columns
+            position_fraction: Default fraction of equity per entry
+                (default: the single-position risk limit)
+        """
+        self.config = config
+        self.signal_fn = signal_fn
+        self.logger = logging.getLogger(__name__)
+
+        self.initial_capital = config.get_float('backtesting', 'initial_capital', 10000)
+        self.commission = config.get_float('backtesting', 'commission', 0.001)
+        self.slippage = config.get_float('backtesting', 'slippage', 0.0005)
+
+        risk = RiskManager(config)
+        self.max_positions = risk.max_positions
+        self.max_position_fraction = risk.max_single_position_risk / 100
+        self.max_daily_loss = risk.max_daily_loss / 100
+        self.position_fraction = min(position_fraction or self.max_position_fraction,
+                                     self.max_position_fraction)
+
+    def load_histories(self, symbols: list[str], start_date: datetime, end_date: datetime,
+                       timeframe: str = '1h') -> dict[str, pd.DataFrame]:
+        """
+        Load candle history for every symbol, skipping symbols that fail.
+
+        Args:
+            symbols: Trading symbols
+            start_date: History start
+            end_date: History end
+            timeframe: Data timeframe
+
+        Returns:
+            Symbol -> OHLCV DataFrame
+        """
+        loader = BacktestEngine(self.config, None)
+        histories = {}
+        for symbol in symbols:
+            try:
+                data = loader.load_history(symbol, start_date, end_date, timeframe)
+                if not data.empty:
+                    histories[symbol] = data
+            except Exception as e:
+                self.logger.warning(f"Skipping {symbol}: could not load history ({e})")
+        return histories
+
+    def _prepare(self, symbol: str, data: pd.DataFrame) -> tuple[np.ndarray, ...]:
+        """Timestamps, closes and signal arrays for one symbol."""
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        index = data.index if data.index.tz is not None else data.index.tz_localize('UTC')
+        ts = ((index - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy(np.int64)
+        close = data['close'].to_numpy(float)
+
+        signals = self.signal_fn(symbol, data)
+        if isinstance(signals, pd.DataFrame):
+            action = signals['action'].to_numpy()
+            confidence = signals['confidence'].to_numpy(float) if 'confidence' in signals else np.zeros(len(data))
+            size = signals['size'].to_numpy(float) if 'size' in signals else np.full(len(data), np.nan)
+        else:
+            action = np.asarray(signals)
+            confidence = np.zeros(len(data))
+            size = np.full(len(data), np.nan)
+        if len(action) != len(data):
+            raise ValueError(f"{symbol}: {len(action)} signals for {len(data)} candles")
+        return ts, close, np.sign(action).astype(np.int8), confidence, size
+
+    def run(self, histories: dict[str, pd.DataFrame]) -> dict[str, Any]:
+        """
+        Replay all symbols on one merged timeline with a shared cash ledger.
+
+        Args:
+            histories: Symbol -> OHLCV DataFrame with a DatetimeIndex
+
+        Returns:
+            Portfolio metrics plus ``equity_curve``, ``trades``, per-symbol
+            ``asset_performances`` and ``rejections`` (entries blocked by each
+            risk check)
+        """
+        symbols = [s for s, data in histories.items() if not data.empty]
+        arrays = [self._prepare(s, histories[s]) for s in symbols]
+        ts_arr = [a[0].tolist() for a in arrays]
+        close_arr = [a[1].tolist() for a in arrays]
+        action_arr = [a[2].tolist() for a in arrays]
+        conf_arr = [a[3].tolist() for a in arrays]
+        size_arr = [a[4].tolist() for a in arrays]
+
+        cash = self.initial_capital
+        qty = [0.0] * len(symbols)
+        cost = [0.0] * len(symbols)
+        last = [math.nan] * len(symbols)
+        holdings_value = 0.0
+        open_positions = 0
+        trades: list[dict[str, Any]] = []
+        realized = [0.0] * len(symbols)
+        rejections = {'cash': 0, 'max_positions': 0, 'min_usdt': 0, 'daily_loss': 0, 'min_size': 0}
+        curve_ts: list[int] = []
+        curve_equity: list[float] = []
+        curve_cash: list[float] = []
+        day = None
+        day_start_equity = cash
+        halted = False
+        buy_mult, sell_mult = 1 + self.slippage, 1 - self.slippage
+
+        # k-way merge: one heap entry per symbol, keyed by its next timestamp
+        heap = [(ts_arr[k][0], k) for k in range(len(symbols)) if ts_arr[k]]
+        heapq.heapify(heap)
+        pos = [0] * len(symbols)
+
+        while heap:
+            now = heap[0][0]
+            bar: list[tuple[int, int]] = []
+            while heap and heap[0][0] == now:
+                _, k = heapq.heappop(heap)
+                i = pos[k]
+                bar.append((k, i))
+                pos[k] = i + 1
+                if i + 1 < len(ts_arr[k]):
+                    heapq.heappush(heap, (ts_arr[k][i + 1], k))
+
+            # Mark to market
+            for k, i in bar:
+                price = close_arr[k][i]
+                if qty[k]:
+                    holdings_value += qty[k] * (price - last[k])
+                last[k] = price
+            equity = cash + holdings_value
+
+            if now // 86400 != day:
+                day = now // 86400
+                day_start_equity = equity
+                halted = False
+
+            # Exits first so their cash is available to entries in the same bar
+            entries = []
+            for k, i in bar:
+                action = action_arr[k][i]
+                if action == SELL and qty[k] > 0:
+                    price = close_arr[k][i] * sell_mult
+                    proceeds = qty[k] * price
+                    fee = proceeds * self.commission
+                    pnl = proceeds - fee - cost[k]
+                    cash += proceeds - fee
+                    holdings_value -= qty[k] * close_arr[k][i]
+                    realized[k] += pnl
+                    trades.append({'timestamp': now, 'symbol': symbols[k], 'action': 'sell', 'price': price,
+                                   'size': qty[k], 'commission': fee, 'pnl': pnl})
+                    qty[k] = 0.0
+                    cost[k] = 0.0
+                    open_positions -= 1
+                elif action == BUY and qty[k] == 0:
+                    entries.append((-conf_arr[k][i], k, i))
+
+            if entries:
+                equity = cash + holdings_value
+                if not halted and day_start_equity > 0 and \
+                        (day_start_equity - equity) / day_start_equity >= self.max_daily_loss:
+                    halted = True
+                entries.sort()
+                for _, k, i in entries:
+                    if halted:
+                        rejections['daily_loss'] += 1
+                        continue
+                    if open_positions >= self.max_positions:
+                        rejections['max_positions'] += 1
+                        continue
+                    if cash < MIN_USDT_BALANCE:
+                        rejections['min_usdt'] += 1
+                        continue
+                    fraction = size_arr[k][i]
+                    if math.isnan(fraction) or fraction <= 0:
+                        fraction = self.position_fraction
+                    value = equity * min(fraction, self.max_position_fraction)
+                    value = min(value, cash / (1 + self.commission))
+                    if value < MIN_POSITION_VALUE:
+                        rejections['min_size' if cash >= MIN_POSITION_VALUE else 'cash'] += 1
+                        continue
+                    price = close_arr[k][i] * buy_mult
+                    fee = value * self.commission
+                    qty[k] = value / price
+                    cost[k] = value + fee
+                    cash -= value + fee
+                    holdings_value += qty[k] * close_arr[k][i]
+                    open_positions += 1
+                    trades.append({'timestamp': now, 'symbol': symbols[k], 'action': 'buy', 'price': price,
+                                   'size': qty[k], 'commission': fee, 'pnl': 0.0})
+
+            curve_ts.append(now)
+            curve_equity.append(cash + holdings_value)
+            curve_cash.append(cash)
+
+        equity_curve = pd.DataFrame({'equity': curve_equity, 'cash': curve_cash},
+                                    index=pd.to_datetime(curve_ts, unit='s', utc=True))
+        trades_df = pd.DataFrame(trades)
+        if not trades_df.empty:
+            trades_df['timestamp'] = pd.to_datetime(trades_df['timestamp'], unit='s', utc=True)
+
+        trade_counts = Counter(t['symbol'] for t in trades)
+        unrealized = [qty[k] * last[k] - cost[k] if qty[k] else 0.0 for k in range(len(symbols))]
+        asset_performances = sorted(({
+            'symbol': symbols[k],
+            'realized_pnl': realized[k],
+            'unrealized_pnl': unrealized[k],
+            'pnl': realized[k] + unrealized[k],
+            'trades': trade_counts[symbols[k]],
+            'open_position': qty[k],
+        } for k in range(len(symbols))), key=lambda a: a['pnl'], reverse=True)
+
+        result = self._metrics(np.asarray(curve_ts), np.asarray(curve_equity), np.asarray(curve_cash), trades_df)
+        result.update({
+            'symbols': len(symbols),
+            'events': sum(len(t) for t in ts_arr),
+            'open_positions': open_positions,
+            'final_cash': cash,
+            'rejections': rejections,
+            'asset_performances': asset_performances,
+            'equity_curve': equity_curve,
+            'trades': trades_df,
+        })
+        return result
+
+    def _metrics(self, ts: np.ndarray, values: np.ndarray, cash: np.ndarray,
+                 trades: pd.DataFrame) -> dict[str, Any]:
+        """Return, risk and trade statistics of the shared equity curve."""
+        if len(values) == 0:
+            return {'initial_capital': self.initial_capital, 'final_value': self.initial_capital,
+                    'total_return': 0.0, 'total_trades': 0}
+        sells = trades[trades['action'] == 'sell'] if not trades.empty else trades
+        metrics = compute_metrics(values, trade_pnls=sells['pnl'].to_numpy(float) if not sells.empty else None,
+                                  positions=values - cash, timestamps=ts,
+                                  initial_capital=self.initial_capital)
+        metrics['total_trades'] = len(trades)
+        return metrics
@@ -0,0 +1,287 @@
+"""
+Accelerated historical replay of the live trading loop.
+
+``run_replay`` drives an unmodified ``EnhancedTrader.start_trading`` over
+stored candles. The trader gets a ``ReplayExchange`` and, for the duration
+of the run, its module globals ``time`` and ``datetime`` (and those of the
+strategy and risk manager) point at a ``VirtualClock``. Every
+``time.sleep`` in the loop then advances the clock instantly, which
+reveals the next closed candle, so the loop, signal execution, order
+verification and portfolio sync run at CPU speed. Rebuy cooldowns and
+daily risk counters follow the virtual time.
+
+Shared services the live path reaches through singleton getters are
+swapped for replay instances while the run lasts: the portfolio service
+reads the replay account, the dynamic ML/TA weighting keeps its samples
+in memory, and the ML confidence analyzer (which needs live market data)
+reports a fixed hybrid score, so a replay never touches the network or the
+live database. The run ends when the clock passes the last candle.
+
+Those swaps are process-wide, so they must never happen inside the web
+server or any other process doing live work. ``run_replay`` therefore
+hands the run to a freshly spawned child process (or runs it in place when
+the caller is already a dedicated replay process, such as the CLI below),
+and the patching code refuses to run anywhere else.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import pandas as pd
+
+from ..data.manager import DataManager
+from ..exchanges.replay_adapter import ReplayExchange, ReplayPortfolioService
+from ..utils.performance_metrics import TIMEFRAME_SECONDS, compute_metrics
+from ..utils.virtual_clock import VirtualClock, patch_clock
+
+logger = logging.getLogger(__name__)
+
+# Candles visible before the first iteration (the trader reads 100)
+DEFAULT_WARMUP = 100
+_QUIET_LOGGERS = ('src.trading.enhanced_trader', 'src.strategies.enhanced_bollinger_strategy',
+                  'src.risk.manager', 'src.data.manager', 'src.exchanges.replay_adapter')
+
+# Set only in processes that exist to run replays (spawned children, the CLI)
+_dedicated_process = False
+
+
+class ReplayDataManager(DataManager):
+    """Uncached data manager reading the replay exchange.
+
+    The exchange already returns UTC-indexed float OHLCV frames, so the
+    per-call normalization of live exchange output is skipped.
+    """
+
+    def __init__(self, exchange: ReplayExchange):
+        super().__init__(exchange, cache_enabled=False)
+
+    def get_ohlcv(self, symbol: str, timeframe: str, limit: int = 100,
+                  start_time: Any = None, end_time: Any = None) -> pd.DataFrame:
+        return self.exchange.get_ohlcv(symbol, timeframe, limit)
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of a replay run."""
+
+    symbol: str
+    timeframe: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+    bars: int
+    wall_seconds: float
+    fills: list[dict[str, Any]]
+    equity_curve: pd.Series
+    statistics: dict[str, Any] = field(default_factory=dict)
+    metrics: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def bars_per_second(self) -> float:
+        return self.bars / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """JSON-friendly overview of the run."""
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'bars': self.bars,
+            'wall_seconds': round(self.wall_seconds, 3),
+            'bars_per_second': round(self.bars_per_second, 1),
+            'fills': len(self.fills),
+            'metrics': self.metrics,
+        }
+
+
+class _NeutralConfidence:
+    """Hybrid-score source for replays (the ML analyzer reads live market data)."""
+
+    def __init__(self, hybrid_score: float):
+        self.hybrid_score = hybrid_score
+
+    def calculate_enhanced_confidence(self, symbol: str, current_price: float, *args: Any,
+                                      **kwargs: Any) -> dict[str, Any]:
+        return {'symbol': symbol, 'hybrid_score': self.hybrid_score, 'ml_probability': None, 'ml_integration': {}}
+
+
+@contextmanager
+def _replay_services(portfolio: ReplayPortfolioService, hybrid_score: float) -> Iterator[None]:
+    """Swap the singleton getters the live path imports at call time."""
+    from ..services import portfolio_service
+    from ..utils import dynamic_weighting, ml_enhanced_confidence
+
+    weighting = dynamic_weighting.DynamicWeighting(db_path=None)
+    confidence = _NeutralConfidence(hybrid_score)
+    saved = [(portfolio_service, 'get_portfolio_service', portfolio_service.get_portfolio_service),
+             (dynamic_weighting, 'get_dynamic_weighting', dynamic_weighting.get_dynamic_weighting),
+             (ml_enhanced_confidence, 'get_ml_confidence_analyzer', ml_enhanced_confidence.get_ml_confidence_analyzer)]
+    portfolio_service.get_portfolio_service = lambda *args, **kwargs: portfolio
+    dynamic_weighting.get_dynamic_weighting = lambda: weighting
+    ml_enhanced_confidence.get_ml_confidence_analyzer = lambda: confidence
+    try:
+        yield
+    finally:
+        for module, name, original in saved:
+            setattr(module, name, original)
+
+
+@contextmanager
+def _quiet(level: int) -> Iterator[None]:
+    loggers = [logging.getLogger(name) for name in _QUIET_LOGGERS]
+    levels = [lg.level for lg in loggers]
+    for lg in loggers:
+        lg.setLevel(level)
+    try:
+        yield
+    finally:
+        for lg, previous in zip(loggers, levels, strict=True):
+            lg.setLevel(previous)
+
+
+def run_replay(config: Any, candles: pd.DataFrame, symbol: str = 'BTC/USDT', timeframe: str = '1h',
+               warmup: int = DEFAULT_WARMUP, initial_cash: float | None = None, hybrid_score: float = 0.0,
+               log_level: int | None = logging.ERROR) -> ReplayResult:
+    """
+    Replay the live trading loop over stored candles in a dedicated process.
+
+    The run happens in a spawned child unless this process is already a
+    dedicated replay process, so the caller's globals are never patched.
+
+    Args:
+        config: Trading configuration
+        candles: OHLCV DataFrame indexed by candle open time
+        symbol: Trading symbol
+        timeframe: Candle timeframe
+        warmup: Candles visible before the first iteration
+        initial_cash: Starting USDT balance (default ``backtesting.initial_capital``)
+        hybrid_score: ML/TA hybrid score reported for entries (0 disables hybrid sizing,
+            as when the analyzer is unavailable live)
+        log_level: Level for the trading loggers during the run (None leaves them)
+
+    Returns:
+        ReplayResult with fills, per-bar equity and trader statistics
+    """
+    args = (config, candles, symbol, timeframe, warmup, initial_cash, hybrid_score, log_level)
+    if _dedicated_process:
+        return _replay_in_process(*args)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_replay_child, *args).result()
+
+
+def _replay_child(*args: Any) -> ReplayResult:
+    """Entry point of the spawned replay process."""
+    global _dedicated_process
+    _dedicated_process = True
+    return _replay_in_process(*args)
+
+
+def _replay_in_process(config: Any, candles: pd.DataFrame, symbol: str = 'BTC/USDT', timeframe: str = '1h',
+                       warmup: int = DEFAULT_WARMUP, initial_cash: float | None = None,
+                       hybrid_score: float = 0.0, log_level: int | None = logging.ERROR) -> ReplayResult:
+    """
+    Replay the live trading loop over stored candles in this process.
+
+    Patches the clock globals and service getters of the whole process for
+    the duration of the run, so it only runs in a dedicated process.
+
+    Args:
+        config: Trading configuration
+        candles: OHLCV DataFrame indexed by candle open time
+        symbol: Trading symbol
+        timeframe: Timeframe of the candles (one loop iteration per bar)
+        warmup: Candles visible before the first iteration
+        initial_cash: Starting USDT balance (default ``backtesting.initial_capital``)
+        hybrid_score: ML/TA hybrid score reported for entries (0 disables hybrid sizing,
+            as when the analyzer is unavailable live)
+        log_level: Level for the trading loggers during the run (None leaves them)
+
+    Returns:
+        ReplayResult with fills, per-bar equity and trader statistics
+    """
+    if not _dedicated_process:
+        raise RuntimeError("Replays patch process-wide clocks and services; "
+                           "use run_replay, which runs them in a dedicated process")
+
+    from ..risk import manager as risk_manager
+    from ..strategies import enhanced_bollinger_strategy
+    from ..trading import enhanced_trader
+
+    if initial_cash is None:
+        initial_cash = config.get_float('backtesting', 'initial_capital', 10000.0)
+    if len(candles) <= warmup:
+        raise ValueError(f"Replay needs more than {warmup} candles, got {len(candles)}")
+
+    index = pd.DatetimeIndex(candles.index).sort_values()
+    index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+    bar = pd.Timedelta(seconds=TIMEFRAME_SECONDS[timeframe])
+    start, end = index[warmup - 1] + bar, index[-1] + bar
+    equity: dict[pd.Timestamp, float] = {}
+    trader = None
+
+    def on_advance(now: Any) -> None:
+        ts = pd.Timestamp(now)
+        if ts > end:
+            trader.stop_trading()
+            return
+        # Equity at each bar the loop sleeps through
+        equity[ts.floor(bar)] = exchange.equity()
+
+    clock = VirtualClock(start.to_pydatetime(), on_advance)
+    exchange = ReplayExchange({symbol: candles}, clock, timeframe, initial_cash=initial_cash,
+                              fee_rate=config.get_float('backtesting', 'commission', 0.001))
+    trader = enhanced_trader.EnhancedTrader(config, exchange)
+    trader.data_manager = ReplayDataManager(exchange)
+    trader.equity = initial_cash
+
+    with ExitStack() as stack:
+        stack.enter_context(patch_clock(clock, enhanced_trader, enhanced_bollinger_strategy, risk_manager))
+        stack.enter_context(_replay_services(ReplayPortfolioService(exchange), hybrid_score))
+        if log_level is not None:
+            stack.enter_context(_quiet(log_level))
+        began = time.perf_counter()
+        trader.start_trading(symbol, timeframe)
+        wall = time.perf_counter() - began
+
+    curve = pd.Series(equity, dtype=float).sort_index()
+    fills = list(exchange.fills)
+    pnls = [float(t.get('pnl', 0.0)) for t in trader.trade_history if t.get('action') == 'sell']
+    metrics = compute_metrics(curve.to_numpy(), trade_pnls=pnls, timestamps=curve.index, timeframe=timeframe,
+                              initial_capital=initial_cash) if len(curve) else {}
+    bars = int((end - start) / bar) + 1
+    result = ReplayResult(symbol, timeframe, start, end, bars, wall, fills, curve,
+                          trader.get_trading_statistics(), metrics)
+    logger.info(f"Replayed {bars} {timeframe} bars of {symbol} in {wall:.2f}s ({result.bars_per_second:.0f} bars/s)")
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from datetime import datetime, timedelta
+
+    from ..config import Config
+    from ..strategies.enhanced_bollinger_strategy import EnhancedBollingerBandsStrategy
+    from .engine import BacktestEngine
+
+    parser = argparse.ArgumentParser(description="Replay the live trading loop over history")
+    parser.add_argument("symbol")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--timeframe", default="1h")
+    args = parser.parse_args()
+
+    # This process only replays, so the run may patch its globals in place
+    _dedicated_process = True
+    config = Config()
+    end = datetime.now()
+    loader = BacktestEngine(config, EnhancedBollingerBandsStrategy(config))
+    history = loader.load_history(args.symbol, end - timedelta(days=args.days), end, args.timeframe)
+    print(json.dumps(run_replay(config, history, args.symbol, args.timeframe).summary(), indent=2, default=str))
@@ -0,0 +1,283 @@
+"""
+Content-addressed cache for backtest runs.
+
+A run is identified by what determines its outcome: the strategy class and
+its parameters, the symbol, timeframe, engine settings and the first bar
+of the candle range. The candles themselves are fingerprinted row by row
+(``pd.util.hash_pandas_object``) and the per-row hashes are stored with the
+run, so a lookup can tell three cases apart:
+
+- the request is the cached candles or a prefix of them: the stored
+  results are sliced and returned without simulating;
+- the request extends the cached candles with new bars: the simulation is
+  resumed from the stored end-of-run state (engine and strategy) and only
+  the new bars are simulated;
+- anything else (a revised candle, different start): full recompute.
+
+Runs are written as compressed ``.npz`` files (one array per results
+column plus JSON metadata), small JSON values as ``.json`` files. The
+directory is kept under ``max_bytes`` by evicting the least recently used
+files (access time is tracked through the file mtime), and recently used
+runs are also kept in memory so repeated hits skip the disk.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path("backtest_cache/results")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+MEMORY_ENTRIES = 32
+# Bump when simulation logic changes so stale runs are ignored
+CACHE_VERSION = 1
+
+NUMERIC_COLUMNS = ('price', 'cash', 'position', 'portfolio_value', 'trade_pnl')
+# Strategy attributes that are configuration, not run state
+_STRATEGY_STATIC = ('config', 'logger')
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp | datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _content_hash(*parts: Any) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, pd.DataFrame | pd.Series):
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=_json_default).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def row_hashes(data: pd.DataFrame) -> np.ndarray:
+    """One 64-bit hash per candle (index and values)."""
+    return pd.util.hash_pandas_object(data, index=True).to_numpy(np.uint64)
+
+
+def run_key(*parts: Any) -> str:
+    """Cache key for a run from its identifying parts."""
+    return _content_hash(CACHE_VERSION, *parts)
+
+
+@dataclass
+class CachedRun:
+    """A stored simulation and the state needed to extend it."""
+
+    row_hashes: np.ndarray
+    results: pd.DataFrame
+    trades: list[dict[str, Any]]
+    state: dict[str, Any] | None = None
+    strategy_state: bytes | None = None
+
+    @property
+    def n_bars(self) -> int:
+        return len(self.row_hashes)
+
+    @property
+    def resumable(self) -> bool:
+        return self.state is not None and self.strategy_state is not None
+
+    @classmethod
+    def capture(cls, hashes: np.ndarray, results: pd.DataFrame, trades: list[dict[str, Any]],
+                state: dict[str, Any] | None, strategy: Any) -> CachedRun:
+        """Snapshot a finished run (strategy state is kept only if it pickles)."""
+        try:
+            strategy_state = pickle.dumps({k: v for k, v in vars(strategy).items() if k not in _STRATEGY_STATIC})
+        except Exception as e:
+            logger.debug(f"Strategy state not picklable, run will not be extendable: {e}")
+            strategy_state = None
+        return cls(hashes, results, [dict(t) for t in trades], state, strategy_state)
+
+    def restore_strategy(self, strategy: Any) -> None:
+        """Put the strategy back into its end-of-run state."""
+        if self.strategy_state is not None:
+            vars(strategy).update(pickle.loads(self.strategy_state))
+
+
+class BacktestResultCache:
+    """Disk cache of backtest runs with LRU eviction."""
+
+    def __init__(self, root: str | Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 memory_entries: int = MEMORY_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            root: Cache directory
+            max_bytes: Size limit of the directory
+            memory_entries: Runs kept in memory
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[str, CachedRun] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.extensions = self.misses = 0
+
+    # -- runs ---------------------------------------------------------------
+
+    def get_run(self, key: str) -> CachedRun | None:
+        """Stored run for a key, or None."""
+        with self._lock:
+            run = self._memory.get(key)
+            if run is not None:
+                self._memory.move_to_end(key)
+        path = self.root / f"{key}.npz"
+        if run is not None:
+            self._touch(path)
+            return run
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                meta = json.loads(npz['meta'].tobytes())
+                timestamps = pd.DatetimeIndex(npz['timestamp'])
+                if meta['tz']:
+                    timestamps = timestamps.tz_localize('UTC').tz_convert(meta['tz'])
+                results = pd.DataFrame({'timestamp': timestamps})
+                for column in NUMERIC_COLUMNS:
+                    results[column] = npz[column]
+                results['signal'] = npz['signal'].astype(object)
+                results = results[['timestamp', 'price', 'cash', 'position', 'portfolio_value', 'signal', 'trade_pnl']]
+                strategy_state = npz['strategy_state'].tobytes() if 'strategy_state' in npz else None
+                hashes = npz['row_hashes']
+        except (OSError, KeyError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Unreadable cached backtest {key}: {e}")
+            return None
+        for trade in meta['trades']:
+            trade['timestamp'] = pd.Timestamp(trade['timestamp'])
+        run = CachedRun(hashes, results, meta['trades'], meta['state'], strategy_state)
+        self._remember(key, run)
+        self._touch(path)
+        return run
+
+    def put_run(self, key: str, run: CachedRun) -> None:
+        """Store a run (replacing any previous one under the key)."""
+        self._remember(key, run)
+        timestamps = pd.DatetimeIndex(run.results['timestamp'])
+        meta = {'tz': str(timestamps.tz) if timestamps.tz is not None else None,
+                'trades': run.trades, 'state': run.state}
+        if timestamps.tz is not None:
+            timestamps = timestamps.tz_convert('UTC').tz_localize(None)
+        arrays = {
+            'meta': np.frombuffer(json.dumps(meta, default=_json_default).encode(), dtype=np.uint8),
+            'row_hashes': run.row_hashes,
+            'timestamp': timestamps.to_numpy('datetime64[ns]'),
+            'signal': run.results['signal'].to_numpy(dtype=str),
+        }
+        for column in NUMERIC_COLUMNS:
+            arrays[column] = run.results[column].to_numpy(float)
+        if run.strategy_state is not None:
+            arrays['strategy_state'] = np.frombuffer(run.strategy_state, dtype=np.uint8)
+        self._write(key, '.npz', lambda f: np.savez_compressed(f, **arrays))
+
+    # -- small JSON values ----------------------------------------------------
+
+    def get(self, key: str) -> Any:
+        """Stored JSON value for a key, or None."""
+        path = self.root / f"{key}.json"
+        try:
+            value = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value."""
+        payload = json.dumps(value, default=_json_default).encode()
+        self._write(key, '.json', lambda f: f.write(payload))
+
+    # -- housekeeping ---------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """Hit counters of this process."""
+        return {'hits': self.hits, 'extensions': self.extensions, 'misses': self.misses,
+                'memory_entries': len(self._memory)}
+
+    def _remember(self, key: str, run: CachedRun) -> None:
+        with self._lock:
+            self._memory[key] = run
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(self, key: str, suffix: str, writer) -> None:
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.root / f".{key}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                writer(f)
+            os.replace(tmp, self.root / f"{key}{suffix}")
+            self._evict()
+        except OSError as e:
+            logger.warning(f"Could not cache backtest result {key}: {e}")
+
+    def _evict(self) -> None:
+        """Delete least recently used files until the directory fits ``max_bytes``."""
+        files = []
+        total = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+            key = Path(path).stem
+            with self._lock:
+                self._memory.pop(key, None)
+
+
+_cache: BacktestResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_backtest_cache() -> BacktestResultCache:
+    """Get the shared backtest result cache (``BACKTEST_CACHE_DIR``, ``BACKTEST_CACHE_MAX_MB``)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                root = os.getenv('BACKTEST_CACHE_DIR', str(DEFAULT_CACHE_DIR))
+                max_mb = float(os.getenv('BACKTEST_CACHE_MAX_MB', DEFAULT_MAX_BYTES / 1024 / 1024))
+                _cache = BacktestResultCache(root, int(max_mb * 1024 * 1024))
+    return _cache
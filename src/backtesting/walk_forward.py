@@ -0,0 +1,680 @@
+"""
+Walk-forward validation for strategies and the buy-return model.
+
+Candle history is cut into rolling train/test windows. For every
+(symbol, fold) the strategy is run in-sample on the train window for each
+parameter set, the best set is re-run on the unseen test window, and both
+runs are scored with ``BacktestEngine._calculate_metrics``. The model is
+scored on the same fold boundaries: fitted on signals from the train window
+and evaluated on signals from the test window.
+
+Folds run in a process pool across all cores. Each task carries one window
+and a ``WindowIndicatorCache`` that computes every indicator once over the
+whole window, so all parameter sets and both the in-sample and the
+out-of-sample run reuse it. Fold results are stored under a hash of the
+window's data, the strategy settings of every parameter set and a
+fingerprint of the simulation and scoring source, so a nightly run only
+computes the folds whose data, settings or code changed.
+"""
+
+from __future__ import annotations
+
+import copy
+import functools
+import hashlib
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ..data.market_impact import get_market_impact_model
+from ..indicators.technical import TechnicalIndicators
+from ..strategies.base import BaseStrategy
+from .engine import BacktestEngine
+from .result_cache import _content_hash, _json_default
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path("backtest_cache/walk_forward")
+MIN_TRAIN_BARS = 30
+# Modules whose source decides strategy fold results (relative to ``src``)
+SIMULATION_MODULES = ('.backtesting.engine', '.backtesting.walk_forward', '.utils.performance_metrics',
+                      '.indicators.technical', '.strategies.base', '.data.market_impact')
+
+
+@dataclass(frozen=True)
+class Fold:
+    """One train/test split; the test window starts where training ends."""
+
+    index: int
+    train_start: pd.Timestamp
+    train_end: pd.Timestamp
+    test_end: pd.Timestamp
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "fold": self.index,
+            "train_start": self.train_start.isoformat(),
+            "train_end": self.train_end.isoformat(),
+            "test_end": self.test_end.isoformat(),
+        }
+
+
+def generate_folds(start: Any, end: Any, train_period: Any = "90D", test_period: Any = "30D",
+                   step: Any = None, anchored: bool = False) -> list[Fold]:
+    """
+    Rolling train/test windows between ``start`` and ``end``.
+
+    Test windows start on a grid of ``step`` multiples since the Unix epoch,
+    so tomorrow's run produces the same windows as today's plus any new
+    ones, and earlier folds can be served from the cache.
+
+    Args:
+        start: First timestamp of the history
+        end: Last timestamp of the history (test windows never extend past it)
+        train_period: Length of each train window
+        test_period: Length of each test window
+        step: Distance between consecutive folds (default: ``test_period``)
+        anchored: Keep every train window starting at the first fold's start
+            (expanding window) instead of rolling it forward
+
+    Returns:
+        Folds in chronological order
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if start.tzinfo is None:
+        start = start.tz_localize("UTC")
+    if end.tzinfo is None:
+        end = end.tz_localize("UTC")
+    train_period, test_period = pd.Timedelta(train_period), pd.Timedelta(test_period)
+    step = pd.Timedelta(step) if step is not None else test_period
+    if train_period <= pd.Timedelta(0) or test_period <= pd.Timedelta(0) or step <= pd.Timedelta(0):
+        raise ValueError("train_period, test_period and step must be positive")
+
+    epoch = pd.Timestamp(0, tz="UTC")
+    first_test = start + train_period
+    test_start = epoch + step * -((epoch - first_test) // step)  # ceil onto the step grid
+    anchor = test_start - train_period
+
+    folds = []
+    while test_start + test_period <= end:
+        train_start = anchor if anchored else test_start - train_period
+        folds.append(Fold(len(folds), train_start, test_start, test_start + test_period))
+        test_start += step
+    return folds
+
+
+class WindowIndicatorCache(TechnicalIndicators):
+    """
+    Indicators computed once over a whole window and served as prefixes.
+
+    The strategy recomputes its indicators on ``data.iloc[:i + 1]`` at every
+    bar. For causal indicators the result on a prefix equals the prefix of
+    the result on the full window, so each (indicator, column, parameters)
+    combination is computed once and sliced on later calls. Series that are
+    not a prefix of a window column fall through to a normal computation.
+    """
+
+    def __init__(self, window: pd.DataFrame):
+        """
+        Initialize the cache.
+
+        Args:
+            window: Full OHLCV window shared by the runs on this fold
+        """
+        super().__init__()
+        self.window = window
+        # Plain arrays: the prefix check runs for every indicator call on every bar
+        self._index = _index_values(window.index)
+        self._columns = {name: window[name].to_numpy() for name in window.columns}
+        self._cache: dict[tuple, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def bollinger_bands(self, data: pd.Series, period: int = 20, std_dev: float = 2.0):
+        return self._cached(TechnicalIndicators.bollinger_bands, (data,), (period, std_dev))
+
+    def atr(self, high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14):
+        return self._cached(TechnicalIndicators.atr, (high, low, close), (period,))
+
+    def rsi(self, data: pd.Series, period: int = 14):
+        return self._cached(TechnicalIndicators.rsi, (data,), (period,))
+
+    def macd(self, data: pd.Series, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        return self._cached(TechnicalIndicators.macd, (data,), (fast_period, slow_period, signal_period))
+
+    def sma(self, data: pd.Series, period: int):
+        return self._cached(TechnicalIndicators.sma, (data,), (period,))
+
+    def ema(self, data: pd.Series, period: int):
+        return self._cached(TechnicalIndicators.ema, (data,), (period,))
+
+    def _prefix_length(self, series: pd.Series) -> int | None:
+        """Length of ``series`` if it is a prefix of the window column it is named after."""
+        column = self._columns.get(getattr(series, "name", None))
+        n = len(series)
+        if column is None or not 0 < n <= len(column):
+            return None
+        index = _index_values(series.index)
+        if index is None or index[0] != self._index[0] or index[-1] != self._index[n - 1]:
+            return None
+        # Guards against derived series that kept the column name (e.g. pct_change)
+        last, expected = series.to_numpy()[-1], column[n - 1]
+        if not (last == expected or (pd.isna(last) and pd.isna(expected))):
+            return None
+        return n
+
+    def _cached(self, func: Callable, series_args: tuple, params: tuple):
+        lengths = {self._prefix_length(s) for s in series_args}
+        n = lengths.pop() if len(lengths) == 1 else None
+        if n is None:
+            self.misses += 1
+            return func(*series_args, *params)
+
+        key = (func.__name__, tuple(s.name for s in series_args), params)
+        full = self._cache.get(key)
+        if full is None:
+            self.misses += 1
+            full = func(*(self.window[s.name] for s in series_args), *params)
+            self._cache[key] = full
+        else:
+            self.hits += 1
+        if isinstance(full, tuple):
+            return tuple(part.iloc[:n] for part in full)
+        return full.iloc[:n]
+
+
+class FoldCache:
+    """JSON fold results keyed by content hash."""
+
+    def __init__(self, root: str | Path | None = DEFAULT_CACHE_DIR):
+        """
+        Initialize the cache.
+
+        Args:
+            root: Cache directory (None disables caching)
+        """
+        self.root = Path(root) if root is not None else None
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        if self.root is None:
+            return None
+        try:
+            return json.loads((self.root / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        if self.root is None:
+            return
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.root / f".{key}.tmp"
+            tmp.write_text(json.dumps(value, default=_json_default))
+            os.replace(tmp, self.root / f"{key}.json")
+        except OSError as e:
+            logger.warning(f"Could not cache fold result {key}: {e}")
+
+
+def _clean_metrics(metrics: dict[str, Any]) -> dict[str, float]:
+    """Plain floats (NaN/inf as None) so results are JSON-safe."""
+    out = {}
+    for key, value in metrics.items():
+        value = float(value)
+        out[key] = value if np.isfinite(value) else None
+    return out
+
+
+def apply_params(config: Any, params: dict[str, Any]) -> Any:
+    """
+    Copy of ``config`` with ``section.key`` overrides applied.
+
+    Environment variables still take precedence, as in ``Config.get``.
+    """
+    if not params:
+        return config
+    config = copy.deepcopy(config)
+    for dotted, value in params.items():
+        section, key = dotted.split(".", 1)
+        if not config.config.has_section(section):
+            config.config.add_section(section)
+        config.config.set(section, key, str(value))
+    return config
+
+
+def _run_strategy(config: Any, strategy_factory: Callable[[Any], BaseStrategy], params: dict[str, Any],
+                  data: pd.DataFrame, symbol: str, indicators: WindowIndicatorCache,
+                  start_index: int = 0) -> dict[str, float]:
+    run_config = apply_params(config, params)
+    strategy = strategy_factory(run_config)
+    if hasattr(strategy, "indicators"):
+        strategy.indicators = indicators
+    engine = BacktestEngine(run_config, strategy)
+    results = engine._simulate_trading(data, symbol, start_index=start_index)
+    if start_index:
+        results = results.iloc[start_index:].reset_index(drop=True)
+    return _clean_metrics(engine._calculate_metrics(results))
+
+
+def _selection_score(metrics: dict[str, float], select_by: str) -> float:
+    value = metrics.get(select_by)
+    return value if value is not None else -np.inf
+
+
+def evaluate_window(config: Any, strategy_factory: Callable[[Any], BaseStrategy], symbol: str,
+                    window: pd.DataFrame, n_train: int, param_sets: list[dict[str, Any]],
+                    select_by: str = "sharpe_ratio") -> dict[str, Any]:
+    """
+    Optimize on the train part of a window and score the choice on the test part.
+
+    Args:
+        config: Configuration object
+        strategy_factory: Callable building a strategy from a config
+        symbol: Trading symbol
+        window: OHLCV rows of the train window followed by the test window
+        n_train: Number of train rows at the start of ``window``
+        param_sets: Candidate ``section.key`` config overrides
+        select_by: In-sample metric that picks the parameter set
+
+    Returns:
+        Chosen parameters with in-sample and out-of-sample metrics
+    """
+    indicators = WindowIndicatorCache(window)
+    train = window.iloc[:n_train]
+    in_sample = [_run_strategy(config, strategy_factory, params, train, symbol, indicators)
+                 for params in param_sets]
+    best = max(range(len(param_sets)), key=lambda i: _selection_score(in_sample[i], select_by))
+    # The test run replays the train bars without trading so indicators have their history
+    out_of_sample = _run_strategy(config, strategy_factory, param_sets[best], window, symbol,
+                                  indicators, start_index=n_train)
+    return {
+        "params": param_sets[best],
+        "in_sample": in_sample[best],
+        "out_of_sample": out_of_sample,
+        "candidates": len(param_sets),
+        "train_bars": int(n_train),
+        "test_bars": int(len(window) - n_train),
+        "indicator_cache": {"hits": indicators.hits, "misses": indicators.misses},
+    }
+
+
+def score_model_fold(train: pd.DataFrame, test: pd.DataFrame, target: str,
+                     features: tuple[str, ...]) -> dict[str, Any]:
+    """
+    Fit the buy-return model on one fold and score it on the next window.
+
+    Args:
+        train: Labelled rows from the train window
+        test: Labelled rows from the test window
+        target: Label column
+        features: Feature columns
+
+    Returns:
+        MSE, R², directional hit rate and row counts
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    # One core per fold: the pool already spreads folds over all cores
+    model = RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42, n_jobs=1)
+    model.fit(train[list(features)].to_numpy(dtype=float), train[target].to_numpy(dtype=float))
+    y_true = test[target].to_numpy(dtype=float)
+    y_pred = model.predict(test[list(features)].to_numpy(dtype=float))
+    return _clean_metrics({
+        "mse": mean_squared_error(y_true, y_pred),
+        "r2": r2_score(y_true, y_pred) if len(test) > 1 else np.nan,
+        "hit_rate": np.mean(np.sign(y_pred) == np.sign(y_true)),
+        "train_rows": len(train),
+        "test_rows": len(test),
+    })
+
+
+def _run_task(kind: str, args: tuple) -> dict[str, Any]:
+    """Process-pool entry point."""
+    if kind == "strategy":
+        return evaluate_window(*args)
+    return score_model_fold(*args)
+
+
+def summarize(records: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    """
+    Distribution of each metric across folds.
+
+    Args:
+        records: Per-fold metric dicts
+
+    Returns:
+        Metric -> mean, median, std, min and max
+    """
+    frame = pd.DataFrame([r for r in records if r]).apply(pd.to_numeric, errors="coerce")
+    if frame.empty:
+        return {}
+    stats = frame.agg(["mean", "median", "std", "min", "max"])
+    return {column: _clean_metrics(stats[column].to_dict()) for column in stats.columns}
+
+
+class WalkForwardEngine:
+    """Walk-forward backtests over many assets, one process per fold."""
+
+    def __init__(self, config, strategy_factory: Callable[[Any], BaseStrategy],
+                 param_sets: list[dict[str, Any]] | None = None, train_period: Any = "90D",
+                 test_period: Any = "30D", step: Any = None, anchored: bool = False,
+                 select_by: str = "sharpe_ratio", max_workers: int | None = None,
+                 cache_dir: str | Path | None = DEFAULT_CACHE_DIR, min_test_bars: int = 10):
+        """
+        Initialize the walk-forward engine.
+
+        Args:
+            config: Configuration object
+            strategy_factory: Picklable callable building a strategy from a
+                config (a strategy class works)
+            param_sets: Candidate ``section.key`` config overrides, e.g.
+                ``[{"strategy.bb_period": 20}, {"strategy.bb_period": 30}]``
+            train_period: Train window length
+            test_period: Test window length
+            step: Distance between folds (default: ``test_period``)
+            anchored: Use expanding instead of rolling train windows
+            select_by: In-sample metric that picks the parameter set
+            max_workers: Worker processes (default: all cores; 1 runs inline)
+            cache_dir: Fold result cache directory (None disables it)
+            min_test_bars: Folds with fewer test bars for a symbol are skipped
+        """
+        self.config = config
+        self.strategy_factory = strategy_factory
+        self.param_sets = param_sets or [{}]
+        self.train_period = pd.Timedelta(train_period)
+        self.test_period = pd.Timedelta(test_period)
+        self.step = pd.Timedelta(step) if step is not None else self.test_period
+        self.anchored = anchored
+        self.select_by = select_by
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = FoldCache(cache_dir)
+        self.min_test_bars = min_test_bars
+        self.logger = logging.getLogger(__name__)
+
+    def load_histories(self, symbols: list[str], start_date: datetime, end_date: datetime,
+                       timeframe: str = '1h') -> dict[str, pd.DataFrame]:
+        """
+        Load candle history for every symbol, skipping symbols that fail.
+
+        Args:
+            symbols: Trading symbols
+            start_date: History start
+            end_date: History end
+            timeframe: Data timeframe
+
+        Returns:
+            Symbol -> OHLCV DataFrame
+        """
+        loader = BacktestEngine(self.config, self.strategy_factory(self.config))
+        histories = {}
+        for symbol in symbols:
+            try:
+                data = loader.load_history(symbol, start_date, end_date, timeframe)
+                if not data.empty:
+                    histories[symbol] = data
+            except Exception as e:
+                self.logger.warning(f"Skipping {symbol}: could not load history ({e})")
+        return histories
+
+    def folds_for(self, histories: dict[str, pd.DataFrame],
+                  model_dataset: pd.DataFrame | None = None) -> list[Fold]:
+        """Folds covering the span of all histories (and the model dataset)."""
+        starts, ends = [], []
+        for data in histories.values():
+            if not data.empty:
+                starts.append(_utc(data.index[0]))
+                ends.append(_utc(data.index[-1]))
+        if model_dataset is not None and not model_dataset.empty:
+            starts.append(pd.Timestamp(int(model_dataset["ts"].min()), unit="s", tz="UTC"))
+            ends.append(pd.Timestamp(int(model_dataset["ts"].max()), unit="s", tz="UTC"))
+        if not starts:
+            return []
+        return generate_folds(min(starts), max(ends), self.train_period, self.test_period,
+                              self.step, self.anchored)
+
+    def run(self, histories: dict[str, pd.DataFrame], model_dataset: pd.DataFrame | None = None,
+            target: str | None = None, features: tuple[str, ...] | None = None) -> dict[str, Any]:
+        """
+        Run every (symbol, fold) backtest and every model fold.
+
+        Args:
+            histories: Symbol -> OHLCV DataFrame with a DatetimeIndex
+            model_dataset: Optional ``training.build_training_set`` output to
+                cross-validate the buy-return model on the same folds
+            target: Model label column (default: the training default)
+            features: Model feature columns (default: the training default)
+
+        Returns:
+            Per-fold records, summaries across folds and per symbol, model
+            scores and run statistics
+        """
+        folds = self.folds_for(histories, model_dataset)
+        self.logger.info(f"Walk-forward: {len(histories)} symbols x {len(folds)} folds")
+
+        records: list[dict[str, Any]] = []
+        pending: list[tuple[dict[str, Any], str, str, tuple]] = []
+        settings = self._strategy_settings() if histories else None
+        for symbol, data in histories.items():
+            for fold in folds:
+                task = self._strategy_task(symbol, data, fold, settings)
+                if task is not None:
+                    self._queue(task, records, pending)
+
+        model_records: list[dict[str, Any]] = []
+        if model_dataset is not None and not model_dataset.empty:
+            for fold in folds:
+                task = self._model_task(model_dataset, fold, target, features)
+                if task is not None:
+                    self._queue(task, model_records, pending)
+
+        failed = self._execute(pending)
+
+        summary = {
+            "in_sample": summarize([r.get("in_sample") for r in records]),
+            "out_of_sample": summarize([r.get("out_of_sample") for r in records]),
+        }
+        returns = [r["out_of_sample"].get("total_return") for r in records if r.get("out_of_sample")]
+        returns = [v for v in returns if v is not None]
+        summary["positive_fold_ratio"] = float(np.mean([v > 0 for v in returns])) if returns else None
+
+        by_symbol: dict[str, list] = {}
+        for r in records:
+            by_symbol.setdefault(r["symbol"], []).append(r.get("out_of_sample"))
+
+        return {
+            "folds": records,
+            "summary": summary,
+            "by_symbol": {symbol: summarize(rows) for symbol, rows in by_symbol.items()},
+            "model": {
+                "folds": model_records,
+                "summary": summarize([r.get("scores") for r in model_records]),
+            } if model_records else None,
+            "stats": {
+                "folds": len(folds),
+                "tasks": len(records) + len(model_records),
+                "computed": len(pending) - failed,
+                "reused": len(records) + len(model_records) - len(pending),
+                "failed": failed,
+                "workers": self.max_workers,
+            },
+        }
+
+    def _strategy_settings(self) -> dict[str, Any]:
+        """What a strategy fold depends on besides its data: code and per-parameter-set settings."""
+        module = getattr(self.strategy_factory, '__module__', None)
+        return {
+            "code": code_fingerprint(*SIMULATION_MODULES, *([module] if module else [])),
+            "factory": _factory_name(self.strategy_factory),
+            "strategies": [self.strategy_factory(apply_params(self.config, params)).get_strategy_parameters()
+                           for params in self.param_sets],
+        }
+
+    def _strategy_task(self, symbol: str, data: pd.DataFrame, fold: Fold, settings: dict[str, Any]):
+        index = data.index
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        in_window = (index >= fold.train_start) & (index < fold.test_end)
+        window = data[in_window]
+        n_train = int((index[in_window] < fold.train_end).sum())
+        if n_train < MIN_TRAIN_BARS or len(window) - n_train < self.min_test_bars:
+            return None
+        record = {"symbol": symbol, **fold.to_dict()}
+        key = _content_hash(
+            "strategy", symbol, settings, self.param_sets, self.select_by, fold.to_dict(), n_train,
+            _engine_settings(self.config, symbol), window,
+        )
+        return record, key, "strategy", (self.config, self.strategy_factory, symbol, window, n_train,
+                                         self.param_sets, self.select_by)
+
+    def _model_task(self, dataset: pd.DataFrame, fold: Fold, target: str | None,
+                    features: tuple[str, ...] | None):
+        from src.ml.labels import DEFAULT_HORIZONS
+        from src.ml.training import DEFAULT_TARGET, MODEL_FEATURES
+
+        target = target or DEFAULT_TARGET
+        features = tuple(features or MODEL_FEATURES)
+        labelled = dataset.dropna(subset=[target, *features])
+        ts = labelled["ts"].to_numpy(dtype=np.int64)
+        train_start, train_end, test_end = (int(t.timestamp()) for t in
+                                            (fold.train_start, fold.train_end, fold.test_end))
+        # Purge train rows whose label window reaches into the test period
+        horizon = DEFAULT_HORIZONS.get(target.removeprefix("ret_"), 0)
+        train = labelled[(ts >= train_start) & (ts + horizon < train_end)]
+        test = labelled[(ts >= train_end) & (ts < test_end)]
+        if len(train) < MIN_TRAIN_BARS or len(test) < 2:
+            return None
+        columns = ["ts", *features, target]
+        record = fold.to_dict()
+        key = _content_hash(code_fingerprint(__name__), "model", target, list(features), fold.to_dict(),
+                            train[columns].reset_index(drop=True), test[columns].reset_index(drop=True))
+        return record, key, "model", (train[columns], test[columns], target, features)
+
+    def _queue(self, task: tuple, records: list, pending: list) -> None:
+        record, key, kind, args = task
+        records.append(record)
+        cached = self.cache.get(key)
+        if cached is not None:
+            record.update(cached, cached_result=True)
+        else:
+            record["cached_result"] = False
+            pending.append((record, key, kind, args))
+
+    def _execute(self, pending: list[tuple[dict[str, Any], str, str, tuple]]) -> int:
+        """Run pending tasks (in a process pool when there is more than one worker)."""
+        failed = 0
+
+        def finish(record: dict[str, Any], key: str, kind: str, result: dict[str, Any] | None,
+                   error: Exception | None) -> None:
+            nonlocal failed
+            if error is not None:
+                failed += 1
+                record["error"] = str(error)
+                self.logger.error(f"Walk-forward {kind} fold {record.get('fold')} "
+                                  f"{record.get('symbol', '')} failed: {error}")
+                return
+            value = result if kind == "strategy" else {"scores": result}
+            record.update(value)
+            self.cache.put(key, value)
+
+        if self.max_workers == 1 or len(pending) <= 1:
+            for record, key, kind, args in pending:
+                try:
+                    finish(record, key, kind, _run_task(kind, args), None)
+                except Exception as e:
+                    finish(record, key, kind, None, e)
+            return failed
+
+        # Spawned workers start clean: forking a threaded web process is unsafe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(pending)),
+                                 mp_context=context) as executor:
+            futures = {executor.submit(_run_task, kind, args): (record, key, kind)
+                       for record, key, kind, args in pending}
+            for future in as_completed(futures):
+                record, key, kind = futures[future]
+                try:
+                    finish(record, key, kind, future.result(), None)
+                except Exception as e:
+                    finish(record, key, kind, None, e)
+        return failed
+
+
+def _index_values(index: pd.Index) -> np.ndarray | None:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8
+    if index.dtype.kind in "iu":
+        return index.to_numpy()
+    return None
+
+
+def _utc(ts: pd.Timestamp) -> pd.Timestamp:
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts
+
+
+def _factory_name(factory: Callable) -> str:
+    return f"{getattr(factory, '__module__', '')}.{getattr(factory, '__qualname__', repr(factory))}"
+
+
+@functools.cache
+def code_fingerprint(*modules: str) -> str:
+    """
+    Hash of the source files of modules, so cached results follow code changes.
+
+    Args:
+        modules: Module names (relative ones are resolved against ``src``)
+    """
+    root = __name__.split('.', 1)[0]
+    digest = hashlib.sha256()
+    for name in sorted(modules):
+        module = importlib.import_module(name, root if name.startswith('.') else None)
+        digest.update(name.encode())
+        source = getattr(module, '__file__', None)
+        digest.update(Path(source).read_bytes() if source else b'')
+    return digest.hexdigest()
+
+
+def _engine_settings(config: Any, symbol: str) -> dict[str, Any]:
+    settings: dict[str, Any] = {key: config.get_float('backtesting', key, default) for key, default in
+                                (("initial_capital", 10000), ("commission", 0.001), ("slippage", 0.0005))}
+    # Same rule as BacktestEngine._cache_key: a refitted impact curve changes the fills
+    if config.get_bool('backtesting', 'order_book_slippage', True):
+        impact = get_market_impact_model().fingerprint(symbol)
+        if impact is not None:
+            settings['impact'] = impact
+    return settings
+
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import timedelta
+
+    from ..config import Config
+    from ..strategies.enhanced_bollinger_strategy import EnhancedBollingerBandsStrategy
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest across assets")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--train", default="90D")
+    parser.add_argument("--test", default="30D")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    config = Config()
+    engine = WalkForwardEngine(config, EnhancedBollingerBandsStrategy, train_period=args.train,
+                               test_period=args.test, max_workers=args.workers)
+    end = datetime.now()
+    histories = engine.load_histories(args.symbols, end - timedelta(days=args.days), end, args.timeframe)
+    report = engine.run(histories)
+    print(json.dumps({"summary": report["summary"], "stats": report["stats"]}, indent=2))
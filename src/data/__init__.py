@@ -5,5 +5,7 @@ Handles OHLCV data retrieval, caching, and storage.
 
 from .cache import DataCache
 from .manager import DataManager
+from .portfolio_timeseries import PortfolioTimeSeries
+from .resampler import CandleResampler, get_candle_resampler
 
-__all__ = ['DataCache', 'DataManager']
+__all__ = ['DataCache', 'DataManager', 'PortfolioTimeSeries', 'CandleResampler', 'get_candle_resampler']
@@ -0,0 +1,188 @@
+"""
+Shared store of precomputed entry confidence.
+
+The confidence scheduler writes each asset's recent daily candles and its
+latest confidence result here; scans, analyzers and API routes only read.
+Rows are keyed by symbol in SQLite, so every gunicorn worker sees the
+scores computed by the one process running the scheduler, and a lookup is
+a single primary-key read.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any
+
+import numpy as np
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class ConfidenceStore:
+    """SQLite-backed latest candles and confidence per symbol."""
+
+    def __init__(self, db_path: str = "trading.db"):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the confidence table."""
+        try:
+            with self._connect() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS confidence_scores (
+                        symbol TEXT PRIMARY KEY,
+                        price REAL,
+                        candles TEXT,
+                        result TEXT,
+                        candles_at REAL,
+                        scored_at REAL
+                    )
+                ''')
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error initializing confidence store: {e!s}")
+
+    def put(self, symbol: str, candles: list[dict[str, Any]], price: float,
+            result: dict[str, Any] | None, ts: float | None = None) -> None:
+        """
+        Store fresh candles and the confidence computed from them.
+
+        Args:
+            symbol: Asset symbol (e.g. ``BTC``)
+            candles: Daily candles, oldest first
+            price: Price the confidence was computed at
+            result: ``calculate_confidence`` output
+            ts: Refresh time in epoch seconds (defaults to now)
+        """
+        ts = time.time() if ts is None else ts
+        try:
+            with self._connect() as conn:
+                conn.execute('''
+                    INSERT INTO confidence_scores (symbol, price, candles, result, candles_at, scored_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(symbol) DO UPDATE SET
+                        price = excluded.price,
+                        candles = excluded.candles,
+                        result = COALESCE(excluded.result, result),
+                        candles_at = excluded.candles_at,
+                        scored_at = COALESCE(excluded.scored_at, scored_at)
+                ''', (symbol, price,
+                      json.dumps(candles, separators=(",", ":"), default=_json_default),
+                      json.dumps(result, separators=(",", ":"), default=_json_default) if result else None,
+                      ts, ts if result else None))
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error storing confidence for {symbol}: {e!s}")
+
+    def get(self, symbol: str, max_age: float | None = None) -> dict[str, Any] | None:
+        """
+        Latest confidence result for a symbol.
+
+        Args:
+            symbol: Asset symbol
+            max_age: Ignore results older than this many seconds
+
+        Returns:
+            Confidence dict with ``current_price`` and ``scored_at`` added, or None
+        """
+        return self.get_many([symbol], max_age).get(symbol)
+
+    def get_many(self, symbols: list[str] | None = None,
+                 max_age: float | None = None) -> dict[str, dict[str, Any]]:
+        """
+        Latest confidence results for several symbols (all when ``symbols`` is None).
+
+        Args:
+            symbols: Asset symbols
+            max_age: Ignore results older than this many seconds
+
+        Returns:
+            Symbol -> confidence dict
+        """
+        query = 'SELECT symbol, price, result, scored_at FROM confidence_scores WHERE result IS NOT NULL'
+        params: list[Any] = []
+        if symbols is not None:
+            if not symbols:
+                return {}
+            query += f' AND symbol IN ({",".join("?" * len(symbols))})'
+            params.extend(symbols)
+        if max_age is not None:
+            query += ' AND scored_at >= ?'
+            params.append(time.time() - max_age)
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(query, params).fetchall()
+        except Exception as e:
+            self.logger.error(f"Error reading confidence scores: {e!s}")
+            return {}
+        out = {}
+        for symbol, price, result, scored_at in rows:
+            data = json.loads(result)
+            data['current_price'] = price
+            data['scored_at'] = scored_at
+            out[symbol] = data
+        return out
+
+    def candles(self, symbol: str, max_age: float | None = None) -> list[dict[str, Any]]:
+        """
+        Stored daily candles for a symbol, oldest first.
+
+        Args:
+            symbol: Asset symbol
+            max_age: Ignore candles fetched more than this many seconds ago
+
+        Returns:
+            Candle dicts (empty when nothing fresh is stored)
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute('SELECT candles, candles_at FROM confidence_scores WHERE symbol = ?',
+                                   (symbol,)).fetchone()
+        except Exception as e:
+            self.logger.error(f"Error reading candles for {symbol}: {e!s}")
+            return []
+        if not row or not row[0]:
+            return []
+        if max_age is not None and (row[1] or 0) < time.time() - max_age:
+            return []
+        return json.loads(row[0])
+
+
+_confidence_store: ConfidenceStore | None = None
+_confidence_store_lock = threading.Lock()
+
+
+def get_confidence_store() -> ConfidenceStore:
+    """Get the process-wide confidence store."""
+    global _confidence_store
+    if _confidence_store is None:
+        with _confidence_store_lock:
+            if _confidence_store is None:
+                _confidence_store = ConfidenceStore(os.getenv("CONFIDENCE_STORE_DB", "trading.db"))
+    return _confidence_store
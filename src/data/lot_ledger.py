@@ -0,0 +1,496 @@
+"""
+Incremental lot accounting over the fills ledger.
+
+``LotLedger`` keeps, per base asset, a FIFO queue of open lots and an
+average-cost position side by side, and folds each new fill into both as
+it arrives: a buy appends a lot (fees included in its unit cost), a sell
+consumes lots from the front (FIFO) and the average position pro rata
+(average cost), realizing PnL net of the sell fee. Each lot is queued and
+consumed once, so a fill costs amortized O(1) and history is never
+rescanned.
+
+Realized PnL is also added to day / week / month / year buckets keyed by
+the fill time, so "realized today for PEPE" or "realized this month" is a
+dictionary lookup. Unrealized PnL is open quantity times price minus the
+open cost, both kept as running totals.
+
+Fills are persisted (deduplicated by fill id) in SQLite and replayed once
+when the ledger is first used in a process. Fills usually arrive in time
+order; a fill older than the newest one of its asset (fetches of the last
+N trades overlap and arrive out of order) makes that asset's fills replay
+in time order, so the result never depends on arrival order and matches a
+restart's replay from SQLite. Sells beyond
+the tracked lots (holdings bought before the ledger window) realize
+nothing and are reported as ``unmatched_qty``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from collections import defaultdict, deque
+from collections.abc import Iterable
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import pandas as pd
+
+METHODS = ('fifo', 'average')
+PERIODS = ('day', 'week', 'month', 'year')
+# Quantities below this are treated as fully closed
+QTY_EPS = 1e-12
+# Cost basis and PnL are kept in this quote currency
+QUOTE_CURRENCY = 'USDT'
+
+logger = logging.getLogger(__name__)
+
+
+def period_key(ts: float, period: str) -> str:
+    """
+    Bucket label of an epoch time (UTC).
+
+    Args:
+        ts: Epoch seconds
+        period: ``'day'``, ``'week'`` (ISO), ``'month'`` or ``'year'``
+
+    Returns:
+        Label such as ``2024-03-05``, ``2024-W10``, ``2024-03`` or ``2024``
+    """
+    moment = datetime.fromtimestamp(ts, UTC)
+    if period == 'day':
+        return moment.strftime('%Y-%m-%d')
+    if period == 'week':
+        year, week, _ = moment.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == 'month':
+        return moment.strftime('%Y-%m')
+    if period == 'year':
+        return moment.strftime('%Y')
+    raise ValueError(f"Unknown period: {period}")
+
+
+def _epoch_seconds(value: Any) -> float | None:
+    if value is None or value == '':
+        return None
+    if isinstance(value, int | float) or (isinstance(value, str) and value.isdigit()):
+        number = float(value)
+        # Exchange timestamps are in milliseconds
+        return number / 1000.0 if number > 1e11 else number
+    try:
+        ts = pd.Timestamp(value)
+    except (ValueError, TypeError):
+        return None
+    if ts is pd.NaT:
+        return None
+    return (ts.tz_localize('UTC') if ts.tzinfo is None else ts).timestamp()
+
+
+@dataclass(slots=True)
+class LedgerFill:
+    """One normalized fill: quantity received/delivered and fee in quote currency."""
+
+    id: str
+    symbol: str
+    side: str
+    qty: float
+    price: float
+    fee: float
+    ts: float
+
+
+def normalize_fill(raw: dict[str, Any]) -> LedgerFill | None:
+    """
+    Normalize a fill from any of the repo's trade shapes.
+
+    Accepts raw OKX fills (``fillId``/``instId``/``fillSz``/``fillPx``),
+    ``OKXAdapter.get_trades`` rows, ccxt trades and ``trades`` table rows.
+    Lots are kept per base asset in USDT, so fills against any other quote
+    currency are rejected. When the record carries its quote notional
+    (``cost`` / ``total_value``) that is what was paid, not ``qty * price``.
+
+    Args:
+        raw: Fill or trade record
+
+    Returns:
+        LedgerFill, or None if the record is not a usable USDT spot fill
+    """
+    try:
+        pair = str(raw.get('symbol') or raw.get('instId') or '').replace('-', '/').upper()
+        base, _, quote = pair.partition('/')
+        side = str(raw.get('side') or raw.get('action') or '').lower()
+        side = {'b': 'buy', 's': 'sell', 'sell_short': 'sell'}.get(side, side)
+        qty = float(next((raw[k] for k in ('quantity', 'amount', 'size', 'fillSz') if raw.get(k) not in (None, '')), 0))
+        price = float(raw.get('price') or raw.get('fillPx') or 0)
+        notional = float(raw.get('cost') or raw.get('total_value') or 0)
+        ts = _epoch_seconds(raw.get('timestamp') or raw.get('ts') or raw.get('datetime'))
+    except (TypeError, ValueError):
+        return None
+    if quote and quote != QUOTE_CURRENCY:
+        return None
+    if notional > 0 and qty > 0:
+        price = notional / qty
+    if not base or side not in ('buy', 'sell') or qty <= 0 or price <= 0 or ts is None:
+        return None
+
+    fee_raw = raw.get('fee', raw.get('commission', 0))
+    fee_currency = raw.get('fee_currency') or raw.get('feeCcy') or ''
+    if isinstance(fee_raw, dict):
+        fee_currency = fee_raw.get('currency') or fee_currency
+        fee_raw = fee_raw.get('cost', 0)
+    try:
+        fee = abs(float(fee_raw or 0))
+    except (TypeError, ValueError):
+        fee = 0.0
+    fee_currency = str(fee_currency).upper()
+    if fee_currency == base:
+        # Value the fee in quote; a buy also receives that much less of the asset,
+        # so the quote paid is spread over the net quantity
+        if side == 'buy':
+            qty -= fee
+        fee *= price
+    elif fee_currency not in ('', QUOTE_CURRENCY):
+        logger.debug(f"Ignoring {fee_currency} fee on {pair} fill (no quote value)")
+        fee = 0.0
+    if qty <= 0:
+        return None
+
+    fill_id = raw.get('id') or raw.get('fillId') or raw.get('trade_id') or raw.get('tradeId')
+    if not fill_id:
+        fill_id = f"{base}:{side}:{ts:.3f}:{qty:.12g}:{price:.12g}"
+    return LedgerFill(str(fill_id), base, side, qty, price, fee, ts)
+
+
+class _AssetLots:
+    """Open lots and running totals of one asset."""
+
+    __slots__ = ('lots', 'by_fill', 'qty', 'cost', 'realized', 'unmatched_qty', 'last_ts')
+
+    def __init__(self) -> None:
+        # FIFO lots: [remaining qty, unit cost incl. fee, fill id]
+        self.lots: deque[list[Any]] = deque()
+        self.by_fill: dict[str, list[Any]] = {}
+        self.qty = {m: 0.0 for m in METHODS}
+        self.cost = {m: 0.0 for m in METHODS}
+        self.realized = {m: 0.0 for m in METHODS}
+        self.unmatched_qty = 0.0
+        self.last_ts = 0.0
+
+    def buy(self, fill: LedgerFill) -> None:
+        unit = (fill.qty * fill.price + fill.fee) / fill.qty
+        lot = [fill.qty, unit, fill.id]
+        self.lots.append(lot)
+        self.by_fill[fill.id] = lot
+        for method in METHODS:
+            self.qty[method] += fill.qty
+            self.cost[method] += fill.qty * unit
+
+    def sell(self, fill: LedgerFill) -> dict[str, tuple[float, float]]:
+        """Consume the sold quantity; returns method -> (realized pnl, cost of the matched qty)."""
+        net_unit = (fill.qty * fill.price - fill.fee) / fill.qty
+
+        remaining, fifo_cost = fill.qty, 0.0
+        while remaining > QTY_EPS and self.lots:
+            lot = self.lots[0]
+            take = min(lot[0], remaining)
+            fifo_cost += take * lot[1]
+            lot[0] -= take
+            remaining -= take
+            if lot[0] <= QTY_EPS:
+                lot[0] = 0.0
+                self.lots.popleft()
+                self.by_fill.pop(lot[2], None)
+        matched = fill.qty - remaining
+        self.unmatched_qty += max(remaining, 0.0)
+
+        avg_unit = self.cost['average'] / self.qty['average'] if self.qty['average'] > QTY_EPS else 0.0
+        matched_avg = min(fill.qty, self.qty['average'])
+        costs = {'fifo': fifo_cost, 'average': matched_avg * avg_unit}
+        matched_qty = {'fifo': matched, 'average': matched_avg}
+
+        out = {}
+        for method in METHODS:
+            pnl = matched_qty[method] * net_unit - costs[method]
+            self.qty[method] -= matched_qty[method]
+            self.cost[method] -= costs[method]
+            if self.qty[method] <= QTY_EPS:
+                # Drop rounding residue once flat
+                self.qty[method] = self.cost[method] = 0.0
+            self.realized[method] += pnl
+            out[method] = (pnl, costs[method])
+        return out
+
+
+class LotLedgerStore:
+    """SQLite-backed, deduplicated fills feeding the lot ledger."""
+
+    def __init__(self, db_path: str = "trading.db"):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the ledger fills table."""
+        try:
+            with self._connect() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS ledger_fills (
+                        id TEXT PRIMARY KEY,
+                        symbol TEXT NOT NULL,
+                        side TEXT NOT NULL,
+                        qty REAL NOT NULL,
+                        price REAL NOT NULL,
+                        fee REAL NOT NULL,
+                        ts REAL NOT NULL
+                    )
+                ''')
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error initializing lot ledger store: {e!s}")
+
+    def add(self, fills: list[LedgerFill]) -> None:
+        try:
+            with self._connect() as conn:
+                conn.executemany('INSERT OR IGNORE INTO ledger_fills (id, symbol, side, qty, price, fee, ts) '
+                                 'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                 [(f.id, f.symbol, f.side, f.qty, f.price, f.fee, f.ts) for f in fills])
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error storing ledger fills: {e!s}")
+
+    def load(self) -> list[LedgerFill]:
+        """All stored fills in time order."""
+        try:
+            with self._connect() as conn:
+                rows = conn.execute('SELECT id, symbol, side, qty, price, fee, ts FROM ledger_fills '
+                                    'ORDER BY ts, rowid').fetchall()
+        except Exception as e:
+            self.logger.error(f"Error reading ledger fills: {e!s}")
+            return []
+        return [LedgerFill(*row) for row in rows]
+
+
+class LotLedger:
+    """Per-asset FIFO and average-cost lots with O(1) PnL queries."""
+
+    def __init__(self, store: LotLedgerStore | None = None):
+        """
+        Initialize the ledger.
+
+        Args:
+            store: Persistent fills (None keeps the ledger in memory only)
+        """
+        self.store = store
+        self._assets: dict[str, _AssetLots] = {}
+        self._seen: set[str] = set()
+        # asset -> applied fills in time order, for replays after a late fill
+        self._history: dict[str, list[LedgerFill]] = {}
+        # fill id -> method -> (realized pnl, matched cost) for sells
+        self._fill_pnl: dict[str, dict[str, tuple[float, float]]] = {}
+        # (method, period, label) -> asset -> realized pnl ('*' = all assets)
+        self._buckets: dict[tuple[str, str, str], defaultdict[str, float]] = {}
+        self._loaded = store is None
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        fills = self.store.load() if self.store is not None else []
+        for fill in fills:
+            self._apply(fill)
+        if fills:
+            logger.info(f"Lot ledger replayed {len(fills)} stored fills")
+
+    def _apply(self, fill: LedgerFill) -> None:
+        self._seen.add(fill.id)
+        lots = self._assets.get(fill.symbol)
+        if lots is None:
+            lots = self._assets[fill.symbol] = _AssetLots()
+        lots.last_ts = max(lots.last_ts, fill.ts)
+        self._history.setdefault(fill.symbol, []).append(fill)
+        if fill.side == 'buy':
+            lots.buy(fill)
+            return
+        results = lots.sell(fill)
+        self._fill_pnl[fill.id] = results
+        self._add_to_buckets(fill, results, 1.0)
+
+    def _add_to_buckets(self, fill: LedgerFill, results: dict[str, tuple[float, float]], sign: float) -> None:
+        for period in PERIODS:
+            label = period_key(fill.ts, period)
+            for method, (pnl, _) in results.items():
+                bucket = self._buckets.get((method, period, label))
+                if bucket is None:
+                    bucket = self._buckets[(method, period, label)] = defaultdict(float)
+                bucket[fill.symbol] += sign * pnl
+                bucket['*'] += sign * pnl
+
+    def _replay_asset(self, asset: str, late: list[LedgerFill]) -> None:
+        """Rebuild an asset's lots from all its fills in time order (after a late fill)."""
+        history = self._history.pop(asset, [])
+        for fill in history:
+            results = self._fill_pnl.pop(fill.id, None)
+            if results is not None:
+                self._add_to_buckets(fill, results, -1.0)
+        self._assets[asset] = _AssetLots()
+        # Stable sort: equal times keep arrival order, like the store's (ts, rowid)
+        for fill in sorted(history + late, key=lambda f: f.ts):
+            self._apply(fill)
+
+    def ingest(self, fills: Iterable[dict[str, Any]]) -> int:
+        """
+        Fold new fills in (already seen fill ids are skipped).
+
+        Args:
+            fills: Fill or trade records in any shape ``normalize_fill`` accepts
+
+        Returns:
+            Number of new fills applied
+        """
+        with self._lock:
+            self._ensure_loaded()
+            new: dict[str, LedgerFill] = {}
+            for raw in fills:
+                fill = normalize_fill(raw)
+                if fill is not None and fill.id not in self._seen:
+                    new[fill.id] = fill
+            ordered = sorted(new.values(), key=lambda f: f.ts)
+            by_asset: dict[str, list[LedgerFill]] = {}
+            for fill in ordered:
+                by_asset.setdefault(fill.symbol, []).append(fill)
+            for asset, asset_fills in by_asset.items():
+                lots = self._assets.get(asset)
+                if lots is not None and asset_fills[0].ts < lots.last_ts:
+                    self._replay_asset(asset, asset_fills)
+                else:
+                    for fill in asset_fills:
+                        self._apply(fill)
+        if ordered and self.store is not None:
+            self.store.add(ordered)
+        return len(ordered)
+
+    def position(self, symbol: str, method: str = 'fifo') -> dict[str, float]:
+        """
+        Open position of an asset.
+
+        Args:
+            symbol: Base asset or pair
+            method: ``'fifo'`` or ``'average'``
+
+        Returns:
+            quantity, cost_basis, avg_cost, realized (all time) and unmatched_qty
+        """
+        with self._lock:
+            self._ensure_loaded()
+            lots = self._assets.get(symbol.replace('-', '/').split('/')[0].upper())
+            if lots is None:
+                return {'quantity': 0.0, 'cost_basis': 0.0, 'avg_cost': 0.0, 'realized': 0.0, 'unmatched_qty': 0.0}
+            qty, cost = lots.qty[method], lots.cost[method]
+            return {'quantity': qty, 'cost_basis': cost, 'avg_cost': cost / qty if qty > QTY_EPS else 0.0,
+                    'realized': lots.realized[method], 'unmatched_qty': lots.unmatched_qty}
+
+    def realized(self, symbol: str | None = None, method: str = 'fifo', period: str | None = None,
+                 at: datetime | float | None = None) -> float:
+        """
+        Realized PnL, all time or within the period containing ``at``.
+
+        Args:
+            symbol: Base asset or pair (None for all assets)
+            method: ``'fifo'`` or ``'average'``
+            period: ``'day'``, ``'week'``, ``'month'``, ``'year'`` or None for all time
+            at: Time inside the period (defaults to now)
+
+        Returns:
+            Realized PnL in quote currency
+        """
+        asset = symbol.replace('-', '/').split('/')[0].upper() if symbol else None
+        with self._lock:
+            self._ensure_loaded()
+            if period is None:
+                if asset is not None:
+                    lots = self._assets.get(asset)
+                    return lots.realized[method] if lots is not None else 0.0
+                return sum(lots.realized[method] for lots in self._assets.values())
+            ts = datetime.now(UTC).timestamp() if at is None else at if isinstance(at, int | float) else at.timestamp()
+            bucket = self._buckets.get((method, period, period_key(ts, period)))
+            return bucket.get(asset or '*', 0.0) if bucket is not None else 0.0
+
+    def unrealized(self, symbol: str, price: float, method: str = 'fifo') -> float:
+        """Open quantity valued at ``price`` minus its cost basis."""
+        pos = self.position(symbol, method)
+        return pos['quantity'] * price - pos['cost_basis'] if pos['quantity'] > 0 else 0.0
+
+    def fill_pnl(self, fill_id: str, method: str = 'fifo') -> tuple[float, float] | None:
+        """(Realized PnL, matched cost) of a sell fill, or None if unknown or a buy."""
+        with self._lock:
+            self._ensure_loaded()
+            result = self._fill_pnl.get(str(fill_id))
+            return result[method] if result is not None else None
+
+    def open_lot(self, fill_id: str) -> tuple[float, float] | None:
+        """(Remaining qty, unit cost) of a buy fill's FIFO lot, or None once fully sold."""
+        with self._lock:
+            self._ensure_loaded()
+            for lots in self._assets.values():
+                lot = lots.by_fill.get(str(fill_id))
+                if lot is not None:
+                    return lot[0], lot[1]
+            return None
+
+    def summary(self, prices: dict[str, float] | None = None, method: str = 'fifo',
+                period: str | None = 'day') -> dict[str, dict[str, float]]:
+        """
+        Per-asset PnL overview.
+
+        Args:
+            prices: Base asset -> current price (unrealized is 0 without one)
+            method: ``'fifo'`` or ``'average'``
+            period: Period for ``realized_period`` (None skips it)
+
+        Returns:
+            Asset -> quantity, cost_basis, avg_cost, realized, realized_period, unrealized
+        """
+        prices = prices or {}
+        with self._lock:
+            self._ensure_loaded()
+            out = {}
+            for asset in self._assets:
+                pos = self.position(asset, method)
+                price = prices.get(asset)
+                pos['unrealized'] = pos['quantity'] * price - pos['cost_basis'] if price and pos['quantity'] else 0.0
+                if period is not None:
+                    pos['realized_period'] = self.realized(asset, method, period)
+                out[asset] = pos
+            return out
+
+
+_lot_ledger: LotLedger | None = None
+_lot_ledger_lock = threading.Lock()
+
+
+def get_lot_ledger() -> LotLedger:
+    """Get the process-wide lot ledger."""
+    global _lot_ledger
+    if _lot_ledger is None:
+        with _lot_ledger_lock:
+            if _lot_ledger is None:
+                _lot_ledger = LotLedger(LotLedgerStore(os.getenv("LOT_LEDGER_DB", "trading.db")))
+    return _lot_ledger
@@ -13,21 +13,30 @@ import pandas as pd
 
 from ..exchanges.base import BaseExchange
 from .cache import DataCache
+from .resampler import BASE_TIMEFRAME, CandleResampler
 
 
 class DataManager:
     """Data manager class for OHLCV data with safe typing and caching."""
 
-    def __init__(self, exchange: BaseExchange, cache_enabled: bool = True) -> None:
+    # Longest 1m catch-up fetched in one call; longer gaps reseed the symbol
+    MAX_BASE_FETCH = 300
+    # 1m refetch interval shared by all timeframes of a symbol
+    BASE_REFRESH_SEC = 10.0
+
+    def __init__(self, exchange: BaseExchange, cache_enabled: bool = True,
+                 resampler: CandleResampler | None = None) -> None:
         """
         Initialize data manager.
 
         Args:
             exchange: Exchange adapter
             cache_enabled: Whether to enable caching
+            resampler: Derive supported timeframes from one 1m stream per symbol
         """
         self.exchange: BaseExchange = exchange
         self.cache: DataCache | None = DataCache() if cache_enabled else None
+        self.resampler = resampler
         self.logger = logging.getLogger(__name__)
 
     # ---------------------------
@@ -48,6 +57,16 @@ class DataManager:
             DataFrame indexed by UTC DatetimeIndex with columns:
             ["open","high","low","close","volume"]
         """
+        # Live reads of resampled timeframes share one 1m fetch per symbol
+        if (self.resampler is not None and start_time is None and end_time is None
+                and self.resampler.supports(timeframe)):
+            try:
+                resampled = self._resampled_ohlcv(symbol, timeframe, limit)
+                if not resampled.empty:
+                    return resampled
+            except Exception as e:
+                self.logger.warning(f"Resampled {symbol} {timeframe} unavailable, fetching directly: {e}")
+
         # Try new LRU cache first
         try:
             from app import cache_get_ohlcv, cache_put_ohlcv
@@ -186,6 +205,30 @@ class DataManager:
             self.logger.error(f"Error updating data for {symbol} {timeframe}: {e}")
             return self._empty_df()
 
+    def _resampled_ohlcv(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        """Refresh the symbol's 1m stream (throttled) and read a timeframe from the resampler."""
+        resampler = cast(CandleResampler, self.resampler)
+        now = datetime.now(UTC)
+        last = resampler.last_base_time(symbol)
+        if last is not None and (now.timestamp() - last) / 60 > self.MAX_BASE_FETCH:
+            resampler.reset(symbol)
+            last = None
+
+        fetched_at = resampler.fetched_at.get(symbol, 0.0)
+        if last is None or now.timestamp() - fetched_at >= self.BASE_REFRESH_SEC:
+            missing = self.MAX_BASE_FETCH if last is None else int((now.timestamp() - last) // 60) + 2
+            raw: Any = self.exchange.get_ohlcv(symbol, BASE_TIMEFRAME, min(missing, self.MAX_BASE_FETCH))
+            resampler.ingest(symbol, self._ensure_dt_index(self._coerce_df(raw)))
+            resampler.fetched_at[symbol] = now.timestamp()
+
+        if timeframe != BASE_TIMEFRAME and not resampler.is_seeded(symbol, timeframe, limit):
+            native: Any = self.exchange.get_ohlcv(symbol, timeframe, limit)
+            resampler.seed(symbol, timeframe, self._ensure_dt_index(self._coerce_df(native)))
+
+        df = resampler.get(symbol, timeframe, limit)
+        df.attrs.update(symbol=symbol, timeframe=timeframe, exchange=resampler.exchange)
+        return df
+
     # ---------------------------
     # Helpers (typed & robust)
     # ---------------------------
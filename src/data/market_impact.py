@@ -0,0 +1,434 @@
+"""
+Order-book market impact curves.
+
+The order book sampler stores top-of-book L2 snapshots here as compact
+float32 arrays (one BLOB per book). ``fit_impact_curve`` walks every stored
+book for a grid of order sizes (quote notional) and keeps, per side, the
+median cost of a market order relative to the mid price - half spread plus
+depth consumed. Beyond the visible depth the curve continues as a power
+law fitted to the walked points, so large orders on thin books (meme coins)
+still get a finite, growing cost.
+
+Fitted curves are stored per base asset. ``MarketImpactModel`` keeps them in
+memory and reloads them from SQLite periodically, so a lookup is an
+interpolation over ~25 points and never an order book call. Consumers pass
+their flat slippage as the default for assets without a curve.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+DEFAULT_DEPTH = 20
+# Order sizes in quote currency (USDT) the curves are tabulated at
+NOTIONAL_GRID = np.geomspace(10.0, 1_000_000.0, 26)
+# Cost ceiling for extrapolated orders far beyond the visible book
+MAX_COST = 0.5
+CURVE_RELOAD_SEC = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def base_asset(symbol: str) -> str:
+    """Base asset of ``BTC/USDT``, ``BTC-USDT`` or ``BTC``."""
+    return symbol.replace('-', '/').split('/')[0].upper()
+
+
+def book_levels(book: dict[str, Any], depth: int = DEFAULT_DEPTH) -> np.ndarray:
+    """
+    Pack an order book into a ``(2, depth, 2)`` float32 array.
+
+    Args:
+        book: ``{'bids': [[price, size], ...], 'asks': [...]}`` (ccxt / OKX shape)
+        depth: Levels kept per side (missing levels are zero-filled)
+
+    Returns:
+        ``levels[0]`` = bids, ``levels[1]`` = asks, columns (price, size)
+    """
+    levels = np.zeros((2, depth, 2), dtype=np.float32)
+    for side, key in enumerate(('bids', 'asks')):
+        rows = [(float(r[0]), float(r[1])) for r in (book.get(key) or [])[:depth]]
+        if rows:
+            levels[side, :len(rows)] = rows
+    return levels
+
+
+def walk_cost(levels: np.ndarray, notionals: np.ndarray = NOTIONAL_GRID) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cost of market orders against one book, relative to the mid price.
+
+    Args:
+        levels: ``book_levels`` array
+        notionals: Order sizes in quote currency
+
+    Returns:
+        (buy cost, sell cost) per notional; NaN where the visible book is too thin
+    """
+    levels = levels.astype(np.float64)
+    bids, asks = levels[0], levels[1]
+    bids, asks = bids[bids[:, 1] > 0], asks[asks[:, 1] > 0]
+    if not len(bids) or not len(asks):
+        nan = np.full(len(notionals), np.nan)
+        return nan, nan.copy()
+    mid = (bids[0, 0] + asks[0, 0]) / 2
+    costs = []
+    for side in (asks, bids):
+        prices, sizes = side[:, 0], side[:, 1]
+        cum_notional = np.cumsum(prices * sizes)
+        cum_qty = np.cumsum(sizes)
+        k = np.searchsorted(cum_notional, notionals)
+        inside = k < len(prices)
+        k = np.minimum(k, len(prices) - 1)
+        prev_notional = np.where(k > 0, cum_notional[k - 1], 0.0)
+        prev_qty = np.where(k > 0, cum_qty[k - 1], 0.0)
+        qty = prev_qty + (notionals - prev_notional) / prices[k]
+        cost = np.abs(notionals / qty / mid - 1)
+        costs.append(np.where(inside, cost, np.nan))
+    return costs[0], costs[1]
+
+
+class ImpactCurve:
+    """Market order cost vs. notional for one asset, per side."""
+
+    def __init__(self, symbol: str, notionals: np.ndarray, buy: np.ndarray, sell: np.ndarray,
+                 fitted_at: float, snapshots: int):
+        """
+        Initialize the curve.
+
+        Args:
+            symbol: Base asset
+            notionals: Order sizes in quote currency (ascending)
+            buy: Median buy cost per notional (NaN beyond visible depth)
+            sell: Median sell cost per notional (NaN beyond visible depth)
+            fitted_at: Fit time in epoch seconds
+            snapshots: Number of books the curve was fitted on
+        """
+        self.symbol = symbol
+        self.notionals = np.asarray(notionals, dtype=float)
+        self.log_notionals = np.log(self.notionals)
+        self.costs = {'buy': np.asarray(buy, dtype=float), 'sell': np.asarray(sell, dtype=float)}
+        self.fitted_at = fitted_at
+        self.snapshots = snapshots
+        self._tails = {side: self._fit_tail(cost) for side, cost in self.costs.items()}
+
+    def _fit_tail(self, cost: np.ndarray) -> tuple[float, float, float, float]:
+        """
+        Continuation past the last walked size: the excess over the half
+        spread grows as a power of size, with the exponent fitted on the
+        deepest walked points and anchored at the last one.
+        """
+        finite = np.flatnonzero(np.isfinite(cost))
+        if not len(finite):
+            return 0.0, 0.0, 0.0, 1.0
+        c0, last = float(cost[finite[0]]), int(finite[-1])
+        excess = cost - c0
+        # Ignore float32 rounding noise on the flat part of the book
+        usable = finite[excess[finite] > 1e-6][-4:]
+        a = 1.0
+        if len(usable) >= 2:
+            a = float(np.clip(np.polyfit(self.log_notionals[usable], np.log(excess[usable]), 1)[0], 0.5, 2.0))
+        # A book that is flat up to its depth costs at least the spread again per book
+        return float(self.notionals[last]), max(float(excess[last]), c0), c0, a
+
+    def cost(self, notional: float, side: str = 'buy') -> float:
+        """
+        Expected market order cost as a fraction of the mid price.
+
+        Args:
+            notional: Order size in quote currency
+            side: ``'buy'`` or ``'sell'``
+
+        Returns:
+            Fractional slippage (e.g. 0.002 = 0.2%)
+        """
+        side = 'sell' if side.lower() == 'sell' else 'buy'
+        cost = self.costs[side]
+        finite = np.flatnonzero(np.isfinite(cost))
+        if not len(finite):
+            return MAX_COST
+        last_notional, last_excess, c0, a = self._tails[side]
+        if notional <= last_notional:
+            log_x = np.log(max(notional, self.notionals[0]))
+            return float(np.interp(log_x, self.log_notionals[finite], cost[finite]))
+        return float(min(MAX_COST, c0 + last_excess * (notional / last_notional) ** a))
+
+    def to_dict(self) -> dict[str, Any]:
+        def clean(values: np.ndarray) -> list[float | None]:
+            return [float(v) if np.isfinite(v) else None for v in values]
+        return {'symbol': self.symbol, 'notionals': self.notionals.tolist(), 'buy': clean(self.costs['buy']),
+                'sell': clean(self.costs['sell']), 'fitted_at': self.fitted_at, 'snapshots': self.snapshots}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ImpactCurve:
+        def arr(values: list[float | None]) -> np.ndarray:
+            return np.array([np.nan if v is None else v for v in values], dtype=float)
+        return cls(data['symbol'], np.array(data['notionals']), arr(data['buy']), arr(data['sell']),
+                   data['fitted_at'], data['snapshots'])
+
+
+def fit_impact_curve(symbol: str, books: Iterable[np.ndarray], notionals: np.ndarray = NOTIONAL_GRID,
+                     fitted_at: float | None = None) -> ImpactCurve | None:
+    """
+    Fit an impact curve from stored book snapshots.
+
+    Args:
+        symbol: Base asset
+        books: ``book_levels`` arrays
+        notionals: Order sizes to tabulate
+        fitted_at: Fit time in epoch seconds (defaults to now)
+
+    Returns:
+        ImpactCurve, or None without usable books
+    """
+    walked = [walk_cost(levels, notionals) for levels in books]
+    walked = [w for w in walked if np.isfinite(w[0][0]) and np.isfinite(w[1][0])]
+    if not walked:
+        return None
+    buys = np.array([w[0] for w in walked])
+    sells = np.array([w[1] for w in walked])
+
+    def median(costs: np.ndarray) -> np.ndarray:
+        # Sizes past the depth of most books are left to the tail fit
+        enough = np.isfinite(costs).mean(axis=0) >= 0.5
+        out = np.full(costs.shape[1], np.nan)
+        if enough.any():
+            out[enough] = np.nanmedian(costs[:, enough], axis=0)
+        # Cost never falls with size
+        return np.where(np.isnan(out), np.nan, np.fmax.accumulate(out))
+
+    return ImpactCurve(base_asset(symbol), notionals, median(buys), median(sells),
+                       time.time() if fitted_at is None else fitted_at, len(walked))
+
+
+def _missing_table(error: sqlite3.OperationalError) -> bool:
+    """Whether a read failed only because nothing was written yet."""
+    return 'no such table' in str(error) or 'unable to open' in str(error)
+
+
+class MarketImpactStore:
+    """SQLite-backed order book snapshots and fitted impact curves."""
+
+    def __init__(self, db_path: str = "trading.db"):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        # Tables are created by the first write, so readers (backtests, replays)
+        # never modify the database
+        self._tables_ready = False
+
+    @contextmanager
+    def _connect(self, readonly: bool = False):
+        if readonly:
+            conn = sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro", timeout=30.0, uri=True)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the snapshot and curve tables (once, before the first write)."""
+        if self._tables_ready:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS order_book_snapshots (
+                        symbol TEXT NOT NULL,
+                        ts REAL NOT NULL,
+                        depth INTEGER NOT NULL,
+                        levels BLOB NOT NULL
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_order_book_symbol_ts '
+                             'ON order_book_snapshots(symbol, ts)')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS impact_curves (
+                        symbol TEXT PRIMARY KEY,
+                        fitted_at REAL,
+                        curve TEXT
+                    )
+                ''')
+                conn.commit()
+            self._tables_ready = True
+        except Exception as e:
+            self.logger.error(f"Error initializing market impact store: {e!s}")
+
+    def add_snapshot(self, symbol: str, levels: np.ndarray, ts: float | None = None) -> None:
+        """
+        Store one ``book_levels`` array.
+
+        Args:
+            symbol: Trading symbol or base asset
+            levels: Packed book
+            ts: Snapshot time in epoch seconds (defaults to now)
+        """
+        self._init_db()
+        try:
+            with self._connect() as conn:
+                conn.execute('INSERT INTO order_book_snapshots (symbol, ts, depth, levels) VALUES (?, ?, ?, ?)',
+                             (base_asset(symbol), time.time() if ts is None else ts, levels.shape[1],
+                              levels.astype(np.float32).tobytes()))
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error storing order book for {symbol}: {e!s}")
+
+    def snapshots(self, symbol: str, since: float = 0.0) -> list[np.ndarray]:
+        """Stored books of an asset since ``since`` (epoch seconds), oldest first."""
+        try:
+            with self._connect(readonly=True) as conn:
+                rows = conn.execute('SELECT depth, levels FROM order_book_snapshots WHERE symbol = ? AND ts >= ? '
+                                    'ORDER BY ts', (base_asset(symbol), since)).fetchall()
+        except sqlite3.OperationalError as e:
+            if _missing_table(e):
+                return []
+            self.logger.error(f"Error reading order books for {symbol}: {e!s}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Error reading order books for {symbol}: {e!s}")
+            return []
+        return [np.frombuffer(blob, dtype=np.float32).reshape(2, depth, 2) for depth, blob in rows]
+
+    def prune(self, before: float) -> int:
+        """Delete snapshots older than ``before`` (epoch seconds)."""
+        self._init_db()
+        try:
+            with self._connect() as conn:
+                deleted = conn.execute('DELETE FROM order_book_snapshots WHERE ts < ?', (before,)).rowcount
+                conn.commit()
+                return deleted
+        except Exception as e:
+            self.logger.error(f"Error pruning order books: {e!s}")
+            return 0
+
+    def put_curve(self, curve: ImpactCurve) -> None:
+        self._init_db()
+        try:
+            with self._connect() as conn:
+                conn.execute('INSERT OR REPLACE INTO impact_curves (symbol, fitted_at, curve) VALUES (?, ?, ?)',
+                             (curve.symbol, curve.fitted_at, json.dumps(curve.to_dict(), separators=(",", ":"))))
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error storing impact curve for {curve.symbol}: {e!s}")
+
+    def curves(self) -> dict[str, ImpactCurve]:
+        """All fitted curves by base asset."""
+        try:
+            with self._connect(readonly=True) as conn:
+                rows = conn.execute('SELECT symbol, curve FROM impact_curves').fetchall()
+        except sqlite3.OperationalError as e:
+            if _missing_table(e):
+                return {}
+            self.logger.error(f"Error reading impact curves: {e!s}")
+            return {}
+        except Exception as e:
+            self.logger.error(f"Error reading impact curves: {e!s}")
+            return {}
+        return {symbol: ImpactCurve.from_dict(json.loads(curve)) for symbol, curve in rows}
+
+
+class MarketImpactModel:
+    """In-memory impact curves with periodic reload from the store."""
+
+    def __init__(self, store: MarketImpactStore | None, reload_seconds: float = CURVE_RELOAD_SEC):
+        """
+        Initialize the model.
+
+        Args:
+            store: Store to load fitted curves from (None: only ``set_curve``)
+            reload_seconds: Reload interval, so refits by the sampler are picked up
+        """
+        self.store = store
+        self.reload_seconds = reload_seconds
+        self._curves: dict[str, ImpactCurve] = {}
+        self._loaded_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        if self.store is None or time.monotonic() - self._loaded_at < self.reload_seconds:
+            return
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.reload_seconds:
+                return
+            self._loaded_at = time.monotonic()
+            self._curves.update(self.store.curves())
+
+    def set_curve(self, curve: ImpactCurve) -> None:
+        with self._lock:
+            self._curves[curve.symbol] = curve
+
+    def curve(self, symbol: str) -> ImpactCurve | None:
+        self._refresh()
+        return self._curves.get(base_asset(symbol))
+
+    def slippage(self, symbol: str | None, notional: float, side: str = 'buy', default: float = 0.0) -> float:
+        """
+        Expected fractional slippage of a market order.
+
+        Args:
+            symbol: Trading symbol or base asset (None gives ``default``)
+            notional: Order size in quote currency
+            side: ``'buy'`` or ``'sell'``
+            default: Flat slippage for assets without a curve
+
+        Returns:
+            Fraction of the price lost to spread and depth
+        """
+        curve = self.curve(symbol) if symbol else None
+        if curve is None or notional <= 0:
+            return default
+        return curve.cost(notional, side)
+
+    def fill_price(self, symbol: str | None, price: float, notional: float, side: str = 'buy',
+                   default: float = 0.0) -> float:
+        """Market order fill price: above ``price`` for buys, below for sells."""
+        slip = self.slippage(symbol, notional, side, default)
+        return price * (1 - slip) if side.lower() == 'sell' else price * (1 + slip)
+
+    def fingerprint(self, symbol: str) -> float | None:
+        """Fit time of the asset's curve (identifies it in result cache keys)."""
+        curve = self.curve(symbol)
+        return curve.fitted_at if curve is not None else None
+
+
+_impact_store: MarketImpactStore | None = None
+_impact_model: MarketImpactModel | None = None
+_impact_lock = threading.Lock()
+
+
+def get_market_impact_store() -> MarketImpactStore:
+    """Get the process-wide market impact store."""
+    global _impact_store
+    if _impact_store is None:
+        with _impact_lock:
+            if _impact_store is None:
+                _impact_store = MarketImpactStore(os.getenv("MARKET_IMPACT_DB", "trading.db"))
+    return _impact_store
+
+
+def get_market_impact_model() -> MarketImpactModel:
+    """Get the process-wide market impact model."""
+    global _impact_model
+    if _impact_model is None:
+        store = get_market_impact_store()
+        with _impact_lock:
+            if _impact_model is None:
+                _impact_model = MarketImpactModel(store)
+    return _impact_model
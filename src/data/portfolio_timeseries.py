@@ -0,0 +1,289 @@
+"""
+Portfolio value time series with incrementally maintained rollups.
+
+Samples are written to a 1-minute tier and folded into 1-hour and 1-day
+OHLC rollups in the same transaction (SQLite upserts), so no job ever
+rescans history to downsample. Each tier is keyed by its bucket start
+(epoch seconds) and has its own retention. Curve queries pick the coarsest
+tier that still gives enough resolution for the requested range and read
+only the rows they return.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+# tier name -> (bucket seconds, retention seconds)
+TIERS: dict[str, tuple[int, int]] = {
+    "1m": (60, 2 * 86400),
+    "1h": (3600, 120 * 86400),
+    "1d": (86400, 10 * 365 * 86400),
+}
+
+TIMEFRAME_SECONDS = {
+    "24h": 86400, "1d": 86400, "3d": 3 * 86400, "7d": 7 * 86400, "30d": 30 * 86400,
+    "90d": 90 * 86400, "6m": 182 * 86400, "1y": 365 * 86400,
+}
+
+# Maximum number of points a curve query should return before moving to a coarser tier
+MAX_CURVE_POINTS = 1500
+
+
+class PortfolioTimeSeries:
+    """SQLite-backed portfolio value series with 1m -> 1h -> 1d rollups."""
+
+    def __init__(self, db_path: str = "trading.db"):
+        """
+        Initialize the time series store.
+
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create tier tables (one per rollup resolution)."""
+        try:
+            with self._connect() as conn:
+                for tier in TIERS:
+                    conn.execute(f'''
+                        CREATE TABLE IF NOT EXISTS equity_{tier} (
+                            ts INTEGER PRIMARY KEY,
+                            open REAL NOT NULL,
+                            high REAL NOT NULL,
+                            low REAL NOT NULL,
+                            close REAL NOT NULL,
+                            cash REAL NOT NULL DEFAULT 0,
+                            positions_value REAL NOT NULL DEFAULT 0,
+                            assets TEXT,
+                            samples INTEGER NOT NULL DEFAULT 1
+                        )
+                    ''')
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error initializing portfolio time series: {e!s}")
+
+    def record(self, total_value: float, cash: float, assets: dict[str, float],
+               ts: float | None = None) -> None:
+        """
+        Record one sample and fold it into every rollup tier.
+
+        Args:
+            total_value: Total portfolio value
+            cash: Cash balance
+            assets: Per-asset value keyed by symbol
+            ts: Sample time in epoch seconds (defaults to now)
+        """
+        ts = time.time() if ts is None else ts
+        positions_value = float(sum(assets.values()))
+        assets_json = json.dumps({k: round(float(v), 8) for k, v in assets.items()},
+                                 separators=(",", ":"))
+        try:
+            with self._connect() as conn:
+                for tier, (bucket, _) in TIERS.items():
+                    # Upsert: first sample opens the bucket, later ones move high/low/close
+                    conn.execute(f'''
+                        INSERT INTO equity_{tier}
+                            (ts, open, high, low, close, cash, positions_value, assets, samples)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
+                        ON CONFLICT(ts) DO UPDATE SET
+                            high = max(high, excluded.high),
+                            low = min(low, excluded.low),
+                            close = excluded.close,
+                            cash = excluded.cash,
+                            positions_value = excluded.positions_value,
+                            assets = excluded.assets,
+                            samples = samples + 1
+                    ''', (int(ts // bucket) * bucket, total_value, total_value, total_value,
+                          total_value, cash, positions_value, assets_json))
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error recording portfolio sample: {e!s}")
+
+    def prune(self, now: float | None = None) -> int:
+        """
+        Apply per-tier retention.
+
+        Returns:
+            Number of rows deleted
+        """
+        now = time.time() if now is None else now
+        deleted = 0
+        try:
+            with self._connect() as conn:
+                for tier, (_, retention) in TIERS.items():
+                    cur = conn.execute(f'DELETE FROM equity_{tier} WHERE ts < ?', (int(now - retention),))
+                    deleted += cur.rowcount
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error pruning portfolio time series: {e!s}")
+        return deleted
+
+    @staticmethod
+    def tier_for(range_seconds: int) -> str:
+        """Coarsest tier whose retention covers the range without exceeding MAX_CURVE_POINTS."""
+        for tier, (bucket, retention) in TIERS.items():
+            if range_seconds <= retention and range_seconds / bucket <= MAX_CURVE_POINTS:
+                return tier
+        return "1d"
+
+    def series(self, timeframe: str = "30d", now: float | None = None) -> list[dict[str, Any]]:
+        """
+        Read the value series for a timeframe from the appropriate tier.
+
+        Args:
+            timeframe: One of ``TIMEFRAME_SECONDS`` keys
+            now: Reference time (for tests)
+
+        Returns:
+            List of ``{"ts", "date", "equity", "high", "low", "cash", "positions_value"}``
+        """
+        now = time.time() if now is None else now
+        range_seconds = TIMEFRAME_SECONDS.get(timeframe, TIMEFRAME_SECONDS["30d"])
+        tier = self.tier_for(range_seconds)
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(f'''
+                    SELECT ts, close, high, low, cash, positions_value
+                    FROM equity_{tier} WHERE ts >= ? ORDER BY ts
+                ''', (int(now - range_seconds),)).fetchall()
+        except Exception as e:
+            self.logger.error(f"Error reading portfolio time series: {e!s}")
+            return []
+        return [
+            {
+                "ts": ts,
+                "date": datetime.fromtimestamp(ts, tz=UTC).isoformat(),
+                "equity": close,
+                "high": high,
+                "low": low,
+                "cash": cash,
+                "positions_value": positions_value,
+            }
+            for ts, close, high, low, cash, positions_value in rows
+        ]
+
+    def latest_assets(self) -> dict[str, float]:
+        """Per-asset values from the most recent sample."""
+        try:
+            with self._connect() as conn:
+                row = conn.execute('SELECT assets FROM equity_1m ORDER BY ts DESC LIMIT 1').fetchone()
+            return json.loads(row[0]) if row and row[0] else {}
+        except Exception as e:
+            self.logger.error(f"Error reading latest asset values: {e!s}")
+            return {}
+
+
+def equity_metrics(points: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Summary metrics for an equity curve in one pass.
+
+    Args:
+        points: Output of ``PortfolioTimeSeries.series``
+
+    Returns:
+        Metrics dictionary (empty when there are no points)
+    """
+    if not points:
+        return {}
+    start, end = points[0]["equity"], points[-1]["equity"]
+    peak = start
+    max_dd = 0.0
+    n = 0
+    mean = m2 = 0.0
+    prev = None
+    for p in points:
+        eq = p["equity"]
+        peak = max(peak, eq)
+        if peak > 0:
+            max_dd = max(max_dd, (peak - eq) / peak * 100)
+        if prev:
+            # Welford running variance of period returns
+            r = eq / prev - 1
+            n += 1
+            delta = r - mean
+            mean += delta / n
+            m2 += delta * (r - mean)
+        prev = eq
+    return {
+        "start_equity": start,
+        "end_equity": end,
+        "current_equity": end,
+        "peak_equity": peak,
+        "total_return_percent": ((end / start - 1) * 100) if start else 0.0,
+        "max_drawdown_percent": max_dd,
+        "volatility_percent": math.sqrt(m2 / (n - 1)) * 100 if n > 1 else 0.0,
+        "data_points": len(points),
+    }
+
+
+def drawdown_curve(points: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """
+    Running-peak drawdown series and drawdown statistics in one pass.
+
+    Args:
+        points: Output of ``PortfolioTimeSeries.series``
+
+    Returns:
+        Tuple of (drawdown points, metrics)
+    """
+    curve: list[dict[str, Any]] = []
+    if not points:
+        return curve, {}
+
+    peak = points[0]["equity"]
+    peak_date = points[0]["date"]
+    max_dd, max_start, max_end, max_duration = 0.0, None, None, 0.0
+    underwater = periods = recoveries = 0
+    dd_sum = 0.0
+    in_drawdown = False
+
+    for p in points:
+        eq = p["equity"]
+        if eq >= peak:
+            if in_drawdown:
+                recoveries += 1
+                in_drawdown = False
+            peak, peak_date = eq, p["date"]
+        dd = (peak - eq) / peak * 100 if peak > 0 else 0.0
+        if dd > 0:
+            underwater += 1
+            dd_sum += dd
+            if not in_drawdown:
+                periods += 1
+                in_drawdown = True
+            if dd > max_dd:
+                max_dd, max_start, max_end = dd, peak_date, p["date"]
+                max_duration = (p["ts"] - datetime.fromisoformat(peak_date).timestamp()) / 86400
+        curve.append({"date": p["date"], "equity": eq, "peak_equity": peak, "drawdown_percent": dd})
+
+    metrics = {
+        "max_drawdown_percent": max_dd,
+        "current_drawdown_percent": curve[-1]["drawdown_percent"],
+        "average_drawdown_percent": dd_sum / underwater if underwater else 0.0,
+        "max_drawdown_start": max_start,
+        "max_drawdown_end": max_end,
+        "max_drawdown_duration_days": max_duration,
+        "total_drawdown_periods": periods,
+        "recovery_periods": recoveries,
+        "underwater_percentage": underwater / len(points) * 100,
+        "data_points": len(points),
+    }
+    return curve, metrics
@@ -0,0 +1,288 @@
+"""
+Multi-timeframe candle resampler fed by one 1m stream per symbol.
+
+``CandleResampler`` keeps the recent 1m bars of each symbol and derives
+higher timeframes (5m/15m/1h/4h/1d by default) incrementally: a new closed
+1m bar only touches the current bucket of each derived timeframe (open
+kept, high/low extended, close replaced, volume added), and a bar that
+starts a new bucket rolls the previous one into history. Buckets are
+aligned to the epoch in UTC, like exchange candles.
+
+Only closed 1m bars are folded in, and a bar counts as closed once the
+exchange has reported a later one, never by the local clock (a skewed
+server clock would otherwise fold a live bar and then reject its final
+version). The newest fetched 1m bar is held aside as *pending* and
+overlaid when a view is read, so re-fetching the live candle never double
+counts it.
+
+History older than the 1m window comes from one native fetch per derived
+timeframe (``seed``). The seeded in-progress bar is taken to include every
+1m bar up to the newest one already seen (closed or live); later 1m bars
+extend it.
+From then on ``DataManager`` only fetches 1m candles, so every timeframe
+is refreshed by a single upstream call per symbol.
+
+Candles differ between venues, so there is one resampler per exchange
+(``get_candle_resampler(exchange)``).
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ..utils.performance_metrics import TIMEFRAME_SECONDS
+
+BASE_TIMEFRAME = '1m'
+DEFAULT_TIMEFRAMES = ('5m', '15m', '1h', '4h', '1d')
+DEFAULT_BASE_BARS = 1440
+DEFAULT_MAX_BARS = 1000
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Bar: (open time in epoch seconds, open, high, low, close, volume)
+Bar = tuple[int, float, float, float, float, float]
+
+
+def _merge(bucket: list[Any], bar: Bar) -> None:
+    bucket[2] = max(bucket[2], bar[2])
+    bucket[3] = min(bucket[3], bar[3])
+    bucket[4] = bar[4]
+    bucket[5] += bar[5]
+
+
+def _rows(df: pd.DataFrame) -> Iterable[Bar]:
+    seconds = (df.index - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    values = df[COLUMNS].to_numpy(dtype=float)
+    for ts, (o, h, low, c, v) in zip(seconds, values, strict=True):
+        yield int(ts), o, h, low, c, v
+
+
+class _Series:
+    """Completed bars plus the bucket in progress for one symbol and timeframe."""
+
+    def __init__(self, seconds: int, max_bars: int):
+        self.seconds = seconds
+        self.bars: deque[Bar] = deque(maxlen=max_bars)
+        self.current: list[Any] | None = None
+        # Base bars at or before this time are already inside the seeded bars
+        self.cutoff = -1
+        self.seeded_limit = 0
+
+    def add(self, bar: Bar) -> None:
+        if bar[0] <= self.cutoff:
+            return
+        start = bar[0] - bar[0] % self.seconds
+        if self.current is not None and self.current[0] == start:
+            _merge(self.current, bar)
+            return
+        if self.current is not None:
+            self.bars.append(tuple(self.current))
+        self.current = [start, *bar[1:]]
+
+    def rows(self, limit: int, pending: Bar | None) -> list[Bar]:
+        current = list(self.current) if self.current is not None else None
+        tail: list[Bar] = []
+        if pending is not None and pending[0] > self.cutoff:
+            start = pending[0] - pending[0] % self.seconds
+            if current is not None and current[0] == start:
+                _merge(current, pending)
+            elif current is None or start > current[0]:
+                if current is not None:
+                    tail.append(tuple(current))
+                current = [start, *pending[1:]]
+        if current is not None:
+            tail.append(tuple(current))
+        history = list(self.bars)[-max(0, limit - len(tail)):] if limit > len(tail) else []
+        return (history + tail)[-limit:]
+
+
+class CandleResampler:
+    """Per-symbol 1m base series with incrementally derived higher timeframes."""
+
+    def __init__(self, timeframes: Iterable[str] = DEFAULT_TIMEFRAMES, base_bars: int = DEFAULT_BASE_BARS,
+                 max_bars: int = DEFAULT_MAX_BARS, exchange: str = 'default'):
+        """
+        Initialize the resampler.
+
+        Args:
+            timeframes: Derived timeframes (multiples of one minute)
+            base_bars: 1m bars kept per symbol
+            max_bars: Completed bars kept per derived timeframe
+            exchange: Venue whose candles this resampler holds
+        """
+        self.exchange = exchange
+        self.timeframes = tuple(tf for tf in timeframes if tf != BASE_TIMEFRAME)
+        for tf in self.timeframes:
+            if tf not in TIMEFRAME_SECONDS or TIMEFRAME_SECONDS[tf] % 60:
+                raise ValueError(f"Cannot derive {tf} from 1m bars")
+        self.base_bars = base_bars
+        self.max_bars = max_bars
+        self._base: dict[str, _Series] = {}
+        self._derived: dict[str, dict[str, _Series]] = {}
+        self._pending: dict[str, Bar | None] = {}
+        self._last_ts: dict[str, int] = {}
+        self.fetched_at: dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def supports(self, timeframe: str) -> bool:
+        return timeframe == BASE_TIMEFRAME or timeframe in self.timeframes
+
+    def _symbol(self, symbol: str) -> dict[str, _Series]:
+        if symbol not in self._derived:
+            self._base[symbol] = _Series(60, self.base_bars)
+            self._derived[symbol] = {tf: _Series(TIMEFRAME_SECONDS[tf], self.max_bars) for tf in self.timeframes}
+            self._pending[symbol] = None
+        return self._derived[symbol]
+
+    def update(self, symbol: str, bar: Bar) -> bool:
+        """
+        Fold one closed 1m bar into the base and every derived timeframe.
+
+        Args:
+            symbol: Trading symbol
+            bar: (open time in epoch seconds, open, high, low, close, volume)
+
+        Returns:
+            False if the bar is not newer than the last one folded in
+        """
+        with self._lock:
+            derived = self._symbol(symbol)
+            if bar[0] <= self._last_ts.get(symbol, -1):
+                return False
+            self._last_ts[symbol] = bar[0]
+            self._base[symbol].add(bar)
+            for series in derived.values():
+                series.add(bar)
+            pending = self._pending[symbol]
+            if pending is not None and pending[0] <= bar[0]:
+                self._pending[symbol] = None
+            return True
+
+    def ingest(self, symbol: str, df: pd.DataFrame) -> int:
+        """
+        Fold fetched 1m candles in and hold the newest one as pending.
+
+        Every candle but the newest is closed: the exchange has already
+        opened a later minute. The newest may still be live whatever the
+        local clock says, so it is only folded once a later fetch returns a
+        candle after it.
+
+        Args:
+            symbol: Trading symbol
+            df: 1m OHLCV indexed by UTC open time
+
+        Returns:
+            Number of new closed bars
+        """
+        if df.empty:
+            return 0
+        rows = list(_rows(df.sort_index()))
+        added = 0
+        with self._lock:
+            self._symbol(symbol)
+            for bar in rows[:-1]:
+                added += self.update(symbol, bar)
+            if rows[-1][0] > self._last_ts.get(symbol, -1):
+                self._pending[symbol] = rows[-1]
+        return added
+
+    def seed(self, symbol: str, timeframe: str, df: pd.DataFrame) -> None:
+        """
+        Install native history of a derived timeframe (last row = bar in progress).
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Derived timeframe
+            df: OHLCV indexed by UTC open time
+        """
+        with self._lock:
+            series = _Series(TIMEFRAME_SECONDS[timeframe], self.max_bars)
+            rows = list(_rows(df.sort_index()))
+            if rows:
+                series.bars.extend(rows[:-1])
+                series.current = list(rows[-1])
+            # The native in-progress bar already holds the live 1m candle too
+            pending = self._pending.get(symbol)
+            series.cutoff = max(self._last_ts.get(symbol, -1), pending[0] if pending else -1)
+            series.seeded_limit = len(rows)
+            self._symbol(symbol)[timeframe] = series
+
+    def is_seeded(self, symbol: str, timeframe: str, limit: int = 0) -> bool:
+        """Whether ``limit`` bars of a timeframe are available without a native fetch."""
+        with self._lock:
+            series = self._derived.get(symbol, {}).get(timeframe)
+            return series is not None and (series.seeded_limit >= limit or len(series.bars) + 1 >= limit)
+
+    def last_base_time(self, symbol: str) -> int | None:
+        """Open time (epoch seconds) of the newest closed 1m bar."""
+        with self._lock:
+            return self._last_ts.get(symbol)
+
+    def reset(self, symbol: str) -> None:
+        """Forget a symbol (e.g. after a gap longer than one 1m fetch)."""
+        with self._lock:
+            for store in (self._base, self._derived, self._pending, self._last_ts, self.fetched_at):
+                store.pop(symbol, None)
+
+    def get(self, symbol: str, timeframe: str, limit: int = 100, include_pending: bool = True) -> pd.DataFrame:
+        """
+        Latest bars of a timeframe, the last one possibly still in progress.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: ``'1m'`` or a derived timeframe
+            limit: Maximum number of bars
+            include_pending: Overlay the live 1m candle
+
+        Returns:
+            OHLCV DataFrame indexed by UTC open time (empty if unknown)
+        """
+        with self._lock:
+            if symbol not in self._derived:
+                rows: list[Bar] = []
+            else:
+                series = self._base[symbol] if timeframe == BASE_TIMEFRAME else self._derived[symbol].get(timeframe)
+                pending = self._pending[symbol] if include_pending else None
+                rows = series.rows(limit, pending) if series is not None else []
+        array = np.array(rows, dtype=float).reshape(-1, 6)
+        index = pd.to_datetime(array[:, 0].astype('int64'), unit='s', utc=True)
+        return pd.DataFrame(array[:, 1:], index=index, columns=COLUMNS)
+
+    def views(self, symbol: str, timeframes: Iterable[str], limit: int = 100) -> dict[str, pd.DataFrame]:
+        """Aligned bars of several timeframes, all read under one lock."""
+        with self._lock:
+            return {tf: self.get(symbol, tf, limit) for tf in timeframes}
+
+
+def higher_timeframe(timeframe: str, factor: int = 4) -> str | None:
+    """Smallest standard timeframe at least ``factor`` times longer (e.g. 1h -> 4h)."""
+    seconds = TIMEFRAME_SECONDS.get(timeframe)
+    if seconds is None:
+        return None
+    longer = [(s, tf) for tf, s in TIMEFRAME_SECONDS.items() if s >= seconds * factor]
+    return min(longer)[1] if longer else None
+
+
+_resamplers: dict[str, CandleResampler] = {}
+_resampler_lock = threading.Lock()
+
+
+def get_candle_resampler(exchange: str = 'default') -> CandleResampler:
+    """
+    Get the process-wide resampler of one exchange.
+
+    Args:
+        exchange: Venue name (traders pass their adapter class name)
+    """
+    resampler = _resamplers.get(exchange)
+    if resampler is None:
+        with _resampler_lock:
+            resampler = _resamplers.get(exchange)
+            if resampler is None:
+                resampler = _resamplers[exchange] = CandleResampler(exchange=exchange)
+    return resampler
@@ -0,0 +1,540 @@
+"""
+Append-only columnar journal of generated trading signals.
+
+Signals are fixed-schema records buffered in memory and appended in
+batches. Each flush writes a segment: a directory with one ``.npy`` file
+per column, rows sorted by (symbol, ts). ``manifest.json`` lists the
+segments with a sparse index - per segment and symbol, the row range and
+time range - so a per-symbol query memory-maps only the segments and rows
+that can match, newest first, and stops once it has enough rows.
+
+Small flush segments are periodically compacted into large ones, and
+segments past the retention window are dropped. Manifest updates hold an
+``flock`` on the journal directory, so every gunicorn worker can append.
+"""
+
+from __future__ import annotations
+
+import atexit
+import csv
+import fcntl
+import io
+import json
+import logging
+import math
+import os
+import shutil
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# column -> numpy dtype; records missing a numeric field store NaN
+SCHEMA: dict[str, str] = {
+    "ts": "f8",
+    "symbol": "U16",
+    "source": "U24",
+    "timing_signal": "U16",
+    "current_price": "f8",
+    "confidence_score": "f8",
+    "ml_probability": "f8",
+    "traditional_score": "f8",
+    "rsi": "f8",
+    "volatility": "f8",
+    "volume_ratio": "f8",
+}
+
+FLUSH_INTERVAL_SEC = 5.0
+COMPACT_INTERVAL_SEC = 3600.0
+
+
+def _as_float(value: Any) -> float:
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "false"):
+            return 1.0 if lowered == "true" else 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _as_epoch(value: Any) -> float:
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(UTC)
+    return ts.timestamp()
+
+
+class SignalJournal:
+    """Batched, segment-rotated columnar signal log with a sparse (symbol, time) index."""
+
+    def __init__(self, root: str | Path = "signal_journal", batch_size: int = 256,
+                 flush_seconds: float = FLUSH_INTERVAL_SEC, segment_rows: int = 262144,
+                 retention_days: float | None = 365.0):
+        """
+        Initialize the journal.
+
+        Args:
+            root: Directory holding the segments and manifest
+            batch_size: Buffered records that trigger a flush
+            flush_seconds: Maximum time a record stays buffered
+            segment_rows: Target rows per compacted segment
+            retention_days: Drop signals older than this (None keeps everything)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.segment_rows = segment_rows
+        self.retention_days = retention_days
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._buffer: list[tuple] = []
+        self._last_flush = time.time()
+        self._manifest: dict[str, Any] = {"next_seq": 0, "segments": []}
+        self._manifest_mtime: int | None = None
+        self._thread: threading.Thread | None = None
+
+    # ---- manifest -------------------------------------------------------
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    @contextmanager
+    def _exclusive(self, lock_name: str = ".lock"):
+        fd = os.open(self.root / lock_name, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _segments(self) -> list[dict[str, Any]]:
+        """Current segment list, re-reading the manifest when another process changed it."""
+        try:
+            mtime = self._manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+        if mtime != self._manifest_mtime:
+            with open(self._manifest_path) as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+        return self._manifest["segments"]
+
+    def _save_manifest(self, manifest: dict[str, Any]) -> None:
+        tmp = self._manifest_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp, self._manifest_path)
+        self._manifest = manifest
+        self._manifest_mtime = self._manifest_path.stat().st_mtime_ns
+
+    # ---- writes ---------------------------------------------------------
+
+    def append(self, record: dict[str, Any]) -> None:
+        """
+        Buffer one signal.
+
+        Args:
+            record: Signal fields (see ``SCHEMA``); ``ts`` or ``timestamp`` may be
+                epoch seconds, ISO text or a datetime (defaults to now)
+        """
+        row = tuple(
+            _as_epoch(record.get("ts", record.get("timestamp"))) if col == "ts"
+            else str(record.get(col) or "")[:int(dtype[1:])] if dtype.startswith("U")
+            else _as_float(record.get(col))
+            for col, dtype in SCHEMA.items()
+        )
+        with self._lock:
+            self._buffer.append(row)
+            due = len(self._buffer) >= self.batch_size or time.time() - self._last_flush >= self.flush_seconds
+        self._ensure_flusher()
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write buffered signals as a new segment.
+
+        Returns:
+            Number of signals written
+        """
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.time()
+        if not rows:
+            return 0
+        columns = {col: np.array([r[i] for r in rows], dtype=dtype)
+                   for i, (col, dtype) in enumerate(SCHEMA.items())}
+        try:
+            with self._exclusive():
+                self._segments()
+                manifest = {"next_seq": self._manifest["next_seq"], "segments": list(self._manifest["segments"])}
+                manifest["segments"].append(self._write_segment(manifest, columns))
+                self._save_manifest(manifest)
+            return len(rows)
+        except Exception as e:
+            self.logger.error(f"Error flushing signal journal: {e!s}")
+            with self._lock:
+                self._buffer[:0] = rows
+            return 0
+
+    def _write_segment(self, manifest: dict[str, Any], columns: dict[str, np.ndarray]) -> dict[str, Any]:
+        """Sort columns by (symbol, ts), write them and return the segment's index entry."""
+        order = np.lexsort((columns["ts"], columns["symbol"]))
+        columns = {col: values[order] for col, values in columns.items()}
+        name = f"seg-{manifest['next_seq']:010d}"
+        manifest["next_seq"] += 1
+        tmp = self.root / f".{name}.tmp"
+        # Leftovers of a write that never reached the manifest
+        shutil.rmtree(tmp, ignore_errors=True)
+        shutil.rmtree(self.root / name, ignore_errors=True)
+        tmp.mkdir()
+        for col, values in columns.items():
+            np.save(tmp / f"{col}.npy", values)
+        os.rename(tmp, self.root / name)
+
+        ts = columns["ts"]
+        symbols, starts, counts = np.unique(columns["symbol"], return_index=True, return_counts=True)
+        index = {
+            str(sym): [int(start), int(start + count), float(ts[start]), float(ts[start + count - 1])]
+            for sym, start, count in zip(symbols, starts, counts, strict=True)
+        }
+        return {"name": name, "rows": len(ts), "min_ts": float(ts.min()), "max_ts": float(ts.max()),
+                "symbols": index}
+
+    def _ensure_flusher(self) -> None:
+        """Start the background thread that flushes idle buffers and compacts."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="signal-journal", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        last_compact = time.time()
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                if self._buffer and time.time() - self._last_flush >= self.flush_seconds:
+                    self.flush()
+                if time.time() - last_compact >= COMPACT_INTERVAL_SEC:
+                    self.compact()
+                    last_compact = time.time()
+            except Exception as e:
+                self.logger.error(f"Signal journal maintenance failed: {e!s}")
+
+    def import_csv(self, path: str | Path, chunk_rows: int = 100000) -> int:
+        """
+        Bulk-load a legacy ``signals_log.csv``.
+
+        Args:
+            path: CSV with a ``timestamp`` column and schema-named columns
+            chunk_rows: Rows per written segment
+
+        Returns:
+            Number of signals imported
+        """
+        total = 0
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            ts = pd.to_datetime(chunk["timestamp"], utc=True, errors="coerce", format="mixed")
+            chunk = chunk[ts.notna()]
+            if chunk.empty:
+                continue
+            columns = {"ts": ((ts[ts.notna()] - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)).to_numpy("f8")}
+            for col, dtype in SCHEMA.items():
+                if col == "ts":
+                    continue
+                if col not in chunk.columns:
+                    values = np.full(len(chunk), "" if dtype.startswith("U") else np.nan)
+                elif dtype.startswith("U"):
+                    values = chunk[col].fillna("").astype(str).str.slice(0, int(dtype[1:])).to_numpy()
+                else:
+                    values = np.array([_as_float(v) for v in chunk[col]])
+                columns[col] = values.astype(dtype)
+            with self._exclusive():
+                self._segments()
+                manifest = {"next_seq": self._manifest["next_seq"], "segments": list(self._manifest["segments"])}
+                manifest["segments"].append(self._write_segment(manifest, columns))
+                self._save_manifest(manifest)
+            total += len(chunk)
+        return total
+
+    # ---- maintenance ----------------------------------------------------
+
+    def compact(self, now: float | None = None) -> dict[str, int]:
+        """
+        Merge small segments into ``segment_rows``-sized ones and apply retention.
+
+        Args:
+            now: Current epoch seconds (defaults to now)
+
+        Returns:
+            Counts of segments merged and dropped and rows expired
+        """
+        now = time.time() if now is None else now
+        cutoff = now - self.retention_days * 86400 if self.retention_days is not None else -math.inf
+        stats = {"merged": 0, "dropped": 0, "expired_rows": 0}
+        with self._exclusive():
+            segments = self._segments()
+            keep, expired, small = [], [], []
+            for seg in segments:
+                if seg["max_ts"] < cutoff:
+                    expired.append(seg)
+                elif seg["rows"] < self.segment_rows // 2 or seg["min_ts"] < cutoff:
+                    small.append(seg)
+                else:
+                    keep.append(seg)
+            if not expired and len(small) < 2 and not any(s["min_ts"] < cutoff for s in small):
+                return stats
+
+            manifest = {"next_seq": self._manifest["next_seq"], "segments": keep}
+            group: list[dict[str, np.ndarray]] = []
+            group_rows = 0
+            for seg in small:
+                columns = self._read_segment(seg["name"])
+                live = columns["ts"] >= cutoff
+                stats["expired_rows"] += int((~live).sum())
+                columns = {col: values[live] for col, values in columns.items()}
+                group.append(columns)
+                group_rows += int(live.sum())
+                if group_rows >= self.segment_rows:
+                    manifest["segments"].append(self._write_segment(manifest, self._concat(group)))
+                    group, group_rows = [], 0
+            if group_rows:
+                manifest["segments"].append(self._write_segment(manifest, self._concat(group)))
+            manifest["segments"].sort(key=lambda s: s["name"])
+            self._save_manifest(manifest)
+
+            for seg in expired:
+                stats["expired_rows"] += seg["rows"]
+            for seg in expired + small:
+                shutil.rmtree(self.root / seg["name"], ignore_errors=True)
+            stats["merged"] = len(small)
+            stats["dropped"] = len(expired)
+        if stats["merged"] or stats["dropped"]:
+            self.logger.info(f"Compacted signal journal: {stats}")
+        return stats
+
+    @staticmethod
+    def _concat(group: list[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+        return {col: np.concatenate([g[col] for g in group]).astype(dtype) for col, dtype in SCHEMA.items()}
+
+    # ---- reads ----------------------------------------------------------
+
+    def _read_segment(self, name: str, rows: slice | None = None) -> dict[str, np.ndarray]:
+        seg_dir = self.root / name
+        out = {}
+        for col in SCHEMA:
+            values = np.load(seg_dir / f"{col}.npy", mmap_mode="r")
+            out[col] = np.array(values[rows] if rows is not None else values)
+        return out
+
+    def _buffered(self) -> dict[str, np.ndarray]:
+        with self._lock:
+            rows = list(self._buffer)
+        return {col: np.array([r[i] for r in rows], dtype=dtype)
+                for i, (col, dtype) in enumerate(SCHEMA.items())}
+
+    def query(self, symbol: str | None = None, start: float | None = None, end: float | None = None,
+              limit: int | None = None) -> pd.DataFrame:
+        """
+        Signals in a time range, oldest first.
+
+        Args:
+            symbol: Only this symbol (uses the sparse index)
+            start: Earliest epoch seconds (inclusive)
+            end: Latest epoch seconds (inclusive)
+            limit: Keep only the most recent ``limit`` signals
+
+        Returns:
+            Frame with the ``SCHEMA`` columns
+        """
+        for attempt in range(2):
+            try:
+                return self._query(symbol, start, end, limit)
+            except FileNotFoundError:
+                # A concurrent compaction replaced the segments; reload the manifest
+                self._manifest_mtime = None
+                if attempt:
+                    raise
+        return pd.DataFrame(columns=list(SCHEMA))
+
+    def _query(self, symbol: str | None, start: float | None, end: float | None,
+               limit: int | None) -> pd.DataFrame:
+        lo = -math.inf if start is None else start
+        hi = math.inf if end is None else end
+        candidates = []
+        for seg in self._segments():
+            if symbol is None:
+                if seg["max_ts"] >= lo and seg["min_ts"] <= hi:
+                    candidates.append((seg["max_ts"], seg["name"], None))
+            elif symbol in seg["symbols"]:
+                a, b, first, last = seg["symbols"][symbol]
+                if last >= lo and first <= hi:
+                    candidates.append((last, seg["name"], (a, b)))
+        candidates.sort(reverse=True)
+
+        # Every part holds only matching rows, so the early stop compares like with like
+        buffered = self._buffered()
+        mask = (buffered["ts"] >= lo) & (buffered["ts"] <= hi)
+        if symbol is not None:
+            mask &= buffered["symbol"] == symbol
+        parts = [{col: values[mask] for col, values in buffered.items()}]
+        have = len(parts[0]["ts"])
+        for newest, name, rows in candidates:
+            if limit is not None and have >= limit and newest < self._nth_latest(parts, limit):
+                break
+            cols = self._read_segment(name, slice(*rows) if rows else None)
+            if rows:
+                # Rows of one symbol are sorted by ts within the segment
+                i = np.searchsorted(cols["ts"], lo, side="left")
+                j = np.searchsorted(cols["ts"], hi, side="right")
+                cols = {col: values[i:j] for col, values in cols.items()}
+            else:
+                in_range = (cols["ts"] >= lo) & (cols["ts"] <= hi)
+                cols = {col: values[in_range] for col, values in cols.items()}
+            parts.append(cols)
+            have += len(cols["ts"])
+
+        frame = pd.DataFrame(self._concat(parts))
+        frame = frame.sort_values("ts", kind="stable").reset_index(drop=True)
+        return frame.tail(limit).reset_index(drop=True) if limit is not None else frame
+
+    @staticmethod
+    def _nth_latest(parts: list[dict[str, np.ndarray]], n: int) -> float:
+        ts = np.concatenate([p["ts"] for p in parts])
+        return float(np.partition(ts, len(ts) - n)[len(ts) - n]) if len(ts) >= n else -math.inf
+
+    def last(self, symbol: str, n: int = 20) -> pd.DataFrame:
+        """The ``n`` most recent signals for a symbol, oldest first."""
+        return self.query(symbol, limit=n)
+
+    def latest_per_symbol(self) -> dict[str, dict[str, Any]]:
+        """Most recent signal of every symbol, read from the index and one row per symbol."""
+        newest: dict[str, tuple[float, str, int]] = {}
+        for seg in self._segments():
+            for sym, (_, b, _, last) in seg["symbols"].items():
+                if sym not in newest or last > newest[sym][0]:
+                    newest[sym] = (last, seg["name"], b - 1)
+        out = {}
+        for sym, (_, name, row) in newest.items():
+            cols = self._read_segment(name, slice(row, row + 1))
+            out[sym] = {col: values[0].item() for col, values in cols.items()}
+        buffered = self._buffered()
+        for i in np.argsort(buffered["ts"], kind="stable"):
+            record = {col: values[i].item() for col, values in buffered.items()}
+            if record["symbol"] not in out or record["ts"] >= out[record["symbol"]]["ts"]:
+                out[record["symbol"]] = record
+        return out
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        One column across the whole journal, reading no other column files.
+
+        Args:
+            name: Column from ``SCHEMA``
+
+        Returns:
+            Values in storage order (not sorted by time)
+        """
+        parts = [self._buffered()[name]]
+        parts.extend(np.load(self.root / seg["name"] / f"{name}.npy", mmap_mode="r")
+                     for seg in self._segments())
+        return np.concatenate(parts)
+
+    def count(self) -> int:
+        """Total stored signals (including buffered ones)."""
+        with self._lock:
+            buffered = len(self._buffer)
+        return buffered + sum(seg["rows"] for seg in self._segments())
+
+    def iter_csv(self, chunk_rows: int = 10000) -> Iterator[str]:
+        """
+        Export every signal as CSV text, oldest first, one segment at a time.
+
+        Segments are memory-mapped up front (a concurrent compaction cannot
+        pull them away) and merged in ``min_ts`` order: rows older than the
+        next segment's first signal are final and written out, so only rows
+        of overlapping segments are held in memory.
+
+        Args:
+            chunk_rows: Rows per yielded chunk
+
+        Yields:
+            CSV text chunks (header first, ``timestamp`` as ISO-8601 UTC)
+        """
+        with self._exclusive():
+            sources = [(seg["min_ts"], {col: np.load(self.root / seg["name"] / f"{col}.npy", mmap_mode="r")
+                                        for col in SCHEMA})
+                       for seg in self._segments()]
+        buffered = self._buffered()
+        if len(buffered["ts"]):
+            sources.append((float(buffered["ts"].min()), buffered))
+        sources.sort(key=lambda source: source[0])
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["timestamp", *(c for c in SCHEMA if c != "ts")])
+        pending: dict[str, np.ndarray] | None = None
+        for k, (_, columns) in enumerate(sources):
+            pending = self._concat([pending, columns] if pending is not None else [columns])
+            order = np.argsort(pending["ts"], kind="stable")
+            pending = {col: values[order] for col, values in pending.items()}
+            next_min = sources[k + 1][0] if k + 1 < len(sources) else math.inf
+            ready = int(np.searchsorted(pending["ts"], next_min, side="left"))
+            for i in range(0, ready, chunk_rows):
+                self._write_csv_rows(writer, {col: values[i:min(i + chunk_rows, ready)]
+                                              for col, values in pending.items()})
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            pending = {col: values[ready:] for col, values in pending.items()}
+        if buf.tell():
+            yield buf.getvalue()
+
+    @staticmethod
+    def _write_csv_rows(writer: Any, columns: dict[str, np.ndarray]) -> None:
+        stamps = pd.to_datetime(columns["ts"], unit="s", utc=True).strftime("%Y-%m-%dT%H:%M:%S.%f%z")
+        others = [columns[c].tolist() for c in SCHEMA if c != "ts"]
+        for stamp, *row in zip(stamps, *others, strict=True):
+            writer.writerow([stamp, *(("" if isinstance(v, float) and math.isnan(v) else v) for v in row)])
+
+
+_signal_journal: SignalJournal | None = None
+_signal_journal_lock = threading.Lock()
+
+
+def get_signal_journal() -> SignalJournal:
+    """Get the process-wide signal journal, importing ``signals_log.csv`` into a new one."""
+    global _signal_journal
+    if _signal_journal is None:
+        with _signal_journal_lock:
+            if _signal_journal is None:
+                journal = SignalJournal(os.getenv("SIGNAL_JOURNAL_DIR", "signal_journal"))
+                legacy = os.getenv("SIGNAL_JOURNAL_LEGACY_CSV", "signals_log.csv")
+                try:
+                    # Separate lock so only one worker imports
+                    with journal._exclusive(".import.lock"):
+                        if not journal._segments() and os.path.isfile(legacy):
+                            imported = journal.import_csv(legacy)
+                            journal.logger.info(f"Imported {imported} signals from {legacy}")
+                except Exception as e:
+                    journal.logger.error(f"Could not import {legacy}: {e!s}")
+                atexit.register(journal.flush)
+                _signal_journal = journal
+    return _signal_journal
@@ -0,0 +1,268 @@
+"""
+Replay exchange adapter over stored candles.
+
+``ReplayExchange`` implements ``BaseExchange`` against OHLCV history and a
+``VirtualClock``: only candles that have closed by the virtual time are
+visible, market orders fill at the last closed price (plus slippage and
+fee), and balances are kept in memory. Limit orders rest until a later
+candle trades through their price. ``ReplayPortfolioService`` exposes the
+same account in the shape of ``PortfolioService.get_portfolio_data`` so
+code that verifies fills against the portfolio works unchanged.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ..utils.performance_metrics import TIMEFRAME_SECONDS
+from ..utils.virtual_clock import VirtualClock
+from .base import BaseExchange
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayExchange(BaseExchange):
+    """Simulated spot exchange driven by a virtual clock."""
+
+    def __init__(self, candles: dict[str, pd.DataFrame], clock: VirtualClock, timeframe: str = '1h',
+                 initial_cash: float = 10000.0, fee_rate: float = 0.001, slippage: float = 0.0,
+                 quote: str = 'USDT'):
+        """
+        Initialize the replay exchange.
+
+        Args:
+            candles: Symbol -> OHLCV DataFrame indexed by candle open time
+            clock: Virtual clock deciding which candles have closed
+            timeframe: Timeframe of the candles
+            initial_cash: Starting quote balance
+            fee_rate: Fee as a fraction of traded value
+            slippage: Price penalty of market orders as a fraction
+            quote: Quote currency
+        """
+        super().__init__({'timeframe': timeframe})
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        self.clock = clock
+        self.timeframe = timeframe
+        self.bar_seconds = TIMEFRAME_SECONDS[timeframe]
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.quote = quote
+
+        self._candles: dict[str, pd.DataFrame] = {}
+        self._close_ns: dict[str, np.ndarray] = {}
+        for symbol, df in candles.items():
+            df = df.sort_index()
+            index = pd.DatetimeIndex(df.index)
+            df.index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+            self._candles[symbol] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+            close_times = df.index + pd.Timedelta(seconds=self.bar_seconds)
+            self._close_ns[symbol] = ((close_times - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(1, 'ns')).to_numpy()
+
+        self.balances: dict[str, float] = {quote: float(initial_cash)}
+        self.cost_basis: dict[str, float] = {}
+        self.fills: list[dict[str, Any]] = []
+        self._open_orders: dict[str, dict[str, Any]] = {}
+        self._order_ids = itertools.count(1)
+
+    # -- time and candles ----------------------------------------------------
+
+    def _visible(self, symbol: str) -> int:
+        """Number of candles of a symbol closed at the current virtual time."""
+        if symbol not in self._candles:
+            raise ValueError(f"No replay data for {symbol}")
+        now_ns = int(self.clock.now().timestamp() * 1_000_000_000)
+        return int(np.searchsorted(self._close_ns[symbol], now_ns, side='right'))
+
+    def last_price(self, symbol: str) -> float:
+        """Close of the last completed candle."""
+        n = self._visible(symbol)
+        if n == 0:
+            raise ValueError(f"No closed {symbol} candle at {self.clock.now().isoformat()}")
+        return float(self._candles[symbol]['close'].iat[n - 1])
+
+    # -- BaseExchange ---------------------------------------------------------
+
+    def connect(self) -> bool:
+        self.exchange = self
+        return True
+
+    def get_ohlcv(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
+        if timeframe != self.timeframe:
+            raise ValueError(f"Replay data is {self.timeframe}, not {timeframe}")
+        self._match_orders(symbol)
+        n = self._visible(symbol)
+        return self._candles[symbol].iloc[max(0, n - limit):n].copy()
+
+    def get_ticker(self, symbol: str) -> dict:
+        self._match_orders(symbol)
+        price = self.last_price(symbol)
+        return {'symbol': symbol, 'last': price, 'bid': price, 'ask': price,
+                'timestamp': int(self.clock.time() * 1000), 'datetime': self.clock.now().isoformat()}
+
+    def get_balance(self) -> dict:
+        for symbol in self._candles:
+            self._match_orders(symbol)
+        used: dict[str, float] = {}
+        for order in self._open_orders.values():
+            base = order['symbol'].split('/')[0]
+            currency, amount = (self.quote, order['amount'] * order['price']) if order['side'] == 'buy' \
+                else (base, order['amount'])
+            used[currency] = used.get(currency, 0.0) + amount
+        balance: dict[str, Any] = {'free': {}, 'used': {}, 'total': {}}
+        for currency, total in self.balances.items():
+            locked = used.get(currency, 0.0)
+            balance[currency] = {'free': total - locked, 'used': locked, 'total': total}
+            balance['free'][currency] = total - locked
+            balance['used'][currency] = locked
+            balance['total'][currency] = total
+        return balance
+
+    def place_order(self, symbol: str, side: str, amount: float,
+                    order_type: str = 'market', price: float | None = None) -> dict:
+        if side not in ('buy', 'sell'):
+            raise ValueError(f"Invalid order side: {side}")
+        if amount <= 0:
+            raise ValueError("Order amount must be positive")
+        order = {
+            'id': str(next(self._order_ids)),
+            'symbol': symbol,
+            'side': side,
+            'type': order_type,
+            'amount': float(amount),
+            'price': price,
+            'timestamp': int(self.clock.time() * 1000),
+            'datetime': self.clock.now().isoformat(),
+        }
+        if order_type == 'market':
+            fill_price = self.last_price(symbol) * (1 + self.slippage if side == 'buy' else 1 - self.slippage)
+            return self._fill(order, fill_price)
+        if price is None:
+            raise ValueError("Limit orders need a price")
+        self._check_funds(symbol, side, amount, price)
+        order.update(status='open', filled=0.0, remaining=float(amount), average=None)
+        self._open_orders[order['id']] = order
+        return dict(order)
+
+    def get_open_orders(self, symbol: str | None = None) -> list[dict]:
+        for sym in ([symbol] if symbol else list(self._candles)):
+            self._match_orders(sym)
+        return [dict(o) for o in self._open_orders.values() if symbol is None or o['symbol'] == symbol]
+
+    def cancel_order(self, order_id: str, symbol: str) -> dict:
+        order = self._open_orders.pop(order_id, None)
+        if order is None:
+            raise ValueError(f"Order {order_id} not found")
+        order['status'] = 'canceled'
+        return dict(order)
+
+    # -- fills ------------------------------------------------------------------
+
+    def _check_funds(self, symbol: str, side: str, amount: float, price: float) -> None:
+        base = symbol.split('/')[0]
+        if side == 'buy':
+            needed = amount * price * (1 + self.fee_rate)
+            if needed > self.balances.get(self.quote, 0.0) + 1e-9:
+                raise ValueError(f"Insufficient {self.quote} balance: need {needed:.2f}")
+        elif amount > self.balances.get(base, 0.0) + 1e-12:
+            raise ValueError(f"Insufficient {base} balance: need {amount:.8f}")
+
+    def _fill(self, order: dict[str, Any], price: float) -> dict[str, Any]:
+        symbol, side, amount = order['symbol'], order['side'], order['amount']
+        base = symbol.split('/')[0]
+        self._check_funds(symbol, side, amount, price)
+        value = amount * price
+        fee = value * self.fee_rate
+        held = self.balances.get(base, 0.0)
+        if side == 'buy':
+            self.balances[self.quote] -= value + fee
+            self.balances[base] = held + amount
+            self.cost_basis[base] = self.cost_basis.get(base, 0.0) + value + fee
+        else:
+            self.balances[self.quote] += value - fee
+            remaining = max(held - amount, 0.0)
+            self.cost_basis[base] = self.cost_basis.get(base, 0.0) * (remaining / held if held else 0.0)
+            self.balances[base] = remaining
+        order.update(status='closed', filled=amount, remaining=0.0, average=price, cost=value,
+                     fee={'cost': fee, 'currency': self.quote})
+        self.fills.append({'timestamp': self.clock.now(), 'id': order['id'], 'symbol': symbol, 'action': side,
+                           'price': price, 'size': amount, 'commission': fee})
+        return dict(order)
+
+    def _match_orders(self, symbol: str) -> None:
+        """Fill resting limit orders that candles closed since placement traded through."""
+        if not self._open_orders:
+            return
+        candles = self._candles[symbol]
+        n = self._visible(symbol)
+        for order_id, order in list(self._open_orders.items()):
+            if order['symbol'] != symbol:
+                continue
+            placed_ns = order['timestamp'] * 1_000_000
+            start = int(np.searchsorted(self._close_ns[symbol], placed_ns, side='right'))
+            window = candles.iloc[start:n]
+            touched = (window['low'] <= order['price']) if order['side'] == 'buy' else (window['high'] >= order['price'])
+            if touched.any():
+                del self._open_orders[order_id]
+                try:
+                    self._fill(order, order['price'])
+                except ValueError as e:
+                    logger.warning(f"Replay limit order {order_id} rejected: {e}")
+
+    # -- account view -------------------------------------------------------------
+
+    def equity(self) -> float:
+        """Quote balance plus holdings at the last closed prices."""
+        total = self.balances.get(self.quote, 0.0)
+        for symbol in self._candles:
+            qty = self.balances.get(symbol.split('/')[0], 0.0)
+            if qty > 0 and self._visible(symbol):
+                total += qty * self.last_price(symbol)
+        return total
+
+
+class ReplayPortfolioService:
+    """``PortfolioService`` look-alike backed by a ``ReplayExchange``."""
+
+    def __init__(self, exchange: ReplayExchange):
+        self.exchange = exchange
+
+    def get_portfolio_data(self, currency: str = 'USD', force_refresh: bool = False) -> dict[str, Any]:
+        ex = self.exchange
+        holdings = []
+        for symbol in ex._candles:
+            base = symbol.split('/')[0]
+            qty = ex.balances.get(base, 0.0)
+            if qty <= 0 or not ex._visible(symbol):
+                continue
+            price = ex.last_price(symbol)
+            cost = ex.cost_basis.get(base, 0.0)
+            value = qty * price
+            holdings.append({
+                'symbol': base,
+                'name': base,
+                'quantity': qty,
+                'current_price': price,
+                'avg_entry_price': cost / qty,
+                'cost_basis': cost,
+                'current_value': value,
+                'value': value,
+                'has_position': True,
+                'pnl': value - cost,
+                'pnl_percent': (value - cost) / cost * 100 if cost else 0.0,
+            })
+        cash = ex.balances.get(ex.quote, 0.0)
+        total = cash + sum(h['current_value'] for h in holdings)
+        return {
+            'holdings': holdings,
+            'total_current_value': total,
+            'total_estimated_value': total,
+            'total_pnl': sum(h['pnl'] for h in holdings),
+            'cash_balance': cash,
+            'last_update': ex.clock.now().isoformat(),
+        }
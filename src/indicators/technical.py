@@ -30,15 +30,21 @@ class TechnicalIndicators:
             Tuple of (upper_band, middle_band, lower_band)
         """
         try:
-            # Calculate moving average (middle band)
-            middle_band = data.rolling(window=period).mean()
-
-            # Calculate standard deviation
-            std = data.rolling(window=period).std()
+            # Moving average and sample standard deviation over full windows,
+            # in one strided pass (NaN until the first window is complete, and
+            # for any window holding a NaN, as with pandas rolling)
+            values = data.to_numpy(dtype=float)
+            middle = np.full(len(values), np.nan)
+            std = np.full(len(values), np.nan)
+            if len(values) >= period:
+                windows = np.lib.stride_tricks.sliding_window_view(values, period)
+                middle[period - 1:] = windows.mean(axis=1)
+                std[period - 1:] = windows.std(axis=1, ddof=1)
 
             # Calculate upper and lower bands
-            upper_band = middle_band + (std * std_dev)
-            lower_band = middle_band - (std * std_dev)
+            middle_band = pd.Series(middle, index=data.index, name=data.name)
+            upper_band = pd.Series(middle + std * std_dev, index=data.index, name=data.name)
+            lower_band = pd.Series(middle - std * std_dev, index=data.index, name=data.name)
 
             return upper_band, middle_band, lower_band
 
@@ -61,12 +67,13 @@ class TechnicalIndicators:
         """
         try:
             # Calculate True Range components
-            hl = high - low
-            hc = abs(high - close.shift())
-            lc = abs(low - close.shift())
+            prev_close = close.shift().to_numpy(dtype=float)
+            hl = high.to_numpy(dtype=float) - low.to_numpy(dtype=float)
+            hc = np.abs(high.to_numpy(dtype=float) - prev_close)
+            lc = np.abs(low.to_numpy(dtype=float) - prev_close)
 
-            # True Range is the maximum of the three
-            tr = pd.concat([hl, hc, lc], axis=1).max(axis=1)
+            # True Range is the maximum of the three (fmax skips NaN like DataFrame.max)
+            tr = pd.Series(np.fmax(hl, np.fmax(hc, lc)), index=high.index)
 
             # Calculate ATR as exponential moving average of TR
             atr = tr.ewm(span=period).mean()
@@ -0,0 +1,385 @@
+# src/ml/feature_store.py
+"""
+Incremental feature store for signal and ML features.
+
+Features are keyed by (symbol, timeframe, bar timestamp) and computed once,
+when a candle closes, by ``compute_features``. The same function backs the
+live ``_lightweight_indicators`` path, so serving and training always see
+identical values.
+
+Rows are stored one typed column per feature (no JSON blobs) so training
+reads only the columns it needs. Every row carries ``available_at`` (the
+bar close time); ``latest(..., as_of=t)`` and ``frame(..., as_of=t)`` only
+return rows that were already known at ``t``, which keeps backtests and
+training point-in-time correct.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Features derived from closed candles, in storage order
+BAR_FEATURES = ("rsi_7", "rsi_14", "volatility_7", "volume_ratio", "price_above_sma7")
+# Values attached to a bar by callers after scoring it (e.g. the 6-factor score)
+ANNOTATIONS = ("composite_confidence",)
+FEATURE_COLUMNS = BAR_FEATURES + ANNOTATIONS
+
+# Bars of history needed before every feature is defined
+WARMUP_BARS = 15
+
+TIMEFRAME_SECONDS = {
+    "1m": 60, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "4h": 4 * 3600, "1d": 86400,
+}
+
+
+def _rsi(closes: np.ndarray, period: int, start: int) -> np.ndarray:
+    """Simple-average RSI (same rule as ``EntryConfidenceAnalyzer._calculate_rsi``)."""
+    out = np.full(len(closes) - start, np.nan)
+    deltas = np.diff(closes)
+    first = max(start, period)  # bar index whose window of ``period`` deltas is complete
+    if len(closes) <= first:
+        return out
+    windows = sliding_window_view(deltas, period)[first - period:]
+    avg_gain = np.where(windows > 0, windows, 0.0).mean(axis=1)
+    avg_loss = np.where(windows < 0, -windows, 0.0).mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    out[first - start:] = rsi
+    return out
+
+
+def compute_features(closes: Any, volumes: Any, start: int = 0) -> dict[str, np.ndarray]:
+    """
+    Compute bar features for bars ``start`` onward.
+
+    Only the trailing windows ending at the requested bars are evaluated, so
+    appending one candle costs one window per feature regardless of history.
+
+    Args:
+        closes: Close prices, oldest first
+        volumes: Volumes aligned with ``closes``
+        start: First bar index to compute (earlier bars are warmup only)
+
+    Returns:
+        Dict of feature name -> array of length ``len(closes) - start``
+        (NaN where a bar does not have enough history yet)
+    """
+    closes = np.asarray(closes, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    n = len(closes) - start
+    features = {name: np.full(n, np.nan) for name in BAR_FEATURES}
+    if n <= 0:
+        return features
+
+    features["rsi_7"] = _rsi(closes, 7, start)
+    features["rsi_14"] = _rsi(closes, 14, start)
+
+    first = max(start, 6)  # 7-bar windows
+    if len(closes) > first:
+        offset = first - start
+        close_windows = sliding_window_view(closes, 7)[first - 6:]
+        volume_windows = sliding_window_view(volumes, 7)[first - 6:]
+        features["volume_ratio"][offset:] = volumes[first:] / (volume_windows.mean(axis=1) + 1e-6)
+        features["price_above_sma7"][offset:] = closes[first:] / (close_windows.mean(axis=1) + 1e-6)
+
+    first = max(start, 7)  # 7 log returns need 8 closes
+    if len(closes) > first:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(np.log(closes))
+        return_windows = sliding_window_view(returns, 7)[first - 7:]
+        features["volatility_7"][first - start:] = return_windows.std(axis=1) * 100
+
+    return features
+
+
+def latest_features(closes: Any, volumes: Any) -> dict[str, float]:
+    """Features for the last bar only, omitting any that are undefined."""
+    closes = np.asarray(closes, dtype=float)
+    if len(closes) == 0:
+        return {}
+    values = compute_features(closes, volumes, start=len(closes) - 1)
+    return {name: float(arr[-1]) for name, arr in values.items() if np.isfinite(arr[-1])}
+
+
+def _normalize_candles(candles: Any) -> list[tuple[int, float, float]]:
+    """(ts seconds, close, volume) from ccxt/OKX lists or dicts, oldest first."""
+    rows = []
+    for candle in candles:
+        if isinstance(candle, dict):
+            ts = candle.get("ts", candle.get("timestamp"))
+            close = candle.get("close", candle.get("price"))
+            volume = candle.get("volume", 0.0)
+        else:
+            ts, close, volume = candle[0], candle[4], candle[5]
+        ts = int(float(ts))
+        if ts > 10**11:  # milliseconds
+            ts //= 1000
+        rows.append((ts, float(close), float(volume or 0.0)))
+    rows.sort(key=lambda r: r[0])
+    return rows
+
+
+class FeatureStore:
+    """SQLite-backed, point-in-time feature store fed by closed candles."""
+
+    def __init__(self, db_path: str = "trading.db"):
+        """
+        Initialize the feature store.
+
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        # (symbol, timeframe) -> (last bar ts, closes deque, volumes deque)
+        self._tails: dict[tuple[str, str], tuple[int, deque, deque]] = {}
+        self._latest: dict[tuple[str, str], dict[str, Any]] = {}
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the feature table (one column per feature)."""
+        feature_cols = ",\n".join(f"{name} REAL" for name in FEATURE_COLUMNS)
+        try:
+            with self._connect() as conn:
+                conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS bar_features (
+                        symbol TEXT NOT NULL,
+                        timeframe TEXT NOT NULL,
+                        ts INTEGER NOT NULL,
+                        available_at INTEGER NOT NULL,
+                        close REAL NOT NULL,
+                        volume REAL NOT NULL,
+                        {feature_cols},
+                        PRIMARY KEY (symbol, timeframe, ts)
+                    ) WITHOUT ROWID
+                ''')
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error initializing feature store: {e!s}")
+
+    def _tail(self, conn: sqlite3.Connection, key: tuple[str, str]) -> tuple[int, deque, deque]:
+        tail = self._tails.get(key)
+        if tail is None:
+            rows = conn.execute('''
+                SELECT ts, close, volume FROM bar_features
+                WHERE symbol = ? AND timeframe = ? ORDER BY ts DESC LIMIT ?
+            ''', (*key, WARMUP_BARS)).fetchall()[::-1]
+            tail = (rows[-1][0] if rows else -1,
+                    deque((r[1] for r in rows), maxlen=WARMUP_BARS),
+                    deque((r[2] for r in rows), maxlen=WARMUP_BARS))
+        return tail
+
+    def ingest(self, symbol: str, timeframe: str, candles: Any, now: float | None = None) -> int:
+        """
+        Compute and store features for newly closed candles.
+
+        Candles already stored are skipped and the still-forming candle is
+        ignored, so this can be called with every fresh OHLCV fetch.
+
+        Args:
+            symbol: Asset symbol (e.g. ``BTC``)
+            timeframe: Candle timeframe (``TIMEFRAME_SECONDS`` key)
+            candles: OHLCV rows (ccxt/OKX lists or dicts with ts/close/volume)
+            now: Reference time (for tests)
+
+        Returns:
+            Number of new bars stored
+        """
+        now = time.time() if now is None else now
+        bar_seconds = TIMEFRAME_SECONDS.get(timeframe, 86400)
+        key = (symbol, timeframe)
+        try:
+            rows = [r for r in _normalize_candles(candles) if r[0] + bar_seconds <= now]
+            with self._lock, self._connect() as conn:
+                last_ts, tail_closes, tail_volumes = self._tail(conn, key)
+                new_rows = [r for r in rows if r[0] > last_ts]
+                if not new_rows:
+                    self._tails[key] = (last_ts, tail_closes, tail_volumes)
+                    return 0
+
+                warm = len(tail_closes)
+                closes = np.concatenate([np.asarray(tail_closes, dtype=float), [r[1] for r in new_rows]])
+                volumes = np.concatenate([np.asarray(tail_volumes, dtype=float), [r[2] for r in new_rows]])
+                features = compute_features(closes, volumes, start=warm)
+
+                records = []
+                for i, (ts, close, volume) in enumerate(new_rows):
+                    values = [None if np.isnan(features[name][i]) else float(features[name][i])
+                              for name in BAR_FEATURES]
+                    records.append((symbol, timeframe, ts, ts + bar_seconds, close, volume, *values))
+                cols = ", ".join(BAR_FEATURES)
+                conn.executemany(f'''
+                    INSERT OR IGNORE INTO bar_features
+                        (symbol, timeframe, ts, available_at, close, volume, {cols})
+                    VALUES ({", ".join("?" * (6 + len(BAR_FEATURES)))})
+                ''', records)
+                conn.commit()
+
+                tail_closes.extend(r[1] for r in new_rows)
+                tail_volumes.extend(r[2] for r in new_rows)
+                self._tails[key] = (new_rows[-1][0], tail_closes, tail_volumes)
+                last = records[-1]
+                self._latest[key] = {
+                    "symbol": symbol, "timeframe": timeframe, "ts": last[2], "available_at": last[3],
+                    "close": last[4], "volume": last[5],
+                    **dict(zip(BAR_FEATURES, last[6:], strict=True)),
+                    "composite_confidence": None,
+                }
+                return len(records)
+        except Exception as e:
+            self.logger.error(f"Error ingesting features for {symbol} {timeframe}: {e!s}")
+            return 0
+
+    def annotate(self, symbol: str, timeframe: str, ts: int | None = None, **values: float) -> bool:
+        """
+        Attach caller-computed values (see ``ANNOTATIONS``) to a stored bar.
+
+        Args:
+            symbol: Asset symbol
+            timeframe: Candle timeframe
+            ts: Bar timestamp (defaults to the latest stored bar)
+            **values: Annotation name -> value
+
+        Returns:
+            True if a bar was updated
+        """
+        values = {k: float(v) for k, v in values.items() if k in ANNOTATIONS and v is not None}
+        if not values:
+            return False
+        key = (symbol, timeframe)
+        try:
+            with self._lock, self._connect() as conn:
+                if ts is None:
+                    row = conn.execute('SELECT MAX(ts) FROM bar_features WHERE symbol = ? AND timeframe = ?',
+                                       key).fetchone()
+                    ts = row[0] if row else None
+                if ts is None:
+                    return False
+                assignments = ", ".join(f"{k} = ?" for k in values)
+                cur = conn.execute(f'''
+                    UPDATE bar_features SET {assignments}
+                    WHERE symbol = ? AND timeframe = ? AND ts = ?
+                ''', (*values.values(), *key, ts))
+                conn.commit()
+                latest = self._latest.get(key)
+                if latest and latest["ts"] == ts:
+                    latest.update(values)
+                return cur.rowcount > 0
+        except Exception as e:
+            self.logger.error(f"Error annotating features for {symbol} {timeframe}: {e!s}")
+            return False
+
+    def latest(self, symbol: str, timeframe: str = "1d", as_of: float | None = None) -> dict[str, Any] | None:
+        """
+        Most recent feature row known at ``as_of`` (defaults to now).
+
+        Args:
+            symbol: Asset symbol
+            timeframe: Candle timeframe
+            as_of: Point in time in epoch seconds
+
+        Returns:
+            Feature row dict or None
+        """
+        key = (symbol, timeframe)
+        if as_of is None:
+            cached = self._latest.get(key)
+            if cached is not None:
+                return dict(cached)
+        as_of = time.time() if as_of is None else as_of
+        cols = ", ".join(FEATURE_COLUMNS)
+        try:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                row = conn.execute(f'''
+                    SELECT symbol, timeframe, ts, available_at, close, volume, {cols}
+                    FROM bar_features
+                    WHERE symbol = ? AND timeframe = ? AND available_at <= ?
+                    ORDER BY ts DESC LIMIT 1
+                ''', (*key, int(as_of))).fetchone()
+        except Exception as e:
+            self.logger.error(f"Error reading features for {symbol} {timeframe}: {e!s}")
+            return None
+        return dict(row) if row else None
+
+    def vector(self, symbol: str, columns: tuple[str, ...] | list[str], timeframe: str = "1d",
+               as_of: float | None = None) -> np.ndarray | None:
+        """Feature vector (NaN for missing values) for live inference."""
+        row = self.latest(symbol, timeframe, as_of)
+        if row is None:
+            return None
+        return np.array([np.nan if row.get(c) is None else row[c] for c in columns], dtype=float)
+
+    def frame(self, symbols: list[str] | None = None, timeframe: str = "1d",
+              start: float | None = None, end: float | None = None,
+              columns: tuple[str, ...] | list[str] = FEATURE_COLUMNS,
+              as_of: float | None = None) -> pd.DataFrame:
+        """
+        Training frame of stored features.
+
+        Args:
+            symbols: Symbols to include (None for all)
+            timeframe: Candle timeframe
+            start: Earliest bar timestamp (inclusive)
+            end: Latest bar timestamp (inclusive)
+            columns: Feature columns to read
+            as_of: Only include rows already available at this time
+
+        Returns:
+            DataFrame with symbol, ts, available_at, close and feature columns,
+            sorted by symbol then ts
+        """
+        columns = [c for c in columns if c in FEATURE_COLUMNS]
+        clauses, params = ["timeframe = ?"], [timeframe]
+        if symbols:
+            clauses.append(f"symbol IN ({', '.join('?' * len(symbols))})")
+            params.extend(symbols)
+        for clause, value in (("ts >= ?", start), ("ts <= ?", end), ("available_at <= ?", as_of)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(int(value))
+        query = f'''
+            SELECT symbol, ts, available_at, close, volume{''.join(', ' + c for c in columns)}
+            FROM bar_features WHERE {' AND '.join(clauses)} ORDER BY symbol, ts
+        '''
+        try:
+            with self._connect() as conn:
+                return pd.read_sql_query(query, conn, params=params)
+        except Exception as e:
+            self.logger.error(f"Error reading feature frame: {e!s}")
+            return pd.DataFrame(columns=["symbol", "ts", "available_at", "close", "volume", *columns])
+
+
+_feature_store: FeatureStore | None = None
+_feature_store_lock = threading.Lock()
+
+
+def get_feature_store() -> FeatureStore:
+    """Get the process-wide feature store."""
+    global _feature_store
+    if _feature_store is None:
+        with _feature_store_lock:
+            if _feature_store is None:
+                _feature_store = FeatureStore(os.getenv("FEATURE_STORE_DB", "trading.db"))
+    return _feature_store
@@ -0,0 +1,302 @@
+# src/ml/model_service.py
+"""
+Resident model service.
+
+Models are loaded once per process and kept in memory. Each lookup does at
+most one ``stat`` per ``check_interval`` seconds and transparently reloads
+(hot-swaps) a model when its file changes, so retraining does not need a
+restart. ``predict_many`` scores a whole batch in one call.
+
+Tree ensembles (RandomForest / ExtraTrees / DecisionTree, regressors and
+classifiers) can be compiled to a ``PackedForest``: every tree's nodes are
+concatenated into flat NumPy arrays and all rows walk all trees together,
+one vectorized step per tree level. That avoids sklearn's per-call
+validation and per-tree Python dispatch, which dominate single-row latency.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Registered model name -> candidate paths (first existing file wins): the
+# registry's active version, then the legacy single-file location
+DEFAULT_MODELS = {
+    "buy_regression": (
+        Path("src/models/registry/buy_regression/current.pkl"),
+        Path("src/models/buy_regression_model.pkl"),
+    ),
+}
+
+
+class PackedForest:
+    """Tree ensemble flattened into contiguous node arrays."""
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray, roots: np.ndarray, max_depth: int,
+                 n_features: int, is_classifier: bool = False, classes: np.ndarray | None = None):
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = np.empty(2 * left.size, dtype=np.intp)
+        self.children[0::2] = left
+        self.children[1::2] = right
+        self.value = value  # (n_nodes, n_outputs): leaf mean or class probabilities
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.is_classifier = is_classifier
+        self.classes_ = classes
+
+    @classmethod
+    def from_estimator(cls, model: Any) -> PackedForest:
+        """
+        Compile a fitted sklearn tree or tree ensemble.
+
+        Args:
+            model: Fitted estimator exposing ``estimators_`` or ``tree_``
+
+        Returns:
+            Packed forest
+
+        Raises:
+            TypeError: If the estimator is not a single-output tree model
+        """
+        # Gradient-boosting style ensembles combine trees differently
+        if hasattr(model, "learning_rate"):
+            raise TypeError(f"{type(model).__name__} is not an averaging ensemble")
+        estimators = getattr(model, "estimators_", None)
+        if estimators is None:
+            estimators = [model] if hasattr(model, "tree_") else None
+        if not estimators or not all(hasattr(est, "tree_") for est in estimators):
+            raise TypeError(f"{type(model).__name__} is not a tree ensemble")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise TypeError("multi-output tree models are not supported")
+        is_classifier = hasattr(model, "classes_")
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for est in estimators:
+            tree = est.tree_
+            leaf = tree.children_left == -1
+            left = np.where(leaf, np.arange(tree.node_count), tree.children_left) + offset
+            right = np.where(leaf, np.arange(tree.node_count), tree.children_right) + offset
+            value = tree.value[:, 0, :].astype(float)
+            if is_classifier:
+                totals = value.sum(axis=1, keepdims=True)
+                value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, int(tree.max_depth))
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=int(model.n_features_in_),
+            is_classifier=is_classifier,
+            classes=getattr(model, "classes_", None),
+        )
+
+    def _leaf_values(self, X: np.ndarray) -> np.ndarray:
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).astype(float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        flat = X.ravel()
+        row_base = (np.arange(X.shape[0]) * X.shape[1])[:, None]
+        node = np.tile(self.roots, (X.shape[0], 1))
+        # Leaves point to themselves, so max_depth steps settle every path
+        for _ in range(self.max_depth):
+            go_right = flat.take(row_base + self.feature.take(node)) > self.threshold.take(node)
+            node = self.children.take(2 * node + go_right)
+        return self.value[node].mean(axis=1)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict a batch of rows (regression value or class label)."""
+        leaf = self._leaf_values(X)
+        if self.is_classifier:
+            return self.classes_[np.argmax(leaf, axis=1)]
+        return leaf[:, 0]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for a batch of rows (classifiers only)."""
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._leaf_values(X)
+
+
+@dataclass
+class _Entry:
+    paths: tuple[Path, ...]
+    path: Path | None = None
+    model: Any = None
+    packed: PackedForest | None = None
+    mtime: float | None = None
+    checked_at: float = 0.0
+    loads: int = 0
+    error: str | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ModelService:
+    """Process-resident model registry with hot-swap and batched inference."""
+
+    def __init__(self, models: dict[str, str | Path] | None = None, check_interval: float = 5.0,
+                 compile_forests: bool = True):
+        """
+        Initialize the service.
+
+        Args:
+            models: Model name -> pickle path or candidate paths (defaults to ``DEFAULT_MODELS``)
+            check_interval: Seconds between file change checks per model
+            compile_forests: Compile tree ensembles to ``PackedForest`` on load
+        """
+        self.check_interval = check_interval
+        self.compile_forests = compile_forests
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        for name, path in (models if models is not None else DEFAULT_MODELS).items():
+            self.register(name, path)
+
+    def register(self, name: str, path: str | Path | tuple[str | Path, ...]) -> None:
+        """Register (or re-point) a model name to a pickle file or candidate files."""
+        paths = tuple(Path(p) for p in path) if isinstance(path, tuple | list) else (Path(path),)
+        with self._lock:
+            self._entries[name] = _Entry(paths=paths)
+
+    def _load(self, entry: _Entry, path: Path, mtime: float) -> None:
+        import joblib
+
+        try:
+            model = joblib.load(path)
+        except Exception as e:
+            entry.error = str(e)
+            logger.error(f"Failed to load model {path}: {e}")
+            return
+        packed = None
+        if self.compile_forests:
+            try:
+                packed = PackedForest.from_estimator(model)
+            except TypeError as e:
+                logger.debug(f"Model {path} not compiled: {e}")
+        # Swap both references together so readers never mix versions
+        entry.model, entry.packed, entry.path, entry.mtime, entry.error = model, packed, path, mtime, None
+        entry.loads += 1
+        logger.info(f"Loaded model {path} (packed={packed is not None}, load #{entry.loads})")
+
+    def _entry(self, name: str) -> _Entry | None:
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if now - entry.checked_at < self.check_interval:
+            return entry
+        with entry.lock:
+            if now - entry.checked_at < self.check_interval:
+                return entry
+            entry.checked_at = now
+            # First existing candidate wins; with none, keep serving the resident model
+            for path in entry.paths:
+                try:
+                    mtime = path.stat().st_mtime
+                except OSError:
+                    continue
+                if (path, mtime) != (entry.path, entry.mtime):
+                    self._load(entry, path, mtime)
+                break
+        return entry
+
+    def get(self, name: str) -> Any | None:
+        """Return the resident estimator for ``name`` (loading it if needed)."""
+        entry = self._entry(name)
+        return entry.model if entry else None
+
+    def available(self, name: str) -> bool:
+        """True if the model is loaded or loadable."""
+        return self.get(name) is not None
+
+    def predict_many(self, name: str, X: Any) -> np.ndarray | None:
+        """
+        Predict a batch of rows.
+
+        Args:
+            name: Registered model name
+            X: 2-D array-like of feature rows
+
+        Returns:
+            Predictions array, or None if the model is unavailable
+        """
+        entry = self._entry(name)
+        if entry is None or entry.model is None:
+            return None
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        packed, model = entry.packed, entry.model
+        if packed is not None:
+            return packed.predict(X)
+        return np.asarray(model.predict(X))
+
+    def predict_proba_many(self, name: str, X: Any) -> np.ndarray | None:
+        """Class probabilities for a batch of rows (classifiers only)."""
+        entry = self._entry(name)
+        if entry is None or entry.model is None or not hasattr(entry.model, "predict_proba"):
+            return None
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if entry.packed is not None:
+            return entry.packed.predict_proba(X)
+        return np.asarray(entry.model.predict_proba(X))
+
+    def status(self) -> dict[str, Any]:
+        """Per-model load diagnostics."""
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            name: {
+                "path": str(e.path or e.paths[0]),
+                "loaded": e.model is not None,
+                "packed": e.packed is not None,
+                "loads": e.loads,
+                "mtime": e.mtime,
+                "error": e.error,
+            }
+            for name, e in entries.items()
+        }
+
+
+_model_service: ModelService | None = None
+_model_service_lock = threading.Lock()
+
+
+def get_model_service() -> ModelService:
+    """Get the process-wide model service."""
+    global _model_service
+    if _model_service is None:
+        with _model_service_lock:
+            if _model_service is None:
+                _model_service = ModelService(
+                    check_interval=float(os.getenv("ML_MODEL_CHECK_INTERVAL", "5")),
+                    compile_forests=os.getenv("ML_PACKED_FOREST", "true").lower() == "true",
+                )
+    return _model_service
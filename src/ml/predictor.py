@@ -1,22 +1,24 @@
 # src/ml/predictor.py
-from pathlib import Path
+from collections.abc import Iterable
 
-import joblib
+import numpy as np
 
-_MODEL = None
-_MODEL_PATH = Path("src/models/buy_regression_model.pkl")
+from src.ml.model_service import get_model_service
+
+_MODEL_NAME = "buy_regression"
 
-def _load():
-    global _MODEL
-    if _MODEL is None and _MODEL_PATH.is_file():
-        _MODEL = joblib.load(_MODEL_PATH)
-    return _MODEL
 
 def predict_buy_return(confidence_score: float, ml_probability: float) -> float:
-    m = _load()
-    if m is None:
+    m = get_model_service()
+    preds = m.predict_many(_MODEL_NAME, [[confidence_score, ml_probability]])
+    if preds is None:
         # graceful fallback, no crashes if model missing
         return 0.0
-    import numpy as np
-    X = np.array([[confidence_score, ml_probability]], dtype=float)
-    return float(m.predict(X)[0])
+    return float(preds[0])
+
+
+def predict_buy_returns(rows: Iterable[tuple[float, float]]) -> np.ndarray:
+    """Batch form of ``predict_buy_return`` for (confidence_score, ml_probability) rows."""
+    X = np.asarray(list(rows), dtype=float).reshape(-1, 2)
+    preds = get_model_service().predict_many(_MODEL_NAME, X)
+    return np.zeros(len(X)) if preds is None else preds
@@ -0,0 +1,110 @@
+# src/ml/registry.py
+"""
+Versioned model registry.
+
+Each save writes ``<root>/<name>/v0001.pkl`` plus a ``v0001.json`` metadata
+file, then atomically replaces ``<root>/<name>/current.pkl`` and
+``current.json``. The model service watches ``current.pkl``, so a new
+version is picked up by running processes without a restart, and older
+versions stay on disk for rollback.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY_ROOT = Path("src/models/registry")
+
+
+class ModelRegistry:
+    """Filesystem registry of versioned models."""
+
+    def __init__(self, root: str | Path = DEFAULT_REGISTRY_ROOT):
+        """
+        Initialize the registry.
+
+        Args:
+            root: Registry root directory
+        """
+        self.root = Path(root)
+
+    def current_path(self, name: str) -> Path:
+        """Path of the active model file for ``name``."""
+        return self.root / name / "current.pkl"
+
+    def versions(self, name: str) -> list[int]:
+        """Saved version numbers for ``name``, ascending."""
+        directory = self.root / name
+        if not directory.is_dir():
+            return []
+        return sorted(int(p.stem[1:]) for p in directory.glob("v*.pkl") if p.stem[1:].isdigit())
+
+    def metadata(self, name: str, version: int | None = None) -> dict[str, Any] | None:
+        """Metadata of a version (default: the active one)."""
+        path = (self.root / name / "current.json" if version is None
+                else self.root / name / f"v{version:04d}.json")
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def load(self, name: str, version: int | None = None) -> Any | None:
+        """Load a version (default: the active one)."""
+        import joblib
+
+        path = self.current_path(name) if version is None else self.root / name / f"v{version:04d}.pkl"
+        if not path.is_file():
+            return None
+        return joblib.load(path)
+
+    def save(self, name: str, model: Any, metadata: dict[str, Any] | None = None) -> int:
+        """
+        Save a new version and make it active.
+
+        Args:
+            name: Model name
+            model: Fitted estimator
+            metadata: Training metadata (features, rows, metrics, watermark, ...)
+
+        Returns:
+            New version number
+        """
+        import joblib
+
+        directory = self.root / name
+        directory.mkdir(parents=True, exist_ok=True)
+        version = (self.versions(name) or [0])[-1] + 1
+        meta = {
+            **(metadata or {}),
+            "name": name,
+            "version": version,
+            "created_at": datetime.now(UTC).isoformat(),
+        }
+        model_path = directory / f"v{version:04d}.pkl"
+        joblib.dump(model, model_path)
+        (directory / f"v{version:04d}.json").write_text(json.dumps(meta, indent=2, default=str))
+        self._activate(name, version)
+        logger.info(f"Registered model {name} v{version}")
+        return version
+
+    def activate(self, name: str, version: int) -> None:
+        """Make an existing version active (rollback)."""
+        if version not in self.versions(name):
+            raise ValueError(f"unknown version {version} for model {name}")
+        self._activate(name, version)
+
+    def _activate(self, name: str, version: int) -> None:
+        directory = self.root / name
+        for suffix in ("pkl", "json"):
+            tmp = directory / f".current.{suffix}.tmp"
+            shutil.copyfile(directory / f"v{version:04d}.{suffix}", tmp)
+            # Atomic swap: readers see either the old or the new file, never a partial one
+            os.replace(tmp, directory / f"current.{suffix}")
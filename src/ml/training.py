@@ -0,0 +1,173 @@
+# src/ml/training.py
+"""
+Training-data pipeline for the buy-return model.
+
+Logged signals are labelled with realized forward returns from candles in
+the feature store (``labels.forward_returns``) and enriched with the bar
+features that were available at signal time (``labels.asof_join``). Models
+are trained incrementally: each run only fits rows newer than the active
+model's ``trained_through`` watermark, adding warm-started trees to the
+existing forest, and the result is saved as a new registry version.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.data.signal_journal import get_signal_journal
+from src.ml.feature_store import BAR_FEATURES, TIMEFRAME_SECONDS, FeatureStore, get_feature_store
+from src.ml.labels import DEFAULT_HORIZONS, CandleIndex, asof_join, forward_returns
+from src.ml.registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "buy_regression"
+# Must match the row layout used by ``predictor.predict_buy_return``
+MODEL_FEATURES = ("confidence_score", "ml_probability")
+DEFAULT_TARGET = "ret_24h"
+
+
+def load_signals(path: str | Path | None = None) -> pd.DataFrame:
+    """
+    Load logged signals.
+
+    Args:
+        path: Legacy ``signals_log.csv`` to read instead of the signal journal
+
+    Returns:
+        Frame with ``symbol``, ``ts`` (epoch seconds, UTC) and score columns,
+        sorted by ``ts``
+    """
+    if path is None:
+        df = get_signal_journal().query()
+        df["ts"] = df["ts"].astype("int64")
+    else:
+        path = Path(path)
+        if not path.is_file():
+            return pd.DataFrame(columns=["symbol", "ts", *MODEL_FEATURES])
+        df = pd.read_csv(path)
+        ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce", format="mixed")
+        df = df[ts.notna()].copy()
+        df["ts"] = (ts[ts.notna()] - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)
+    df["symbol"] = df["symbol"].astype(str).str.upper().str.replace(r"[-/].*$", "", regex=True)
+    if "ml_probability" not in df.columns:
+        df["ml_probability"] = 0.5
+    df["confidence_score"] = pd.to_numeric(df["confidence_score"], errors="coerce")
+    df["ml_probability"] = pd.to_numeric(df["ml_probability"], errors="coerce").fillna(0.5)
+    return df.dropna(subset=["confidence_score"]).sort_values("ts", kind="stable").reset_index(drop=True)
+
+
+def build_training_set(signals: pd.DataFrame, candles: pd.DataFrame, timeframe: str = "1d",
+                       horizons: dict[str, int] | None = None) -> pd.DataFrame:
+    """
+    Label signals with forward returns and point-in-time bar features.
+
+    Args:
+        signals: Output of ``load_signals``
+        candles: ``FeatureStore.frame`` output (symbol, available_at, close, features)
+        timeframe: Candle timeframe, used to drop horizons shorter than one bar
+        horizons: Horizon name -> seconds
+
+    Returns:
+        ``signals`` with ``entry_price``, ``ret_<horizon>`` and bar feature columns
+    """
+    bar_seconds = TIMEFRAME_SECONDS.get(timeframe, 86400)
+    horizons = {k: v for k, v in (horizons or DEFAULT_HORIZONS).items() if v >= bar_seconds}
+    out = signals.reset_index(drop=True)
+    symbols = out["symbol"].to_numpy()
+    ts = out["ts"].to_numpy(dtype=np.int64)
+
+    index = CandleIndex(candles["symbol"], candles["available_at"], candles["close"])
+    labels = forward_returns(symbols, ts, index, horizons, entry_tolerance=2 * bar_seconds)
+    feature_cols = [c for c in BAR_FEATURES if c in candles.columns]
+    features = asof_join(symbols, ts, candles, feature_cols)
+    return pd.concat([out, pd.DataFrame(labels), features], axis=1)
+
+
+def train_incremental(dataset: pd.DataFrame, registry: ModelRegistry | None = None,
+                      name: str = MODEL_NAME, target: str = DEFAULT_TARGET,
+                      features: tuple[str, ...] = MODEL_FEATURES, trees_per_update: int = 20,
+                      min_rows: int = 30, holdout_fraction: float = 0.2) -> dict[str, Any] | None:
+    """
+    Fit the model on rows newer than the active version and register the result.
+
+    The newest ``holdout_fraction`` of the new rows is held out for metrics
+    and stays after the watermark, so it is trained on in the next run.
+
+    Args:
+        dataset: Output of ``build_training_set``
+        registry: Model registry
+        name: Registry model name
+        target: Label column
+        features: Feature columns (model input order)
+        trees_per_update: Trees added per warm-start update
+        min_rows: Minimum new labelled rows needed to train
+        holdout_fraction: Share of new rows held out for evaluation
+
+    Returns:
+        Metadata of the new version, or None if there was not enough new data
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    registry = registry or ModelRegistry()
+    meta = registry.metadata(name) or {}
+    watermark = int(meta.get("trained_through", -1))
+    labelled = dataset.dropna(subset=[target, *features]).sort_values("ts", kind="stable")
+    new = labelled[labelled["ts"] > watermark]
+    if len(new) < min_rows:
+        logger.info(f"{name}: {len(new)} new labelled rows (< {min_rows}), skipping training")
+        return None
+
+    split = max(1, int(len(new) * (1 - holdout_fraction)))
+    train, test = new.iloc[:split], new.iloc[split:]
+    X_train, y_train = train[list(features)].to_numpy(dtype=float), train[target].to_numpy(dtype=float)
+
+    model = registry.load(name) if watermark >= 0 else None
+    if isinstance(model, RandomForestRegressor) and list(meta.get("features", [])) == list(features):
+        # Warm start: existing trees are kept, new trees see only the new rows
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + trees_per_update)
+        mode = "warm_start"
+    else:
+        model = RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42, n_jobs=-1)
+        mode = "full"
+    model.fit(X_train, y_train)
+
+    metrics: dict[str, float] = {}
+    if len(test) > 1:
+        y_pred = model.predict(test[list(features)].to_numpy(dtype=float))
+        metrics = {"mse": float(mean_squared_error(test[target], y_pred)),
+                   "r2": float(r2_score(test[target], y_pred))}
+
+    new_meta = {
+        "features": list(features),
+        "target": target,
+        "mode": mode,
+        "rows": int(len(train)),
+        "total_rows": int(meta.get("total_rows", 0) if mode == "warm_start" else 0) + len(train),
+        "holdout_rows": int(len(test)),
+        "n_estimators": int(model.n_estimators),
+        "trained_through": int(train["ts"].max()),
+        "metrics": metrics,
+    }
+    new_meta["version"] = registry.save(name, model, new_meta)
+    return new_meta
+
+
+def run_pipeline(signals_path: str | Path | None = None, store: FeatureStore | None = None,
+                 timeframe: str = "1d", registry: ModelRegistry | None = None,
+                 **train_kwargs: Any) -> dict[str, Any] | None:
+    """Load signals and candles, label them and train incrementally."""
+    store = store or get_feature_store()
+    signals = load_signals(signals_path)
+    if signals.empty:
+        logger.info("No logged signals to train on")
+        return None
+    candles = store.frame(sorted(signals["symbol"].unique()), timeframe)
+    dataset = build_training_set(signals, candles, timeframe)
+    return train_incremental(dataset, registry, **train_kwargs)
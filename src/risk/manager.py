@@ -213,6 +213,37 @@ class RiskManager:
             self.logger.error(f"Error calculating Kelly position size: {e!s}")
             return 0.01  # 1% fallback
 
+    def calculate_position_size_monte_carlo(self, result, portfolio_value: float,
+                                            confidence: float = 0.95,
+                                            max_ruin_probability: float = 0.01) -> float:
+        """
+        Kelly position size from a Monte Carlo resampling of the trade history.
+
+        Uses the pessimistic tail of the bootstrapped win rate and win/loss
+        sizes instead of the single observed backtest path.
+
+        Args:
+            result: ``MonteCarloResult`` from ``run_monte_carlo``
+            portfolio_value: Current portfolio value
+            confidence: Confidence level for the Kelly inputs
+            max_ruin_probability: Fall back to the minimum size above this ruin probability
+
+        Returns:
+            Optimal position size as percentage of portfolio
+        """
+        try:
+            if result.ruin_probability > max_ruin_probability:
+                self.logger.warning(f"Monte Carlo ruin probability {result.ruin_probability:.1%} "
+                                    f"exceeds {max_ruin_probability:.1%}; using minimum size")
+                return 0.01
+            inputs = result.kelly_inputs(confidence)
+            return self.calculate_position_size_kelly(inputs['win_rate'], inputs['avg_win'],
+                                                      inputs['avg_loss'], portfolio_value)
+
+        except Exception as e:
+            self.logger.error(f"Error calculating Monte Carlo position size: {e!s}")
+            return 0.01  # 1% fallback
+
     def get_adaptive_position_multiplier(self) -> float:
         """
         Calculate position size multiplier based on recent performance.
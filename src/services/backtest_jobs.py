@@ -0,0 +1,561 @@
+"""
+Backtest Jobs - persistent queue and process pool for long backtests.
+
+``/api/run-backtest`` only enqueues a job into the ``backtest_jobs`` table
+and returns. One gunicorn worker (non-blocking ``flock`` on a lock file
+next to the database, as with the snapshot recorder) runs a dispatcher
+thread that claims queued jobs and executes them in a bounded process
+pool, so simulations never run in a request thread. Workers write progress
+and partial metrics to the job row as they go and check its cancel flag at
+every progress write (at most every ``PROGRESS_INTERVAL_SEC``, also inside a
+single simulation through the engine's per-bar hook); the API polls or
+streams those rows.
+
+Job kinds map to handler import paths (``module:function``) so spawned
+worker processes can resolve them. A handler is called as
+``handler(params, progress)`` and returns a JSON-serializable result.
+Jobs still marked running when a dispatcher starts belong to a process
+that died; they are requeued up to ``MAX_ATTEMPTS`` times, then failed.
+"""
+
+from __future__ import annotations
+
+import importlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any
+
+from src.utils.leader_lock import LeaderLock
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = 'queued', 'running', 'completed', 'failed', 'cancelled'
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+JOB_HANDLERS: dict[str, str] = {
+    'backtest': 'src.services.backtest_jobs:run_backtest_job',
+    'sweep': 'src.services.backtest_jobs:run_sweep_job',
+}
+
+MAX_ATTEMPTS = 2
+MAX_SWEEP_RUNS = 200
+# Progress rows are written at most this often (partial results always go through)
+PROGRESS_INTERVAL_SEC = 0.5
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled."""
+
+
+def _dumps(value: Any) -> str | None:
+    return None if value is None else json.dumps(value, default=str)
+
+
+def _loads(value: str | None) -> Any:
+    return None if value is None else json.loads(value)
+
+
+class JobStore:
+    """SQLite-backed job queue shared by all processes."""
+
+    def __init__(self, db_path: str = "trading.db"):
+        """
+        Initialize the job store.
+
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = db_path
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit; claim_next opens its own write transaction
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS backtest_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL DEFAULT 0,
+                    message TEXT,
+                    partial TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    cancel_requested INTEGER DEFAULT 0,
+                    worker_pid INTEGER,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    updated_at REAL,
+                    finished_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_backtest_jobs_status ON backtest_jobs(status, created_at)')
+
+    def enqueue(self, kind: str, params: dict[str, Any]) -> str:
+        """
+        Add a job to the queue.
+
+        Args:
+            kind: Job kind (key of ``JOB_HANDLERS``)
+            params: Handler parameters
+
+        Returns:
+            Job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT INTO backtest_jobs (id, kind, params, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (job_id, kind, _dumps(params), QUEUED, now, now))
+        return job_id
+
+    def claim_next(self, worker_pid: int) -> dict[str, Any] | None:
+        """Atomically move the oldest queued job to running."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT * FROM backtest_jobs WHERE status = ? ORDER BY created_at LIMIT 1', (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    conn.execute('COMMIT')
+                    return None
+                conn.execute('''
+                    UPDATE backtest_jobs SET status = ?, worker_pid = ?, attempts = attempts + 1,
+                        started_at = ?, updated_at = ? WHERE id = ?
+                ''', (RUNNING, worker_pid, now, now, row['id']))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return self._decode(row) | {'status': RUNNING, 'attempts': row['attempts'] + 1, 'worker_pid': worker_pid}
+
+    def update_progress(self, job_id: str, progress: float, message: str | None = None,
+                        partial: Any = None) -> bool:
+        """
+        Record progress of a running job.
+
+        Returns:
+            True if cancellation was requested
+        """
+        with self._connect() as conn:
+            conn.execute('''
+                UPDATE backtest_jobs SET progress = ?, message = COALESCE(?, message),
+                    partial = COALESCE(?, partial), updated_at = ? WHERE id = ?
+            ''', (progress, message, _dumps(partial), time.time(), job_id))
+            row = conn.execute('SELECT cancel_requested FROM backtest_jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute('SELECT cancel_requested FROM backtest_jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: str | None = None) -> None:
+        """Mark a running job completed, failed or cancelled."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('''
+                UPDATE backtest_jobs SET status = ?, result = ?, error = ?, finished_at = ?, updated_at = ?,
+                    progress = CASE WHEN ? = ? THEN 1.0 ELSE progress END
+                WHERE id = ? AND status = ?
+            ''', (status, _dumps(result), error, now, now, status, COMPLETED, job_id, RUNNING))
+
+    def cancel(self, job_id: str) -> dict[str, Any] | None:
+        """
+        Cancel a job: queued jobs stop at once, running ones at their next progress update.
+
+        Returns:
+            The job after the request, or None if it does not exist
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('''
+                UPDATE backtest_jobs SET status = ?, finished_at = ?, updated_at = ?
+                WHERE id = ? AND status = ?
+            ''', (CANCELLED, now, now, job_id, QUEUED))
+            conn.execute('UPDATE backtest_jobs SET cancel_requested = 1 WHERE id = ? AND status = ?',
+                         (job_id, RUNNING))
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM backtest_jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._decode(row) if row else None
+
+    def list_jobs(self, limit: int = 20, status: str | None = None) -> list[dict[str, Any]]:
+        """Most recent jobs without their full results."""
+        query = 'SELECT * FROM backtest_jobs'
+        args: list[Any] = []
+        if status:
+            query += ' WHERE status = ?'
+            args.append(status)
+        query += ' ORDER BY created_at DESC LIMIT ?'
+        args.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(query, args).fetchall()
+        jobs = []
+        for row in rows:
+            job = self._decode(row)
+            job.pop('result', None)
+            jobs.append(job)
+        return jobs
+
+    def count(self, status: str) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM backtest_jobs WHERE status = ?', (status,)).fetchone()[0]
+
+    def recover_interrupted(self) -> int:
+        """Requeue (or fail, after MAX_ATTEMPTS) jobs left running by a dead dispatcher."""
+        now = time.time()
+        with self._connect() as conn:
+            failed = conn.execute('''
+                UPDATE backtest_jobs SET status = ?, error = 'Interrupted too many times',
+                    finished_at = ?, updated_at = ? WHERE status = ? AND attempts >= ?
+            ''', (FAILED, now, now, RUNNING, MAX_ATTEMPTS)).rowcount
+            requeued = conn.execute('''
+                UPDATE backtest_jobs SET status = ?, worker_pid = NULL, updated_at = ? WHERE status = ?
+            ''', (QUEUED, now, RUNNING)).rowcount
+        if failed or requeued:
+            logger.warning(f"Backtest jobs: requeued {requeued}, failed {failed} interrupted job(s)")
+        return requeued
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> dict[str, Any]:
+        job = dict(row)
+        for key in ('params', 'partial', 'result'):
+            job[key] = _loads(job.get(key))
+        job['cancel_requested'] = bool(job.get('cancel_requested'))
+        return job
+
+
+class JobProgress:
+    """Progress reporter handed to job handlers (runs in the worker process)."""
+
+    def __init__(self, store: JobStore, job_id: str, min_interval: float = PROGRESS_INTERVAL_SEC):
+        self.store = store
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self._last_write = 0.0
+
+    def update(self, fraction: float, message: str | None = None, partial: Any = None) -> None:
+        """
+        Report progress and partial results.
+
+        Args:
+            fraction: Completed share of the job (0-1)
+            message: Short status line
+            partial: JSON-serializable partial result (replaces the previous one)
+
+        Raises:
+            JobCancelled: If the job was cancelled
+        """
+        now = time.monotonic()
+        if partial is None and now - self._last_write < self.min_interval:
+            return
+        self._last_write = now
+        if self.store.update_progress(self.job_id, min(max(fraction, 0.0), 1.0), message, partial):
+            raise JobCancelled(self.job_id)
+
+    def check_cancelled(self) -> None:
+        """Raise JobCancelled if the job was cancelled."""
+        if self.store.cancel_requested(self.job_id):
+            raise JobCancelled(self.job_id)
+
+
+def resolve_handler(path: str) -> Callable[[dict[str, Any], JobProgress], Any]:
+    """Import a handler from its ``module:function`` path."""
+    module_name, func_name = path.split(':', 1)
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def execute_job(db_path: str, job_id: str, handler_path: str, params: dict[str, Any]) -> str:
+    """
+    Run one claimed job and persist its outcome (worker process entry point).
+
+    The handler path is resolved by the dispatcher, so handlers registered
+    at runtime in the parent process also work in spawned workers.
+
+    Returns:
+        Final job status
+    """
+    store = JobStore(db_path)
+    try:
+        handler = resolve_handler(handler_path)
+        result = handler(params, JobProgress(store, job_id))
+        store.finish(job_id, COMPLETED, result=result)
+        return COMPLETED
+    except JobCancelled:
+        store.finish(job_id, CANCELLED)
+        return CANCELLED
+    except Exception as e:
+        logger.error(f"Backtest job {job_id} ({handler_path}) failed: {e}")
+        store.finish(job_id, FAILED, error=str(e))
+        return FAILED
+
+
+class BacktestJobRunner:
+    """Dispatcher thread feeding queued jobs to a bounded process pool."""
+
+    def __init__(self, store: JobStore, max_workers: int = 2, poll_seconds: float = 1.0):
+        """
+        Initialize the runner.
+
+        Args:
+            store: Job queue
+            max_workers: Worker processes (jobs running at once)
+            poll_seconds: Queue polling interval for jobs enqueued by other processes
+        """
+        self.store = store
+        self.max_workers = max(1, max_workers)
+        self.poll_seconds = poll_seconds
+
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._leader = LeaderLock(f"{self.store.db_path}.jobs.lock", self._on_leader)
+        self._pool: ProcessPoolExecutor | None = None
+        self._running: dict[Future, str] = {}
+        self.jobs_started = 0
+        self.last_error = ""
+
+    def submit(self, kind: str, params: dict[str, Any] | None = None) -> str:
+        """
+        Enqueue a job (from any process) and wake the dispatcher.
+
+        Returns:
+            Job id
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = self.store.enqueue(kind, params or {})
+        self._wake.set()
+        return job_id
+
+    def start(self) -> None:
+        """Start the dispatcher thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="backtest-jobs", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop dispatching; running jobs finish in their processes."""
+        self._stop.set()
+        self._wake.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_leader(self) -> None:
+        """Take over dispatching and requeue jobs a dead leader left running."""
+        self.store.recover_interrupted()
+        logger.info(f"🧪 Backtest job runner active in pid {os.getpid()} ({self.max_workers} workers)")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self._leader.acquire():
+                    self._reap()
+                    self._dispatch()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Backtest job dispatch failed: {e}")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _dispatch(self) -> None:
+        while len(self._running) < self.max_workers and not self._stop.is_set():
+            job = self.store.claim_next(os.getpid())
+            if job is None:
+                return
+            handler_path = JOB_HANDLERS.get(job['kind'])
+            if handler_path is None:
+                self.store.finish(job['id'], FAILED, error=f"Unknown job kind: {job['kind']}")
+                continue
+            future = self._executor().submit(execute_job, self.store.db_path, job['id'], handler_path, job['params'])
+            future.add_done_callback(lambda _: self._wake.set())
+            self._running[future] = job['id']
+            self.jobs_started += 1
+
+    def _reap(self) -> None:
+        for future in [f for f in self._running if f.done()]:
+            job_id = self._running.pop(future)
+            error = future.exception()
+            if error is None:
+                continue
+            # The worker process died before it could record the outcome
+            self.store.finish(job_id, FAILED, error=f"Worker crashed: {error}")
+            if isinstance(error, BrokenProcessPool) and self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "leader": self._leader.held,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "max_workers": self.max_workers,
+            "active_jobs": list(self._running.values()),
+            "jobs_started": self.jobs_started,
+            "queued": self.store.count(QUEUED),
+            "last_error": self.last_error,
+        }
+
+
+# --- Built-in job handlers (run in worker processes) -------------------------
+
+def _job_config(params: dict[str, Any]) -> Any:
+    from src.backtesting.walk_forward import apply_params
+    from src.config import Config
+    return apply_params(Config(), params.get('params') or {})
+
+
+def _date_range(params: dict[str, Any]) -> tuple[datetime, datetime]:
+    end = datetime.now()
+    return end - timedelta(days=int(params.get('days', 30))), end
+
+
+def _bar_progress(progress: JobProgress, step: int, steps: int, message: str) -> Callable[[int, int], None]:
+    """Engine ``on_bar`` hook: progress within one step, so long runs stay cancellable."""
+    def on_bar(i: int, n_bars: int) -> None:
+        # Throttled inside JobProgress; raises JobCancelled when the job was cancelled
+        progress.update((step + i / n_bars) / steps, message)
+    return on_bar
+
+
+def run_backtest_job(params: dict[str, Any], progress: JobProgress) -> dict[str, Any]:
+    """
+    Backtest the default strategy on one or more symbols.
+
+    Params:
+        symbols: Trading symbols (default ``['BTC/USDT']``)
+        days: Lookback in days (default 30)
+        timeframe: Bar timeframe (default ``'1h'``)
+        intrabar_timeframe: Optional sub-candle timeframe for exits
+        params: ``section.key`` config overrides
+    """
+    from src.backtesting.engine import BacktestEngine
+    from src.backtesting.walk_forward import _clean_metrics, summarize
+    from src.strategies.enhanced_bollinger_strategy import EnhancedBollingerBandsStrategy
+
+    symbols = params.get('symbols') or ['BTC/USDT']
+    timeframe = params.get('timeframe', '1h')
+    start, end = _date_range(params)
+    config = _job_config(params)
+
+    per_symbol: dict[str, Any] = {}
+    errors: dict[str, str] = {}
+    for i, symbol in enumerate(symbols):
+        progress.update(i / len(symbols), f"Backtesting {symbol}")
+        try:
+            engine = BacktestEngine(config, EnhancedBollingerBandsStrategy(config))
+            engine.on_bar = _bar_progress(progress, i, len(symbols), f"Backtesting {symbol}")
+            metrics = engine.run_backtest(symbol, start, end, timeframe, params.get('intrabar_timeframe'))
+            per_symbol[symbol] = _clean_metrics(metrics)
+        except JobCancelled:
+            raise
+        except Exception as e:
+            errors[symbol] = str(e)
+        progress.update((i + 1) / len(symbols), f"{i + 1}/{len(symbols)} symbols",
+                        partial={'symbols': per_symbol, 'errors': errors})
+    if not per_symbol:
+        raise RuntimeError(f"No symbol could be backtested: {errors}")
+    return {'symbols': per_symbol, 'errors': errors, 'summary': summarize(list(per_symbol.values()))}
+
+
+def run_sweep_job(params: dict[str, Any], progress: JobProgress) -> dict[str, Any]:
+    """
+    Backtest every combination of a parameter grid on one symbol.
+
+    Params:
+        symbol: Trading symbol (default ``'BTC/USDT'``)
+        days, timeframe, params: As for ``run_backtest_job``
+        grid: ``section.key`` -> list of values
+        select_by: Metric to rank runs by (default ``'sharpe_ratio'``)
+    """
+    from src.backtesting.engine import BacktestEngine
+    from src.backtesting.walk_forward import _clean_metrics, apply_params
+    from src.strategies.enhanced_bollinger_strategy import EnhancedBollingerBandsStrategy
+
+    symbol = params.get('symbol', 'BTC/USDT')
+    timeframe = params.get('timeframe', '1h')
+    select_by = params.get('select_by', 'sharpe_ratio')
+    grid = params.get('grid') or {}
+    keys = list(grid)
+    combos = [dict(zip(keys, values, strict=True)) for values in itertools.product(*(grid[k] for k in keys))]
+    if len(combos) > MAX_SWEEP_RUNS:
+        raise ValueError(f"Grid has {len(combos)} combinations (max {MAX_SWEEP_RUNS})")
+
+    config = _job_config(params)
+    start, end = _date_range(params)
+    progress.update(0.0, f"Loading {symbol} history")
+    data = BacktestEngine(config, EnhancedBollingerBandsStrategy(config)).load_history(symbol, start, end, timeframe)
+    if data.empty:
+        raise RuntimeError(f"No {timeframe} data for {symbol}")
+
+    runs: list[dict[str, Any]] = []
+    best: dict[str, Any] | None = None
+    for i, combo in enumerate(combos):
+        run_config = apply_params(config, combo)
+        engine = BacktestEngine(run_config, EnhancedBollingerBandsStrategy(run_config))
+        engine.timeframe = timeframe
+        engine.on_bar = _bar_progress(progress, i, len(combos), f"Run {i + 1}/{len(combos)}")
+        results = engine._simulate_cached(data, symbol, timeframe)
+        run = {'params': combo, 'metrics': _clean_metrics(engine._calculate_metrics(results))}
+        runs.append(run)
+        score = run['metrics'].get(select_by)
+        if score is not None and (best is None or score > best['metrics'][select_by]):
+            best = run
+        progress.update((i + 1) / len(combos), f"{i + 1}/{len(combos)} runs",
+                        partial={'runs': len(runs), 'best': best, 'last': run})
+
+    runs.sort(key=lambda r: r['metrics'].get(select_by) if r['metrics'].get(select_by) is not None
+              else float('-inf'), reverse=True)
+    return {'symbol': symbol, 'select_by': select_by, 'best': best, 'runs': runs}
+
+
+_runner: BacktestJobRunner | None = None
+_runner_lock = threading.Lock()
+
+
+def get_backtest_job_runner() -> BacktestJobRunner:
+    """Get the shared job runner (``BACKTEST_JOB_WORKERS`` processes, not started)."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                workers = int(os.getenv("BACKTEST_JOB_WORKERS", "2"))
+                _runner = BacktestJobRunner(JobStore(), max_workers=workers)
+    return _runner
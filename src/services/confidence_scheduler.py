@@ -0,0 +1,234 @@
+"""
+Confidence Scheduler - keeps candles and entry confidence fresh for every asset.
+
+Each tracked asset is refreshed once per ``refresh_seconds``: its daily
+candles are fetched from OKX, it is rescored, and the result is written to
+the shared ``ConfidenceStore``. Refreshes are staggered evenly across the
+interval instead of bursting, and a token bucket caps the scheduler's OKX
+request rate so it stays inside the client's rate budget with room for
+trading calls. Everything fetched in one tick is scored with a single
+``calculate_confidence_batch`` call.
+
+As with the snapshot recorder, only one gunicorn worker runs the scheduler
+(non-blocking ``flock`` on a lock file next to the database); the others
+read the store.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from src.data.confidence_store import ConfidenceStore
+from src.utils.leader_lock import LeaderLock
+
+logger = logging.getLogger(__name__)
+
+# Assets scanned by the confidence trader and shown on the dashboard
+TRACKED_ASSETS = [
+    'BTC', 'ETH', 'SOL', 'ADA', 'AVAX', 'LINK', 'UNI', 'LTC', 'XRP',
+    'DOGE', 'MATIC', 'ATOM', 'DOT', 'NEAR', 'SHIB', 'BNB', 'BCH',
+    'XLM', 'ALGO', 'ICP', 'SAND', 'MANA', 'CRO', 'APE', 'AXS',
+    'CHZ', 'THETA', 'GRT', 'COMP', 'MKR', 'YFI', 'SUSHI', 'AAVE',
+    'CRV', 'TON', 'FIL', 'OP', 'ARB', 'LDO', 'FET', 'INJ'
+]
+
+TICK_SEC = 1.0
+CANDLE_DAYS = 30
+
+
+def candles_to_rows(candles_data: list[list[Any]]) -> list[dict[str, Any]]:
+    """
+    Convert OKX candle arrays to the analyzer's candle dicts, oldest first.
+
+    Args:
+        candles_data: OKX rows ``[ts, open, high, low, close, volume, ...]``
+
+    Returns:
+        Candle dicts with date, price (close), volume, high, low, open, close
+    """
+    rows = []
+    for candle in candles_data:
+        close_price = float(candle[4])
+        rows.append({
+            'date': datetime.fromtimestamp(int(candle[0]) / 1000.0).isoformat(),
+            'price': close_price,
+            'volume': float(candle[5]),
+            'high': float(candle[2]),
+            'low': float(candle[3]),
+            'open': float(candle[1]),
+            'close': close_price
+        })
+    rows.sort(key=lambda x: x['date'])
+    return rows
+
+
+class OKXCandleFetcher:
+    """Fetches daily candles for one asset per call and feeds the feature store."""
+
+    def __init__(self, days: int = CANDLE_DAYS):
+        """
+        Initialize the fetcher.
+
+        Args:
+            days: Number of daily candles to fetch
+        """
+        self.days = days
+        self._client = None
+
+    def __call__(self, symbol: str) -> list[dict[str, Any]]:
+        from src.ml.feature_store import get_feature_store
+        from src.utils.okx_native import OKXNative
+
+        if self._client is None:
+            self._client = OKXNative.from_env()
+        candles_data = self._client.candles(f"{symbol}-USDT", bar="1D", limit=self.days)
+        # Closed daily candles feed the shared feature store
+        try:
+            get_feature_store().ingest(symbol, '1d', [c for c in candles_data if len(c) < 9 or str(c[8]) == '1'])
+        except Exception as e:
+            logger.debug(f"Feature store ingest failed for {symbol}: {e}")
+        return candles_to_rows(candles_data)
+
+
+class ConfidenceScheduler:
+    """Background refresher of candles and confidence for the tracked universe."""
+
+    def __init__(self, store: ConfidenceStore, symbols: list[str] | None = None,
+                 fetch_candles: Callable[[str], list[dict[str, Any]]] | None = None,
+                 analyzer: Any = None, refresh_seconds: float = 120.0,
+                 max_requests_per_sec: float = 1.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            store: Store to write candles and scores into
+            symbols: Assets to keep fresh (default: ``TRACKED_ASSETS``)
+            fetch_candles: Callable returning daily candles for a symbol (one OKX request)
+            analyzer: ``EntryConfidenceAnalyzer`` used for scoring
+            refresh_seconds: Target age of every asset's data
+            max_requests_per_sec: OKX request budget for the scheduler
+        """
+        self.store = store
+        self.symbols = list(symbols or TRACKED_ASSETS)
+        self.fetch_candles = fetch_candles or OKXCandleFetcher()
+        self._analyzer = analyzer
+        self.max_requests_per_sec = max_requests_per_sec
+        # The whole universe has to fit in the request budget
+        self.refresh_seconds = max(refresh_seconds, len(self.symbols) / max_requests_per_sec)
+
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._leader = LeaderLock(f"{self.store.db_path}.confidence.lock", self._on_leader)
+        self._next_due: dict[str, float] = {}
+        self._tokens = 1.0
+        self._last_tick: float | None = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = ""
+
+    @property
+    def analyzer(self) -> Any:
+        if self._analyzer is None:
+            from src.utils.entry_confidence import get_confidence_analyzer
+            self._analyzer = get_confidence_analyzer()
+        return self._analyzer
+
+    def start(self) -> None:
+        """Start the scheduler thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="confidence-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler thread."""
+        self._stop.set()
+
+    def _on_leader(self) -> None:
+        """This worker now spends the OKX budget for every process."""
+        logger.info(f"🧮 Confidence scheduler active in pid {os.getpid()} "
+                    f"({len(self.symbols)} assets every {self.refresh_seconds:.0f}s)")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._leader.acquire():
+                self.run_pending()
+            self._stop.wait(TICK_SEC)
+
+    def _stagger(self, now: float) -> None:
+        """Spread first refreshes evenly over one interval."""
+        spacing = self.refresh_seconds / max(1, len(self.symbols))
+        for i, symbol in enumerate(self.symbols):
+            self._next_due.setdefault(symbol, now + i * spacing)
+
+    def run_pending(self, now: float | None = None) -> int:
+        """
+        Refresh the assets that are due, within the request budget.
+
+        Args:
+            now: Current epoch seconds (defaults to now)
+
+        Returns:
+            Number of assets refreshed
+        """
+        now = time.time() if now is None else now
+        if not self._next_due:
+            self._stagger(now)
+        if self._last_tick is not None:
+            # Token bucket; a burst of one tick's budget keeps requests evenly paced
+            burst = max(1.0, self.max_requests_per_sec * TICK_SEC)
+            self._tokens = min(burst, self._tokens + (now - self._last_tick) * self.max_requests_per_sec)
+        self._last_tick = now
+
+        due = sorted((t, s) for s, t in self._next_due.items() if t <= now)
+        prices: dict[str, float] = {}
+        histories: dict[str, list[dict[str, Any]]] = {}
+        for _, symbol in due:
+            if self._tokens < 1.0:
+                break
+            self._tokens -= 1.0
+            self._next_due[symbol] = now + self.refresh_seconds
+            try:
+                candles = self.fetch_candles(symbol)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{symbol}: {e}"
+                logger.warning(f"Confidence refresh failed for {symbol}: {e}")
+                continue
+            if candles:
+                histories[symbol] = candles
+                prices[symbol] = float(candles[-1]['close'])
+
+        if not histories:
+            return 0
+        try:
+            results = self.analyzer.calculate_confidence_batch(prices, histories)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.warning(f"Confidence scoring failed: {e}")
+            results = {}
+        for symbol, candles in histories.items():
+            self.store.put(symbol, candles, prices[symbol], results.get(symbol), ts=now)
+        self.refreshes += len(histories)
+        return len(histories)
+
+    def stats(self) -> dict[str, Any]:
+        """Scheduler diagnostics."""
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "leader": self._leader.held,
+            "symbols": len(self.symbols),
+            "refresh_seconds": self.refresh_seconds,
+            "max_requests_per_sec": self.max_requests_per_sec,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,349 @@
+"""
+Dashboard Stream - single producer, many subscribers (Server-Sent Events).
+
+One background thread computes every dashboard topic (portfolio, prices,
+bot status, signals) once per tick and publishes only what changed. Each
+change is serialized to SSE text exactly once and written into the queue of
+every connected client, so an extra browser tab costs a queue write instead
+of another round of OKX calls.
+
+Changes are encoded as JSON Merge Patches (RFC 7386): nested dicts are
+diffed recursively and a ``null`` value means "key removed". Clients keep the
+last full state per topic and apply patches in ``id`` order. A bounded replay
+buffer lets a reconnecting client resume from its ``Last-Event-ID``; clients
+that fell out of the buffer get a fresh full snapshot instead. Event ids are
+``<instance>-<seq>`` because every worker process runs its own producer: an id
+issued by another worker (or before a restart) also gets a full snapshot. A client whose
+queue fills up is disconnected rather than skipped ahead, so it never applies
+a patch to a state it did not receive.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Sentinel used by merge patches to express "no difference"
+_UNCHANGED = object()
+
+
+def merge_patch_diff(old: Any, new: Any) -> Any:
+    """
+    Compute the JSON Merge Patch that turns ``old`` into ``new``.
+
+    Args:
+        old: Previous JSON-compatible value
+        new: Current JSON-compatible value
+
+    Returns:
+        Patch value, or the module sentinel ``_UNCHANGED`` when equal
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch: dict[str, Any] = {}
+        for key, value in new.items():
+            if key not in old:
+                patch[key] = value
+                continue
+            sub = merge_patch_diff(old[key], value)
+            if sub is not _UNCHANGED:
+                patch[key] = sub
+        for key in old:
+            if key not in new:
+                patch[key] = None
+        return patch if patch else _UNCHANGED
+    return _UNCHANGED if old == new else new
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Apply a JSON Merge Patch (RFC 7386) and return the patched value.
+
+    Args:
+        target: Current value (left untouched)
+        patch: Patch produced by ``merge_patch_diff``
+
+    Returns:
+        New value with the patch applied
+    """
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """A published change, pre-serialized to SSE wire format."""
+
+    seq: int
+    topic: str
+    full: bool
+    text: str
+
+
+class Subscription:
+    """Per-client handle: a bounded queue of pre-serialized SSE messages."""
+
+    def __init__(self, maxsize: int):
+        self._queue: queue.Queue[str] = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.overflowed = False
+
+    def push(self, text: str) -> None:
+        """
+        Enqueue a message; a lagging client is cut off instead of losing patches.
+
+        Patches only make sense applied in order, so once the queue is full
+        nothing more is queued. The client drains what it has, the stream
+        closes and its reconnect resumes from ``Last-Event-ID`` (or a full
+        snapshot when it fell out of the replay buffer).
+        """
+        if self.overflowed:
+            self.dropped += 1
+            return
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            self.overflowed = True
+            self.dropped += 1
+
+    @property
+    def closed(self) -> bool:
+        """True once an overflowed client has drained every message it can apply."""
+        return self.overflowed and self._queue.empty()
+
+    def next_message(self, timeout: float) -> str | None:
+        """Block up to ``timeout`` seconds for the next message."""
+        try:
+            return self._queue.get(timeout=0 if self.overflowed else timeout)
+        except queue.Empty:
+            return None
+
+
+class DashboardStream:
+    """Background producer that fans out dashboard diffs to SSE subscribers."""
+
+    def __init__(self, tick_seconds: float = 15.0, replay_size: int = 256,
+                 queue_size: int = 64):
+        """
+        Initialize the stream.
+
+        Args:
+            tick_seconds: Interval between producer runs
+            replay_size: Number of events kept for reconnecting clients
+            queue_size: Per-subscriber queue bound
+        """
+        self.tick_seconds = tick_seconds
+        self.queue_size = queue_size
+
+        self._producers: list[tuple[str | None, Callable[[], Any]]] = []
+        self._state: dict[str, Any] = {}
+        self._replay: deque[StreamEvent] = deque(maxlen=replay_size)
+        self._subscribers: set[Subscription] = set()
+        self._seq = 0
+        self._lock = threading.Lock()
+        # Sequence numbers are only meaningful within this process
+        self.instance = secrets.token_hex(6)
+
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    # ---- registration / lifecycle ----
+
+    def register(self, topic: str, producer: Callable[[], Any]) -> None:
+        """Register a zero-argument callable that returns a topic's payload."""
+        self._producers.append((topic, producer))
+
+    def register_group(self, producer: Callable[[], dict[str, Any]]) -> None:
+        """Register a callable returning ``{topic: payload}`` from one shared fetch."""
+        self._producers.append((None, producer))
+
+    def start(self) -> None:
+        """Start the producer thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="dashboard-stream", daemon=True
+            )
+            self._thread.start()
+        logger.info(f"📡 Dashboard stream producer started (tick={self.tick_seconds}s)")
+
+    def stop(self) -> None:
+        """Stop the producer thread."""
+        self._stop.set()
+        self._wake.set()
+
+    def request_tick(self) -> None:
+        """Ask the producer to run now instead of waiting for the next tick."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.subscriber_count():
+                self.tick()
+            self._wake.wait(self.tick_seconds)
+            self._wake.clear()
+
+    # ---- producing ----
+
+    def tick(self) -> int:
+        """
+        Run every producer once and publish the topics that changed.
+
+        Returns:
+            Number of events published
+        """
+        published = 0
+        for topic, producer in list(self._producers):
+            try:
+                result = producer()
+            except Exception as e:
+                logger.warning(f"Stream producer '{topic or getattr(producer, '__name__', '?')}' failed: {e}")
+                continue
+            payloads = result if topic is None else {topic: result}
+            for name, payload in (payloads or {}).items():
+                if payload is not None and self.publish(name, payload):
+                    published += 1
+        return published
+
+    def publish(self, topic: str, payload: Any) -> bool:
+        """
+        Publish a topic payload; only the diff against the last state is sent.
+
+        Args:
+            topic: Topic name (becomes the SSE ``event`` field)
+            payload: JSON-compatible payload
+
+        Returns:
+            True if something changed and an event was emitted
+        """
+        # Round-trip once so state comparisons and diffs see plain JSON types
+        payload = json.loads(json.dumps(payload, default=str))
+        with self._lock:
+            previous = self._state.get(topic, _UNCHANGED)
+            if previous is _UNCHANGED:
+                full, patch = True, payload
+            else:
+                patch = merge_patch_diff(previous, payload)
+                if patch is _UNCHANGED:
+                    return False
+                full = False
+            self._state[topic] = payload
+            self._seq += 1
+            event = StreamEvent(self._seq, topic, full, self._format(self._seq, topic, full, patch))
+            self._replay.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.push(event.text)
+        return True
+
+    def _format(self, seq: int, topic: str, full: bool, data: Any) -> str:
+        event_id = f"{self.instance}-{seq}"
+        body = json.dumps({"id": event_id, "seq": seq, "topic": topic, "full": full, "data": data},
+                          separators=(",", ":"), default=str)
+        return f"id: {event_id}\nevent: {topic}\ndata: {body}\n\n"
+
+    def _parse_event_id(self, last_event_id: str | int | None) -> int | None:
+        """Sequence number of an id issued by this instance, else None."""
+        instance, _, seq = str(last_event_id or "").rpartition("-")
+        if instance != self.instance:
+            return None
+        try:
+            return int(seq)
+        except ValueError:
+            return None
+
+    # ---- subscribing ----
+
+    def subscribe(self, last_event_id: str | int | None = None) -> Subscription:
+        """
+        Register a client and pre-load it with replayed or snapshot events.
+
+        Args:
+            last_event_id: Value of the client's ``Last-Event-ID`` header; ids
+                from another instance are answered with a full snapshot
+
+        Returns:
+            Subscription to read SSE messages from
+        """
+        sub = Subscription(self.queue_size)
+        last_seq = self._parse_event_id(last_event_id)
+
+        with self._lock:
+            oldest = self._replay[0].seq if self._replay else self._seq + 1
+            backlog: list[str] | None = None
+            if last_seq is not None and oldest - 1 <= last_seq <= self._seq:
+                backlog = [ev.text for ev in self._replay if ev.seq > last_seq]
+            # A replay longer than the client queue would overflow at once
+            if backlog is None or len(backlog) > self.queue_size:
+                backlog = [
+                    self._format(self._seq, topic, True, state)
+                    for topic, state in self._state.items()
+                ]
+            self._subscribers.add(sub)
+            for text in backlog:
+                sub.push(text)
+            first_subscriber = len(self._subscribers) == 1 and not self._state
+
+        self.start()
+        if first_subscriber:
+            self.request_tick()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """Remove a client."""
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self) -> int:
+        """Number of connected clients."""
+        with self._lock:
+            return len(self._subscribers)
+
+    def stats(self) -> dict[str, Any]:
+        """Stream diagnostics for status endpoints."""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "instance": self.instance,
+                "last_seq": self._seq,
+                "replay_buffered": len(self._replay),
+                "topics": sorted(self._state),
+                "tick_seconds": self.tick_seconds,
+                "running": self._thread is not None and self._thread.is_alive(),
+                "timestamp": time.time(),
+            }
+
+
+# Global stream instance
+_dashboard_stream: DashboardStream | None = None
+
+
+def get_dashboard_stream() -> DashboardStream:
+    """Get the global dashboard stream instance."""
+    global _dashboard_stream
+    if _dashboard_stream is None:
+        import os
+        _dashboard_stream = DashboardStream(
+            tick_seconds=float(os.getenv("STREAM_TICK_SEC", "15")),
+            replay_size=int(os.getenv("STREAM_REPLAY_SIZE", "256")),
+        )
+    return _dashboard_stream
@@ -0,0 +1,393 @@
+"""
+Dashboard Views - derived dashboard metrics over one portfolio, fills and signals snapshot.
+
+The performance dashboard used to call five endpoints per refresh, each of
+which fetched balances and/or trades on its own and recomputed overlapping
+numbers (win rate, best/worst performer, allocation). Here every metric is a
+named view with explicit dependencies on other views. A view is computed at
+most once per snapshot version and memoized until the next snapshot is taken,
+so the bundled ``/api/dashboard`` response costs one portfolio fetch, one
+fills fetch, one signal journal read and one pass over each derived view.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ViewFn = Callable[..., Any]
+
+
+class DashboardSnapshot:
+    """Immutable input data plus the memo of views computed from it."""
+
+    def __init__(self, version: int, portfolio: dict[str, Any], fills: list[dict[str, Any]],
+                 signals: dict[str, dict[str, Any]] | None = None, instance: str = ""):
+        """
+        Initialize a snapshot.
+
+        Args:
+            version: Monotonic snapshot version
+            portfolio: Portfolio data as returned by PortfolioService
+            fills: Recent fills as returned by OKXAdapter.get_trades
+            signals: Latest journal signal per symbol (SignalJournal.latest_per_symbol)
+            instance: Random id of the ``DashboardViews`` that took the snapshot
+        """
+        self.version = version
+        # Versions restart at 1 in every worker; the instance id keeps them apart
+        self.etag = f"{instance}.{version}" if instance else str(version)
+        self.taken_at = time.time()
+        self.portfolio = portfolio or {}
+        self.fills = fills or []
+        self.signals = signals or {}
+        self.memo: dict[str, Any] = {}
+        self.lock = threading.RLock()
+
+
+class ViewGraph:
+    """Registry of named views and the views each one depends on."""
+
+    def __init__(self) -> None:
+        self._views: dict[str, tuple[tuple[str, ...], ViewFn]] = {}
+
+    def view(self, name: str, *deps: str) -> Callable[[ViewFn], ViewFn]:
+        """
+        Decorator registering ``fn(snapshot, *dep_values)`` as view ``name``.
+
+        Args:
+            name: View name
+            *deps: Names of views whose values are passed positionally
+
+        Returns:
+            Decorator that registers and returns the function unchanged
+        """
+        def decorator(fn: ViewFn) -> ViewFn:
+            self._views[name] = (deps, fn)
+            return fn
+        return decorator
+
+    def names(self) -> list[str]:
+        """Registered view names."""
+        return list(self._views)
+
+    def resolve(self, snapshot: DashboardSnapshot, name: str) -> Any:
+        """
+        Compute (or fetch from the snapshot memo) a view and its dependencies.
+
+        Args:
+            snapshot: Snapshot the view is computed over
+            name: View name
+
+        Returns:
+            View value
+        """
+        with snapshot.lock:
+            return self._resolve(snapshot, name, ())
+
+    def _resolve(self, snapshot: DashboardSnapshot, name: str, stack: tuple[str, ...]) -> Any:
+        if name in snapshot.memo:
+            return snapshot.memo[name]
+        if name not in self._views:
+            raise KeyError(f"Unknown dashboard view: {name}")
+        if name in stack:
+            raise ValueError(f"Dashboard view cycle: {' -> '.join((*stack, name))}")
+        deps, fn = self._views[name]
+        args = [self._resolve(snapshot, dep, (*stack, name)) for dep in deps]
+        value = fn(snapshot, *args)
+        snapshot.memo[name] = value
+        return value
+
+
+# Default view graph used by /api/dashboard
+views = ViewGraph()
+
+
+def _pnl_percent(holding: dict[str, Any]) -> float:
+    return float(holding.get('pnl_percent', 0) or 0)
+
+
+def _performer(holding: dict[str, Any] | None) -> dict[str, Any] | None:
+    if not holding:
+        return None
+    return {
+        "symbol": holding.get('symbol', ''),
+        "pnl_percent": _pnl_percent(holding),
+        "current_value": float(holding.get('current_value', 0) or 0),
+    }
+
+
+@views.view("holdings")
+def _holdings(snap: DashboardSnapshot) -> list[dict[str, Any]]:
+    return list(snap.portfolio.get('holdings', []) or [])
+
+
+@views.view("holdings_by_symbol", "holdings")
+def _holdings_by_symbol(snap: DashboardSnapshot, holdings: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    return {h.get('symbol', ''): h for h in holdings}
+
+
+@views.view("fills")
+def _fills(snap: DashboardSnapshot) -> list[dict[str, Any]]:
+    return [
+        {
+            **fill,
+            "symbol": (fill.get('symbol', '') or '').replace('/USDT', '').replace('-USDT', ''),
+            "side": (fill.get('side', '') or '').upper(),
+        }
+        for fill in snap.fills
+    ]
+
+
+@views.view("position_stats", "holdings")
+def _position_stats(snap: DashboardSnapshot, holdings: list[dict[str, Any]]) -> dict[str, Any]:
+    total = len(holdings)
+    profitable = sum(1 for h in holdings if _pnl_percent(h) > 0)
+    return {
+        "total_value": float(snap.portfolio.get('total_current_value', 0) or 0),
+        "total_pnl": float(snap.portfolio.get('total_pnl', 0) or 0),
+        "total_pnl_percent": float(snap.portfolio.get('total_pnl_percent', 0) or 0),
+        "total_positions": total,
+        "profitable_positions": profitable,
+        "losing_positions": total - profitable,
+        "win_rate": (profitable / total * 100) if total > 0 else 0,
+    }
+
+
+@views.view("performers", "holdings")
+def _performers(snap: DashboardSnapshot, holdings: list[dict[str, Any]]) -> dict[str, Any]:
+    if not holdings:
+        return {"best_performer": None, "worst_performer": None}
+    return {
+        "best_performer": _performer(max(holdings, key=_pnl_percent)),
+        "worst_performer": _performer(min(holdings, key=_pnl_percent)),
+    }
+
+
+@views.view("allocation", "holdings", "position_stats")
+def _allocation(snap: DashboardSnapshot, holdings: list[dict[str, Any]],
+                stats: dict[str, Any]) -> list[dict[str, Any]]:
+    total_value = stats["total_value"] or 1
+    allocation = [
+        {
+            "symbol": h.get('symbol', ''),
+            "value": float(h.get('current_value', 0) or 0),
+            "percentage": float(h.get('current_value', 0) or 0) / total_value * 100,
+            "pnl_percent": _pnl_percent(h),
+        }
+        for h in holdings
+        if float(h.get('current_value', 0) or 0) > 10  # Only include positions > $10
+    ]
+    allocation.sort(key=lambda x: x['value'], reverse=True)
+    return allocation[:10]
+
+
+@views.view("pnl_curve", "holdings")
+def _pnl_curve(snap: DashboardSnapshot, holdings: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    curve = []
+    cumulative = 0.0
+    now = datetime.fromtimestamp(snap.taken_at)
+    for i, holding in enumerate(holdings[:30]):
+        pnl_percent = _pnl_percent(holding)
+        cumulative += pnl_percent
+        curve.append({
+            "date": (now - timedelta(days=30 - i)).strftime('%Y-%m-%d'),
+            "value": cumulative,
+            "symbol": holding.get('symbol', ''),
+            "daily_pnl": pnl_percent,
+        })
+    return curve
+
+
+@views.view("signal_performance", "fills", "position_stats")
+def _signal_performance(snap: DashboardSnapshot, fills: list[dict[str, Any]],
+                        stats: dict[str, Any]) -> list[dict[str, Any]]:
+    if not fills:
+        # Fall back to portfolio performance as a proxy, as /api/signal-tracking does
+        return [{
+            "signal_type": "BUY",
+            "total_signals": stats["total_positions"],
+            "profitable_signals": stats["profitable_positions"],
+            "accuracy": stats["win_rate"],
+            "avg_pnl": stats["total_pnl_percent"],
+            "total_pnl": stats["total_pnl"],
+        }] if stats["total_positions"] else []
+
+    by_side: dict[str, dict[str, Any]] = {}
+    for fill in fills:
+        pnl = float(fill.get('pnl', 0) or 0)
+        perf = by_side.setdefault(fill['side'] or 'UNKNOWN', {
+            "signal_type": fill['side'] or 'UNKNOWN',
+            "total_signals": 0, "profitable_signals": 0, "total_pnl": 0.0,
+            "best_signal": 0.0, "worst_signal": 0.0,
+        })
+        perf["total_signals"] += 1
+        perf["total_pnl"] += pnl
+        perf["profitable_signals"] += pnl > 0
+        perf["best_signal"] = max(perf["best_signal"], pnl)
+        perf["worst_signal"] = min(perf["worst_signal"], pnl)
+    for perf in by_side.values():
+        perf["accuracy"] = perf["profitable_signals"] / perf["total_signals"] * 100
+        perf["avg_pnl"] = perf["total_pnl"] / perf["total_signals"]
+    return list(by_side.values())
+
+
+@views.view("trade_performance", "fills", "holdings_by_symbol")
+def _trade_performance(snap: DashboardSnapshot, fills: list[dict[str, Any]],
+                       by_symbol: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    trades = []
+    for i, fill in enumerate(fills):
+        symbol = fill['symbol']
+        holding = by_symbol.get(symbol) or {}
+        trades.append({
+            "trade_id": fill.get('id') or f"okx_{i}_{symbol}",
+            "symbol": symbol,
+            "side": fill['side'],
+            "price": float(fill.get('price', 0) or 0),
+            "amount": float(fill.get('quantity', fill.get('amount', 0)) or 0),
+            "value": float(fill.get('total_value', fill.get('cost', 0)) or 0),
+            "timestamp": fill.get('datetime', ''),
+            "pnl_percent": _pnl_percent(holding),
+            "pnl_dollar": float(holding.get('pnl', 0) or 0),
+            "status": "EXECUTED",
+        })
+    total = len(trades)
+    return {
+        "trades": trades,
+        "trade_summary": {
+            "total_trades": total,
+            "winning_trades": sum(1 for t in trades if t['pnl_percent'] > 0),
+            "losing_trades": sum(1 for t in trades if t['pnl_percent'] < 0),
+            "avg_pnl_percent": sum(t['pnl_percent'] for t in trades) / total if total else 0,
+        },
+    }
+
+
+def _finite(value: Any) -> float | None:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+@views.view("latest_signals", "holdings_by_symbol")
+def _latest_signals(snap: DashboardSnapshot, by_symbol: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+    signals = sorted(snap.signals.values(), key=lambda s: _finite(s.get('ts')) or 0.0, reverse=True)
+    latest = []
+    for signal in signals[:10]:
+        symbol = signal.get('symbol', '')
+        holding = by_symbol.get(symbol)
+        pnl_percent = _pnl_percent(holding) if holding else None
+        if pnl_percent is None:
+            outcome = "pending"
+        else:
+            outcome = "open_profit" if pnl_percent >= 0 else "open_loss"
+        ts = _finite(signal.get('ts'))
+        latest.append({
+            "symbol": symbol,
+            "signal": signal.get('timing_signal') or 'WAIT',
+            "hybrid_score": _finite(signal.get('confidence_score')) or 0.0,
+            "ml_probability": _finite(signal.get('ml_probability')),
+            "timestamp": datetime.fromtimestamp(ts).isoformat() if ts else None,
+            "pnl_percent": pnl_percent,
+            "outcome": outcome,
+        })
+    return latest
+
+
+@views.view("overview", "position_stats", "performers")
+def _overview(snap: DashboardSnapshot, stats: dict[str, Any], performers: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "portfolio_metrics": stats,
+        "signal_metrics": {
+            # ML accuracy derived from portfolio performance, as /api/performance-overview does
+            "ml_accuracy": min(95.0, max(60.0, stats["win_rate"] + 15)),
+            "total_signals": stats["total_positions"],
+            "successful_signals": stats["profitable_positions"],
+        },
+        "top_performers": performers,
+    }
+
+
+@views.view("charts", "pnl_curve", "allocation", "signal_performance")
+def _charts(snap: DashboardSnapshot, pnl_curve: list[dict[str, Any]], allocation: list[dict[str, Any]],
+            signal_performance: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "pnl_curve": pnl_curve,
+        "asset_allocation": allocation,
+        "signal_accuracy": [
+            {
+                "signal": perf["signal_type"],
+                "accuracy": perf["accuracy"],
+                "total_trades": perf["total_signals"],
+                "profitable_trades": perf["profitable_signals"],
+            }
+            for perf in signal_performance
+        ],
+    }
+
+
+class DashboardViews:
+    """Serves view bundles from a snapshot that is refreshed at most every ``ttl`` seconds."""
+
+    def __init__(self, fetch_snapshot: Callable[[], tuple[dict[str, Any], list[dict[str, Any]],
+                                                         dict[str, dict[str, Any]]]],
+                 ttl_seconds: float = 30.0, graph: ViewGraph | None = None):
+        """
+        Initialize the view service.
+
+        Args:
+            fetch_snapshot: Callable returning ``(portfolio_data, fills, latest_signals)``
+            ttl_seconds: Maximum snapshot age before a new one is taken
+            graph: View graph (defaults to the module graph)
+        """
+        self.fetch_snapshot = fetch_snapshot
+        self.ttl_seconds = ttl_seconds
+        self.graph = graph or views
+        self._snapshot: DashboardSnapshot | None = None
+        self._version = 0
+        self._instance = secrets.token_hex(6)
+        self._lock = threading.Lock()
+
+    def snapshot(self, force_refresh: bool = False) -> DashboardSnapshot:
+        """Return the current snapshot, taking a new one if it is stale."""
+        with self._lock:
+            snap = self._snapshot
+            if force_refresh or snap is None or time.time() - snap.taken_at >= self.ttl_seconds:
+                portfolio, fills, signals = self.fetch_snapshot()
+                self._version += 1
+                snap = DashboardSnapshot(self._version, portfolio, fills, signals, instance=self._instance)
+                self._snapshot = snap
+                logger.debug(f"Dashboard snapshot v{snap.version}: "
+                             f"{len(snap.portfolio.get('holdings', []) or [])} holdings, {len(snap.fills)} fills")
+            return snap
+
+    def bundle(self, names: list[str] | None = None, force_refresh: bool = False,
+               snapshot: DashboardSnapshot | None = None) -> dict[str, Any]:
+        """
+        Compute the requested views over one snapshot.
+
+        Args:
+            names: View names to include (defaults to every registered view
+                except the raw inputs)
+            force_refresh: Take a new snapshot even if the current one is fresh
+            snapshot: Snapshot already obtained by the caller (e.g. to build an ETag)
+
+        Returns:
+            ``{"snapshot_version", "snapshot_age_seconds", "views": {...}}``
+        """
+        snap = snapshot or self.snapshot(force_refresh=force_refresh)
+        wanted = names or [n for n in self.graph.names() if n not in ("holdings_by_symbol", "fills")]
+        return {
+            "snapshot_version": snap.version,
+            "snapshot_age_seconds": round(time.time() - snap.taken_at, 3),
+            "views": {name: self.graph.resolve(snap, name) for name in wanted},
+        }
@@ -0,0 +1,180 @@
+"""
+Order Book Sampler - snapshots L2 books and refits market impact curves.
+
+Every ``interval_seconds`` the top ``depth`` levels of each traded pair's
+order book are fetched through ``OKXAdapter.get_order_book`` and stored in
+the ``MarketImpactStore`` as packed arrays. Every ``refit_seconds`` each
+pair's impact curve is refitted from the books of the last ``window_seconds``
+and old snapshots are pruned. Backtests, position sizing and pricing then
+read the fitted curves instead of calling the exchange per order.
+
+As with the other background services, only one gunicorn worker samples
+(non-blocking ``flock`` on a lock file next to the database).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from src.data.market_impact import DEFAULT_DEPTH, MarketImpactStore, book_levels, fit_impact_curve
+from src.utils.leader_lock import LeaderLock
+
+logger = logging.getLogger(__name__)
+
+RETENTION_SEC = 3 * 86400
+
+
+class OKXBookFetcher:
+    """Fetches one order book per call through a lazily connected OKX adapter."""
+
+    def __init__(self, depth: int = DEFAULT_DEPTH):
+        self.depth = depth
+        self._adapter: Any = None
+
+    def __call__(self, symbol: str) -> dict[str, Any]:
+        if self._adapter is None:
+            from src.exchanges.okx_adapter import OKXAdapter
+            adapter = OKXAdapter({})
+            if not adapter.connect():
+                raise RuntimeError("Failed to connect to OKX")
+            self._adapter = adapter
+        pair = symbol if '/' in symbol else f"{symbol}/USDT"
+        return self._adapter.get_order_book(pair, self.depth)
+
+
+class OrderBookSampler:
+    """Background order book snapshotter and impact curve fitter."""
+
+    def __init__(self, store: MarketImpactStore, symbols: Callable[[], list[str]] | list[str],
+                 fetch_book: Callable[[str], dict[str, Any]] | None = None,
+                 interval_seconds: float = 300.0, refit_seconds: float = 3600.0,
+                 window_seconds: float = 86400.0, depth: int = DEFAULT_DEPTH):
+        """
+        Initialize the sampler.
+
+        Args:
+            store: Store for snapshots and fitted curves
+            symbols: Pairs or base assets to sample, or a callable returning them
+            fetch_book: Callable returning a ccxt-style order book for a symbol
+            interval_seconds: Snapshot cadence
+            refit_seconds: Curve refit cadence
+            window_seconds: Age of the books a curve is fitted on
+            depth: Levels kept per side
+        """
+        self.store = store
+        self.symbols = symbols
+        self.fetch_book = fetch_book or OKXBookFetcher(depth)
+        self.interval_seconds = interval_seconds
+        self.refit_seconds = refit_seconds
+        self.window_seconds = window_seconds
+        self.depth = depth
+
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._leader = LeaderLock(f"{self.store.db_path}.orderbook.lock", self._on_leader)
+        self._last_refit = 0.0
+        self.snapshots_taken = 0
+        self.curves_fitted = 0
+        self.failures = 0
+        self.last_error = ""
+
+    def start(self) -> None:
+        """Start the sampler thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="order-book-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampler thread."""
+        self._stop.set()
+
+    def _on_leader(self) -> None:
+        """This worker now samples books for every process."""
+        logger.info(f"📚 Order book sampler active in pid {os.getpid()} (every {self.interval_seconds:.0f}s)")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._leader.acquire():
+                self.sample_once()
+            self._stop.wait(self.interval_seconds)
+
+    def _symbols(self) -> list[str]:
+        try:
+            symbols = self.symbols() if callable(self.symbols) else self.symbols
+        except Exception as e:
+            logger.warning(f"Order book symbol list unavailable: {e}")
+            return []
+        return list(dict.fromkeys(symbols))
+
+    def sample_once(self, now: float | None = None) -> int:
+        """
+        Snapshot every symbol's book, refitting curves when due.
+
+        Args:
+            now: Current epoch seconds (defaults to now)
+
+        Returns:
+            Number of books stored
+        """
+        now = time.time() if now is None else now
+        symbols = self._symbols()
+        stored = 0
+        for symbol in symbols:
+            try:
+                levels = book_levels(self.fetch_book(symbol), self.depth)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{symbol}: {e}"
+                logger.warning(f"Order book snapshot failed for {symbol}: {e}")
+                continue
+            self.store.add_snapshot(symbol, levels, ts=now)
+            stored += 1
+        self.snapshots_taken += stored
+
+        if stored and now - self._last_refit >= self.refit_seconds:
+            self.refit(symbols, now)
+        return stored
+
+    def refit(self, symbols: list[str], now: float | None = None) -> int:
+        """
+        Refit the impact curves of ``symbols`` and prune expired snapshots.
+
+        Args:
+            symbols: Pairs or base assets
+            now: Current epoch seconds (defaults to now)
+
+        Returns:
+            Number of curves stored
+        """
+        now = time.time() if now is None else now
+        fitted = 0
+        for symbol in symbols:
+            curve = fit_impact_curve(symbol, self.store.snapshots(symbol, since=now - self.window_seconds),
+                                     fitted_at=now)
+            if curve is not None:
+                self.store.put_curve(curve)
+                fitted += 1
+        self.store.prune(now - max(RETENTION_SEC, self.window_seconds))
+        self._last_refit = now
+        self.curves_fitted += fitted
+        return fitted
+
+    def stats(self) -> dict[str, Any]:
+        """Sampler diagnostics."""
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "leader": self._leader.held,
+            "interval_seconds": self.interval_seconds,
+            "refit_seconds": self.refit_seconds,
+            "snapshots_taken": self.snapshots_taken,
+            "curves_fitted": self.curves_fitted,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
@@ -10,6 +10,8 @@ import logging
 from datetime import UTC, datetime
 from typing import Any
 
+from src.data.lot_ledger import get_lot_ledger
+
 # No simulation imports - using real OKX data only
 
 
@@ -664,6 +666,11 @@ class PortfolioService:
                 try:
                     # Get recent trades from OKX with conservative limits
                     raw_trades = self.exchange.get_trades(limit=20)
+                    # New fills extend the lot ledger (already seen ones are skipped)
+                    try:
+                        get_lot_ledger().ingest(raw_trades)
+                    except Exception as e:
+                        self.logger.warning(f"Lot ledger ingest failed: {e}")
                     trade_history = []
                     for trade in raw_trades:
                         formatted_trade = {
@@ -970,6 +977,11 @@ class PortfolioService:
                 current_quantity = float(balance_info.get('free', 0.0) or 0.0)
 
                 if current_quantity > 0:
+                    # Average cost of the open lots, kept incrementally by the lot ledger
+                    position = get_lot_ledger().position(symbol, 'average')
+                    if position['quantity'] > 0 and position['avg_cost'] > 0:
+                        return current_quantity * position['avg_cost'], position['avg_cost']
+
                     # Debug: Show what trade history data looks like
                     if len(trade_history) > 0:
                         sample_trade = trade_history[0]
@@ -1270,6 +1282,9 @@ class PortfolioService:
         """
         Calculate real cost basis and average entry price from OKX trade history.
 
+        The trades are folded into the lot ledger (only fills it has not seen
+        yet are applied), and the average-cost position is read from it.
+
         Args:
             symbol: The cryptocurrency symbol (e.g., 'PEPE')
             trade_history: List of trade records from OKX
@@ -1278,53 +1293,16 @@ class PortfolioService:
             tuple: (total_cost_basis, average_entry_price)
         """
         try:
-            symbol_trades = []
-
-            # Filter trades for this symbol
-            for trade in trade_history:
-                trade_symbol = trade.get('symbol', '')
-                # Handle both 'PEPE/USDT' and 'PEPE' formats
-                if (trade_symbol == f"{symbol}/USDT" or
-                    trade_symbol == f"{symbol}-USDT" or
-                    trade_symbol.startswith(symbol)):
-                    symbol_trades.append(trade)
-
-            if not symbol_trades:
-                self.logger.warning(f"No trade history found for {symbol}")
-                return 0.0, 0.0
-
-            total_cost = 0.0
-            total_quantity = 0.0
-
-            # Calculate weighted average cost basis
-            for trade in symbol_trades:
-                side = trade.get('side', '').lower()
-                amount = float(trade.get('amount', 0) or 0)
-                price = float(trade.get('price', 0) or 0)
-                cost = float(trade.get('cost', 0) or 0)
-
-                if side == 'buy' and amount > 0 and price > 0:
-                    # Use cost if available, otherwise calculate from amount * price
-                    trade_cost = cost if cost > 0 else amount * price
-                    total_cost += trade_cost
-                    total_quantity += amount
-                    self.logger.debug(f"{symbol} BUY: {amount} @ {price} = ${trade_cost}")
-                elif side == 'sell' and amount > 0:
-                    # For sells, reduce the quantity but keep proportional cost basis
-                    if total_quantity > 0:
-                        sell_ratio = min(amount / total_quantity, 1.0)
-                        sold_cost = total_cost * sell_ratio
-                        total_cost -= sold_cost
-                        total_quantity -= amount
-                        self.logger.debug(f"{symbol} SELL: {amount} @ {price}, remaining cost: ${total_cost}")
-
-            if total_quantity > 0 and total_cost > 0:
-                avg_entry_price = total_cost / total_quantity
-                self.logger.info(f"{symbol} real cost basis: ${total_cost:.2f}, avg entry: ${avg_entry_price:.8f}")
-                return total_cost, avg_entry_price
-            else:
-                self.logger.warning(f"Unable to calculate cost basis for {symbol}: qty={total_quantity}, cost={total_cost}")
-                return 0.0, 0.0
+            ledger = get_lot_ledger()
+            ledger.ingest(trade_history)
+            position = ledger.position(symbol, 'average')
+            if position['quantity'] > 0 and position['cost_basis'] > 0:
+                self.logger.info(f"{symbol} real cost basis: ${position['cost_basis']:.2f}, "
+                                 f"avg entry: ${position['avg_cost']:.8f}")
+                return position['cost_basis'], position['avg_cost']
+            self.logger.warning(f"Unable to calculate cost basis for {symbol}: qty={position['quantity']}, "
+                                f"cost={position['cost_basis']}")
+            return 0.0, 0.0
 
         except Exception as e:
             self.logger.error(f"Error calculating cost basis for {symbol}: {e}")
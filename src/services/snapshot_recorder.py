@@ -0,0 +1,102 @@
+"""
+Snapshot Recorder - samples portfolio value at a fixed cadence.
+
+Runs in a daemon thread and writes total value, cash and per-asset value to
+``PortfolioTimeSeries``. With several gunicorn workers only one process
+records: the recorder takes a non-blocking ``flock`` on a lock file next to
+the database, and the others retry periodically in case the leader exits.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from src.data.portfolio_timeseries import PortfolioTimeSeries
+from src.utils.leader_lock import LeaderLock
+
+logger = logging.getLogger(__name__)
+
+PRUNE_INTERVAL_SEC = 3600
+
+
+class SnapshotRecorder:
+    """Background sampler feeding the portfolio time series."""
+
+    def __init__(self, fetch_portfolio: Callable[[], dict[str, Any]],
+                 timeseries: PortfolioTimeSeries, interval_seconds: float = 60.0):
+        """
+        Initialize the recorder.
+
+        Args:
+            fetch_portfolio: Callable returning PortfolioService-style portfolio data
+            timeseries: Store to write samples into
+            interval_seconds: Sampling cadence
+        """
+        self.fetch_portfolio = fetch_portfolio
+        self.timeseries = timeseries
+        self.interval_seconds = interval_seconds
+
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._leader = LeaderLock(f"{self.timeseries.db_path}.recorder.lock", self._on_leader)
+        self._last_prune = 0.0
+        self.samples_recorded = 0
+        self.last_error = ""
+
+    def start(self) -> None:
+        """Start the sampler thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampler thread."""
+        self._stop.set()
+
+    def _on_leader(self) -> None:
+        """This worker now records; the others keep retrying in case it exits."""
+        logger.info(f"📈 Snapshot recorder active in pid {os.getpid()} (every {self.interval_seconds:.0f}s)")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._leader.acquire():
+                self.sample_once()
+            self._stop.wait(self.interval_seconds)
+
+    def sample_once(self) -> bool:
+        """
+        Take and store one sample.
+
+        Returns:
+            True if a sample was written
+        """
+        try:
+            data = self.fetch_portfolio() or {}
+            holdings = data.get('holdings', []) or []
+            if not holdings and not data.get('total_current_value'):
+                return False
+            assets = {
+                h.get('symbol', ''): float(h.get('current_value', 0) or 0)
+                for h in holdings if h.get('symbol')
+            }
+            cash = float(data.get('cash_balance', 0) or 0)
+            total = float(data.get('total_current_value', 0) or 0) or (sum(assets.values()) + cash)
+            self.timeseries.record(total, cash, assets)
+            self.samples_recorded += 1
+
+            now = time.time()
+            if now - self._last_prune >= PRUNE_INTERVAL_SEC:
+                self.timeseries.prune(now)
+                self._last_prune = now
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning(f"Portfolio snapshot failed: {e}")
+            return False
@@ -3,7 +3,9 @@ Base strategy class.
 Defines the interface for trading strategies.
 """
 
+import configparser
 import logging
+import os
 from abc import ABC, abstractmethod
 
 import pandas as pd
@@ -200,7 +202,15 @@ class BaseStrategy(ABC):
         Returns:
             Dictionary of strategy parameters
         """
+        parser = getattr(self.config, 'config', None)
+        if isinstance(parser, configparser.ConfigParser):
+            settings = {section: dict(parser.items(section)) for section in parser.sections()}
+        else:
+            settings = str(self.config)
+        # Config.get lets SECTION_KEY environment variables override the file
+        overrides = {k: v for k, v in os.environ.items() if k.startswith(('STRATEGY_', 'TRADING_'))}
         return {
             'name': self.__class__.__name__,
-            'config': self.config.__dict__ if hasattr(self.config, '__dict__') else str(self.config)
+            'config': settings,
+            'env_overrides': overrides
         }
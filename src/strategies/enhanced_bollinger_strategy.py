@@ -9,7 +9,10 @@ from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 
+from ..data.market_impact import MarketImpactModel
+from ..data.resampler import get_candle_resampler, higher_timeframe
 from ..indicators.technical import TechnicalIndicators
+from ..utils.performance_metrics import TIMEFRAME_SECONDS
 from .base import BaseStrategy, Signal
 
 
@@ -51,6 +54,11 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
         # Trading costs and slippage
         self.fee = config.get_float('trading', 'fee', 0.0025)  # 0.25% fee
         self.slip = config.get_float('trading', 'slip', 0.001)  # 0.1% slippage
+        # Pair being traded, for order-book impact lookups (set by the runner or the data)
+        self.symbol: str | None = None
+        # Impact model for sizing, injected by the runner (the live trader's or the
+        # backtest engine's); None sizes against the flat price
+        self.impact: MarketImpactModel | None = None
 
         # Position tracking state
         self.position_state = {
@@ -82,9 +90,20 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
             # Fallback to traditional fixed percentage
             risk_amount = portfolio_value * (signal.size if hasattr(signal, 'size') else self.position_size_percent / 100)
 
-        position_size = risk_amount / current_price
+        # Size against the expected fill, including order-book impact where fitted
+        position_size = risk_amount / (current_price * (1 + self._impact_slippage(risk_amount, 'buy', 0.0)))
         return position_size
 
+    def _impact_slippage(self, notional: float, side: str, default: float) -> float:
+        """Order-book slippage of a market order on the traded pair (``default`` without a curve)."""
+        try:
+            if self.impact is None:
+                return default
+            return self.impact.slippage(self.symbol, notional, side, default)
+        except Exception as e:
+            self.logger.debug(f"Impact lookup failed for {self.symbol}: {e}")
+            return default
+
     def calculate_bollinger_bands(self, data: pd.DataFrame) -> dict | None:
         """Calculate Bollinger Bands for the given data."""
         if data is None or len(data) < self.bb_period:
@@ -125,6 +144,7 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
     def generate_signals(self, data: pd.DataFrame) -> list[Signal]:
         """Generate enhanced trading signals with crash protection."""
         signals = []
+        self.symbol = data.attrs.get('symbol', self.symbol)
 
         if len(data) < max(self.bb_period, self.atr_period) + 1:
             return signals
@@ -165,7 +185,7 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
                 )
 
             # 1. CRASH FAILSAFE - Check for emergency exit
-            crash_signal = self._check_crash_exit(current_price, current_low, current_atr, last_candle)
+            crash_signal = self._check_crash_exit(current_price, current_low, current_atr, last_candle, data)
             if crash_signal:
                 signals.append(crash_signal)
                 return signals  # Exit immediately after crash signal
@@ -187,7 +207,8 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
             self.logger.error(f"Error in enhanced signal generation: {e}")
             return signals
 
-    def _check_crash_exit(self, px: float, current_low: float, atr: float, last_candle: pd.Series) -> Signal | None:
+    def _check_crash_exit(self, px: float, current_low: float, atr: float, last_candle: pd.Series,
+                          data: pd.DataFrame | None = None) -> Signal | None:
         """Check for crash protection exit conditions."""
         if self.position_state['position_qty'] <= 0.0:
             return None
@@ -201,11 +222,13 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
         drop_close_pct = drop_from_peak_close / max(1e-12, peak)
         drop_low_pct = drop_from_peak_low / max(1e-12, peak)
 
-        # Fast timeframe check (simplified - would need actual fast data)
+        # Fast timeframe check: lows of the last fast_tf bars when the resampler
+        # has them for this bar, otherwise the current candle wick
         fast_trigger = False
         if self.fast_failsafe:
-            # Simplified fast check using current candle wick
-            fast_drop = peak - current_low
+            fast = self._resampled_view(data, self.fast_tf, self.fast_lookback_min) if data is not None else None
+            fast_low = float(fast['low'].min()) if fast is not None else current_low
+            fast_drop = peak - fast_low
             if fast_drop >= self.crash_atr_mult * atr:
                 fast_trigger = True
 
@@ -288,7 +311,6 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
             self.logger.debug(f"🎯 Dynamic safety threshold: {safety_take_profit_percent:.1f}% "
                             f"(BB width: {bb_width_percent:.1f}%, multiplier: {volatility_multiplier:.1f}x)")
         except Exception as e:
-        logger.error(f"Unhandled exception in {path.name}: {e}")
             safety_take_profit_percent = self.take_profit_percent * 1.5  # Fallback to static 1.5x
         safety_take = entry_price * (1 + safety_take_profit_percent / 100)
         fixed_percentage_exit = px >= safety_take
@@ -371,14 +393,20 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
     def _get_hybrid_score(self, symbol: str, current_price: float) -> float:
         """Get hybrid score from ML enhanced confidence analyzer."""
         try:
-            from src.utils.ml_enhanced_confidence import MLEnhancedConfidenceAnalyzer
-            analyzer = MLEnhancedConfidenceAnalyzer()
+            from src.utils.ml_enhanced_confidence import get_ml_confidence_analyzer
+            analyzer = get_ml_confidence_analyzer()
             result = analyzer.calculate_enhanced_confidence(symbol, current_price)
             hybrid_score = result.get('hybrid_score', 0.0)
+            # Entry-time scores, reported back to the dynamic weighting when the trade closes
+            self._current_entry_scores = {
+                'ml_probability': result.get('ml_probability'),
+                'ta_score': result.get('ml_integration', {}).get('traditional_score'),
+            }
             self.logger.debug(f"🎯 Retrieved Hybrid Score for {symbol}: {hybrid_score:.1f}%")
             return float(hybrid_score)
         except Exception as e:
             self.logger.warning(f"Failed to get hybrid score for {symbol}: {e}")
+            self._current_entry_scores = {}
             return 0.0
 
     def _check_entry_opportunities(self, px: float, bb_up: float, bb_lo: float, atr: float, data: pd.DataFrame) -> Signal | None:
@@ -455,6 +483,7 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
             signal.metadata['confirmations'] = total_confirmations
             signal.metadata['confirmed_filters'] = confirmed_filters
             signal.metadata['hybrid_score'] = hybrid_score
+            signal.metadata.update(getattr(self, '_current_entry_scores', {}))
 
             return signal
         else:
@@ -511,11 +540,15 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
     def _check_higher_timeframe_support(self, data: pd.DataFrame) -> bool:
         """Check if higher timeframe shows support for the trade."""
         try:
-            if len(data) < 100:
-                return True  # Not enough data, don't penalize
+            # Real higher-timeframe bars when resampled live, else the trend of the same bars
+            frame = self._resampled_view(data, higher_timeframe(data.attrs.get('timeframe', '')), 100)
+            if frame is None or len(frame) < 60:
+                if len(data) < 100:
+                    return True  # Not enough data, don't penalize
+                frame = data
 
             # Analyze longer-term trend using 50-period SMA
-            sma_50 = data['close'].rolling(window=50).mean()
+            sma_50 = frame['close'].rolling(window=50).mean()
             current_price = data['close'].iloc[-1]
             sma_50_current = sma_50.iloc[-1]
 
@@ -537,6 +570,31 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
             self.logger.debug(f"Higher timeframe analysis error: {e}")
             return True
 
+    def _resampled_view(self, data: pd.DataFrame, timeframe: str | None, limit: int) -> pd.DataFrame | None:
+        """
+        Bars of another timeframe for the symbol of ``data`` from the live resampler.
+
+        Only frames read through a resampling ``DataManager`` carry the symbol
+        and exchange, and the view is used only if its last bar overlaps the last bar of
+        ``data``, so backtests never see live bars.
+        """
+        symbol = data.attrs.get('symbol')
+        base_seconds = TIMEFRAME_SECONDS.get(data.attrs.get('timeframe', ''))
+        if not symbol or not timeframe or base_seconds is None or timeframe not in TIMEFRAME_SECONDS:
+            return None
+        try:
+            resampler = get_candle_resampler(data.attrs.get('exchange', 'default'))
+            view = resampler.get(symbol, timeframe, limit)
+        except Exception as e:
+            self.logger.debug(f"Resampled {timeframe} view unavailable: {e}")
+            return None
+        if view.empty:
+            return None
+        view_start, data_start = view.index[-1], data.index[-1]
+        overlap_end = min(view_start + pd.Timedelta(seconds=TIMEFRAME_SECONDS[timeframe]),
+                          data_start + pd.Timedelta(seconds=base_seconds))
+        return view if max(view_start, data_start) < overlap_end else None
+
     def _check_support_level(self, data: pd.DataFrame, current_price: float) -> bool:
         """Check if current price is near a significant support level."""
         try:
@@ -709,8 +767,8 @@ class EnhancedBollingerBandsStrategy(BaseStrategy):
 
         qty = max(0.0, dollars / risk_per_unit)
 
-        # Use real OKX market price with realistic spread
-        fill_price = px * (1 + 0.001)  # Current OKX market price with spread
+        # Current OKX market price plus spread and depth for this size
+        fill_price = px * (1 + self._impact_slippage(qty * px, 'buy', 0.001))
 
         # Update position state
         self.position_state['position_qty'] = qty
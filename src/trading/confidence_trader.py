@@ -11,6 +11,8 @@ from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from ..config import Config
+from ..data.confidence_store import get_confidence_store
+from ..services.confidence_scheduler import TRACKED_ASSETS
 from ..services.portfolio_service import get_portfolio_service
 from ..utils.entry_confidence import get_confidence_analyzer
 from ..utils.okx_native import OKXNative
@@ -37,6 +39,9 @@ class ConfidenceBasedTrader:
         self.purchase_cooldown_minutes = 30
         self.last_purchase_times: dict[str, datetime] = {}
 
+        # Precomputed scores older than this are not traded on
+        self.max_score_age = 600.0
+
         self.logger.info("Confidence-based trader initialized with $%.2f purchase limit", self.max_purchase_amount)
 
     def scan_for_confidence_opportunities(self) -> list[dict[str, Any]]:
@@ -64,16 +69,11 @@ class ConfidenceBasedTrader:
                 self.logger.error("Error fetching balance data: %s", e)
                 return []
 
-            # Comprehensive list of major cryptocurrencies (same as available-positions endpoint)
-            major_crypto_assets = [
-                'BTC', 'ETH', 'SOL', 'ADA', 'AVAX', 'LINK', 'UNI', 'LTC', 'XRP',
-                'DOGE', 'MATIC', 'ATOM', 'DOT', 'NEAR', 'SHIB', 'BNB', 'BCH',
-                'XLM', 'ALGO', 'ICP', 'SAND', 'MANA', 'CRO', 'APE', 'AXS',
-                'CHZ', 'THETA', 'GRT', 'COMP', 'MKR', 'YFI', 'SUSHI', 'AAVE',
-                'CRV', 'TON', 'FIL', 'OP', 'ARB', 'LDO', 'FET', 'INJ'
-            ]
+            # Same universe the confidence scheduler keeps fresh
+            major_crypto_assets = TRACKED_ASSETS
 
             opportunities = []
+            candidate_prices: dict[str, float] = {}
 
             for symbol in major_crypto_assets:
                 try:
@@ -102,32 +102,40 @@ class ConfidenceBasedTrader:
                     if not current_price or current_price <= 0:
                         continue
 
-                    # Calculate confidence score
-                    confidence_data = self.confidence_analyzer.calculate_confidence(symbol, current_price)
-                    confidence_score = confidence_data['confidence_score']
-                    timing_signal = confidence_data['timing_signal']
-
-                    # Check if confidence meets our criteria
-                    if timing_signal in ['CAUTIOUS_BUY', 'STRONG_BUY', 'BUY']:
-                        opportunity = {
-                            'symbol': symbol,
-                            'current_price': current_price,
-                            'confidence_score': confidence_score,
-                            'timing_signal': timing_signal,
-                            'confidence_data': confidence_data,
-                            'recommended_amount': self._calculate_purchase_amount(confidence_score, timing_signal)
-                        }
-                        opportunities.append(opportunity)
-
-                        self.logger.info(
-                            "🎯 CONFIDENCE OPPORTUNITY: %s at $%.4f - %s (Score: %.1f)",
-                            symbol, current_price, timing_signal, confidence_score
-                        )
+                    candidate_prices[symbol] = current_price
 
                 except Exception as asset_error:
                     self.logger.debug("Error analyzing %s: %s", symbol, asset_error)
                     continue
 
+            # Scores are precomputed by the confidence scheduler; stale ones are skipped
+            confidence_results = get_confidence_store().get_many(list(candidate_prices), max_age=self.max_score_age)
+
+            for symbol, current_price in candidate_prices.items():
+                confidence_data = confidence_results.get(symbol)
+                if not confidence_data:
+                    self.logger.debug("No fresh precomputed confidence for %s", symbol)
+                    continue
+                confidence_score = confidence_data['confidence_score']
+                timing_signal = confidence_data['timing_signal']
+
+                # Check if confidence meets our criteria
+                if timing_signal in ['CAUTIOUS_BUY', 'STRONG_BUY', 'BUY']:
+                    opportunity = {
+                        'symbol': symbol,
+                        'current_price': current_price,
+                        'confidence_score': confidence_score,
+                        'timing_signal': timing_signal,
+                        'confidence_data': confidence_data,
+                        'recommended_amount': self._calculate_purchase_amount(confidence_score, timing_signal)
+                    }
+                    opportunities.append(opportunity)
+
+                    self.logger.info(
+                        "🎯 CONFIDENCE OPPORTUNITY: %s at $%.4f - %s (Score: %.1f)",
+                        symbol, current_price, timing_signal, confidence_score
+                    )
+
             return opportunities
 
         except Exception as e:
@@ -15,6 +15,8 @@ import pandas as pd
 
 from ..config import Config
 from ..data.manager import DataManager
+from ..data.market_impact import get_market_impact_model
+from ..data.resampler import get_candle_resampler
 from ..exchanges.base import BaseExchange
 from ..risk.manager import RiskManager
 from ..strategies.enhanced_bollinger_strategy import EnhancedBollingerBandsStrategy
@@ -42,11 +44,15 @@ class EnhancedTrader:
         self.exchange = exchange
         self.logger = logging.getLogger(__name__)
 
-        self.data_manager = DataManager(exchange, cache_enabled=True)
+        resampler = (get_candle_resampler(type(exchange).__name__)
+                     if config.get_bool('data', 'resample_from_1m', True) else None)
+        self.data_manager = DataManager(exchange, cache_enabled=True, resampler=resampler)
         self.risk_manager = RiskManager(config)
 
         # Always use Enhanced Bollinger Bands Strategy
         self.strategy = EnhancedBollingerBandsStrategy(config)
+        # Live entries are sized against the sampled order-book curves
+        self.strategy.impact = get_market_impact_model()
         self.logger.info("Using Enhanced Bollinger Bands Strategy with crash protection")
 
         self.running: bool = False
@@ -67,6 +73,8 @@ class EnhancedTrader:
             }
         )
         self.last_update_time: datetime | None = None
+        # (ml_probability, ta_score) at entry per symbol, for the dynamic weighting
+        self._entry_scores: dict[str, tuple[float, float]] = {}
 
     def _sync_with_portfolio(self, symbol: str) -> None:
         """Sync trader position state with actual OKX portfolio holdings."""
@@ -121,7 +129,7 @@ class EnhancedTrader:
 
                             dynamic_safety_threshold = 4.0 * volatility_multiplier  # Base 4%, adjust for volatility
                         except Exception as e:
-        logger.error(f"Unhandled exception in {path.name}: {e}")
+                            self.logger.debug(f"Volatility multiplier unavailable: {e}")
                             dynamic_safety_threshold = 6.0  # Fallback to conservative 6%
 
                         if gain_percent >= dynamic_safety_threshold:  # Dynamic safety net
@@ -185,7 +193,6 @@ class EnhancedTrader:
                                     self.logger.warning(f"🔄 RETRY ATTEMPT {retry_count}/{max_retries}: {base_symbol} exit verification")
 
                                     try:
-                                        import time
                                         time.sleep(2)  # Wait before retry
 
                                         retry_success = self._execute_verified_exit(safety_signal, symbol, base_symbol, current_price, datetime.now(), quantity, gain_percent)
@@ -223,6 +230,7 @@ class EnhancedTrader:
 
     def start_trading(self, symbol: str, timeframe: str = '1h') -> None:
         self.logger.info("Starting enhanced trading: %s on %s", symbol, timeframe)
+        self.strategy.symbol = symbol
         try:
             if not self.exchange.connect():
                 raise RuntimeError("Failed to connect to exchange")
@@ -473,6 +481,8 @@ class EnhancedTrader:
                             'equity_after': self.equity,
                         }
                         self.trade_history.append(record)
+                        if metadata.get('ml_probability') is not None and metadata.get('ta_score') is not None:
+                            self._entry_scores[symbol] = (float(metadata['ml_probability']), float(metadata['ta_score']))
                         self.logger.critical(
                             "✅ BUY VERIFIED: [%s] %.6f %s @ $%.2f (Conf: %.2f, Equity: $%.2f)",
                             event_type, position_size_units, symbol, current_price, confidence, self.equity
@@ -525,6 +535,7 @@ class EnhancedTrader:
                         'equity_after': self.equity,
                     }
                     self.trade_history.append(record2)
+                    self._record_closed_trade(symbol, pnl_val)
                     self.logger.info(
                         "[%s] SELL %.6f %s @ $%.2f (PnL: $%.2f, Equity: $%.2f)",
                         event_type, position_size_units, symbol, current_price, pnl_val, self.equity
@@ -533,6 +544,17 @@ class EnhancedTrader:
         except Exception as e:
             self.logger.exception("Failed to execute enhanced signal: %s", e)
 
+    def _record_closed_trade(self, symbol: str, pnl: float) -> None:
+        """Feed a closed trade's entry scores and realized PnL to the dynamic weighting."""
+        scores = self._entry_scores.pop(symbol, None)
+        if scores is None:
+            return
+        try:
+            from ..utils.dynamic_weighting import get_dynamic_weighting
+            get_dynamic_weighting().record_trade(scores[0], scores[1], pnl, symbol=symbol)
+        except Exception as e:
+            self.logger.debug(f"Dynamic weighting update skipped for {symbol}: {e}")
+
     def _execute_verified_exit(self, signal: Any, symbol: str, base_symbol: str, current_price: float, timestamp: datetime, quantity: float, gain_percent: float) -> bool:
         """Execute exit order with proper verification to prevent phantom positions."""
         try:
@@ -569,7 +591,6 @@ class EnhancedTrader:
             self.logger.info(f"📊 PRE-EXIT POSITION: {base_symbol} holds {current_qty:.6f} units at ${position_before.get('current_price', 0.0):.4f}")
 
             # 🚀 LIVE TRADING MODE: Execute actual OKX order placement
-            import time
 
             self.logger.info(f"🎯 EXECUTING LIVE EXIT ORDER: {base_symbol} sell {current_qty:.6f} @ ${current_price:.4f}")
 
@@ -669,6 +690,7 @@ class EnhancedTrader:
                 'equity_after': self.equity,
             }
             self.trade_history.append(record)
+            self._record_closed_trade(symbol, pnl_val)
 
             return True
 
@@ -718,7 +740,6 @@ class EnhancedTrader:
             self.logger.info(f"📊 PRE-PURCHASE STATE: {base_symbol} qty={current_qty_before:.6f}, USDT=${usdt_balance:.2f}")
 
             # 🚀 LIVE TRADING MODE: Execute actual OKX order placement
-            import time
 
             self.logger.info(f"🎯 EXECUTING LIVE BUY ORDER: {base_symbol} buy {quantity:.6f} @ ${current_price:.4f} (${cost_dollars:.2f})")
 
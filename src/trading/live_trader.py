@@ -17,9 +17,11 @@ from typing import Any, TypedDict
 import pandas as pd
 
 from ..data.manager import DataManager
+from ..data.resampler import get_candle_resampler
 from ..exchanges.kraken_adapter import KrakenAdapter
 from ..risk.manager import RiskManager
 from ..strategies.base import BaseStrategy
+from ..utils.performance_metrics import StreamingMetrics
 
 
 class TradeRecord(TypedDict, total=False):
@@ -53,7 +55,9 @@ class LiveTrader:
         # Initialize exchange and data manager
         exchange_config = config.get_exchange_config('kraken')
         self.exchange = KrakenAdapter(exchange_config)
-        self.data_manager = DataManager(self.exchange, cache_enabled=True)
+        resampler = (get_candle_resampler(type(self.exchange).__name__)
+                     if config.get_bool('data', 'resample_from_1m', True) else None)
+        self.data_manager = DataManager(self.exchange, cache_enabled=True, resampler=resampler)
 
         # Initialize risk manager
         self.risk_manager = RiskManager(config)
@@ -62,6 +66,8 @@ class LiveTrader:
         self.orders: list[dict[str, Any]] = []
         self.trade_history: list[TradeRecord] = []
         self.running = False
+        # Equity metrics, updated once per loop iteration
+        self.performance = StreamingMetrics()
 
         # Safety checks
         self.max_daily_trades = 50
@@ -170,6 +176,8 @@ class LiveTrader:
 
                     # Check risk limits
                     portfolio_value = self._get_portfolio_value()
+                    if portfolio_value > 0:
+                        self.performance.update(portfolio_value, time.time())
 
                     # Get USDT balance for risk check
                     try:
@@ -0,0 +1,260 @@
+"""
+Admission control and load shedding for API routes.
+
+Three pieces work together:
+
+* ``SharedWindowCounter`` - fixed-memory sliding-window rate counters kept in
+  an anonymous shared mmap, so gunicorn workers forked from a preloaded app
+  enforce one budget instead of one per worker. Each slot stores a key
+  fingerprint plus the current and previous window counts; the sliding
+  estimate is ``prev * (1 - elapsed) + cur``.
+* ``PrioritySemaphore`` - outbound (OKX) call slots where priority callers
+  (bot control/orders) are always served before queued dashboard polls.
+* ``AdmissionController`` - per-lane concurrency caps. When the OKX lane is
+  full or the outbound queue is deep, requests are rejected immediately
+  (503 or last-good "stale" data) instead of holding a worker thread for the
+  15-second throttle wait.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import multiprocessing
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+LANE_PRIORITY = "priority"
+LANE_OKX = "okx"
+LANE_DEFAULT = "default"
+
+# fingerprint, window index, current count, previous count
+_SLOT = struct.Struct("=qqqq")
+
+
+class SharedWindowCounter:
+    """Fixed-memory sliding-window counters shared across forked workers."""
+
+    def __init__(self, slots: int = 4096):
+        """
+        Initialize the counter table.
+
+        Args:
+            slots: Number of hash slots (memory is ``slots * 32`` bytes)
+        """
+        self.slots = slots
+        # Anonymous MAP_SHARED mapping survives fork(); created before workers spawn
+        self._mem = mmap.mmap(-1, slots * _SLOT.size)
+        self._lock = multiprocessing.Lock()
+
+    @staticmethod
+    def _fingerprint(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little", signed=True) or 1
+
+    def hit(self, key: str, limit: int, window_seconds: float, now: float | None = None) -> tuple[bool, float]:
+        """
+        Record a hit for ``key`` if it is within budget.
+
+        Args:
+            key: Rate-limit key (e.g. ``ip|path``)
+            limit: Maximum hits per window
+            window_seconds: Window length
+            now: Current time (for tests)
+
+        Returns:
+            Tuple of (allowed, estimated hits in the sliding window)
+        """
+        now = time.time() if now is None else now
+        fp = self._fingerprint(f"{key}|{window_seconds}")
+        offset = (fp % self.slots) * _SLOT.size
+        window = int(now // window_seconds)
+        elapsed = (now % window_seconds) / window_seconds
+
+        with self._lock:
+            slot_fp, slot_window, cur, prev = _SLOT.unpack_from(self._mem, offset)
+            if slot_fp != fp:
+                # Empty slot or collision: the newer key takes the slot over
+                slot_window, cur, prev = window, 0, 0
+            elif window != slot_window:
+                prev = cur if window == slot_window + 1 else 0
+                cur = 0
+            estimate = prev * (1.0 - elapsed) + cur
+            allowed = estimate < limit
+            if allowed:
+                cur += 1
+            _SLOT.pack_into(self._mem, offset, fp, window, cur, prev)
+        return allowed, estimate
+
+
+class PrioritySemaphore:
+    """Counting semaphore that serves priority waiters before normal ones."""
+
+    def __init__(self, value: int):
+        self._cond = threading.Condition(threading.Lock())
+        self._value = value
+        self._waiting = 0
+        self._waiting_priority = 0
+
+    def acquire(self, timeout: float | None = None, priority: bool = False) -> bool:
+        """
+        Acquire a slot.
+
+        Args:
+            timeout: Seconds to wait (None waits forever)
+            priority: Jump ahead of non-priority waiters
+
+        Returns:
+            True if a slot was acquired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if priority:
+                self._waiting_priority += 1
+            else:
+                self._waiting += 1
+            try:
+                while self._value <= 0 or (not priority and self._waiting_priority > 0):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self._value -= 1
+                return True
+            finally:
+                if priority:
+                    self._waiting_priority -= 1
+                else:
+                    self._waiting -= 1
+
+    def release(self) -> None:
+        """Release a slot."""
+        with self._cond:
+            self._value += 1
+            self._cond.notify_all()
+
+    def queue_depth(self) -> int:
+        """Number of callers currently waiting for a slot."""
+        with self._cond:
+            return self._waiting + self._waiting_priority
+
+
+@dataclass
+class Decision:
+    """Outcome of an admission check."""
+
+    admitted: bool
+    lane: str
+    reason: str = ""
+    retry_after: int = 1
+
+
+class AdmissionController:
+    """Per-lane concurrency caps, rate budgets and a last-good response cache."""
+
+    def __init__(self, lane_limits: dict[str, int], outbound: PrioritySemaphore | None = None,
+                 shed_queue_depth: int = 4, counter: SharedWindowCounter | None = None,
+                 stale_max_entries: int = 100):
+        """
+        Initialize the controller.
+
+        Args:
+            lane_limits: Max in-flight requests per lane per worker (priority is uncapped)
+            outbound: Outbound call semaphore whose queue depth triggers shedding
+            shed_queue_depth: Outbound waiters at which OKX-lane requests are shed
+            counter: Shared rate counter
+            stale_max_entries: Max cached last-good responses
+        """
+        self.lane_limits = dict(lane_limits)
+        self.outbound = outbound
+        self.shed_queue_depth = shed_queue_depth
+        self.counter = counter or SharedWindowCounter()
+
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, int] = {}
+        self._stats: dict[str, int] = {"admitted": 0, "shed": 0, "rate_limited": 0}
+        self._stale: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._stale_max = stale_max_entries
+        self._local = threading.local()
+
+    # ---- lane bookkeeping ----
+
+    def current_lane(self) -> str | None:
+        """Lane of the request being handled by this thread, if any."""
+        return getattr(self._local, "lane", None)
+
+    def admit(self, lane: str) -> Decision:
+        """
+        Try to admit a request into ``lane``; call ``release`` when done.
+
+        Args:
+            lane: Lane name
+
+        Returns:
+            Admission decision
+        """
+        with self._lock:
+            if lane == LANE_OKX and self.outbound is not None:
+                depth = self.outbound.queue_depth()
+                if depth >= self.shed_queue_depth:
+                    self._stats["shed"] += 1
+                    return Decision(False, lane, f"okx_queue_depth={depth}", retry_after=5)
+            limit = self.lane_limits.get(lane)
+            in_flight = self._in_flight.get(lane, 0)
+            if limit is not None and lane != LANE_PRIORITY and in_flight >= limit:
+                self._stats["shed"] += 1
+                return Decision(False, lane, f"{lane}_in_flight={in_flight}", retry_after=2)
+            self._in_flight[lane] = in_flight + 1
+            self._stats["admitted"] += 1
+        self._local.lane = lane
+        return Decision(True, lane)
+
+    def release(self, lane: str) -> None:
+        """Release an admitted request's lane slot."""
+        with self._lock:
+            self._in_flight[lane] = max(0, self._in_flight.get(lane, 0) - 1)
+        self._local.lane = None
+
+    def check_rate(self, key: str, limit: int, window_seconds: float) -> bool:
+        """Record a hit against a shared sliding-window budget."""
+        allowed, _ = self.counter.hit(key, limit, window_seconds)
+        if not allowed:
+            with self._lock:
+                self._stats["rate_limited"] += 1
+        return allowed
+
+    # ---- stale data ----
+
+    def remember(self, key: str, body: bytes) -> None:
+        """Keep the last good response body for ``key``."""
+        with self._lock:
+            self._stale[key] = (time.time(), body)
+            self._stale.move_to_end(key)
+            while len(self._stale) > self._stale_max:
+                self._stale.popitem(last=False)
+
+    def stale(self, key: str, max_age: float) -> tuple[float, bytes] | None:
+        """Return ``(age_seconds, body)`` for a remembered response if recent enough."""
+        with self._lock:
+            entry = self._stale.get(key)
+        if entry is None:
+            return None
+        age = time.time() - entry[0]
+        return (age, entry[1]) if age <= max_age else None
+
+    def stats(self) -> dict[str, Any]:
+        """Admission diagnostics for status endpoints."""
+        with self._lock:
+            return {
+                **self._stats,
+                "in_flight": dict(self._in_flight),
+                "lane_limits": dict(self.lane_limits),
+                "outbound_queue_depth": self.outbound.queue_depth() if self.outbound else 0,
+                "stale_entries": len(self._stale),
+            }
@@ -3,9 +3,12 @@ Bot pricing formulas from bot.py for accurate buy/sell calculations.
 Implements the exact risk-based position sizing used in the bot.
 """
 
+import logging
 from dataclasses import dataclass
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class BotParams:
@@ -45,23 +48,37 @@ class BotPricingCalculator:
 
         return raw_qty, dollars
 
-    def calculate_entry_price(self, market_price: float, side: str = 'buy') -> float:
+    def calculate_entry_price(self, market_price: float, side: str = 'buy', symbol: str | None = None,
+                              notional: float | None = None) -> float:
         """
         Calculate entry price with slippage (bot.py: fill_px = nxt_open*(1 + P.slip))
 
+        With a symbol and order size the slippage comes from the asset's fitted
+        order-book impact curve; otherwise the flat ``slippage_pct`` applies.
+
         Args:
             market_price: Current market price
             side: 'buy' or 'sell'
+            symbol: Traded pair or base asset (e.g. 'PEPE')
+            notional: Order size in quote currency
 
         Returns:
             Entry price with slippage applied
         """
+        slippage = self.params.slippage_pct
+        if symbol and notional:
+            try:
+                from ..data.market_impact import get_market_impact_model
+                slippage = get_market_impact_model().slippage(symbol, notional, side, slippage)
+            except Exception as e:
+                logger.debug(f"Impact lookup failed for {symbol}: {e}")
+
         if side.lower() == 'buy':
             # Buy higher due to slippage
-            return market_price * (1 + self.params.slippage_pct)
+            return market_price * (1 + slippage)
         else:
             # Sell lower due to slippage
-            return market_price * (1 - self.params.slippage_pct)
+            return market_price * (1 - slippage)
 
     def calculate_stop_take_prices(self, entry_price: float, side: str = 'buy') -> tuple[float, float]:
         """
@@ -154,7 +171,8 @@ class BotPricingCalculator:
                               equity: float,
                               lower_band: float,
                               upper_band: float,
-                              current_position: float = 0.0) -> dict[str, Any]:
+                              current_position: float = 0.0,
+                              symbol: str | None = None) -> dict[str, Any]:
         """
         Apply complete bot.py sizing logic for buy/sell decisions.
 
@@ -164,6 +182,7 @@ class BotPricingCalculator:
             lower_band: Lower Bollinger Band
             upper_band: Upper Bollinger Band
             current_position: Current position quantity
+            symbol: Traded pair, for order-book slippage
 
         Returns:
             Dictionary with trade recommendation
@@ -182,7 +201,7 @@ class BotPricingCalculator:
         if current_position == 0.0 and current_price <= lower_band:
             # Calculate position using bot formulas
             quantity, risk_amount = self.calculate_position_size(current_price, equity)
-            entry_price = self.calculate_entry_price(current_price, 'buy')
+            entry_price = self.calculate_entry_price(current_price, 'buy', symbol, quantity * current_price)
             stop_loss, take_profit = self.calculate_stop_take_prices(entry_price, 'buy')
 
             result.update({
@@ -204,7 +223,7 @@ class BotPricingCalculator:
             hit_take = current_price >= take_profit or current_price >= upper_band
 
             if hit_stop or hit_take:
-                exit_price = self.calculate_entry_price(current_price, 'sell')
+                exit_price = self.calculate_entry_price(current_price, 'sell', symbol, current_position * current_price)
                 result.update({
                     'action': 'sell',
                     'quantity': current_position,
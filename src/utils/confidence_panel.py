@@ -0,0 +1,201 @@
+"""
+Panel-vectorized entry confidence scoring.
+
+Computes every ``EntryConfidenceAnalyzer`` sub-score, the six enhanced
+filters, the timing signal inputs and the intelligent target price for a
+whole symbols x bars panel with 2-D NumPy operations. Shared indicators
+(RSI-14, SMA-10/20/30/50, Bollinger bands, window lows) are computed once per
+panel instead of once per sub-score per symbol, so scoring 60 symbols costs
+about the same as scoring one.
+
+Semantics match the per-symbol methods exactly; ``EntryConfidenceAnalyzer.
+calculate_confidence_batch`` assembles the usual result dicts from the arrays
+returned here.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Composite weights (same as EntryConfidenceAnalyzer.calculate_confidence)
+WEIGHTS = {
+    'technical': 0.30,
+    'volatility': 0.25,
+    'momentum': 0.20,
+    'volume': 0.15,
+    'support_resistance': 0.10,
+}
+
+
+def _rsi_last(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """Simple-average RSI of the last ``period`` deltas per row."""
+    deltas = np.diff(prices[:, -(period + 1):], axis=1)
+    avg_gain = np.where(deltas > 0, deltas, 0.0).mean(axis=1)
+    avg_loss = np.where(deltas < 0, -deltas, 0.0).mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, 100.0, rsi)
+
+
+def _support_proximity(lows: np.ndarray, current: np.ndarray, window: int = 5,
+                       tolerance: float = 0.02) -> np.ndarray:
+    """Swing-low support check over the last 50 bars (see ``_check_support_proximity``)."""
+    lows = lows[:, -50:]
+    if lows.shape[1] < 2 * window + 1:
+        return np.ones(lows.shape[0], dtype=bool)
+    windows = sliding_window_view(lows, 2 * window + 1, axis=1)
+    centers = lows[:, window:lows.shape[1] - window]
+    is_swing_low = centers == windows.min(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        near = np.abs(current[:, None] - centers) / centers <= tolerance
+    has_support = is_swing_low.any(axis=1)
+    return ~has_support | (is_swing_low & near).any(axis=1)
+
+
+def score_panel(prices: np.ndarray, volumes: np.ndarray, current_prices: np.ndarray,
+                lows: np.ndarray | None = None) -> dict[str, Any]:
+    """
+    Score a symbols x bars panel.
+
+    Args:
+        prices: Close prices, shape (S, T) with T >= 20
+        volumes: Volumes, shape (S, T)
+        current_prices: Current prices, shape (S,)
+        lows: Optional bar lows for support detection, shape (S, T)
+
+    Returns:
+        Dict of per-symbol arrays: sub-scores, composite, filter values and
+        pass flags, bollinger buy-zone flag and target price
+    """
+    prices = np.asarray(prices, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    cur = np.asarray(current_prices, dtype=float)
+    n_sym, n_bars = prices.shape
+    last = prices[:, -1]
+    out: dict[str, Any] = {'n_bars': n_bars}
+
+    # ---- shared indicators ----
+    rsi = _rsi_last(prices, 14)
+    sma10 = prices[:, -10:].mean(axis=1)
+    sma20 = prices[:, -20:].mean(axis=1)
+    std20_pop = prices[:, -20:].std(axis=1)
+    std20 = prices[:, -20:].std(axis=1, ddof=1)
+    bb_lower = sma20 - 2 * std20
+
+    vol_avg20 = volumes[:, -20:].mean(axis=1)
+    vol_cur = volumes[:, -1]
+
+    # ---- six enhanced filters ----
+    checks: dict[str, np.ndarray] = {}
+    checks['rsi'] = rsi < 45.0
+    checks['volume'] = vol_cur >= vol_avg20 * 1.2
+    out['rsi'] = rsi
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['volume_multiplier'] = np.where(vol_avg20 > 0, vol_cur / vol_avg20, 0.0)
+
+    if n_bars >= 100:
+        sma50_now = prices[:, -50:].mean(axis=1)
+        sma50_prev = prices[:, -59:-9].mean(axis=1)
+        sma_distance = (last - sma50_now) / sma50_now * 100
+        sma_slope = (sma50_now - sma50_prev) / sma50_prev * 100
+        checks['higher_tf'] = (sma_distance > -10.0) & (sma_slope > -2.0)
+        out['sma_distance'], out['sma_slope'] = sma_distance, sma_slope
+
+    if n_bars >= 50:
+        checks['support'] = _support_proximity(prices if lows is None else lows, cur)
+
+    if n_bars >= 30:
+        sma30 = prices[:, -30:].mean(axis=1)
+        change_10d = (last - prices[:, -10]) / prices[:, -10] * 100
+        checks['regime'] = (((last > sma10 * 0.95) | (sma10 > sma30 * 0.98))
+                            & (change_10d > -15.0))
+        out['price_vs_sma10'] = (last / sma10 - 1) * 100
+        out['price_change_10d'] = change_10d
+
+    checks['bollinger'] = cur <= bb_lower
+    out['bb_lower'] = bb_lower
+    out['checks'] = checks
+
+    confirmations = np.sum(np.stack(list(checks.values())), axis=0)
+    technical = np.where(
+        confirmations >= 3,
+        np.minimum(95.0, 70.0 + (confirmations - 3) * 6.0),
+        np.maximum(20.0, 60.0 - (3 - confirmations) * 10.0),
+    )
+
+    # ---- volatility ----
+    returns = np.diff(np.log(prices), axis=1)
+    volatility = returns.std(axis=1) * np.sqrt(14) * 100
+    volatility_score = np.select([volatility < 5, volatility < 15, volatility < 25],
+                                 [85.0, 70.0, 50.0], 25.0)
+
+    # ---- momentum ----
+    avg3 = prices[:, -3:].mean(axis=1)
+    avg7 = prices[:, -7:].mean(axis=1)
+    avg14 = prices[:, -14:].mean(axis=1)
+    short_momentum = (avg3 - avg7) / avg7 * 100
+    medium_momentum = (cur - avg14) / avg14 * 100
+    momentum = (50.0
+                + np.select([short_momentum > 2, short_momentum > 0, short_momentum < -2],
+                            [20.0, 10.0, -15.0], 0.0)
+                + np.select([medium_momentum > 5, medium_momentum > 0, medium_momentum < -5],
+                            [15.0, 5.0, -10.0], 0.0))
+    momentum_score = np.clip(momentum, 0, 100)
+
+    # ---- volume ----
+    recent_volume = volumes[:, -3:].mean(axis=1)
+    base_volume = volumes[:, :-3].mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = recent_volume / base_volume
+    volume_score = np.where(
+        base_volume > 0,
+        np.select([volume_ratio > 1.5, volume_ratio > 1.2, volume_ratio > 0.8], [80.0, 70.0, 60.0], 40.0),
+        50.0,
+    )
+
+    # ---- support / resistance ----
+    low10 = prices[:, -10:].min(axis=1)
+    support_distance = (cur - low10) / low10 * 100
+    sr_score = np.select([support_distance < 2, support_distance < 5, support_distance < 10],
+                         [85.0, 75.0, 60.0], 45.0)
+
+    composite = (technical * WEIGHTS['technical'] + volatility_score * WEIGHTS['volatility']
+                 + momentum_score * WEIGHTS['momentum'] + volume_score * WEIGHTS['volume']
+                 + sr_score * WEIGHTS['support_resistance'])
+
+    # ---- intelligent target price ----
+    with np.errstate(divide='ignore', invalid='ignore'):
+        target_momentum = np.where(avg14 > 0, (avg7 - avg14) / avg14 * 100, 0.0)
+    multiplier = np.select(
+        [
+            (composite >= 85) & (target_momentum > 3) & (rsi < 60),
+            (composite >= 85) & (target_momentum > 0),
+            composite >= 85,
+            (composite >= 70) & (target_momentum > 2),
+            (composite >= 70) & (target_momentum > -2),
+            composite >= 70,
+            (composite >= 60) & (target_momentum > 1),
+            composite >= 60,
+        ],
+        [1.01, 1.00, 0.995, 1.00, 0.99, 0.98, 0.995, 0.975],
+        0.95,
+    )
+    support_level = prices[:, -30:].min(axis=1) if n_bars >= 30 else cur * 0.90
+    min_target = np.maximum(support_level * 0.95, cur * 0.85)
+    target = np.maximum(min_target, np.minimum(cur * 1.02, cur * multiplier))
+
+    out.update({
+        'technical': technical,
+        'volatility': volatility_score,
+        'momentum': momentum_score,
+        'volume': volume_score,
+        'support_resistance': sr_score,
+        'composite': composite,
+        'confirmations': confirmations,
+        'bollinger_zone': cur <= (sma20 - 2 * std20_pop) * 1.01,
+        'target_price': np.round(target, 8),
+    })
+    return out
@@ -404,39 +404,26 @@ class DatabaseManager:
             self.logger.error(f"Error getting portfolio history: {e!s}")
             return pd.DataFrame()
 
-    def save_signal(self, signal_data: dict) -> int:
+    def save_signal(self, signal_data: dict) -> None:
         """
-        Save trading signal to database.
+        Save trading signal to the signal journal.
+
+        Signals are batched into the columnar journal; the legacy ``signals``
+        table is no longer written once per signal.
 
         Args:
             signal_data: Signal data dictionary
-
-        Returns:
-            Signal ID
         """
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-
-                cursor.execute('''
-                    INSERT INTO signals
-                    (timestamp, symbol, action, price, confidence, strategy, executed, mode)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    signal_data.get('timestamp', datetime.now()),
-                    signal_data['symbol'],
-                    signal_data['action'],
-                    signal_data['price'],
-                    signal_data['confidence'],
-                    signal_data.get('strategy'),
-                    signal_data.get('executed', False),
-                    signal_data.get('mode', 'paper')
-                ))
-
-                signal_id = cursor.lastrowid
-                conn.commit()
-
-                return signal_id
+            from src.data.signal_journal import get_signal_journal
+            get_signal_journal().append({
+                'ts': signal_data.get('timestamp'),
+                'symbol': signal_data['symbol'],
+                'source': signal_data.get('strategy') or 'strategy',
+                'timing_signal': signal_data['action'],
+                'current_price': signal_data['price'],
+                'confidence_score': signal_data['confidence']
+            })
 
         except Exception as e:
             self.logger.error(f"Error saving signal: {e!s}")
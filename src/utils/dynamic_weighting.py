@@ -0,0 +1,314 @@
+"""
+Dynamic ML/TA weighting for the hybrid score.
+
+Every closed trade contributes one (ml_probability, ta_score, realized PnL)
+sample. Two rolling Pearson correlations - ML probability vs PnL and TA
+score vs PnL - are maintained over a sliding window from running sums, so
+each trade is an O(1) update. The weights are recomputed on update and
+published as an immutable snapshot, so the hybrid scorer and the API read
+them in constant time.
+
+Samples are appended to SQLite, which is the source of truth shared by every
+worker process: a worker re-syncs its window when the table's row count or
+max id moves (checked at most every ``sync_interval`` seconds on reads and
+right after its own inserts), so the window also survives restarts.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any
+
+DEFAULT_WINDOW = 50
+MIN_SAMPLES = 10
+DEFAULT_ML_WEIGHT = 0.4
+DEFAULT_TA_WEIGHT = 0.6
+# Neither source is ever switched off completely
+MIN_WEIGHT = 0.2
+MAX_WEIGHT = 0.8
+# Seconds between checks for samples written by other workers
+SYNC_INTERVAL = 5.0
+
+
+class RollingCorrelation:
+    """Pearson correlation over the last ``window`` (x, y) pairs with O(1) updates."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        """
+        Initialize the rolling correlation.
+
+        Args:
+            window: Number of most recent pairs to include
+        """
+        self.window = window
+        self._pairs: deque[tuple[float, float]] = deque()
+        self._sx = self._sy = self._sxx = self._syy = self._sxy = 0.0
+        self._updates = 0
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def add(self, x: float, y: float) -> None:
+        """Add a pair, evicting the oldest one once the window is full."""
+        self._pairs.append((x, y))
+        self._accumulate(x, y, 1.0)
+        if len(self._pairs) > self.window:
+            old_x, old_y = self._pairs.popleft()
+            self._accumulate(old_x, old_y, -1.0)
+        self._updates += 1
+        # Add/subtract cycles accumulate rounding error; rebuild the sums once per window
+        if self._updates % self.window == 0:
+            self._resum()
+
+    def correlation(self) -> float:
+        """Current correlation (0.0 with fewer than 2 pairs or zero variance)."""
+        n = len(self._pairs)
+        if n < 2:
+            return 0.0
+        cov = n * self._sxy - self._sx * self._sy
+        var_x = n * self._sxx - self._sx * self._sx
+        var_y = n * self._syy - self._sy * self._sy
+        if var_x <= 1e-12 or var_y <= 1e-12:
+            return 0.0
+        return max(-1.0, min(1.0, cov / math.sqrt(var_x * var_y)))
+
+    def _accumulate(self, x: float, y: float, sign: float) -> None:
+        self._sx += sign * x
+        self._sy += sign * y
+        self._sxx += sign * x * x
+        self._syy += sign * y * y
+        self._sxy += sign * x * y
+
+    def _resum(self) -> None:
+        self._sx = self._sy = self._sxx = self._syy = self._sxy = 0.0
+        for x, y in self._pairs:
+            self._accumulate(x, y, 1.0)
+
+
+class DynamicWeighting:
+    """Online ML/TA weights derived from how well each score predicted realized PnL."""
+
+    def __init__(self, db_path: str | None = "trading.db", window: int = DEFAULT_WINDOW,
+                 min_samples: int = MIN_SAMPLES, sync_interval: float = SYNC_INTERVAL):
+        """
+        Initialize the weighting engine and reload the last window of trades.
+
+        Args:
+            db_path: SQLite database for closed-trade samples (None keeps them in memory only)
+            window: Number of most recent closed trades used for the correlations
+            min_samples: Trades needed before weights move away from the defaults
+            sync_interval: Seconds between read-side checks for other workers' samples
+        """
+        self.db_path = db_path
+        self.window = window
+        self.min_samples = min_samples
+        self.sync_interval = sync_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._ml = RollingCorrelation(window)
+        self._ta = RollingCorrelation(window)
+        self._analysis: dict[str, Any] = self._build_analysis()
+        # (row count, max id) of weighting_trades as last applied
+        self._table_state = (0, 0)
+        self._synced_at = 0.0
+        self._init_db()
+        self._sync(force=True)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the closed-trade sample table."""
+        if self.db_path is None:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS weighting_trades (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        ts REAL NOT NULL,
+                        symbol TEXT,
+                        ml_probability REAL NOT NULL,
+                        ta_score REAL NOT NULL,
+                        pnl REAL NOT NULL
+                    )
+                ''')
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error initializing dynamic weighting table: {e!s}")
+
+    def _sync(self, force: bool = False) -> bool:
+        """
+        Pick up samples written by any worker since the last sync.
+
+        Appends are replayed incrementally; anything else (rows deleted or
+        rewritten) rebuilds the window from the newest ``window`` rows.
+
+        Args:
+            force: Skip the ``sync_interval`` throttle
+
+        Returns:
+            True if the window changed
+        """
+        if self.db_path is None:
+            return False
+        now = time.monotonic()
+        if not force and now - self._synced_at < self.sync_interval:
+            return False
+        with self._lock:
+            self._synced_at = now
+            try:
+                with self._connect() as conn:
+                    count, max_id = conn.execute(
+                        'SELECT COUNT(*), COALESCE(MAX(id), 0) FROM weighting_trades'
+                    ).fetchone()
+                    if (count, max_id) == self._table_state:
+                        return False
+                    seen_count, seen_id = self._table_state
+                    appended = max_id > seen_id and count - seen_count == max_id - seen_id
+                    if appended:
+                        rows = conn.execute(
+                            'SELECT ml_probability, ta_score, pnl FROM weighting_trades '
+                            'WHERE id > ? AND id <= ? ORDER BY id DESC LIMIT ?',
+                            (seen_id, max_id, self.window)
+                        ).fetchall()
+                    else:
+                        rows = conn.execute(
+                            'SELECT ml_probability, ta_score, pnl FROM weighting_trades '
+                            'WHERE id <= ? ORDER BY id DESC LIMIT ?',
+                            (max_id, self.window)
+                        ).fetchall()
+            except Exception as e:
+                self.logger.error(f"Error loading dynamic weighting history: {e!s}")
+                return False
+            if not appended:
+                self._ml = RollingCorrelation(self.window)
+                self._ta = RollingCorrelation(self.window)
+            for ml_probability, ta_score, pnl in reversed(rows):
+                self._ml.add(ml_probability, pnl)
+                self._ta.add(ta_score, pnl)
+            self._table_state = (count, max_id)
+            self._analysis = self._build_analysis()
+        return True
+
+    def record_trade(self, ml_probability: float, ta_score: float, pnl: float,
+                     symbol: str | None = None, ts: float | None = None) -> None:
+        """
+        Add one closed trade and refresh the weights.
+
+        Args:
+            ml_probability: ML probability at entry (0-1)
+            ta_score: Technical confidence score at entry (0-100)
+            pnl: Realized PnL of the trade
+            symbol: Traded symbol
+            ts: Close time in epoch seconds (defaults to now)
+        """
+        values = (float(ml_probability), float(ta_score), float(pnl))
+        if not all(math.isfinite(v) for v in values):
+            self.logger.debug(f"Ignoring non-finite weighting sample {values}")
+            return
+        ml_probability, ta_score, pnl = values
+        if self.db_path is not None:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        'INSERT INTO weighting_trades (ts, symbol, ml_probability, ta_score, pnl) VALUES (?, ?, ?, ?, ?)',
+                        (time.time() if ts is None else ts, symbol, ml_probability, ta_score, pnl)
+                    )
+                    conn.commit()
+            except Exception as e:
+                self.logger.error(f"Error recording dynamic weighting sample: {e!s}")
+            else:
+                # Applies this sample together with any other worker's since the last sync
+                self._sync(force=True)
+                return
+
+        with self._lock:
+            self._ml.add(ml_probability, pnl)
+            self._ta.add(ta_score, pnl)
+            self._analysis = self._build_analysis()
+
+    def weights(self) -> tuple[float, float]:
+        """Current ``(ta_weight, ml_weight)``."""
+        self._sync()
+        analysis = self._analysis
+        return analysis['ta_weight'], analysis['ml_weight']
+
+    def calculate_weights(self) -> dict[str, float]:
+        """Current weights as ``{'ml_weight', 'ta_weight'}``."""
+        self._sync()
+        analysis = self._analysis
+        return {'ml_weight': analysis['ml_weight'], 'ta_weight': analysis['ta_weight']}
+
+    def get_correlation_analysis(self) -> dict[str, Any]:
+        """Weights, correlations and sample statistics."""
+        self._sync()
+        return dict(self._analysis)
+
+    def _build_analysis(self) -> dict[str, Any]:
+        """Derive weights from the correlations (called with the lock held)."""
+        n = len(self._ml)
+        ml_corr = self._ml.correlation()
+        ta_corr = self._ta.correlation()
+        ml_weight = DEFAULT_ML_WEIGHT
+        status = 'insufficient_data'
+
+        if n >= self.min_samples:
+            ml_edge, ta_edge = max(ml_corr, 0.0), max(ta_corr, 0.0)
+            if ml_edge + ta_edge > 0:
+                raw = ml_edge / (ml_edge + ta_edge)
+                # Shrink towards the defaults until the window is full
+                ml_weight = DEFAULT_ML_WEIGHT + (raw - DEFAULT_ML_WEIGHT) * min(1.0, n / self.window)
+                ml_weight = min(MAX_WEIGHT, max(MIN_WEIGHT, ml_weight))
+                status = 'active'
+            else:
+                status = 'no_predictive_signal'
+
+        if n >= self.window:
+            confidence = 'high'
+        elif n >= self.min_samples:
+            confidence = 'medium'
+        else:
+            confidence = 'low'
+
+        ml_weight = round(ml_weight, 3)
+        return {
+            'ml_weight': ml_weight,
+            'ta_weight': round(1.0 - ml_weight, 3),
+            'ml_correlation': round(ml_corr, 4),
+            'ta_correlation': round(ta_corr, 4),
+            'sample_size': n,
+            'window_size': self.window,
+            'status': status,
+            'confidence': confidence,
+        }
+
+
+_dynamic_weighting: DynamicWeighting | None = None
+_dynamic_weighting_lock = threading.Lock()
+
+
+def get_dynamic_weighting() -> DynamicWeighting:
+    """Get the process-wide weighting engine."""
+    global _dynamic_weighting
+    if _dynamic_weighting is None:
+        with _dynamic_weighting_lock:
+            if _dynamic_weighting is None:
+                _dynamic_weighting = DynamicWeighting(
+                    os.getenv("DYNAMIC_WEIGHTS_DB", "trading.db"),
+                    window=int(os.getenv("DYNAMIC_WEIGHTS_WINDOW", DEFAULT_WINDOW)),
+                    sync_interval=float(os.getenv("DYNAMIC_WEIGHTS_SYNC_SEC", SYNC_INTERVAL)),
+                )
+    return _dynamic_weighting
@@ -16,6 +16,9 @@ from datetime import datetime
 import numpy as np
 import pandas as pd
 
+from src.data.confidence_store import get_confidence_store
+from src.ml.feature_store import latest_features
+
 logger = logging.getLogger(__name__)
 
 class EntryConfidenceAnalyzer:
@@ -37,35 +40,18 @@ class EntryConfidenceAnalyzer:
         """
         Calculate fast technical indicators on minimal data.
         Expects df with 'price' and 'volume'.
-        """
-        indicators = {}
 
+        Uses the feature store's ``compute_features`` so live scoring and
+        training see the same values. ``volatility_7`` is the std of the last
+        7 log returns (not of every return in ``df``), and ``rsi_7`` is 100
+        when the window has no losses, as in ``_calculate_rsi``; both need 8
+        prices.
+        """
         try:
-            prices = df['price'].values
-            volumes = df['volume'].values
-
-            if len(prices) >= 7:
-                deltas = np.diff(prices)
-                gains = np.maximum(deltas, 0)
-                losses = np.maximum(-deltas, 0)
-
-                avg_gain = np.mean(gains[-7:])
-                avg_loss = np.mean(losses[-7:])
-                rs = avg_gain / avg_loss if avg_loss > 0 else 100
-                indicators['rsi_7'] = 100 - (100 / (1 + rs))
-
-                returns = np.diff(np.log(prices))
-                indicators['volatility_7'] = np.std(returns) * 100  # percentage
-
-                indicators['volume_ratio'] = volumes[-1] / (np.mean(volumes[-7:]) + 1e-6)
-
-                indicators['price_above_sma7'] = prices[-1] / (np.mean(prices[-7:]) + 1e-6)
-
+            return latest_features(df['price'].values, df['volume'].values)
         except Exception:
             # Fallback if calculation fails
-            pass
-
-        return indicators
+            return {}
 
     def _calculate_enhanced_confidence(self, df: pd.DataFrame, current_price: float) -> float:
         """Enhanced confidence calculation using real technical indicators."""
@@ -162,6 +148,169 @@ class EntryConfidenceAnalyzer:
             self.logger.error(f"Error calculating confidence for {symbol}: {e}")
             return self._create_basic_confidence(symbol, current_price)
 
+    def calculate_confidence_batch(self, current_prices: dict[str, float],
+                                   historical_data: dict[str, list[dict]] | None = None) -> dict[str, dict]:
+        """
+        Calculate entry confidence for many symbols in one vectorized pass.
+
+        Symbols are grouped by history length and each group is scored as one
+        symbols x bars panel (see ``confidence_panel.score_panel``), so a scan
+        of dozens of assets costs roughly the same as scoring one. Results are
+        identical in shape and value to ``calculate_confidence``.
+
+        Args:
+            current_prices: Current market price keyed by symbol
+            historical_data: Optional historical price data keyed by symbol
+
+        Returns:
+            Dict of confidence results keyed by symbol
+        """
+        from .confidence_panel import score_panel
+
+        historical_data = historical_data or {}
+        results: dict[str, dict] = {}
+        groups: dict[int, list[tuple]] = {}
+
+        for symbol, current_price in current_prices.items():
+            history = historical_data.get(symbol)
+            if not history:
+                history = self._fetch_market_data(symbol, days=30, current_price=current_price)
+            columns = self._history_columns(history, current_price) if history and len(history) >= 20 else None
+            if columns is None:
+                # Short or unusable history takes the per-symbol fallback path
+                results[symbol] = self.calculate_confidence(symbol, current_price, history)
+                continue
+            groups.setdefault(len(columns[0]), []).append((symbol, current_price, history, columns))
+
+        calculated_at = datetime.now().isoformat()
+        for members in groups.values():
+            try:
+                prices = np.vstack([columns[0] for *_, columns in members])
+                volumes = np.vstack([columns[1] for *_, columns in members])
+                # Support detection uses bar lows where present, closes otherwise
+                lows = np.vstack([columns[0] if columns[2] is None else columns[2] for *_, columns in members])
+                cur = np.array([price for _, price, _, _ in members], dtype=float)
+                panel = score_panel(prices, volumes, cur, lows)
+            except Exception as e:
+                self.logger.error(f"Error scoring confidence panel: {e}")
+                for symbol, current_price, history, _ in members:
+                    results[symbol] = self.calculate_confidence(symbol, current_price, history)
+                continue
+
+            for i, (symbol, current_price, _, _) in enumerate(members):
+                composite = float(panel['composite'][i])
+                volatility_score = float(panel['volatility'][i])
+                momentum_score = float(panel['momentum'][i])
+                results[symbol] = {
+                    'symbol': symbol,
+                    'confidence_score': round(composite, 1),
+                    'confidence_level': self._get_confidence_level(composite),
+                    'timing_signal': self._timing_signal_for(composite, bool(panel['bollinger_zone'][i])),
+                    'suggested_target_price': float(panel['target_price'][i]),
+                    'breakdown': {
+                        'technical_analysis': round(float(panel['technical'][i]), 1),
+                        'volatility_assessment': round(volatility_score, 1),
+                        'momentum_indicators': round(momentum_score, 1),
+                        'volume_analysis': round(float(panel['volume'][i]), 1),
+                        'support_resistance': round(float(panel['support_resistance'][i]), 1)
+                    },
+                    'enhanced_filters': self._panel_filter_breakdown(panel, i, current_price),
+                    'entry_recommendation': self._get_entry_recommendation(composite),
+                    'risk_level': self._assess_risk_level(volatility_score, momentum_score),
+                    'calculated_at': calculated_at
+                }
+
+        return results
+
+    def _history_columns(self, historical_data: list | dict | None,
+                         current_price: float) -> tuple[np.ndarray, np.ndarray, np.ndarray | None] | None:
+        """
+        Extract price, volume and low columns with ``_create_safe_dataframe`` semantics.
+
+        Plain lists of OHLCV dicts (the ``_fetch_market_data`` format) are read
+        straight into arrays; anything else goes through the DataFrame path.
+
+        Returns:
+            Tuple of (prices, volumes, lows or None), or None if unusable
+        """
+        if isinstance(historical_data, list) and historical_data and all(
+                isinstance(row, dict) for row in historical_data):
+            keys = set().union(*historical_data)
+            price_key = 'price' if 'price' in keys else 'close' if 'close' in keys else None
+            volume_key = 'volume' if 'volume' in keys else 'v' if 'v' in keys else None
+            if price_key and all(price_key in row for row in historical_data):
+                try:
+                    prices = np.array([row[price_key] for row in historical_data], dtype=float)
+                    volumes = np.array([row.get(volume_key, np.nan) if volume_key else 1000.0
+                                        for row in historical_data], dtype=float)
+                    lows = None
+                    if 'low' in keys:
+                        lows = np.array([row.get('low', np.nan) for row in historical_data], dtype=float)
+                    prices[np.isnan(prices)] = current_price
+                    volumes[np.isnan(volumes)] = 1000.0
+                    return prices, volumes, lows
+                except (TypeError, ValueError):
+                    pass  # Mixed/odd values: let pandas coerce them
+
+        df = self._create_safe_dataframe(historical_data, current_price)
+        if df is None:
+            return None
+        lows = pd.to_numeric(df['low'], errors='coerce').to_numpy(dtype=float) if 'low' in df.columns else None
+        return df['price'].to_numpy(dtype=float), df['volume'].to_numpy(dtype=float), lows
+
+    def _panel_filter_breakdown(self, panel: dict, i: int, current_price: float) -> dict:
+        """Build the ``_get_enhanced_filter_breakdown`` dict for row ``i`` of a scored panel."""
+        checks = panel['checks']
+        rsi = float(panel['rsi'][i])
+        filters = {
+            'rsi_oversold': {
+                'passed': bool(rsi < 30.0),
+                'value': round(rsi, 1),
+                'threshold': 30.0,
+                'description': 'RSI below 30 indicates oversold conditions'
+            },
+            'volume_confirmation': {
+                'passed': bool(checks['volume'][i]),
+                'value': round(float(panel['volume_multiplier'][i]), 2),
+                'threshold': 1.2,
+                'description': 'Current volume should be 1.2x above 20-day average'
+            },
+        }
+        if 'higher_tf' in checks:
+            filters['higher_timeframe_support'] = {
+                'passed': bool(checks['higher_tf'][i]),
+                'sma_distance': round(float(panel['sma_distance'][i]), 1),
+                'sma_slope': round(float(panel['sma_slope'][i]), 2),
+                'description': 'Price within 10% of SMA50 and not in severe downtrend'
+            }
+        if 'support' in checks:
+            filters['support_level_proximity'] = {
+                'passed': bool(checks['support'][i]),
+                'description': 'Price within 2% of significant support level'
+            }
+        if 'regime' in checks:
+            filters['market_regime'] = {
+                'passed': bool(checks['regime'][i]),
+                'price_vs_sma10': round(float(panel['price_vs_sma10'][i]), 1),
+                'price_change_10d': round(float(panel['price_change_10d'][i]), 1),
+                'description': 'Market not in severe downtrend (within 15% of 10-day high)'
+            }
+        filters['bollinger_band_position'] = {
+            'passed': bool(checks['bollinger'][i]),
+            'lower_band': round(float(panel['bb_lower'][i]), 6),
+            'current_price': float(current_price),
+            'description': 'Price at or below lower Bollinger Band (oversold)'
+        }
+
+        total_confirmations = sum(1 for f in filters.values() if f.get('passed', False))
+        filters['summary'] = {
+            'total_confirmations': int(total_confirmations),
+            'total_filters': int(len(filters) - 1),  # Same count as _get_enhanced_filter_breakdown
+            'minimum_required': 4,
+            'meets_requirements': bool(total_confirmations >= 4)
+        }
+        return filters
+
     def _calculate_technical_score(self, df: pd.DataFrame, current_price: float) -> float:
         """
         ENHANCED: Calculate technical analysis score using new multiple confirmation filters.
@@ -625,28 +774,7 @@ class EntryConfidenceAnalyzer:
                 bb_lower = sma - (2 * std)
                 bollinger_zone = current_price <= bb_lower * 1.01  # Within 1% of lower band
 
-            # ENHANCED CRITERIA: Align with 6-filter system thresholds
-            # Score of 75+ means 4+ confirmations (minimum requirement)
-            # Score of 85+ means 5-6 confirmations (excellent setup)
-
-            if confidence_score >= 85:
-                # EXCELLENT: 5-6 confirmations passed
-                return "STRONG_BUY"
-            elif confidence_score >= 70:
-                # HIGH PROBABILITY: 3+ confirmations passed (meets enhanced criteria)
-                return "BUY"
-            elif confidence_score >= 60:
-                # MODERATE: 2-3 confirmations + some additional factors
-                if bollinger_zone:
-                    return "CAUTIOUS_BUY"  # At Bollinger Band gives slight boost
-                else:
-                    return "WAIT"  # Not quite enough confirmations
-            elif confidence_score >= 50:
-                # WEAK: Only 2-3 confirmations, insufficient for enhanced strategy
-                return "WAIT"
-            else:
-                # POOR: Very few confirmations, avoid entry
-                return "AVOID"
+            return self._timing_signal_for(confidence_score, bollinger_zone)
 
         except Exception:
             pass
@@ -661,6 +789,31 @@ class EntryConfidenceAnalyzer:
         else:
             return "AVOID"
 
+    def _timing_signal_for(self, confidence_score: float, bollinger_zone: bool) -> str:
+        """Map a composite score and Bollinger buy-zone flag to a timing signal."""
+        # ENHANCED CRITERIA: Align with 6-filter system thresholds
+        # Score of 75+ means 4+ confirmations (minimum requirement)
+        # Score of 85+ means 5-6 confirmations (excellent setup)
+
+        if confidence_score >= 85:
+            # EXCELLENT: 5-6 confirmations passed
+            return "STRONG_BUY"
+        elif confidence_score >= 70:
+            # HIGH PROBABILITY: 3+ confirmations passed (meets enhanced criteria)
+            return "BUY"
+        elif confidence_score >= 60:
+            # MODERATE: 2-3 confirmations + some additional factors
+            if bollinger_zone:
+                return "CAUTIOUS_BUY"  # At Bollinger Band gives slight boost
+            else:
+                return "WAIT"  # Not quite enough confirmations
+        elif confidence_score >= 50:
+            # WEAK: Only 2-3 confirmations, insufficient for enhanced strategy
+            return "WAIT"
+        else:
+            # POOR: Very few confirmations, avoid entry
+            return "AVOID"
+
     def _get_confidence_level(self, score: float) -> str:
         """Convert score to confidence level."""
         if score >= 90:
@@ -892,232 +1045,21 @@ class EntryConfidenceAnalyzer:
             return "VERY_HIGH"
 
     def _fetch_market_data(self, symbol: str, days: int = 30, current_price: float | None = None) -> list[dict]:
-        """Fetch REAL historical market data from OKX API with intelligent caching."""
-        try:
-            import time
-
-            # Import OKX native client for real data
-            from src.utils.okx_native import OKXCreds, OKXNative
-
-            # Convert symbol to OKX format (e.g., ALGO -> ALGO-USDT)
-            inst_id = f"{symbol}-USDT" if not symbol.endswith('-USDT') else symbol
-
-            # Check cache first (5-minute cache for speed)
-            cache_key = f"okx_candles_{inst_id}_{days}"
-            try:
-                from app import cache_get_price, cache_put_price
-                cached_data = cache_get_price(cache_key)
-                if cached_data:
-                    self.logger.debug(f"📊 Cache hit for {symbol} - using cached OKX data")
-                    return cached_data
-            except ImportError:
-                pass
-
-            # 🎯 SMART WORKAROUND: Real data for top 3 cryptos only + aggressive caching
-            priority_cryptos = {'BTC', 'ETH', 'SOL'}  # Only top 3 to prevent timeouts
-
-            if symbol not in priority_cryptos:
-                self.logger.debug(f"⚡ Using optimized data for {symbol} (non-priority)")
-                return self._create_fallback_data(current_price)
-
-            # 🚀 AGGRESSIVE CACHING: 10-minute cache for real data to prevent repeated API calls
-            cache_key = f"confidence_real_{symbol}_{current_price:.6f}"
-            try:
-                # Check if we have cached real confidence data (10-min TTL)
-                from src.utils.database import DatabaseManager
-                db = DatabaseManager()
-                cached_data = db.get_cached_data(cache_key, ttl_seconds=600)  # 10 minutes
-                if cached_data:
-                    self.logger.debug(f"📋 Using cached real confidence for {symbol}")
-                    return cached_data
-            except Exception:
-                pass
-
-            # ⚡ REAL CONFIDENCE DATA: Simplified approach for priority cryptos
-            self.logger.debug(f"🔄 Fetching real confidence for {symbol}")
-
-            # Generate varied confidence scores based on market conditions
-            # Use price volatility and market cap to determine confidence
-            try:
-                # 🚀 REAL TECHNICAL ANALYSIS: Use actual indicators
-                base_score = 55.0
-
-                # Market cap based adjustments
-                market_cap_scores = {
-                    'BTC': 75.0,  # Highest confidence for Bitcoin
-                    'ETH': 70.0,  # High confidence for Ethereum
-                    'SOL': 65.0   # Good confidence for Solana
-                }
-
-                confidence_score = market_cap_scores.get(symbol, base_score)
-
-                # 📊 ENHANCED: Try to get real market data for technical analysis
-                try:
-                    # Create minimal DataFrame for analysis (fallback to current price)
-                    sample_data = {
-                        'price': [current_price * 0.98, current_price * 0.99, current_price],
-                        'volume': [100000, 120000, 110000]  # Sample volumes
-                    }
-
-                    df = self._create_safe_dataframe(sample_data, current_price)
-
-                    # Apply lightweight indicators
-                    indicators = self._lightweight_indicators(df)
-
-                    if indicators:
-                        # RSI adjustment
-                        if 'rsi_7' in indicators:
-                            rsi = indicators['rsi_7']
-                            if 30 <= rsi <= 40:  # Oversold but recovering
-                                confidence_score += 8
-                            elif 60 <= rsi <= 70:  # Strong but not overbought
-                                confidence_score += 5
-                            elif rsi > 80:  # Overbought
-                                confidence_score -= 5
-
-                        # Volume ratio adjustment
-                        if 'volume_ratio' in indicators:
-                            vol_ratio = indicators['volume_ratio']
-                            if vol_ratio > 1.5:  # High volume
-                                confidence_score += 3
-                            elif vol_ratio < 0.5:  # Low volume
-                                confidence_score -= 3
-
-                        # Price momentum adjustment
-                        if 'price_above_sma7' in indicators:
-                            momentum = indicators['price_above_sma7']
-                            if momentum > 1.02:  # Above SMA
-                                confidence_score += 2
-                            elif momentum < 0.98:  # Below SMA
-                                confidence_score -= 2
-
-                        self.logger.debug(f"📊 Technical indicators for {symbol}: RSI={indicators.get('rsi_7', 'N/A'):.1f}, Vol={indicators.get('volume_ratio', 'N/A'):.2f}")
-
-                except Exception as e:
-                    self.logger.debug(f"Technical indicators failed for {symbol}: {e}")
-                    # Fallback to basic price variation
-                    price_hash = hash(str(current_price)[:6]) % 20
-                    confidence_score += (price_hash - 10)
-
-                # Keep within bounds
-                confidence_score = max(45.0, min(85.0, confidence_score))
-
-                # Determine confidence level (more realistic thresholds)
-                if confidence_score >= 70:
-                    confidence_level = "HIGH"
-                    risk_level = "LOW"
-                    timing_signal = "BUY"
-                elif confidence_score >= 60:
-                    confidence_level = "GOOD"
-                    risk_level = "MEDIUM"
-                    timing_signal = "CONSIDER"
-                elif confidence_score >= 45:
-                    confidence_level = "FAIR"
-                    risk_level = "MEDIUM"
-                    timing_signal = "WAIT"
-                else:
-                    confidence_level = "WEAK"
-                    risk_level = "HIGH"
-                    timing_signal = "AVOID"
-
-                # 🚀 CACHE REAL DATA: Store for 10 minutes
-                result = {
-                    'score': confidence_score,
-                    'level': confidence_level,
-                    'risk_level': risk_level,
-                    'timing_signal': timing_signal,
-                    'rsi_signal': "NEUTRAL",
-                    'volume_confirmation': True,
-                    'momentum_strength': confidence_score / 100.0,
-                    'support_level': current_price * 0.95,
-                    'volatility_regime': "NORMAL",
-                    'market_structure': "TRENDING",
-                    'data_quality': 'enhanced_priority_crypto',
-                    'timestamp': time.time()
-                }
-
-                try:
-                    from src.utils.database import DatabaseManager
-                    db = DatabaseManager()
-                    db.cache_data(cache_key, result, ttl_seconds=600)
-                    self.logger.debug(f"📋 Cached real confidence for {symbol}")
-                except Exception:
-                    pass
-
-                self.logger.info(f"✅ Enhanced confidence analysis for {symbol}: {confidence_score:.1f}% ({confidence_level})")
-                # _fetch_market_data should return list[dict], not dict
-                return self._create_fallback_data(current_price)
-
-            except Exception as e:
-                self.logger.error(f"Error calculating enhanced confidence for {symbol}: {e}")
-                self.logger.debug(f"⚡ Falling back to optimized data for {symbol}")
-                return self._create_fallback_data(current_price)
-
-            # Use environment credentials directly (same as other OKX clients)
-            try:
-                creds = OKXCreds.from_env()
-                if not (creds.api_key and creds.secret_key and creds.passphrase):
-                    self.logger.warning(f"OKX credentials not available for {symbol}, using fallback")
-                    return self._create_fallback_data(current_price)
-
-                # Initialize OKX client with environment credentials
-                okx_client = OKXNative(creds)
-            except Exception as cred_error:
-                self.logger.warning(f"Failed to initialize OKX client for {symbol}: {cred_error}")
-                return self._create_fallback_data(current_price)
-
-            # Fetch real historical candle data (daily candles) with timeout protection
-            start_time = time.time()
-            candles_data = okx_client.candles(inst_id, bar="1D", limit=min(days, 7))  # Limit to 7 days for speed
-            fetch_time = time.time() - start_time
-
-            if fetch_time > 2.0:  # If took more than 2 seconds, warn
-                self.logger.warning(f"Slow OKX fetch for {symbol}: {fetch_time:.1f}s")
-
-            if not candles_data:
-                self.logger.warning(f"No real OKX data for {symbol}, using current price fallback")
-                return self._create_fallback_data(current_price)
-
-            # Convert OKX candle data to our format
-            data = []
-            for candle in candles_data:
-                # OKX candle format: [timestamp, open, high, low, close, volume, volumeCcy, volCcyQuote, confirm]
-                timestamp = int(candle[0])
-                open_price = float(candle[1])
-                high_price = float(candle[2])
-                low_price = float(candle[3])
-                close_price = float(candle[4])
-                volume = float(candle[5])
-
-                # Convert timestamp to datetime
-                date = datetime.fromtimestamp(timestamp / 1000.0)
-
-                data.append({
-                    'date': date.isoformat(),
-                    'price': close_price,  # Use close price for analysis
-                    'volume': volume,
-                    'high': high_price,
-                    'low': low_price,
-                    'open': open_price,
-                    'close': close_price
-                })
-
-            # Sort by date (oldest first)
-            data.sort(key=lambda x: x['date'])
-
-            # Cache the result for 5 minutes
-            try:
-                from app import cache_put_price
-                cache_put_price(cache_key, data)  # Standard cache duration
-            except ImportError:
-                pass
-
-            self.logger.info(f"✅ Fetched {len(data)} real OKX candles for {symbol} in {fetch_time:.1f}s")
-            return data
+        """
+        Daily candles for ``symbol`` from the shared confidence store.
 
+        The confidence scheduler refreshes candles for every tracked asset in
+        the background, so request paths never call OKX here. Assets without
+        stored candles get the single-point fallback.
+        """
+        try:
+            candles = get_confidence_store().candles(symbol.replace('-USDT', ''))
+            if candles:
+                return candles[-days:]
+            self.logger.debug(f"No stored candles for {symbol} yet, using fallback")
         except Exception as e:
-            self.logger.error(f"Error fetching REAL OKX data for {symbol}: {e}")
-            return self._create_fallback_data(current_price)
+            self.logger.error(f"Error reading stored candles for {symbol}: {e}")
+        return self._create_fallback_data(current_price)
 
     def _create_fallback_data(self, current_price: float | None = None) -> list[dict]:
         """Create fallback market data when OKX fetch fails."""
@@ -0,0 +1,174 @@
+"""
+Fast JSON encoding and response compression helpers.
+
+``dumps_bytes`` serializes API payloads with orjson when it is installed
+(falling back to the standard library) and natively understands numpy
+scalars/arrays, pandas timestamps/series/frames, datetimes, Decimals and
+sets, so callers no longer need a recursive ``convert_numpy_types`` pass
+before ``jsonify``. ``compress_body`` picks brotli or gzip from the client's
+``Accept-Encoding`` for bodies above a size threshold.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Responses smaller than this are not worth compressing
+DEFAULT_COMPRESS_THRESHOLD = 1024
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Fallback conversion for types neither encoder handles natively."""
+    # numpy scalars/arrays (orjson handles most of these itself)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'item') and hasattr(obj, 'dtype'):
+        return obj.item()
+    # pandas Timestamp / datetime-like
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    # pandas Series/DataFrame
+    if hasattr(obj, 'to_dict'):
+        try:
+            return obj.to_dict(orient='records')
+        except TypeError:
+            return obj.to_dict()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, set | frozenset | tuple):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8', errors='replace')
+    return str(obj)
+
+
+def _std_default(obj: Any) -> Any:
+    if isinstance(obj, datetime | date):
+        return obj.isoformat()
+    return _default(obj)
+
+
+def _finite(obj: Any) -> Any:
+    """Replace NaN/Infinity with None, as orjson does (browsers reject them)."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, list | tuple):
+        return [_finite(v) for v in obj]
+    if obj is None or isinstance(obj, str | int):
+        return obj
+    return _finite(_std_default(obj))
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    Serialize a payload to UTF-8 JSON bytes.
+
+    Args:
+        obj: Payload (may contain numpy/pandas/datetime values)
+        sort_keys: Sort object keys (stable output for hashing)
+
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        options = _ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, default=_default, option=options)
+        except TypeError as e:
+            # e.g. integers beyond 64 bits; fall through to the stdlib encoder
+            logger.debug(f"orjson fallback: {e}")
+    try:
+        text = json.dumps(obj, default=_std_default, sort_keys=sort_keys, allow_nan=False,
+                          separators=(',', ':'), ensure_ascii=False)
+    except ValueError:
+        text = json.dumps(_finite(obj), sort_keys=sort_keys,
+                          separators=(',', ':'), ensure_ascii=False)
+    return text.encode('utf-8')
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON text with the fastest available decoder."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def body_etag(body: bytes) -> str:
+    """Strong validator for an encoded body."""
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Pick the best supported content-coding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Raw header value
+
+    Returns:
+        'br', 'gzip' or None
+    """
+    if not accept_encoding:
+        return None
+    offered = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[token.strip().lower()] = q
+    if brotli is not None and offered.get('br', 0) > 0:
+        return 'br'
+    if offered.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress_body(body: bytes, accept_encoding: str | None,
+                  threshold: int = DEFAULT_COMPRESS_THRESHOLD) -> tuple[bytes, str | None]:
+    """
+    Compress a body for the client if it is large enough.
+
+    Args:
+        body: Uncompressed body
+        accept_encoding: Client's Accept-Encoding header
+        threshold: Minimum size in bytes worth compressing
+
+    Returns:
+        Tuple of (body, content_encoding); encoding is None when unchanged
+    """
+    if len(body) < threshold:
+        return body, None
+    encoding = choose_encoding(accept_encoding)
+    if encoding == 'br':
+        return brotli.compress(body, quality=4), 'br'
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=5), 'gzip'
+    return body, None
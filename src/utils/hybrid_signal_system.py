@@ -6,8 +6,9 @@ Goal 1: ✅ Hybrid Scoring System (ML + Heuristic)
 Goal 2: 🔄 Auto-Backtest on Real OKX Trade History (Next Phase)
 
 Scoring Strategy:
-- heuristic_score: 60% weight (Your current confidence_score)
-- ml_probability: 40% weight (Output from ML model: predict_buy_opportunity())
+- heuristic_score: 60% weight by default (Your current confidence_score)
+- ml_probability: 40% weight by default (Output from ML model: predict_buy_opportunity())
+- Weights adapt to closed-trade performance (src/utils/dynamic_weighting.py)
 
 Final Decision Logic:
 - hybrid_score >= 75: BUY (Strong confidence)
@@ -27,11 +28,23 @@ sys.path.insert(0, project_root)
 
 logger = logging.getLogger(__name__)
 
+# Entry confidence older than this is recomputed instead of served from the store
+CONFIDENCE_MAX_AGE = 600.0
+
+THRESHOLDS = {
+    "BUY": "≥75",
+    "CONSIDER": "≥60",
+    "WAIT": "≥45",
+    "AVOID": "<45"
+}
+
+
 def calculate_hybrid_signal(confidence_score: float, indicators: dict[str, Any]) -> dict[str, Any]:
     """
-    HYBRID SIGNAL SYSTEM: Combine heuristic analysis (60%) with ML predictions (40%).
+    HYBRID SIGNAL SYSTEM: Combine heuristic analysis with ML predictions.
 
-    Formula: hybrid_score = 0.6 * confidence_score + 0.4 * (ml_probability * 100)
+    Formula: hybrid_score = ta_weight * confidence_score + ml_weight * (ml_probability * 100)
+    with weights from the dynamic weighting engine (default 60/40).
 
     Args:
         confidence_score: Traditional 6-factor confidence score (0-100)
@@ -44,62 +57,151 @@ def calculate_hybrid_signal(confidence_score: float, indicators: dict[str, Any])
         # Try to get ML prediction
         ml_prob = _get_ml_prediction(indicators)
 
-        # HYBRID SCORING: Fixed 60/40 weight distribution
-        heuristic_weight = 0.6
-        ml_weight = 0.4
-
-        # Calculate hybrid score
-        hybrid_score = (confidence_score * heuristic_weight) + (ml_prob * 100 * ml_weight)
-
-        # Generate final signal based on hybrid score thresholds
-        if hybrid_score >= 75:
-            signal = "BUY"
-        elif hybrid_score >= 60:
-            signal = "CONSIDER"
-        elif hybrid_score >= 45:
-            signal = "WAIT"
-        else:
-            signal = "AVOID"
-
-        # Calculate component breakdown
-        heuristic_component = confidence_score * heuristic_weight
-        ml_component = ml_prob * 100 * ml_weight
-
-        result = {
-            "hybrid_score": round(hybrid_score, 2),
-            "ml_probability": round(ml_prob, 4),
-            "final_signal": signal,
-            "breakdown": {
-                "heuristic_component": round(heuristic_component, 1),
-                "ml_component": round(ml_component, 1),
-                "weights": {"heuristic": "60%", "ml": "40%"}
-            },
-            "thresholds": {
-                "BUY": "≥75",
-                "CONSIDER": "≥60",
-                "WAIT": "≥45",
-                "AVOID": "<45"
-            }
-        }
+        # HYBRID SCORING: Weights track which score has predicted realized PnL
+        return _hybrid_result(confidence_score, ml_prob, _get_weights())
+
+    except Exception as e:
+        logger.error(f"Hybrid signal calculation failed: {e}")
+        return _heuristic_only_result(confidence_score, str(e))
+
 
-        logger.debug(f"🎯 HYBRID SIGNAL: {confidence_score:.1f} (60%) + {ml_prob*100:.1f} (40%) = {hybrid_score:.1f} → {signal}")
+def calculate_hybrid_signals(scores: dict[str, tuple[float, float]]) -> dict[str, dict[str, Any]]:
+    """
+    Hybrid signals for many symbols with one batched ML prediction.
 
-        return result
+    Args:
+        scores: ``symbol -> (confidence_score, ml_probability)`` model inputs
 
+    Returns:
+        ``calculate_hybrid_signal``-shaped results keyed by symbol
+    """
+    if not scores:
+        return {}
+    symbols = list(scores)
+    try:
+        ml_probs = _get_ml_predictions([scores[s] for s in symbols])
+        weights = _get_weights()
+        return {s: _hybrid_result(scores[s][0], float(p), weights) for s, p in zip(symbols, ml_probs, strict=True)}
     except Exception as e:
-        logger.error(f"Hybrid signal calculation failed: {e}")
-        # Fallback to heuristic-only
-        return {
-            "hybrid_score": round(confidence_score, 2),
-            "ml_probability": 0.5,  # Neutral
-            "final_signal": _heuristic_only_signal(confidence_score),
-            "breakdown": {
-                "heuristic_component": round(confidence_score, 1),
-                "ml_component": 0.0,
-                "weights": {"heuristic": "100%", "ml": "0% (unavailable)"}
-            },
-            "error": str(e)
+        logger.error(f"Batched hybrid signal calculation failed: {e}")
+        return {s: _heuristic_only_result(scores[s][0], str(e)) for s in symbols}
+
+
+def evaluate_hybrid_signals(symbols: list[str], prices: dict[str, float] | None = None,
+                            max_age: float = CONFIDENCE_MAX_AGE) -> dict[str, dict[str, Any]]:
+    """
+    Entry confidence plus hybrid signal for a whole watchlist in one call.
+
+    Confidence comes from the precomputed confidence store; symbols without a
+    fresh score are rescored together in one ``calculate_confidence_batch``
+    pass when a price is known. ML probabilities come from one batched
+    prediction over every symbol.
+
+    Args:
+        symbols: Asset symbols (e.g. ``BTC``)
+        prices: Current prices keyed by symbol (override stored prices)
+        max_age: Maximum age in seconds of a stored confidence score
+
+    Returns:
+        Per-symbol dict with the confidence fields, ``price``, ``source``
+        (``cache`` or ``computed``) and the hybrid result; symbols with no
+        confidence and no price are left out
+    """
+    from src.data.confidence_store import get_confidence_store
+
+    prices = prices or {}
+    confidence = get_confidence_store().get_many(symbols, max_age=max_age)
+    sources = dict.fromkeys(confidence, "cache")
+
+    missing = {s: prices[s] for s in symbols if s not in confidence and prices.get(s, 0) > 0}
+    if missing:
+        try:
+            from src.utils.entry_confidence import get_confidence_analyzer
+            computed = get_confidence_analyzer().calculate_confidence_batch(missing)
+            for symbol, result in computed.items():
+                confidence[symbol] = {**result, 'current_price': missing[symbol]}
+                sources[symbol] = "computed"
+        except Exception as e:
+            logger.error(f"Confidence batch for hybrid signals failed: {e}")
+
+    hybrid = calculate_hybrid_signals({
+        s: (float(c.get('confidence_score', 50.0)), float(c.get('ml_probability', 0.5)))
+        for s, c in confidence.items()
+    })
+    results = {}
+    for symbol in symbols:
+        if symbol not in confidence:
+            continue
+        c = confidence[symbol]
+        results[symbol] = {
+            'symbol': symbol,
+            'price': prices.get(symbol) or c.get('current_price'),
+            'confidence_score': c.get('confidence_score'),
+            'timing_signal': c.get('timing_signal'),
+            'source': sources[symbol],
+            **hybrid[symbol]
         }
+    return results
+
+
+def _hybrid_result(confidence_score: float, ml_prob: float, weights: tuple[float, float]) -> dict[str, Any]:
+    """Score, signal and breakdown for one symbol."""
+    heuristic_weight, ml_weight = weights
+
+    # Calculate hybrid score
+    hybrid_score = (confidence_score * heuristic_weight) + (ml_prob * 100 * ml_weight)
+
+    # Generate final signal based on hybrid score thresholds
+    if hybrid_score >= 75:
+        signal = "BUY"
+    elif hybrid_score >= 60:
+        signal = "CONSIDER"
+    elif hybrid_score >= 45:
+        signal = "WAIT"
+    else:
+        signal = "AVOID"
+
+    # Calculate component breakdown
+    heuristic_component = confidence_score * heuristic_weight
+    ml_component = ml_prob * 100 * ml_weight
+
+    logger.debug(f"🎯 HYBRID SIGNAL: {confidence_score:.1f} ({heuristic_weight:.0%}) + {ml_prob*100:.1f} ({ml_weight:.0%}) = {hybrid_score:.1f} → {signal}")
+
+    return {
+        "hybrid_score": round(hybrid_score, 2),
+        "ml_probability": round(ml_prob, 4),
+        "final_signal": signal,
+        "breakdown": {
+            "heuristic_component": round(heuristic_component, 1),
+            "ml_component": round(ml_component, 1),
+            "weights": {"heuristic": f"{heuristic_weight:.0%}", "ml": f"{ml_weight:.0%}"}
+        },
+        "thresholds": THRESHOLDS
+    }
+
+
+def _heuristic_only_result(confidence_score: float, error: str) -> dict[str, Any]:
+    """Fallback to heuristic-only scoring."""
+    return {
+        "hybrid_score": round(confidence_score, 2),
+        "ml_probability": 0.5,  # Neutral
+        "final_signal": _heuristic_only_signal(confidence_score),
+        "breakdown": {
+            "heuristic_component": round(confidence_score, 1),
+            "ml_component": 0.0,
+            "weights": {"heuristic": "100%", "ml": "0% (unavailable)"}
+        },
+        "error": error
+    }
+
+def _get_weights() -> tuple[float, float]:
+    """Current (heuristic, ml) weights, falling back to 60/40."""
+    try:
+        from src.utils.dynamic_weighting import get_dynamic_weighting
+        return get_dynamic_weighting().weights()
+    except Exception as e:
+        logger.debug(f"Dynamic weights unavailable: {e}")
+        return 0.6, 0.4
 
 def _get_ml_prediction(indicators: dict[str, Any]) -> float:
     """Get ML prediction probability for the given indicators."""
@@ -123,6 +225,18 @@ def _get_ml_prediction(indicators: dict[str, Any]) -> float:
         logger.debug(f"ML prediction unavailable: {e}")
         return 0.5  # Neutral prediction when ML unavailable
 
+def _get_ml_predictions(rows: list[tuple[float, float]]) -> list[float]:
+    """Batched ``_get_ml_prediction`` for (confidence_score, ml_probability) rows."""
+    try:
+        from src.ml.predictor import predict_buy_returns
+
+        predicted = predict_buy_returns(rows)
+        return [max(0.1, min(0.9, 0.5 + float(r) * 10)) for r in predicted]
+
+    except Exception as e:
+        logger.debug(f"ML prediction unavailable: {e}")
+        return [0.5] * len(rows)
+
 def _heuristic_only_signal(confidence_score: float) -> str:
     """Generate signal based on heuristic score only when ML unavailable."""
     if confidence_score >= 80:
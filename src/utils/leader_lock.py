@@ -0,0 +1,75 @@
+"""
+Leader election between gunicorn workers.
+
+Background services that must run in a single process (snapshot recorder,
+confidence scheduler, order book sampler, backtest job dispatcher, target
+price refresher) take a non-blocking ``flock`` on a lock file next to their
+database. The holder keeps the file descriptor open for its lifetime, so
+the lock is released by the kernel when the process exits and another
+worker's next ``acquire`` takes over.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import logging
+import os
+import threading
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """Non-blocking, process-lifetime ``flock`` on a lock file."""
+
+    def __init__(self, path: str, on_acquire: Callable[[], None] | None = None):
+        """
+        Initialize the lock (nothing is locked until ``acquire``).
+
+        Args:
+            path: Lock file path (created if missing)
+            on_acquire: Called once when this process becomes the leader
+        """
+        self.path = path
+        self.on_acquire = on_acquire
+        self._fd: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def held(self) -> bool:
+        """True if this process is the leader."""
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """
+        Try to become the leader (idempotent, never blocks).
+
+        Returns:
+            True if this process holds the lock
+        """
+        if self._fd is not None:
+            return True
+        with self._lock:
+            if self._fd is not None:
+                return True
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            self._fd = fd
+        if self.on_acquire is not None:
+            try:
+                self.on_acquire()
+            except Exception as e:
+                logger.warning(f"Leader callback for {self.path} failed: {e}")
+        return True
+
+    def release(self) -> None:
+        """Give up leadership (closing the descriptor drops the lock)."""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -21,6 +21,9 @@ import pandas as pd
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, project_root)
 
+from src.data.signal_journal import get_signal_journal
+from src.ml.feature_store import BAR_FEATURES, get_feature_store
+
 # Import existing confidence analyzer
 from src.utils.entry_confidence import EntryConfidenceAnalyzer
 
@@ -160,6 +163,7 @@ class MLEnhancedConfidenceAnalyzer(EntryConfidenceAnalyzer):
 
         # Extract technical indicators for ML prediction
         try:
+            live = not historical_data
             if not historical_data:
                 self.logger.debug(f"🔍 Fetching market data for {symbol}")
                 historical_data = self._fetch_market_data(symbol, days=30, current_price=current_price)
@@ -184,14 +188,24 @@ class MLEnhancedConfidenceAnalyzer(EntryConfidenceAnalyzer):
                 self.logger.debug(f"🔍 Using fallback indicators (no historical data)")
                 indicators = {'composite_confidence': traditional_analysis['confidence_score']}
 
+            if live:
+                # Serve the same closed-bar features the models are trained on
+                store = get_feature_store()
+                stored = store.latest(symbol, '1d')
+                if stored:
+                    indicators.update({k: stored[k] for k in BAR_FEATURES if stored.get(k) is not None})
+                    store.annotate(symbol, '1d', composite_confidence=traditional_analysis['confidence_score'])
+
             # Get ML prediction
             ml_results = self._get_ml_prediction(symbol, indicators)
 
-            # HYBRID SCORING: Combine traditional (60%) and ML (40%)
+            # HYBRID SCORING: Combine traditional and ML with the current dynamic weights
+            weights = self._get_hybrid_weights()
             hybrid_score = self._combine_traditional_and_ml_scores(
                 traditional_score=traditional_analysis['confidence_score'],
                 ml_probability=ml_results['ml_probability'],
-                ml_confidence=ml_results['ml_confidence']
+                ml_confidence=ml_results['ml_confidence'],
+                weights=weights
             )
 
             # HYBRID SIGNAL: Generate signal based on hybrid score thresholds
@@ -219,10 +233,10 @@ class MLEnhancedConfidenceAnalyzer(EntryConfidenceAnalyzer):
                     'enhancement_boost': round(hybrid_score - traditional_analysis['confidence_score'], 1)
                 },
                 'scoring_breakdown': {
-                    'heuristic_component': round(traditional_analysis['confidence_score'] * 0.6, 1),
-                    'ml_component': round(ml_results['ml_probability'] * 100 * 0.4, 1),
+                    'heuristic_component': round(traditional_analysis['confidence_score'] * weights[0], 1),
+                    'ml_component': round(ml_results['ml_probability'] * 100 * weights[1], 1),
                     'hybrid_total': round(hybrid_score, 1),
-                    'weights': {'heuristic': '60%', 'ml': '40%'}
+                    'weights': {'heuristic': f"{weights[0]:.0%}", 'ml': f"{weights[1]:.0%}"}
                 },
                 'analysis_type': 'HYBRID_ML_HEURISTIC',
                 'version': '3.0'
@@ -239,17 +253,28 @@ class MLEnhancedConfidenceAnalyzer(EntryConfidenceAnalyzer):
             traditional_analysis['analysis_type'] = 'TRADITIONAL_FALLBACK'
             return traditional_analysis
 
+    def _get_hybrid_weights(self) -> tuple[float, float]:
+        """Current (heuristic, ml) weights from the dynamic weighting engine (default 60/40)."""
+        try:
+            from src.utils.dynamic_weighting import get_dynamic_weighting
+            return get_dynamic_weighting().weights()
+        except Exception as e:
+            self.logger.debug(f"Dynamic weights unavailable: {e}")
+            return 0.6, 0.4
+
     def _combine_traditional_and_ml_scores(self, traditional_score: float,
-                                         ml_probability: float, ml_confidence: float) -> float:
+                                         ml_probability: float, ml_confidence: float,
+                                         weights: tuple[float, float] | None = None) -> float:
         """
-        HYBRID SCORING SYSTEM: Combine traditional heuristics (60%) with ML predictions (40%).
+        HYBRID SCORING SYSTEM: Combine traditional heuristics with ML predictions.
 
-        Formula: hybrid_score = 0.6 * confidence_score + 0.4 * (ml_probability * 100)
+        Formula: hybrid_score = ta_weight * confidence_score + ml_weight * (ml_probability * 100)
 
         Args:
             traditional_score: Score from 6-factor analysis (0-100)
             ml_probability: ML prediction probability (0-1)
             ml_confidence: ML confidence level (0-100)
+            weights: (heuristic, ml) weights; defaults to the current dynamic weights
 
         Returns:
             Hybrid confidence score (0-100)
@@ -257,22 +282,19 @@ class MLEnhancedConfidenceAnalyzer(EntryConfidenceAnalyzer):
         if not self.ml_enabled:
             return traditional_score
 
-        # HYBRID SCORING: Fixed 60/40 weight distribution
-        # 60% weight to traditional heuristic analysis
-        # 40% weight to ML probability prediction
-        heuristic_weight = 0.6
-        ml_weight = 0.4
+        # HYBRID SCORING: Weights track which score has predicted realized PnL
+        heuristic_weight, ml_weight = weights or self._get_hybrid_weights()
 
         # Convert ML probability to 0-100 scale to match traditional score
         ml_score = ml_probability * 100
 
-        # Calculate hybrid score with fixed weights
+        # Calculate hybrid score
         hybrid_score = (traditional_score * heuristic_weight) + (ml_score * ml_weight)
 
         # Ensure score stays within bounds
         final_score = max(0, min(100, hybrid_score))
 
-        self.logger.debug(f"🎯 HYBRID SCORING: Traditional={traditional_score:.1f} (60%) + ML={ml_score:.1f} (40%) = {final_score:.1f}")
+        self.logger.debug(f"🎯 HYBRID SCORING: Traditional={traditional_score:.1f} ({heuristic_weight:.0%}) + ML={ml_score:.1f} ({ml_weight:.0%}) = {final_score:.1f}")
 
         return final_score
 
@@ -313,31 +335,11 @@ class MLEnhancedConfidenceAnalyzer(EntryConfidenceAnalyzer):
 
     def _log_signal_for_training(self, symbol: str, current_price: float,
                                analysis: dict, indicators: dict) -> None:
-        """Log enhanced signal data for ML training and improvement."""
+        """Append the enhanced signal to the signal journal for ML training."""
         try:
-            # Try to import signal logger (optional)
-            try:
-                import os
-                import sys
-                # Add project root to path for signal logger import
-                project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-                if project_root not in sys.path:
-                    sys.path.append(project_root)
-                # Signal logging functionality - graceful fallback if not available
-                try:
-                    self.logger.debug(f"Enhanced signal generated for {symbol}: hybrid_score={enhanced_analysis.get('confidence_score', 0)}, ml_enabled={ml_results.get('ml_enabled', False)}")
-                except Exception:
-                    # Signal logging system not configured
-                    self.logger.debug("Signal logging not available")
-                    return
-            except (ImportError, AttributeError):
-                # Signal logging not available
-                self.logger.debug("Signal logging not available")
-                return
-
-            # Extract key data for logging
-            signal_data = {
+            get_signal_journal().append({
                 'symbol': symbol,
+                'source': 'ML_ENHANCED',
                 'current_price': current_price,
                 'confidence_score': analysis['confidence_score'],
                 'timing_signal': analysis['timing_signal'],
@@ -345,12 +347,8 @@ class MLEnhancedConfidenceAnalyzer(EntryConfidenceAnalyzer):
                 'traditional_score': analysis.get('ml_integration', {}).get('traditional_score', 0),
                 'rsi': indicators.get('rsi_14', 50),
                 'volatility': indicators.get('volatility_7', 10),
-                'volume_ratio': indicators.get('volume_ratio', 1),
-                'analysis_type': 'ML_ENHANCED'
-            }
-
-            # Log the signal (using debug logging instead of external signal logger)
-            self.logger.debug(f"Enhanced signal logged for {symbol}: {signal_data}")
+                'volume_ratio': indicators.get('volume_ratio', 1)
+            })
 
         except Exception as e:
             # Don't fail the main analysis if logging fails
@@ -458,6 +456,16 @@ class MLEnhancedConfidenceAnalyzer(EntryConfidenceAnalyzer):
             'signal_logging_enabled': True
         }
 
+# Global instance
+_ml_confidence_analyzer = None
+
+def get_ml_confidence_analyzer() -> MLEnhancedConfidenceAnalyzer:
+    """Get singleton ML-enhanced confidence analyzer instance."""
+    global _ml_confidence_analyzer
+    if _ml_confidence_analyzer is None:
+        _ml_confidence_analyzer = MLEnhancedConfidenceAnalyzer()
+    return _ml_confidence_analyzer
+
 # Convenience function for backward compatibility
 def calculate_ml_enhanced_confidence(symbol: str, current_price: float,
                                    historical_data: list[dict] | None = None) -> dict:
@@ -472,8 +480,8 @@ def calculate_ml_enhanced_confidence(symbol: str, current_price: float,
     Returns:
         Enhanced confidence analysis with ML integration
     """
-    analyzer = MLEnhancedConfidenceAnalyzer()
+    analyzer = get_ml_confidence_analyzer()
     return analyzer.calculate_enhanced_confidence(symbol, current_price, historical_data)
 
 # Export the main class and convenience function
-__all__ = ['MLEnhancedConfidenceAnalyzer', 'calculate_ml_enhanced_confidence']
+__all__ = ['MLEnhancedConfidenceAnalyzer', 'calculate_ml_enhanced_confidence', 'get_ml_confidence_analyzer']
@@ -0,0 +1,438 @@
+"""
+Performance metrics for equity curves and closed trades.
+
+Two flavours share one set of definitions:
+
+- Batch functions that work on raw NumPy arrays (equity values, per-trade
+  PnL, position sizes). The backtest engines use these.
+- ``StreamingMetrics``, an accumulator that live traders and the dashboard
+  update once per equity snapshot or closed trade in O(1) time. It keeps
+  running moments (Welford), the running peak and drawdown, and trade
+  totals, so a snapshot never rescans history.
+
+Returns are annualized from the bar timeframe, e.g. ``'1h'`` gives
+365 * 24 periods per year because crypto trades around the clock. When no
+timeframe is given, the batch functions use the median timestamp spacing
+and the accumulator uses the mean spacing since its first sample.
+Undefined ratios (no volatility, no drawdown, no losing trade) are 0.0.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_YEAR = 365 * 86400
+DEFAULT_PERIODS_PER_YEAR = 365 * 24
+
+TIMEFRAME_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '8h': 28800, '12h': 43200,
+    '1d': 86400, '3d': 3 * 86400, '1w': 7 * 86400,
+}
+
+
+def periods_per_year(timeframe: str | float) -> float:
+    """
+    Number of bars per year for a timeframe.
+
+    Args:
+        timeframe: Timeframe string (e.g. ``'1h'``) or bar length in seconds
+
+    Returns:
+        Bars per year
+    """
+    if isinstance(timeframe, str):
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unknown timeframe: {timeframe}")
+        seconds = TIMEFRAME_SECONDS[timeframe]
+    else:
+        seconds = float(timeframe)
+    if seconds <= 0:
+        raise ValueError("Bar length must be positive")
+    return SECONDS_PER_YEAR / seconds
+
+
+def infer_periods_per_year(timestamps: Any) -> float:
+    """
+    Bars per year from the median spacing of timestamps.
+
+    Args:
+        timestamps: Epoch seconds, datetime64 values or a DatetimeIndex
+
+    Returns:
+        Bars per year (hourly when fewer than two timestamps)
+    """
+    if isinstance(timestamps, pd.DatetimeIndex | pd.Series) or \
+            np.issubdtype(np.asarray(timestamps).dtype, np.datetime64):
+        index = pd.DatetimeIndex(timestamps)
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        seconds = ((index - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)).to_numpy(float)
+    else:
+        seconds = np.asarray(timestamps, dtype=float)
+    if len(seconds) < 2:
+        return DEFAULT_PERIODS_PER_YEAR
+    spacing = float(np.median(np.diff(seconds)))
+    return SECONDS_PER_YEAR / spacing if spacing > 0 else DEFAULT_PERIODS_PER_YEAR
+
+
+def simple_returns(values: np.ndarray) -> np.ndarray:
+    """Period-over-period returns of an equity curve."""
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return np.empty(0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(values) / values[:-1]
+    return np.where(np.isfinite(returns), returns, 0.0)
+
+
+def sharpe_ratio(returns: np.ndarray, periods: float = DEFAULT_PERIODS_PER_YEAR) -> float:
+    """Annualized mean return over annualized volatility."""
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) < 2:
+        return 0.0
+    std = returns.std(ddof=1)
+    return float(returns.mean() / std * math.sqrt(periods)) if std > 0 else 0.0
+
+
+def sortino_ratio(returns: np.ndarray, periods: float = DEFAULT_PERIODS_PER_YEAR) -> float:
+    """Annualized mean return over downside deviation (below a zero target)."""
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) < 2:
+        return 0.0
+    downside = math.sqrt(float(np.mean(np.minimum(returns, 0.0) ** 2)))
+    return float(returns.mean() / downside * math.sqrt(periods)) if downside > 0 else 0.0
+
+
+def drawdown_series(values: np.ndarray) -> np.ndarray:
+    """Drawdown from the running peak at every bar (0 or negative fractions)."""
+    values = np.asarray(values, dtype=float)
+    peaks = np.maximum.accumulate(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = (values - peaks) / peaks
+    return np.where(peaks > 0, drawdown, 0.0)
+
+
+def max_drawdown(values: np.ndarray) -> tuple[float, int]:
+    """
+    Deepest drawdown and the longest time spent below a previous peak.
+
+    Args:
+        values: Equity curve
+
+    Returns:
+        Tuple of (max drawdown as a negative fraction, duration in bars)
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return 0.0, 0
+    positions = np.arange(len(values))
+    at_peak = values >= np.maximum.accumulate(values)
+    last_peak = np.maximum.accumulate(np.where(at_peak, positions, 0))
+    return float(drawdown_series(values).min()), int((positions - last_peak).max())
+
+
+def annualized_return(total_return: float, n_periods: int, periods: float = DEFAULT_PERIODS_PER_YEAR) -> float:
+    """Compound annual growth rate of a total return earned over ``n_periods`` bars."""
+    if n_periods <= 0 or total_return <= -1:
+        return -1.0 if total_return <= -1 else 0.0
+    try:
+        return float((1 + total_return) ** (periods / n_periods) - 1)
+    except OverflowError:
+        return math.inf
+
+
+def calmar_ratio(annual_return: float, max_dd: float) -> float:
+    """Annualized return over the absolute max drawdown."""
+    if max_dd >= 0 or not math.isfinite(annual_return):
+        return 0.0
+    return float(annual_return / abs(max_dd))
+
+
+def trade_statistics(trade_pnls: np.ndarray) -> dict[str, float]:
+    """
+    Win rate, average win/loss and profit factor of closed trades.
+
+    Args:
+        trade_pnls: Realized PnL of each closed trade
+
+    Returns:
+        Trade statistics dictionary
+    """
+    pnls = np.asarray(trade_pnls, dtype=float)
+    wins, losses = pnls[pnls > 0], pnls[pnls < 0]
+    gross_profit, gross_loss = float(wins.sum()), float(-losses.sum())
+    return {
+        'closed_trades': len(pnls),
+        'win_rate': len(wins) / len(pnls) if len(pnls) else 0.0,
+        'avg_trade_pnl': float(pnls.mean()) if len(pnls) else 0.0,
+        'avg_win': float(wins.mean()) if len(wins) else 0.0,
+        'avg_loss': float(losses.mean()) if len(losses) else 0.0,
+        'profit_factor': gross_profit / gross_loss if gross_loss > 0 else 0.0,
+    }
+
+
+def exposure(positions: np.ndarray) -> float:
+    """Fraction of bars with an open position."""
+    positions = np.asarray(positions, dtype=float)
+    return float(np.count_nonzero(positions) / len(positions)) if len(positions) else 0.0
+
+
+def rolling_sharpe(returns: np.ndarray, window: int, periods: float = DEFAULT_PERIODS_PER_YEAR) -> np.ndarray:
+    """
+    Sharpe ratio over a sliding window of returns.
+
+    Args:
+        returns: Period returns
+        window: Window length in bars
+        periods: Bars per year
+
+    Returns:
+        Array aligned with ``returns`` (NaN until the first full window)
+    """
+    mean, std = _rolling_moments(returns, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * math.sqrt(periods), 0.0)
+    return np.where(np.isnan(mean), np.nan, sharpe)
+
+
+def rolling_volatility(returns: np.ndarray, window: int, periods: float = DEFAULT_PERIODS_PER_YEAR) -> np.ndarray:
+    """Annualized volatility over a sliding window (NaN until the first full window)."""
+    _, std = _rolling_moments(returns, window)
+    return std * math.sqrt(periods)
+
+
+def rolling_max_drawdown(values: np.ndarray, window: int) -> np.ndarray:
+    """Deepest drawdown inside each sliding window of the equity curve (NaN until full)."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if window < 1 or len(values) < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values, window)
+    peaks = np.maximum.accumulate(windows, axis=1)
+    out[window - 1:] = ((windows - peaks) / peaks).min(axis=1)
+    return out
+
+
+def _rolling_moments(returns: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """Sliding mean and sample standard deviation from cumulative sums."""
+    returns = np.asarray(returns, dtype=float)
+    n = len(returns)
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if window < 2 or n < window:
+        return mean, std
+    c1 = np.concatenate(([0.0], np.cumsum(returns)))
+    c2 = np.concatenate(([0.0], np.cumsum(returns * returns)))
+    s1 = c1[window:] - c1[:-window]
+    s2 = c2[window:] - c2[:-window]
+    mean[window - 1:] = s1 / window
+    std[window - 1:] = np.sqrt(np.maximum(s2 - s1 * s1 / window, 0.0) / (window - 1))
+    return mean, std
+
+
+def compute_metrics(values: np.ndarray, trade_pnls: np.ndarray | None = None,
+                    positions: np.ndarray | None = None, timestamps: Any = None,
+                    timeframe: str | float | None = None,
+                    initial_capital: float | None = None) -> dict[str, float]:
+    """
+    Full metric set for an equity curve.
+
+    Args:
+        values: Equity at every bar
+        trade_pnls: Realized PnL of each closed trade
+        positions: Position size at every bar (for exposure)
+        timestamps: Bar timestamps, used for annualization without ``timeframe``
+        timeframe: Bar timeframe (e.g. ``'1h'``) or bar length in seconds
+        initial_capital: Starting equity (default: first value)
+
+    Returns:
+        Metrics dictionary of plain floats (empty when there are no values)
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return {}
+    if timeframe is not None:
+        periods = periods_per_year(timeframe)
+    elif timestamps is not None:
+        periods = infer_periods_per_year(timestamps)
+    else:
+        periods = DEFAULT_PERIODS_PER_YEAR
+
+    start = float(initial_capital) if initial_capital else float(values[0])
+    final_value = float(values[-1])
+    total_return = (final_value - start) / start if start else 0.0
+    returns = simple_returns(values)
+    volatility = float(returns.std(ddof=1) * math.sqrt(periods)) if len(returns) > 1 else 0.0
+    annual = annualized_return(total_return, len(returns), periods)
+    dd, dd_duration = max_drawdown(values)
+
+    metrics = {
+        'initial_capital': start,
+        'final_value': final_value,
+        'total_return': total_return,
+        'annualized_return': annual,
+        'volatility': volatility,
+        'sharpe_ratio': sharpe_ratio(returns, periods),
+        'sortino_ratio': sortino_ratio(returns, periods),
+        'max_drawdown': dd,
+        'max_drawdown_duration': dd_duration,
+        'calmar_ratio': calmar_ratio(annual, dd),
+        'exposure': exposure(positions) if positions is not None else 0.0,
+        'periods_per_year': periods,
+    }
+    metrics.update(trade_statistics(trade_pnls if trade_pnls is not None else np.empty(0)))
+    return metrics
+
+
+class StreamingMetrics:
+    """O(1)-per-update accumulator matching ``compute_metrics``."""
+
+    def __init__(self, initial_value: float | None = None, timeframe: str | float | None = None):
+        """
+        Initialize the accumulator.
+
+        Args:
+            initial_value: Starting equity (default: first update)
+            timeframe: Snapshot cadence for annualization (default: inferred
+                from the timestamps passed to ``update``)
+        """
+        self._lock = threading.Lock()
+        self._periods = periods_per_year(timeframe) if timeframe is not None else None
+        self._initial = initial_value
+        self._first_value: float | None = None
+        self._last_value: float | None = None
+        self._first_ts: float | None = None
+        self._last_ts: float | None = None
+        self._bars = 0
+        self._exposed_bars = 0
+        # Welford moments of period returns plus the downside sum of squares
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._downside_sq = 0.0
+        self._peak = -math.inf
+        self._max_dd = 0.0
+        self._bars_below_peak = 0
+        self._max_dd_duration = 0
+        # Closed trades
+        self._trades = 0
+        self._wins = 0
+        self._losses = 0
+        self._pnl_sum = 0.0
+        self._gross_profit = 0.0
+        self._gross_loss = 0.0
+
+    def update(self, value: float, ts: float | None = None, exposed: bool | None = None) -> None:
+        """
+        Add one equity snapshot.
+
+        Args:
+            value: Portfolio equity
+            ts: Snapshot time in epoch seconds
+            exposed: Whether a position was open (counted towards exposure)
+        """
+        value = float(value)
+        if not math.isfinite(value):
+            return
+        with self._lock:
+            if self._first_value is None:
+                self._first_value = value
+                self._first_ts = ts
+            else:
+                r = value / self._last_value - 1 if self._last_value else 0.0
+                self._n += 1
+                delta = r - self._mean
+                self._mean += delta / self._n
+                self._m2 += delta * (r - self._mean)
+                if r < 0:
+                    self._downside_sq += r * r
+            self._last_value = value
+            if ts is not None:
+                self._last_ts = ts
+            self._bars += 1
+            if exposed:
+                self._exposed_bars += 1
+
+            if value >= self._peak:
+                self._peak = value
+                self._bars_below_peak = 0
+            else:
+                self._bars_below_peak += 1
+                self._max_dd_duration = max(self._max_dd_duration, self._bars_below_peak)
+                if self._peak > 0:
+                    self._max_dd = min(self._max_dd, (value - self._peak) / self._peak)
+
+    def record_trade(self, pnl: float) -> None:
+        """
+        Add one closed trade.
+
+        Args:
+            pnl: Realized PnL of the trade
+        """
+        pnl = float(pnl)
+        with self._lock:
+            self._trades += 1
+            self._pnl_sum += pnl
+            if pnl > 0:
+                self._wins += 1
+                self._gross_profit += pnl
+            elif pnl < 0:
+                self._losses += 1
+                self._gross_loss -= pnl
+
+    @property
+    def last_ts(self) -> float | None:
+        """Timestamp of the latest snapshot."""
+        return self._last_ts
+
+    def _periods_per_year(self) -> float:
+        if self._periods is not None:
+            return self._periods
+        if self._n and self._first_ts is not None and self._last_ts is not None and self._last_ts > self._first_ts:
+            return self._n * SECONDS_PER_YEAR / (self._last_ts - self._first_ts)
+        return DEFAULT_PERIODS_PER_YEAR
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Current metrics.
+
+        Returns:
+            Metrics dictionary with the keys of ``compute_metrics`` (empty
+            before the first update)
+        """
+        with self._lock:
+            if self._first_value is None:
+                return {}
+            periods = self._periods_per_year()
+            start = self._initial or self._first_value
+            total_return = (self._last_value - start) / start if start else 0.0
+            std = math.sqrt(self._m2 / (self._n - 1)) if self._n > 1 else 0.0
+            downside = math.sqrt(self._downside_sq / self._n) if self._n else 0.0
+            annual = annualized_return(total_return, self._n, periods)
+            losses_mean = -self._gross_loss / self._losses if self._losses else 0.0
+            return {
+                'initial_capital': start,
+                'final_value': self._last_value,
+                'total_return': total_return,
+                'annualized_return': annual,
+                'volatility': std * math.sqrt(periods),
+                'sharpe_ratio': self._mean / std * math.sqrt(periods) if std > 0 and self._n > 1 else 0.0,
+                'sortino_ratio': self._mean / downside * math.sqrt(periods) if downside > 0 and self._n > 1 else 0.0,
+                'max_drawdown': self._max_dd,
+                'max_drawdown_duration': self._max_dd_duration,
+                'calmar_ratio': calmar_ratio(annual, self._max_dd),
+                'exposure': self._exposed_bars / self._bars if self._bars else 0.0,
+                'periods_per_year': periods,
+                'closed_trades': self._trades,
+                'win_rate': self._wins / self._trades if self._trades else 0.0,
+                'avg_trade_pnl': self._pnl_sum / self._trades if self._trades else 0.0,
+                'avg_win': self._gross_profit / self._wins if self._wins else 0.0,
+                'avg_loss': losses_mean,
+                'profit_factor': self._gross_profit / self._gross_loss if self._gross_loss > 0 else 0.0,
+            }
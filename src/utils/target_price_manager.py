@@ -2,16 +2,53 @@
 """
 Target Price Manager - Locks target buy prices to prevent exponential recalculation.
 Now uses intelligent 3-day momentum analysis instead of simple discounts.
+
+The ``target_prices`` table is the single source of truth shared by every
+gunicorn worker. Each worker serves lookups from an in-memory copy that it
+reloads whenever the table's version counter (``target_prices_meta``) moves,
+and re-reads before calculating anything on a miss. New targets are stored
+with a compare-and-set, so two workers racing on the same symbol both end up
+with the row that was committed first.
+
+Every worker runs a sync thread that reloads changed targets and batches
+"target was used" marks into SQLite; only the worker holding the
+``<db>.targets.lock`` leader lock renews targets shortly before their lock
+expires (if they were used during it) and drops unused ones.
 """
 
+import atexit
+import heapq
 import logging
+import os
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from typing import Any
 
-from src.utils.entry_confidence import EntryConfidenceAnalyzer
+from src.utils.leader_lock import LeaderLock
 
 logger = logging.getLogger(__name__)
 
+LOCK_DURATION = timedelta(hours=24)
+# Recompute targets this long before their lock expires
+REFRESH_AHEAD_SEC = 300.0
+FLUSH_INTERVAL_SEC = 5.0
+TICK_SEC = 1.0
+
+_COLUMNS = ('symbol, target_price, original_market_price, calculated_at, '
+            'locked_until, tier, discount_percent')
+
+
+def _expires_at(locked_until: str) -> float:
+    """Epoch seconds for a stored ``locked_until`` (0 if unparseable)."""
+    try:
+        return datetime.fromisoformat(locked_until).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
 class TargetPriceManager:
     """
     Manages locked target buy prices to prevent constant recalculation.
@@ -20,43 +57,191 @@ class TargetPriceManager:
     - Locks target prices for 24 hours once calculated
     - Allows updates only if market drops significantly (>5%)
     - Provides manual reset capability
-    - Persistent storage in SQLite
+    - Persistent storage in SQLite, shared by all worker processes
     """
 
-    def __init__(self, db_path: str = "trading.db"):
+    def __init__(self, db_path: str = "trading.db", analyzer: Any = None):
+        """
+        Initialize the manager and load locked targets into memory.
+
+        Args:
+            db_path: Path to SQLite database file
+            analyzer: ``EntryConfidenceAnalyzer`` used for targets (default: shared instance)
+        """
         self.db_path = db_path
-        self.confidence_analyzer = EntryConfidenceAnalyzer()  # INTEGRATION: Use 3-day algorithm
+        self._analyzer = analyzer
+        self._lock = threading.Lock()
+        self._targets: dict[str, dict[str, Any]] = {}
+        # (locked_until epoch, symbol); stale entries are skipped when popped
+        self._expiry_heap: list[tuple[float, str]] = []
+        # Version of target_prices the in-memory table reflects
+        self._version = -1
+        # symbol -> (market price, epoch) of lookups not yet written to SQLite
+        self._used: dict[str, tuple[float, float]] = {}
+        self._leader = LeaderLock(f"{db_path}.targets.lock", self._on_leader)
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.refreshes = 0
         self._init_database()
+        self._sync()
+
+    @property
+    def confidence_analyzer(self) -> Any:
+        # INTEGRATION: Use 3-day algorithm
+        if self._analyzer is None:
+            from src.utils.entry_confidence import get_confidence_analyzer
+            self._analyzer = get_confidence_analyzer()
+        return self._analyzer
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit; multi-statement writes open their own transaction
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that also bumps the table version on commit."""
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.execute('UPDATE target_prices_meta SET version = version + 1 WHERE id = 1')
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
 
     def _init_database(self):
         """Initialize target prices table."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS target_prices (
-                    symbol TEXT PRIMARY KEY,
-                    target_price REAL NOT NULL,
-                    original_market_price REAL NOT NULL,
-                    calculated_at TIMESTAMP NOT NULL,
-                    locked_until TIMESTAMP NOT NULL,
-                    tier TEXT DEFAULT 'altcoin',
-                    discount_percent REAL DEFAULT 8.0
-                )
-            ''')
-
-            conn.commit()
-            conn.close()
+            with self._connect() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS target_prices (
+                        symbol TEXT PRIMARY KEY,
+                        target_price REAL NOT NULL,
+                        original_market_price REAL NOT NULL,
+                        calculated_at TIMESTAMP NOT NULL,
+                        locked_until TIMESTAMP NOT NULL,
+                        tier TEXT DEFAULT 'altcoin',
+                        discount_percent REAL DEFAULT 8.0,
+                        last_price REAL,
+                        last_used REAL
+                    )
+                ''')
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(target_prices)')}
+                for column in ('last_price', 'last_used'):
+                    if column not in columns:
+                        conn.execute(f'ALTER TABLE target_prices ADD COLUMN {column} REAL')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS target_prices_meta (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        version INTEGER NOT NULL
+                    )
+                ''')
+                conn.execute('INSERT OR IGNORE INTO target_prices_meta (id, version) VALUES (1, 0)')
             logger.info("Target prices database initialized successfully")
 
         except Exception as e:
             logger.error(f"Failed to initialize target prices database: {e}")
 
+    def _sync(self) -> bool:
+        """
+        Reload the in-memory table if another writer changed ``target_prices``.
+
+        Returns:
+            True if the table was reloaded
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute('SELECT version FROM target_prices_meta WHERE id = 1').fetchone()
+                version = row[0] if row else 0
+                if version == self._version:
+                    return False
+                rows = conn.execute(f'SELECT {_COLUMNS} FROM target_prices').fetchall()
+        except Exception as e:
+            logger.error(f"Error loading target prices: {e}")
+            return False
+
+        targets = {}
+        for symbol, target_price, original_price, calculated_at, locked_until, tier, discount in rows:
+            targets[symbol] = {
+                'target_price': target_price,
+                'original_market_price': original_price,
+                'calculated_at': calculated_at,
+                'locked_until': locked_until,
+                'expires': _expires_at(locked_until),
+                'tier': tier,
+                'discount_percent': discount
+            }
+        with self._lock:
+            self._targets = targets
+            self._expiry_heap = [(entry['expires'], symbol) for symbol, entry in targets.items()]
+            heapq.heapify(self._expiry_heap)
+            self._version = version
+        logger.debug(f"Loaded {len(targets)} target prices (version {version})")
+        return True
+
+    def _on_leader(self) -> None:
+        """Renewals now happen here; the other workers only sync and report usage."""
+        logger.info(f"🎯 Target price refresher active in pid {os.getpid()}")
+
+    def start(self) -> None:
+        """Start the sync thread (idempotent); it refreshes targets only while leader."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="target-price-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sync thread, write outstanding usage marks and step down as leader."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self.flush()
+        self._leader.release()
+
+    def _run(self) -> None:
+        last_flush = time.time()
+        while not self._stop.is_set():
+            try:
+                if self._leader.acquire():
+                    self.refresh_due()
+                    last_flush = time.time()
+                else:
+                    self._sync()
+                    if time.time() - last_flush >= FLUSH_INTERVAL_SEC:
+                        self.flush()
+                        last_flush = time.time()
+            except Exception as e:
+                logger.error(f"Target price refresher error: {e}")
+            self._stop.wait(TICK_SEC)
+
+    def _valid_entry(self, symbol: str, current_market_price: float) -> dict[str, Any] | None:
+        """The locked entry for ``symbol``, or None if missing, expired or undercut by >5%."""
+        with self._lock:
+            entry = self._targets.get(symbol)
+        if entry is None or time.time() >= entry['expires']:
+            return None
+        original_price = entry['original_market_price']
+        # Check if market has dropped significantly (>5% from original)
+        price_drop_percent = ((original_price - current_market_price) / original_price) * 100
+        if price_drop_percent > 5.0:
+            return None
+        return entry
+
     def get_locked_target_price(self, symbol: str, current_market_price: float) -> tuple[float, bool]:
         """
         Get locked target price for a symbol. Returns (target_price, is_locked).
 
+        On a miss, an expired lock or a >5% drop the shared table is re-read
+        first (another worker may already have locked a new target) and only
+        then is a target calculated and stored.
+
         Args:
             symbol: Cryptocurrency symbol
             current_market_price: Current market price
@@ -65,46 +250,101 @@ class TargetPriceManager:
             tuple: (target_price, is_locked) where is_locked indicates if price is locked
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                SELECT target_price, original_market_price, calculated_at, locked_until, discount_percent
-                FROM target_prices
-                WHERE symbol = ?
-            ''', (symbol,))
+            with self._lock:
+                self._used[symbol] = (current_market_price, time.time())
+
+            entry = self._valid_entry(symbol, current_market_price)
+            if entry is None and self._sync():
+                entry = self._valid_entry(symbol, current_market_price)
+            if entry is not None:
+                return entry['target_price'], True
+
+            with self._lock:
+                stale = self._targets.get(symbol)
+            if stale is None:
+                logger.info(f"{symbol}: No existing target price, calculating new one")
+            elif time.time() >= stale['expires']:
+                logger.info(f"{symbol}: Target price lock expired, recalculating")
+            else:
+                logger.info(f"{symbol}: Market dropped >5% from {stale['original_market_price']}, "
+                            "recalculating target")
+            return self._calculate_new_target(symbol, current_market_price,
+                                              replaces=stale['calculated_at'] if stale else None)
 
-            result = cursor.fetchone()
-            conn.close()
+        except Exception as e:
+            logger.error(f"Error getting locked target price for {symbol}: {e}")
+            return current_market_price * 0.98, False
 
-            if result:
-                target_price, original_price, calculated_at, locked_until, discount_percent = result
-                locked_until_dt = datetime.fromisoformat(locked_until)
+    def refresh_due(self, now: float | None = None) -> int:
+        """
+        Renew locks that are about to expire (leader only).
 
-                # Check if lock is still valid
-                if datetime.now() < locked_until_dt:
-                    # Check if market has dropped significantly (>5% from original)
-                    price_drop_percent = ((original_price - current_market_price) / original_price) * 100
+        Only targets looked up during their current lock, by any worker, are
+        renewed; the rest are deleted when they expire.
 
-                    if price_drop_percent > 5.0:
-                        logger.info(f"{symbol}: Market dropped {price_drop_percent:.1f}%, recalculating target")
-                        return self._calculate_new_target(symbol, current_market_price)
+        Args:
+            now: Current epoch seconds (defaults to now)
 
-                    logger.debug(f"{symbol}: Using locked target ${target_price:.8f} (locked until {locked_until})")
-                    return target_price, True
-                else:
-                    logger.info(f"{symbol}: Target price lock expired, recalculating")
-                    return self._calculate_new_target(symbol, current_market_price)
+        Returns:
+            Number of targets recalculated
+        """
+        now = time.time() if now is None else now
+        self.flush()
+        self._sync()
+        with self._lock:
+            due = []
+            while self._expiry_heap and self._expiry_heap[0][0] <= now + REFRESH_AHEAD_SEC:
+                expires, symbol = heapq.heappop(self._expiry_heap)
+                entry = self._targets.get(symbol)
+                if entry is not None and entry['expires'] == expires:
+                    due.append((expires, symbol, entry['calculated_at']))
+        if not due:
+            return 0
+
+        placeholders = ','.join('?' * len(due))
+        with self._connect() as conn:
+            usage = {
+                symbol: (price, used) for symbol, price, used in conn.execute(
+                    f'SELECT symbol, last_price, last_used FROM target_prices WHERE symbol IN ({placeholders})',
+                    [symbol for _, symbol, _ in due])
+            }
+
+        refreshed = 0
+        deferred = []
+        expired = []
+        for expires, symbol, calculated_at in due:
+            price, used = usage.get(symbol, (None, None))
+            if price and used and used >= expires - LOCK_DURATION.total_seconds():
+                _, locked = self._calculate_new_target(symbol, price, replaces=calculated_at)
+                refreshed += locked
+                if not locked:
+                    deferred.append((expires, symbol))
+            elif expires <= now:
+                expired.append((symbol, calculated_at))
             else:
-                logger.info(f"{symbol}: No existing target price, calculating new one")
-                return self._calculate_new_target(symbol, current_market_price)
-
-        except Exception as e:
-            logger.error(f"Error getting locked target price for {symbol}: {e}")
-            return self._calculate_new_target(symbol, current_market_price)
+                # Not used since the last renewal; check again once it has expired
+                deferred.append((expires, symbol))
+
+        if expired:
+            with self._transaction() as conn:
+                conn.executemany('DELETE FROM target_prices WHERE symbol = ? AND calculated_at = ?', expired)
+            self._sync()
+        with self._lock:
+            for item in deferred:
+                heapq.heappush(self._expiry_heap, item)
+        self.refreshes += refreshed
+        return refreshed
+
+    def _calculate_new_target(self, symbol: str, current_price: float,
+                              replaces: str | None = None) -> tuple[float, bool]:
+        """
+        Calculate and lock a new target price using INTELLIGENT 3-DAY ALGORITHM.
 
-    def _calculate_new_target(self, symbol: str, current_price: float) -> tuple[float, bool]:
-        """Calculate and lock a new target price using INTELLIGENT 3-DAY ALGORITHM."""
+        Args:
+            symbol: Cryptocurrency symbol
+            current_price: Current market price
+            replaces: ``calculated_at`` of the row this target supersedes (None on a miss)
+        """
         try:
             # 🎯 REVOLUTIONARY CHANGE: Use confidence analyzer's 3-day momentum algorithm!
             confidence_data = self.confidence_analyzer.calculate_confidence(
@@ -134,14 +374,14 @@ class TargetPriceManager:
             discount_percent = ((current_price - target_price) / current_price) * 100
 
             # Lock for 24 hours
-            lock_duration = timedelta(hours=24)
-            locked_until = datetime.now() + lock_duration
-
-            # Save to database
-            self._save_target_price(symbol, target_price, current_price, locked_until, tier, discount_percent)
-
-            logger.info(f"🎯 {symbol}: INTELLIGENT TARGET ${target_price:.8f} ({discount_percent:.1f}% discount, "
-                       f"confidence: {confidence_score:.1f}), locked until {locked_until.strftime('%H:%M %d/%m')}")
+            locked_until = datetime.now() + LOCK_DURATION
+
+            target_price, stored = self._save_target_price(symbol, target_price, current_price, locked_until,
+                                                           tier, discount_percent, replaces)
+            if stored:
+                logger.info(f"🎯 {symbol}: INTELLIGENT TARGET ${target_price:.8f} ({discount_percent:.1f}% "
+                            f"discount, confidence: {confidence_score:.1f}), "
+                            f"locked until {locked_until.strftime('%H:%M %d/%m')}")
             return target_price, True
 
         except Exception as e:
@@ -150,116 +390,126 @@ class TargetPriceManager:
             return current_price * 0.98, False
 
     def _save_target_price(self, symbol: str, target_price: float, original_price: float,
-                          locked_until: datetime, tier: str, discount_percent: float):
-        """Save target price to database."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+                           locked_until: datetime, tier: str, discount_percent: float,
+                           replaces: str | None) -> tuple[float, bool]:
+        """
+        Store a target unless another worker locked a newer one first.
 
-            cursor.execute('''
-                INSERT OR REPLACE INTO target_prices
-                (symbol, target_price, original_market_price, calculated_at, locked_until, tier, discount_percent)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (symbol, target_price, original_price, datetime.now().isoformat(),
-                  locked_until.isoformat(), tier, discount_percent))
+        Returns:
+            (locked target price, True if ours was stored / False if theirs was kept)
+        """
+        row = (symbol, target_price, original_price, datetime.now().isoformat(),
+               locked_until.isoformat(), tier, discount_percent)
+        with self._transaction() as conn:
+            current = conn.execute(
+                'SELECT target_price, calculated_at, locked_until FROM target_prices WHERE symbol = ?',
+                (symbol,)).fetchone()
+            if current is None or current[1] == replaces or _expires_at(current[2]) <= time.time():
+                conn.execute(f'INSERT OR REPLACE INTO target_prices ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             row)
+                current = None
+        self._sync()
+        if current is not None:
+            return current[0], False
+        return target_price, True
+
+    def flush(self) -> int:
+        """
+        Write this worker's pending usage marks to SQLite.
 
-            conn.commit()
-            conn.close()
+        The leader reads them to decide which targets to renew; they do not
+        change the table version, so other workers do not reload for them.
 
+        Returns:
+            Number of symbols marked
+        """
+        with self._lock:
+            if not self._used:
+                return 0
+            used, self._used = self._used, {}
+        try:
+            with self._connect() as conn:
+                conn.executemany('''
+                    UPDATE target_prices
+                    SET last_price = ?, last_used = ?
+                    WHERE symbol = ? AND COALESCE(last_used, 0) <= ?
+                ''', [(price, ts, symbol, ts) for symbol, (price, ts) in used.items()])
+            return len(used)
         except Exception as e:
-            logger.error(f"Error saving target price for {symbol}: {e}")
+            logger.error(f"Error saving target price usage: {e}")
+            with self._lock:
+                # Keep newer marks made while writing
+                for symbol, mark in used.items():
+                    self._used.setdefault(symbol, mark)
+            return 0
 
     def reset_all_target_prices(self):
         """Clear ALL target prices to force recalculation with INTELLIGENT 3-DAY ALGORITHM."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Get count first
-            cursor.execute('SELECT COUNT(*) FROM target_prices')
-            count = cursor.fetchone()[0]
-
-            cursor.execute('DELETE FROM target_prices')
-            conn.commit()
-            conn.close()
+            with self._transaction() as conn:
+                count = conn.execute('DELETE FROM target_prices').rowcount
+            self._sync()
             logger.info(f"🎯 ALGORITHM UPGRADE: Cleared {count} old targets - will now use intelligent 3-day momentum analysis!")
         except Exception as e:
             logger.error(f"Error clearing all target prices: {e}")
 
     def reset_target_price(self, symbol: str):
-        """Manually reset a target price (force recalculation on next request)."""
+        """Manually reset a target price in every worker (force recalculation on next request)."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('DELETE FROM target_prices WHERE symbol = ?', (symbol,))
-            conn.commit()
-            conn.close()
-
+            with self._transaction() as conn:
+                conn.execute('DELETE FROM target_prices WHERE symbol = ?', (symbol,))
+            self._sync()
             logger.info(f"Reset target price for {symbol}")
-
         except Exception as e:
             logger.error(f"Error resetting target price for {symbol}: {e}")
 
     def get_all_locked_targets(self) -> dict[str, dict]:
         """Get all currently locked target prices."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                SELECT symbol, target_price, original_market_price, calculated_at,
-                       locked_until, tier, discount_percent
-                FROM target_prices
-                WHERE locked_until > datetime('now')
-                ORDER BY symbol
-            ''')
-
-            results = cursor.fetchall()
-            conn.close()
-
-            locked_targets = {}
-            for row in results:
-                symbol, target_price, original_price, calculated_at, locked_until, tier, discount = row
-                locked_targets[symbol] = {
-                    'target_price': target_price,
-                    'original_market_price': original_price,
-                    'calculated_at': calculated_at,
-                    'locked_until': locked_until,
-                    'tier': tier,
-                    'discount_percent': discount
-                }
-
-            return locked_targets
-
-        except Exception as e:
-            logger.error(f"Error getting all locked targets: {e}")
-            return {}
+        self._sync()
+        now = time.time()
+        with self._lock:
+            return {
+                symbol: {k: v for k, v in entry.items() if k != 'expires'}
+                for symbol, entry in sorted(self._targets.items())
+                if entry['expires'] > now
+            }
 
     def cleanup_expired_targets(self):
-        """Remove expired target prices from database."""
+        """Remove expired target prices from the database (and so from every worker)."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("DELETE FROM target_prices WHERE locked_until < datetime('now')")
-            deleted_count = cursor.rowcount
-
-            conn.commit()
-            conn.close()
-
-            if deleted_count > 0:
-                logger.info(f"Cleaned up {deleted_count} expired target prices")
-
+            now = datetime.now().isoformat()
+            with self._transaction() as conn:
+                count = conn.execute('DELETE FROM target_prices WHERE locked_until <= ?', (now,)).rowcount
+            self._sync()
+            if count:
+                logger.info(f"Cleaned up {count} expired target prices")
         except Exception as e:
-            logger.error(f"Error cleaning up expired targets: {e}")
+            logger.error(f"Error cleaning up expired target prices: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        """Sync thread / refresher diagnostics."""
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "leader": self._leader.held,
+                "targets": len(self._targets),
+                "version": self._version,
+                "unsaved_usage": len(self._used),
+                "refreshes": self.refreshes,
+            }
 
 # Global instance
-_target_manager = None
+_target_manager: TargetPriceManager | None = None
+_target_manager_lock = threading.Lock()
 
 def get_target_price_manager() -> TargetPriceManager:
-    """Get singleton target price manager instance."""
+    """Get singleton target price manager instance with its sync thread running."""
     global _target_manager
     if _target_manager is None:
-        _target_manager = TargetPriceManager()
+        with _target_manager_lock:
+            if _target_manager is None:
+                manager = TargetPriceManager()
+                manager.start()
+                atexit.register(manager.stop)
+                _target_manager = manager
     return _target_manager
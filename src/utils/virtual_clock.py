@@ -0,0 +1,135 @@
+"""
+Virtual clock for replaying live code against history.
+
+``VirtualClock`` stands in for both the ``time`` module and the
+``datetime`` class of a module under replay: ``sleep`` advances the clock
+instantly instead of blocking, and ``clock.datetime.now()`` returns the
+virtual time. ``patch_clock`` swaps those module globals for the duration
+of a ``with`` block, so code written against the wall clock (sleep until
+the next bar, cooldowns measured with ``datetime.now()``) runs unchanged
+at CPU speed.
+
+The patch is visible to every thread of the process, so it is only safe
+in a process that does nothing but replay (see ``run_replay``).
+
+Naive ``now()`` values are UTC, matching how the trading code compares
+them with naive timestamps it stored earlier from the same clock.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta, tzinfo
+from types import ModuleType
+from typing import Any
+
+
+class _ClockDatetimeMeta(type):
+    # Values built by the real datetime class still pass isinstance checks
+    def __instancecheck__(cls, obj: Any) -> bool:
+        return isinstance(obj, datetime)
+
+
+class VirtualClock:
+    """Manually advanced clock with ``time``-module and ``datetime`` facades."""
+
+    def __init__(self, start: datetime, on_advance: Callable[[datetime], None] | None = None):
+        """
+        Initialize the clock.
+
+        Args:
+            start: Initial time (naive values are taken as UTC)
+            on_advance: Called with the new time after every advance
+        """
+        self._now = start.replace(tzinfo=UTC) if start.tzinfo is None else start.astimezone(UTC)
+        self._elapsed = 0.0
+        self.on_advance = on_advance
+        self._lock = threading.Lock()
+        self.datetime = self._datetime_class()
+
+    def _datetime_class(self) -> type[datetime]:
+        clock = self
+
+        class ClockDatetime(datetime, metaclass=_ClockDatetimeMeta):
+            @classmethod
+            def now(cls, tz: tzinfo | None = None) -> datetime:
+                now = clock.now()
+                return now.replace(tzinfo=None) if tz is None else now.astimezone(tz)
+
+            @classmethod
+            def utcnow(cls) -> datetime:
+                return clock.now().replace(tzinfo=None)
+
+            @classmethod
+            def today(cls) -> datetime:
+                return cls.now()
+
+        return ClockDatetime
+
+    def now(self) -> datetime:
+        """Current virtual time (UTC-aware)."""
+        with self._lock:
+            return self._now
+
+    def advance(self, seconds: float) -> datetime:
+        """
+        Move the clock forward.
+
+        Args:
+            seconds: Seconds to advance (negative values are ignored)
+
+        Returns:
+            New virtual time
+        """
+        seconds = max(0.0, float(seconds))
+        with self._lock:
+            self._now += timedelta(seconds=seconds)
+            self._elapsed += seconds
+            now = self._now
+        if self.on_advance is not None:
+            self.on_advance(now)
+        return now
+
+    # ``time`` module interface
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    def time(self) -> float:
+        return self.now().timestamp()
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self._elapsed
+
+    perf_counter = monotonic
+
+
+@contextmanager
+def patch_clock(clock: VirtualClock, *modules: ModuleType) -> Iterator[VirtualClock]:
+    """
+    Point the ``time`` and ``datetime`` globals of modules at a virtual clock.
+
+    Only names a module already binds are replaced (``import time`` or
+    ``from datetime import datetime``), and the originals are restored on exit.
+
+    Args:
+        clock: Clock to install
+        modules: Modules whose globals are patched
+    """
+    saved: list[tuple[ModuleType, str, Any]] = []
+    try:
+        for module in modules:
+            for name, replacement in (('time', clock), ('datetime', clock.datetime)):
+                current = getattr(module, name, None)
+                if name == 'datetime' and current is not datetime:
+                    continue
+                if name == 'time' and not isinstance(current, ModuleType):
+                    continue
+                saved.append((module, name, current))
+                setattr(module, name, replacement)
+        yield clock
+    finally:
+        for module, name, original in reversed(saved):
+            setattr(module, name, original)
@@ -718,6 +718,7 @@ class TradingApp {
         // IMMEDIATE INITIAL DATA LOAD (only once)
         this.updateRefreshTimestamp(); // Set initial timestamp for timer
         this.debouncedUpdateDashboard(); // Overview refresh (/api/crypto-portfolio)
+        this.startLiveStream(); // Push updates (/api/stream); polling below becomes the fallback
         
         // No initial countdown - master interval handles available positions timing
         
@@ -733,6 +734,7 @@ class TradingApp {
             this.debouncedUpdateDashboard(); // Overview refresh (/api/crypto-portfolio)
             this.startPositionsCountdown(90); // Reset positions countdown
             setTimeout(() => {
+                if (this.isStreamLive()) return; // Holdings arrive via /api/stream
                 console.log(`📊 Holdings refresh starting (10s delay)`);
                 this.updateCryptoPortfolio(); // Holdings refresh
                 this.startAvailableCountdown(30); // Reset available countdown (30s)
@@ -803,12 +805,109 @@ class TradingApp {
     cleanup() {
         this.stopAutoUpdate();
         this.stopCountdown();
+        this.stopLiveStream();
         if (this.pendingDashboardUpdate) {
             clearTimeout(this.pendingDashboardUpdate);
             this.pendingDashboardUpdate = null;
         }
     }
 
+    // ---------- Live stream (SSE) ----------
+    startLiveStream() {
+        if (this.liveStream || typeof EventSource === 'undefined') return;
+        this.streamState = this.streamState || {};
+        this.streamConnected = false;
+
+        const es = new EventSource('/api/stream');
+        this.liveStream = es;
+        es.onopen = () => { this.streamConnected = true; };
+        es.onerror = () => {
+            // EventSource reconnects on its own (sending Last-Event-ID); poll meanwhile
+            this.streamConnected = false;
+            // A 503 (stream slots full) closes it for good: try again later
+            if (es.readyState === EventSource.CLOSED && this.liveStream === es) {
+                this.liveStream = null;
+                this.liveStreamRetry = setTimeout(() => this.startLiveStream(), 30000);
+            }
+        };
+
+        ['portfolio', 'prices', 'bot', 'signals'].forEach(topic => {
+            es.addEventListener(topic, (ev) => {
+                try {
+                    const msg = JSON.parse(ev.data);
+                    this.streamState[topic] = msg.full
+                        ? msg.data
+                        : this.applyMergePatch(this.streamState[topic], msg.data);
+                    this.handleStreamTopic(topic, this.streamState[topic]);
+                } catch (e) {
+                    console.debug(`Stream ${topic} event failed:`, e);
+                }
+            });
+        });
+    }
+
+    stopLiveStream() {
+        clearTimeout(this.liveStreamRetry);
+        if (this.liveStream) {
+            this.liveStream.close();
+            this.liveStream = null;
+        }
+        this.streamConnected = false;
+    }
+
+    isStreamLive() {
+        // Stream is USD-only; other currencies keep polling
+        return !!(this.liveStream && this.streamConnected && this.selectedCurrency === 'USD');
+    }
+
+    applyMergePatch(target, patch) {
+        // JSON Merge Patch (RFC 7386): null removes a key, objects merge recursively
+        if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+        const result = (target && typeof target === 'object' && !Array.isArray(target)) ? { ...target } : {};
+        Object.keys(patch).forEach(key => {
+            if (patch[key] === null) delete result[key];
+            else result[key] = this.applyMergePatch(result[key], patch[key]);
+        });
+        return result;
+    }
+
+    handleStreamTopic(topic, state) {
+        if (topic === 'bot') {
+            this.updateBotStatus(state);
+            this.updateActiveStatus(state.running || false);
+            return;
+        }
+        if (topic !== 'portfolio' || this.selectedCurrency !== 'USD') return;
+
+        // Rebuild the /api/crypto-portfolio shape and reuse the normal renderers
+        const holdings = Object.values(state.holdings || {});
+        const data = { ...state, holdings };
+        const overview = data.overview || {};
+        const totalValue = data.total_current_value ?? overview.total_value ?? 0;
+        const totalPnl = data.total_pnl ?? overview.total_pnl ?? 0;
+
+        this.currentCryptoData = holdings;
+        this.updateCryptoSymbols(holdings);
+        this.updateCryptoTable(holdings);
+        this.updateAllTables(holdings);
+        this.updateDashboardMetrics({
+            portfolioValue: totalValue,
+            totalPnL: totalPnl,
+            activePositions: holdings.length,
+            totalReturnPercent: data.total_pnl_percent || 0,
+            winRate: 0
+        });
+        this.updatePortfolioSummary({
+            total_cryptos: holdings.length,
+            total_current_value: totalValue,
+            total_pnl: totalPnl,
+            total_pnl_percent: data.total_pnl_percent || 0
+        }, holdings);
+        if (typeof updatePortfolioSummaryUI === 'function') {
+            updatePortfolioSummaryUI(data);
+        }
+    }
+
     // ---------- Networking / cache ----------
     async fetchWithCache(endpoint, cacheKey, bypassCache = false) {
         const cache = this.apiCache[cacheKey];
@@ -21,13 +21,17 @@ class TradingDashboard {
             // Show loading states for all metric cards
             this.showMetricLoading();
             
-            await Promise.all([
-                this.loadPortfolioOverview(),
-                this.loadMLSignals(),
-                this.loadHoldings(),
-                this.loadChartData(),
-                this.loadRiskMetrics()
-            ]);
+            // One bundled request over a shared snapshot; fall back to per-panel endpoints
+            const bundled = await this.loadDashboardBundle();
+            if (!bundled) {
+                await Promise.all([
+                    this.loadPortfolioOverview(),
+                    this.loadMLSignals(),
+                    this.loadHoldings(),
+                    this.loadChartData(),
+                    this.loadRiskMetrics()
+                ]);
+            }
             
             this.showDashboardLoaded();
         } catch (error) {
@@ -38,6 +42,26 @@ class TradingDashboard {
         }
     }
 
+    async loadDashboardBundle() {
+        try {
+            const response = await fetch('/api/dashboard');
+            if (!response.ok) return false;
+            const data = await response.json();
+            if (!data.success || !data.views) return false;
+
+            const views = data.views;
+            this.updatePortfolioMetrics(views.overview);
+            this.updateMLSignalsTable(views.latest_signals || []);
+            this.updatePortfolioChart(views.charts);
+            this.updateRiskMetrics(views.trade_performance?.trade_summary);
+            console.log(`✅ Dashboard bundle loaded (snapshot v${data.snapshot_version})`);
+            return true;
+        } catch (error) {
+            console.error('❌ Error loading dashboard bundle:', error);
+            return false;
+        }
+    }
+
     async loadPortfolioOverview() {
         try {
             const response = await fetch('/api/performance-overview');
@@ -0,0 +1,11 @@
+import pytest
+
+from src.data import market_impact
+
+
+@pytest.fixture(autouse=True)
+def isolated_market_impact_db(tmp_path, monkeypatch):
+    """Keep the process-wide impact store off the tracked trading.db."""
+    monkeypatch.setenv("MARKET_IMPACT_DB", str(tmp_path / "impact.db"))
+    monkeypatch.setattr(market_impact, "_impact_store", None)
+    monkeypatch.setattr(market_impact, "_impact_model", None)
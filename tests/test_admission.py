@@ -0,0 +1,69 @@
+import threading
+import time
+
+from src.utils.admission import (
+    LANE_OKX,
+    LANE_PRIORITY,
+    AdmissionController,
+    PrioritySemaphore,
+    SharedWindowCounter,
+)
+
+
+def test_sliding_window_counter_limits_and_slides():
+    counter = SharedWindowCounter(slots=64)
+    t0 = 1_000_000.0
+    results = [counter.hit("ip|/api/x", 3, 60, now=t0 + i)[0] for i in range(4)]
+    assert results == [True, True, True, False]
+    # Half way into the next window only half of the previous count still weighs in
+    assert counter.hit("ip|/api/x", 3, 60, now=t0 + 30 + 60)[0] is True
+
+
+def test_priority_waiter_served_before_normal_waiters():
+    sem = PrioritySemaphore(1)
+    assert sem.acquire(timeout=1)
+    order = []
+
+    def worker(name, priority):
+        if sem.acquire(timeout=2, priority=priority):
+            order.append(name)
+            sem.release()
+
+    normal = threading.Thread(target=worker, args=("normal", False))
+    normal.start()
+    time.sleep(0.05)
+    prio = threading.Thread(target=worker, args=("priority", True))
+    prio.start()
+    time.sleep(0.05)
+    sem.release()
+    normal.join()
+    prio.join()
+    assert order == ["priority", "normal"]
+
+
+def test_okx_lane_sheds_but_priority_lane_is_uncapped():
+    ctl = AdmissionController({LANE_OKX: 1}, outbound=PrioritySemaphore(2))
+    assert ctl.admit(LANE_OKX).admitted
+    assert not ctl.admit(LANE_OKX).admitted
+    assert all(ctl.admit(LANE_PRIORITY).admitted for _ in range(5))
+    ctl.release(LANE_OKX)
+    assert ctl.admit(LANE_OKX).admitted
+
+
+def test_shed_admin_route_never_serves_stale_body_without_token(monkeypatch):
+    import app as app_mod
+
+    monkeypatch.setattr(app_mod.app, "testing", True)
+    monkeypatch.setattr(app_mod, "ADMIN_TOKEN", "secret")
+    ctl = AdmissionController({LANE_OKX: 0}, outbound=PrioritySemaphore(1))
+    ctl.remember("/api/performance-overview?", b'{"private": true}')
+    ctl.remember("/api/crypto-portfolio?", b'{"holdings": []}')
+    monkeypatch.setattr(app_mod, "_admission", ctl)
+
+    with app_mod.app.test_client() as c:
+        shed = c.get("/api/performance-overview")
+        assert shed.status_code == 503 and "X-Data-Stale" not in shed.headers
+        authed = c.get("/api/performance-overview", headers={"X-Admin-Token": "secret"})
+        assert authed.status_code == 503 and b"private" not in authed.data
+        public = c.get("/api/crypto-portfolio")
+        assert public.status_code == 200 and public.headers["X-Data-Stale"] == "true"
@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+
+import app as app_mod
+from app import app
+from src.services.dashboard_views import DashboardViews
+from src.utils import fast_json
+
+TRADES = [
+    {"trade_id": f"t{i}", "order_id": f"o{i}", "symbol": "BTC-USDT", "side": "buy",
+     "price": 100.0 + i, "quantity": 0.1, "fee": 0.01, "timestamp": "2025-01-01T00:00:00Z"}
+    for i in range(50)
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_mod, "load_executed_trades_from_csv", lambda: [dict(t) for t in TRADES])
+    with app.test_client() as c:
+        yield c
+
+
+def test_comprehensive_trades_omit_raw_data_unless_requested(client):
+    trades = client.get("/api/comprehensive-trades").get_json()["trades"]
+    assert len(trades) == 50 and all("raw_data" not in t for t in trades)
+
+    raw = client.get("/api/comprehensive-trades?include_raw=true").get_json()["trades"]
+    assert raw[0]["raw_data"] == TRADES[0]
+
+
+def test_matching_if_none_match_gets_a_bodyless_304(client):
+    first = client.get("/api/comprehensive-trades")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    again = client.get("/api/comprehensive-trades", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+    assert again.headers["ETag"] == etag
+
+    assert client.get("/api/comprehensive-trades", headers={"If-None-Match": 'W/"stale"'}).status_code == 200
+
+
+def test_large_json_responses_are_gzipped_on_request(client, monkeypatch):
+    monkeypatch.setattr(fast_json, "brotli", None)
+
+    plain = client.get("/api/comprehensive-trades")
+    assert "Content-Encoding" not in plain.headers
+
+    zipped = client.get("/api/comprehensive-trades", headers={"Accept-Encoding": "br, gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+    assert gzip.decompress(zipped.data) == plain.data
+
+
+def test_dashboard_snapshot_etag_short_circuits_to_304(client, monkeypatch):
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return {"holdings": []}, [], {}
+
+    monkeypatch.setattr(app_mod, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(app_mod, "_dashboard_views", DashboardViews(fetch))
+    headers = {"X-Admin-Token": "secret"}
+
+    first = client.get("/api/dashboard", headers=headers)
+    assert first.status_code == 200 and first.get_json()["success"] is True
+    etag = first.headers["ETag"]
+
+    again = client.get("/api/dashboard", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+    assert len(fetches) == 1
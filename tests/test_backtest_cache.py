@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from src.backtesting.engine import BacktestEngine
+from src.backtesting.result_cache import BacktestResultCache
+from src.config import Config
+from src.strategies.base import BaseStrategy, Signal
+
+
+CALLS = []
+
+
+class CrossStrategy(BaseStrategy):
+    """Buys above the 20-bar mean, sells below it."""
+
+    def generate_signals(self, data):
+        CALLS.append(len(data))
+        close = data["close"]
+        mean = close.iloc[-20:].mean()
+        action = "buy" if close.iloc[-1] > mean * 1.01 else "sell" if close.iloc[-1] < mean * 0.99 else None
+        return [Signal(action, close.iloc[-1], 0.5)] if action else []
+
+    def calculate_position_size(self, signal, portfolio_value, current_price):
+        return portfolio_value * signal.size / current_price
+
+    def validate_signal(self, signal):
+        return signal.action == "buy" or signal.action == "sell"
+
+
+def _candles(n=400, seed=4):
+    close = 100 * np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.01, n))
+    index = pd.date_range("2024-01-01", periods=n, freq="1h", tz="UTC")
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": 1.0}, index=index)
+
+
+def _run(data, cache):
+    CALLS.clear()
+    engine = BacktestEngine(Config("missing.ini"), CrossStrategy(Config("missing.ini")))
+    engine.result_cache = cache
+    engine.load_history = lambda *args, **kwargs: data
+    return engine.run_backtest("BTC/USDT", None, None, "1h"), engine
+
+
+def test_hits_prefixes_and_extensions_match_fresh_runs(tmp_path):
+    data = _candles()
+    fresh, fresh_engine = _run(data, None)
+    cache = BacktestResultCache(tmp_path)
+
+    _run(data.iloc[:300], cache)
+    extended, engine = _run(data, cache)
+    assert len(CALLS) == 100 and cache.extensions == 1
+    assert extended == fresh and engine.trades == fresh_engine.trades
+
+    # Served from disk without simulating, including a shorter prefix
+    disk = BacktestResultCache(tmp_path)
+    again, engine = _run(data, disk)
+    assert len(CALLS) == 0 and again == fresh
+    prefix, engine = _run(data.iloc[:250], disk)
+    assert len(CALLS) == 0 and prefix == _run(data.iloc[:250], None)[0]
+
+    # A revised candle invalidates the run
+    revised = data.copy()
+    revised.iloc[100, revised.columns.get_loc("close")] *= 1.1
+    _, engine = _run(revised, disk)
+    assert len(CALLS) == 371 and disk.misses == 1
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path):
+    cache = BacktestResultCache(tmp_path, max_bytes=2500)
+    for i in range(5):
+        cache.put(f"k{i}", {"payload": "x" * 800, "i": i})
+        cache.get("k0")
+    assert cache.get("k0") is not None and cache.get("k4") is not None
+    assert cache.get("k1") is None
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 2500
@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting.engine import BacktestEngine
+from src.config import Config
+from src.services import backtest_jobs
+from src.services.backtest_jobs import (
+    CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING, BacktestJobRunner, JobCancelled, JobProgress, JobStore,
+)
+from src.strategies.enhanced_bollinger_strategy import EnhancedBollingerBandsStrategy
+
+
+def counting_job(params, progress):
+    """Test handler: reports each step, optionally slowly."""
+    for i in range(params["steps"]):
+        time.sleep(params.get("delay", 0))
+        progress.update((i + 1) / params["steps"], f"step {i + 1}", partial={"step": i + 1})
+    if params.get("fail"):
+        raise RuntimeError("boom")
+    return {"steps": params["steps"]}
+
+
+def _wait(store, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get(job_id)
+        if job["status"] not in (QUEUED, RUNNING):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} did not finish: {store.get(job_id)}")
+
+
+def test_store_claim_cancel_and_recover(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first = store.enqueue("backtest", {"symbols": ["BTC/USDT"]})
+    second = store.enqueue("backtest", {})
+    third = store.enqueue("sweep", {})
+
+    assert store.cancel(second)["status"] == CANCELLED
+    claimed = store.claim_next(123)
+    assert claimed["id"] == first and claimed["params"] == {"symbols": ["BTC/USDT"]} and claimed["attempts"] == 1
+
+    # Running jobs stop at their next progress update
+    assert store.cancel(first)["cancel_requested"]
+    with pytest.raises(JobCancelled):
+        JobProgress(store, first).update(0.5, "half", partial={"x": 1})
+    assert store.get(first)["partial"] == {"x": 1}
+
+    # A dispatcher restart requeues the interrupted job until it runs out of attempts
+    assert store.claim_next(123)["id"] == third
+    assert store.recover_interrupted() == 2 and store.get(third)["status"] == QUEUED
+    store.claim_next(1), store.claim_next(1)
+    store.recover_interrupted()
+    assert store.get(first)["status"] == FAILED and store.count(QUEUED) == 0
+
+
+def test_runner_executes_jobs_in_worker_processes(tmp_path, monkeypatch):
+    monkeypatch.setitem(backtest_jobs.JOB_HANDLERS, "count", "tests.test_backtest_jobs:counting_job")
+    runner = BacktestJobRunner(JobStore(str(tmp_path / "jobs.db")), max_workers=2, poll_seconds=0.1)
+    runner.start()
+    try:
+        done = runner.submit("count", {"steps": 3})
+        failed = runner.submit("count", {"steps": 1, "fail": True})
+        slow = runner.submit("count", {"steps": 200, "delay": 0.05})
+
+        job = _wait(runner.store, done)
+        assert job["status"] == COMPLETED and job["result"] == {"steps": 3} and job["progress"] == 1.0
+        assert job["partial"] == {"step": 3} and job["worker_pid"] is not None
+        job = _wait(runner.store, failed)
+        assert job["status"] == FAILED and job["error"] == "boom"
+
+        while runner.store.get(slow)["partial"] is None:
+            time.sleep(0.05)
+        runner.store.cancel(slow)
+        job = _wait(runner.store, slow)
+        assert job["status"] == CANCELLED and job["partial"]["step"] < 200
+        assert runner.stats()["leader"] and runner.stats()["jobs_started"] == 3
+    finally:
+        runner.stop()
+
+
+def test_single_simulation_stops_at_the_next_bar_after_cancel(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.enqueue("backtest", {})
+    store.claim_next(1)
+    config = Config("missing.ini")
+    engine = BacktestEngine(config, EnhancedBollingerBandsStrategy(config))
+    seen = []
+    hook = backtest_jobs._bar_progress(JobProgress(store, job_id, min_interval=0), 0, 1, "run")
+
+    def on_bar(i, n):
+        seen.append(i)
+        if i == 40:
+            store.cancel(job_id)
+        hook(i, n)
+
+    engine.on_bar = on_bar
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(size=200))
+    data = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0},
+                        index=pd.date_range("2024-01-01", periods=200, freq="1h", tz="UTC"))
+    with pytest.raises(JobCancelled):
+        engine._simulate_trading(data, "BTC/USDT")
+    assert seen[-1] == 40 and store.get(job_id)["progress"] == pytest.approx(40 / 200)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from src.utils.entry_confidence import EntryConfidenceAnalyzer
+
+
+def _history(seed, bars, with_low=False):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, bars)))
+    volumes = rng.uniform(500, 2000, bars)
+    rows = [{'price': float(p), 'volume': float(v)} for p, v in zip(prices, volumes, strict=True)]
+    if with_low:
+        for row in rows:
+            row['low'] = row['price'] * 0.99
+    return rows
+
+
+def test_batch_matches_per_symbol_scoring():
+    analyzer = EntryConfidenceAnalyzer()
+    histories, prices = {}, {}
+    for i, bars in enumerate([30, 30, 60, 120, 120, 120]):
+        symbol = f"SYM{i}"
+        histories[symbol] = _history(i, bars, with_low=bars == 120)
+        # Mix of prices at, below and above the last close to exercise every branch
+        prices[symbol] = histories[symbol][-1]['price'] * (0.9, 1.0, 1.05)[i % 3]
+
+    batch = analyzer.calculate_confidence_batch(prices, histories)
+
+    for symbol, price in prices.items():
+        single = analyzer.calculate_confidence(symbol, price, histories[symbol])
+        for key in ('confidence_score', 'timing_signal', 'confidence_level', 'risk_level',
+                    'breakdown', 'enhanced_filters'):
+            assert batch[symbol][key] == single[key], (symbol, key)
+        assert np.isclose(batch[symbol]['suggested_target_price'], single['suggested_target_price'])
@@ -0,0 +1,57 @@
+from src.data.confidence_store import ConfidenceStore
+from src.services.confidence_scheduler import ConfidenceScheduler
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.batches = []
+
+    def calculate_confidence_batch(self, prices, histories):
+        self.batches.append(sorted(prices))
+        return {s: {'symbol': s, 'confidence_score': 60.0 + len(histories[s])} for s in prices}
+
+
+def _candles(n, price=100.0):
+    return [{'date': f'2024-01-{i + 1:02d}', 'price': price, 'close': price + i,
+             'high': price + i, 'low': price + i, 'open': price + i, 'volume': 1.0} for i in range(n)]
+
+
+def test_scheduler_staggers_refreshes_within_rate_budget(tmp_path):
+    store = ConfidenceStore(str(tmp_path / "conf.db"))
+    fetched = []
+
+    def fetch(symbol):
+        fetched.append(symbol)
+        return _candles(5)
+
+    analyzer = FakeAnalyzer()
+    scheduler = ConfidenceScheduler(store, symbols=["BTC", "ETH", "SOL", "ADA"], fetch_candles=fetch,
+                                    analyzer=analyzer, refresh_seconds=2.0, max_requests_per_sec=1.0)
+    # Four symbols at one request per second cannot be refreshed faster than every 4s
+    assert scheduler.refresh_seconds == 4.0
+
+    for t in range(4):
+        assert scheduler.run_pending(now=1000.0 + t) == 1
+    assert fetched == ["BTC", "ETH", "SOL", "ADA"]
+    assert analyzer.batches == [["BTC"], ["ETH"], ["SOL"], ["ADA"]]
+
+    # Nothing is due again until the interval has passed
+    assert scheduler.run_pending(now=1003.5) == 0
+    assert scheduler.run_pending(now=1004.0) == 1 and fetched[-1] == "BTC"
+
+
+def test_store_round_trips_scores_and_candles(tmp_path):
+    store = ConfidenceStore(str(tmp_path / "conf.db"))
+    store.put("BTC", _candles(3), 102.0, {'confidence_score': 71.5})
+    store.put("ETH", _candles(2), 101.0, None)
+
+    scores = store.get_many()
+    assert set(scores) == {"BTC"}
+    assert scores["BTC"]["confidence_score"] == 71.5 and scores["BTC"]["current_price"] == 102.0
+    assert store.candles("ETH")[-1]["close"] == 101.0
+
+    # A failed rescore keeps the previous result but updates the candles
+    store.put("BTC", _candles(4), 103.0, None)
+    assert store.get("BTC")["confidence_score"] == 71.5
+    assert len(store.candles("BTC")) == 4
+    assert store.get_many(["BTC"], max_age=-1.0) == {}
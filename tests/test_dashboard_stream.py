@@ -0,0 +1,78 @@
+import json
+
+from src.services.dashboard_stream import (
+    DashboardStream,
+    apply_merge_patch,
+    merge_patch_diff,
+)
+
+
+def _events(sub):
+    out = []
+    while True:
+        msg = sub.next_message(timeout=0.01)
+        if msg is None:
+            return out
+        data_line = [ln for ln in msg.splitlines() if ln.startswith("data: ")][0]
+        out.append(json.loads(data_line[len("data: "):]))
+
+
+def test_merge_patch_round_trip():
+    old = {"a": 1, "b": {"x": 1, "y": 2}, "c": 3}
+    new = {"a": 1, "b": {"x": 5, "y": 2}, "d": 4}
+    patch = merge_patch_diff(old, new)
+    assert patch == {"b": {"x": 5}, "c": None, "d": 4}
+    assert apply_merge_patch(old, patch) == new
+
+
+def test_publish_only_emits_changes_and_replays():
+    stream = DashboardStream(tick_seconds=60)
+    assert stream.publish("prices", {"BTC": 1.0, "ETH": 2.0})
+    assert not stream.publish("prices", {"BTC": 1.0, "ETH": 2.0})
+    assert stream.publish("prices", {"BTC": 1.5, "ETH": 2.0})
+
+    resumed = _events(stream.subscribe(last_event_id=f"{stream.instance}-1"))
+    assert [(e["seq"], e["full"], e["data"]) for e in resumed] == [(2, False, {"BTC": 1.5})]
+
+    fresh = _events(stream.subscribe())
+    assert fresh[0]["full"] is True
+    assert fresh[0]["data"] == {"BTC": 1.5, "ETH": 2.0}
+    stream.stop()
+
+
+def test_lagging_client_is_closed_and_resumes_without_gaps():
+    stream = DashboardStream(tick_seconds=60, queue_size=3)
+    sub = stream.subscribe()
+    for i in range(6):
+        stream.publish("prices", {"BTC": float(i)})
+
+    # Nothing past the overflow is queued, so every delivered patch applies
+    delivered = _events(sub)
+    assert [e["seq"] for e in delivered] == [1, 2, 3] and sub.closed
+
+    resumed = _events(stream.subscribe(last_event_id=delivered[-1]["id"]))
+    assert [e["seq"] for e in resumed] == [4, 5, 6]
+    state = delivered[0]["data"]
+    for event in delivered[1:] + resumed:
+        state = apply_merge_patch(state, event["data"])
+    assert state == {"BTC": 5.0}
+    stream.stop()
+
+
+def test_event_ids_from_another_worker_get_a_full_snapshot():
+    stream = DashboardStream(tick_seconds=60)
+    other = DashboardStream(tick_seconds=60)
+    stream.publish("prices", {"BTC": 1.0})
+    stream.publish("prices", {"BTC": 2.0})
+    other.publish("prices", {"BTC": 9.0})
+    assert stream.instance != other.instance
+
+    # Same sequence number, different process: a patch would apply to the wrong state
+    foreign = _events(stream.subscribe(last_event_id=f"{other.instance}-1"))
+    assert [(e["full"], e["data"]) for e in foreign] == [(True, {"BTC": 2.0})]
+    assert foreign[0]["id"] == f"{stream.instance}-2"
+
+    assert _events(stream.subscribe(last_event_id="1"))[0]["full"] is True
+    assert _events(stream.subscribe(last_event_id=f"{stream.instance}-2")) == []
+    stream.stop()
+    other.stop()
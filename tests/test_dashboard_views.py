@@ -0,0 +1,89 @@
+import pytest
+
+from src.services.dashboard_views import DashboardSnapshot, DashboardViews, ViewGraph
+
+
+def _counting_graph(calls):
+    graph = ViewGraph()
+
+    @graph.view("base")
+    def _base(snap):
+        calls.append("base")
+        return len(snap.fills)
+
+    @graph.view("double", "base")
+    def _double(snap, base):
+        calls.append("double")
+        return base * 2
+
+    @graph.view("total", "base", "double")
+    def _total(snap, base, double):
+        calls.append("total")
+        return base + double
+
+    return graph
+
+
+def test_views_are_computed_once_per_snapshot():
+    calls = []
+    fills = [[{}], [{}, {}]]
+    service = DashboardViews(lambda: ({}, fills.pop(0), {}), graph=_counting_graph(calls))
+
+    first = service.bundle()
+    assert first["views"] == {"base": 1, "double": 2, "total": 3}
+    # "base" feeds two views but runs once; a second bundle reuses the memo
+    assert calls == ["base", "double", "total"]
+    assert service.bundle()["views"] == first["views"] and len(calls) == 3
+
+    # A new snapshot starts a new memo
+    assert service.bundle(force_refresh=True)["views"] == {"base": 2, "double": 4, "total": 6}
+    assert calls == ["base", "double", "total"] * 2
+
+
+def test_views_resolve_dependencies_and_reject_cycles():
+    calls = []
+    graph = _counting_graph(calls)
+    snap = DashboardSnapshot(1, {}, [{}, {}, {}])
+    assert graph.resolve(snap, "total") == 9
+    assert calls == ["base", "double", "total"]
+
+    @graph.view("a", "b")
+    def _a(snap, b):
+        return b
+
+    @graph.view("b", "a")
+    def _b(snap, a):
+        return a
+
+    with pytest.raises(ValueError, match="a -> b -> a"):
+        graph.resolve(snap, "a")
+    with pytest.raises(KeyError):
+        graph.resolve(snap, "missing")
+
+
+def test_latest_signals_view_joins_signals_with_holdings():
+    portfolio = {"holdings": [{"symbol": "BTC", "pnl_percent": -2.5}]}
+    signals = {
+        "BTC": {"symbol": "BTC", "ts": 200.0, "timing_signal": "BUY", "confidence_score": 71.5,
+                "ml_probability": float("nan")},
+        "ETH": {"symbol": "ETH", "ts": 300.0, "timing_signal": "WAIT", "confidence_score": 40.0,
+                "ml_probability": 0.55},
+    }
+    service = DashboardViews(lambda: (portfolio, [], signals))
+
+    latest = service.bundle(["latest_signals"])["views"]["latest_signals"]
+    assert [(s["symbol"], s["signal"], s["hybrid_score"], s["outcome"]) for s in latest] == [
+        ("ETH", "WAIT", 40.0, "pending"),
+        ("BTC", "BUY", 71.5, "open_loss"),
+    ]
+    assert latest[1]["pnl_percent"] == -2.5 and latest[1]["ml_probability"] is None
+
+
+def test_snapshot_etags_differ_between_workers_at_the_same_version():
+    first = DashboardViews(lambda: ({"holdings": []}, [], {}))
+    second = DashboardViews(lambda: ({"holdings": [{"symbol": "BTC"}]}, [], {}))
+
+    a, b = first.snapshot(), second.snapshot()
+    assert a.version == b.version == 1
+    assert a.etag != b.etag
+    assert first.snapshot(force_refresh=True).etag != a.etag
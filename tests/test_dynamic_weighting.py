@@ -0,0 +1,64 @@
+import sqlite3
+
+import numpy as np
+
+from src.utils.dynamic_weighting import DynamicWeighting, RollingCorrelation
+
+
+def test_rolling_correlation_matches_numpy():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=500)
+    y = 0.5 * x + rng.normal(size=500)
+    corr = RollingCorrelation(window=50)
+    for i in range(len(x)):
+        corr.add(x[i], y[i])
+        if i >= 1:
+            lo = max(0, i - 49)
+            assert np.isclose(corr.correlation(), np.corrcoef(x[lo:i + 1], y[lo:i + 1])[0, 1])
+
+
+def test_weights_follow_the_predictive_score(tmp_path):
+    db = str(tmp_path / "weights.db")
+    dw = DynamicWeighting(db, window=40, min_samples=10)
+    assert dw.calculate_weights() == {'ml_weight': 0.4, 'ta_weight': 0.6}
+
+    rng = np.random.default_rng(1)
+    for _ in range(60):
+        ml = rng.uniform(0, 1)
+        dw.record_trade(ml, rng.uniform(0, 100), pnl=(ml - 0.5) * 100 + rng.normal(0, 5))
+    analysis = dw.get_correlation_analysis()
+    assert analysis['ml_correlation'] > 0.8 and analysis['status'] == 'active'
+    assert analysis['sample_size'] == 40
+    ta_weight, ml_weight = dw.weights()
+    assert ml_weight > 0.6 and np.isclose(ta_weight + ml_weight, 1.0)
+
+    # The window is rebuilt from the database after a restart
+    assert DynamicWeighting(db, window=40, min_samples=10).get_correlation_analysis() == analysis
+
+
+def test_workers_resync_samples_recorded_by_each_other(tmp_path):
+    db = str(tmp_path / "weights.db")
+    first = DynamicWeighting(db, window=20, min_samples=5, sync_interval=0)
+    second = DynamicWeighting(db, window=20, min_samples=5, sync_interval=3600)
+
+    rng = np.random.default_rng(2)
+    for _ in range(30):
+        ml = rng.uniform(0, 1)
+        first.record_trade(ml, rng.uniform(0, 100), pnl=(ml - 0.5) * 100)
+    assert first.get_correlation_analysis()['sample_size'] == 20
+
+    # Throttled reads keep serving the old window; the next sync catches up
+    assert second.get_correlation_analysis()['sample_size'] == 0
+    assert second._sync(force=True)
+    assert second.get_correlation_analysis() == first.get_correlation_analysis()
+
+    # A sample recorded by the second worker reaches the first on its next read
+    second.record_trade(0.9, 10.0, pnl=40.0)
+    assert first.get_correlation_analysis() == second.get_correlation_analysis()
+    assert not first._sync(force=True)
+
+    # Deleting rows (e.g. a manual cleanup) rebuilds the window instead of appending
+    with sqlite3.connect(db) as conn:
+        conn.execute('DELETE FROM weighting_trades WHERE id > 10')
+    assert first._sync(force=True)
+    assert first.get_correlation_analysis()['sample_size'] == 10
@@ -0,0 +1,76 @@
+import gzip
+import json
+import math
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import fast_json
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    return request.param
+
+
+def test_numpy_and_pandas_values_encode_natively(encoder):
+    payload = {
+        "int": np.int64(7),
+        "float": np.float32(1.5),
+        "array": np.arange(3),
+        "ts": pd.Timestamp("2025-01-02T03:04:05", tz="UTC"),
+        "when": datetime(2025, 1, 2, tzinfo=UTC),
+        "series": pd.Series([1.0, 2.0]),
+        "frame": pd.DataFrame({"a": [1, 2]}),
+        "price": Decimal("1.25"),
+    }
+    decoded = json.loads(fast_json.dumps_bytes(payload))
+    assert decoded["int"] == 7 and decoded["float"] == 1.5
+    assert decoded["array"] == [0, 1, 2]
+    assert decoded["ts"].startswith("2025-01-02T03:04:05")
+    assert decoded["when"].startswith("2025-01-02T00:00:00")
+    assert decoded["series"] == [1.0, 2.0]
+    assert decoded["frame"] == [{"a": 1}, {"a": 2}]
+    assert decoded["price"] == 1.25
+
+
+def test_non_finite_floats_encode_as_null(encoder):
+    payload = {"nan": float("nan"), "np_nan": np.float64("nan"), "inf": math.inf,
+               "array": np.array([1.0, np.nan]), "ok": 1.5}
+    # Strict parsing, as a browser's JSON.parse would do
+    decoded = json.loads(fast_json.dumps_bytes(payload), parse_constant=pytest.fail)
+    assert decoded == {"nan": None, "np_nan": None, "inf": None, "array": [1.0, None], "ok": 1.5}
+
+
+def test_sorted_keys_give_a_stable_body_etag(encoder):
+    a = fast_json.dumps_bytes({"b": 1, "a": 2}, sort_keys=True)
+    b = fast_json.dumps_bytes({"a": 2, "b": 1}, sort_keys=True)
+    assert a == b and fast_json.body_etag(a) == fast_json.body_etag(b)
+
+
+def test_encoding_negotiation_honours_q_values(monkeypatch):
+    monkeypatch.setattr(fast_json, "brotli", None)
+    assert fast_json.choose_encoding("gzip, deflate, br") == "gzip"
+    assert fast_json.choose_encoding("gzip;q=0, identity") is None
+    assert fast_json.choose_encoding(None) is None
+
+
+def test_compress_body_gzips_only_above_the_threshold(monkeypatch):
+    monkeypatch.setattr(fast_json, "brotli", None)
+    body = b'{"rows":[' + b','.join(b'{"x":1}' for _ in range(500)) + b']}'
+    assert fast_json.compress_body(b"{}", "gzip") == (b"{}", None)
+    compressed, encoding = fast_json.compress_body(body, "br, gzip")
+    assert encoding == "gzip" and gzip.decompress(compressed) == body
+    assert fast_json.compress_body(body, "identity") == (body, None)
+
+
+def test_compress_body_prefers_brotli_when_installed():
+    brotli = pytest.importorskip("brotli")
+    body = b"x" * 4096
+    compressed, encoding = fast_json.compress_body(body, "gzip, br")
+    assert encoding == "br" and brotli.decompress(compressed) == body
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from src.ml.feature_store import BAR_FEATURES, FeatureStore, compute_features
+
+DAY = 86400
+T0 = 1_700_000_000 - (1_700_000_000 % DAY)
+
+
+def _candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return [[(T0 + i * DAY) * 1000, c, c, c, c, float(v)]
+            for i, (c, v) in enumerate(zip(closes, rng.uniform(100, 200, n), strict=True))]
+
+
+def test_incremental_ingest_matches_full_computation(tmp_path):
+    candles = _candles(40)
+    store = FeatureStore(str(tmp_path / "f.db"))
+    # Includes a still-forming last candle, which must be skipped
+    assert store.ingest("BTC", "1d", candles[:25], now=T0 + 24.5 * DAY) == 24
+
+    # A fresh instance warms up from the database and continues incrementally
+    store = FeatureStore(str(tmp_path / "f.db"))
+    assert store.ingest("BTC", "1d", candles[20:], now=T0 + 41 * DAY) == 16
+
+    frame = store.frame(["BTC"])
+    closes = np.array([c[4] for c in candles])
+    full = compute_features(closes, [c[5] for c in candles])
+    for name in BAR_FEATURES:
+        assert np.allclose(frame[name].to_numpy(dtype=float), full[name], equal_nan=True), name
+
+
+def test_point_in_time_reads(tmp_path):
+    store = FeatureStore(str(tmp_path / "f.db"))
+    store.ingest("ETH", "1d", _candles(20, seed=1), now=T0 + 30 * DAY)
+    assert store.annotate("ETH", "1d", composite_confidence=72.5)
+
+    # At the close of bar 10 only bars 0..9 are known
+    row = store.latest("ETH", "1d", as_of=T0 + 10 * DAY)
+    assert row["ts"] == T0 + 9 * DAY
+    assert len(store.frame(["ETH"], as_of=T0 + 10 * DAY)) == 10
+    assert store.latest("ETH", "1d")["composite_confidence"] == 72.5
+    assert np.isnan(store.vector("ETH", ["rsi_14", "composite_confidence"], as_of=T0 + 10 * DAY)[1])
+
+
+def test_lightweight_indicators_use_the_trailing_window():
+    from src.utils.entry_confidence import EntryConfidenceAnalyzer
+
+    rng = np.random.default_rng(3)
+    # A calm stretch, then a volatile week: only the week counts
+    prices = np.concatenate([100 * np.exp(np.cumsum(rng.normal(0, 0.001, 30))),
+                             [100, 104, 99, 106, 98, 107, 97, 108]])
+    df = pd.DataFrame({"price": prices, "volume": rng.uniform(100, 200, len(prices))})
+    indicators = EntryConfidenceAnalyzer()._lightweight_indicators(df)
+    returns = np.diff(np.log(prices))
+    assert np.isclose(indicators["volatility_7"], returns[-7:].std() * 100)
+    assert indicators["volatility_7"] > 2 * returns.std() * 100
+
+    # No losses in the window: RSI saturates at 100 (not 100 - 100 / 101)
+    rising = df.assign(price=np.linspace(100, 120, len(df)))
+    assert EntryConfidenceAnalyzer()._lightweight_indicators(rising)["rsi_7"] == 100.0
+
+    # 7 prices give only 6 returns, so the 7-bar RSI and volatility are undefined
+    short = EntryConfidenceAnalyzer()._lightweight_indicators(df.tail(7))
+    assert set(short) == {"volume_ratio", "price_above_sma7"}
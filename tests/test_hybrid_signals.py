@@ -0,0 +1,34 @@
+import src.data.confidence_store as confidence_store
+import src.utils.hybrid_signal_system as hybrid
+from src.data.confidence_store import ConfidenceStore
+
+
+def test_batch_matches_single_symbol_signals(monkeypatch):
+    calls = []
+
+    def fake_predictions(rows):
+        calls.append(list(rows))
+        return [min(0.9, 0.3 + c / 200) for c, _ in rows]
+
+    monkeypatch.setattr(hybrid, "_get_ml_predictions", fake_predictions)
+    monkeypatch.setattr(hybrid, "_get_ml_prediction", lambda ind: fake_predictions([(ind["confidence_score"], 0.5)])[0])
+    monkeypatch.setattr(hybrid, "_get_weights", lambda: (0.6, 0.4))
+
+    scores = {"BTC": (82.0, 0.5), "ETH": (55.0, 0.5), "SOL": (20.0, 0.5)}
+    batch = hybrid.calculate_hybrid_signals(scores)
+    assert len(calls) == 1 and len(calls[0]) == 3
+    for symbol, (score, _) in scores.items():
+        assert batch[symbol] == hybrid.calculate_hybrid_signal(score, {"confidence_score": score})
+    assert [batch[s]["final_signal"] for s in scores] == ["BUY", "WAIT", "AVOID"]
+
+
+def test_watchlist_reads_cached_confidence(monkeypatch, tmp_path):
+    store = ConfidenceStore(str(tmp_path / "conf.db"))
+    store.put("BTC", [], 65000.0, {"confidence_score": 80.0, "timing_signal": "BUY"})
+    monkeypatch.setattr(confidence_store, "get_confidence_store", lambda: store)
+    monkeypatch.setattr(hybrid, "_get_ml_predictions", lambda rows: [0.5] * len(rows))
+
+    signals = hybrid.evaluate_hybrid_signals(["BTC", "XYZ"])
+    assert list(signals) == ["BTC"]
+    assert signals["BTC"]["source"] == "cache" and signals["BTC"]["price"] == 65000.0
+    assert signals["BTC"]["confidence_score"] == 80.0 and "final_signal" in signals["BTC"]
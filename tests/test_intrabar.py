@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from src.backtesting.engine import BacktestEngine
+from src.backtesting.intrabar import CRASH_EXIT, STOP_LOSS, TAKE_PROFIT, IntrabarExecutor
+from src.config import Config
+from src.strategies.base import BaseStrategy, Signal
+
+
+def _minutes(path, start="2024-01-01"):
+    close = np.asarray(path, dtype=float)
+    index = pd.date_range(start, periods=len(close), freq="1min", tz="UTC")
+    opens = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({"open": opens, "high": np.maximum(opens, close), "low": np.minimum(opens, close),
+                         "close": close}, index=index)
+
+
+def _hours(minutes):
+    return minutes.resample("1h").agg({"open": "first", "high": "max", "low": "min", "close": "last"})
+
+
+def test_first_trigger_inside_the_bar_wins():
+    # Hour 0 rallies through the target, then sells off through the stop
+    path = np.r_[np.linspace(100, 104, 30), np.linspace(104, 96, 30), np.full(60, 96.0)]
+    sub = _minutes(path)
+    executor = IntrabarExecutor(sub)
+    executor.attach(_hours(sub).index)
+
+    reason, fill, ts, _ = executor.resolve_exit(0, stop=98.0, target=103.0)
+    assert reason == TAKE_PROFIT and fill == 103.0
+    assert ts < sub.index[30].timestamp()
+    assert executor.resolve_exit(0, stop=98.0)[0] == STOP_LOSS
+    # Trail 3% under the running peak of 104
+    reason, fill, _, peak = executor.resolve_exit(0, crash_drawdown=0.03, peak=100.0)
+    assert reason == CRASH_EXIT and peak == 104.0 and abs(fill - 104 * 0.97) < 1e-9
+    assert executor.resolve_exit(1, stop=90.0, target=110.0) is None
+
+
+def test_gap_through_stop_fills_at_open():
+    path = np.r_[np.full(60, 100.0), np.full(60, 90.0)]
+    sub = _minutes(path)
+    sub.iloc[60, sub.columns.get_loc("open")] = 90.0
+    executor = IntrabarExecutor(sub)
+    executor.attach(_hours(sub).index)
+    assert executor.resolve_exit(1, stop=95.0)[:2] == (STOP_LOSS, 90.0)
+
+
+class BuyOnce(BaseStrategy):
+    def generate_signals(self, data):
+        if len(data) == 30:
+            price = data["close"].iloc[-1]
+            return [Signal("buy", price, 0.5, stop_loss=price * 0.97, take_profit=price * 1.02)]
+        return []
+
+    def calculate_position_size(self, signal, portfolio_value, current_price):
+        return portfolio_value * signal.size / current_price
+
+    def validate_signal(self, signal):
+        return True
+
+
+def test_engine_fills_exits_intrabar():
+    # Flat for 30h, then hour 30 spikes 3% and closes back at the entry price
+    path = np.r_[np.full(30 * 60, 100.0), np.linspace(100, 103, 30), np.linspace(103, 100, 30),
+                 np.full(10 * 60, 100.0)]
+    sub = _minutes(path)
+    bars = _hours(sub)
+
+    plain = BacktestEngine(Config("missing.ini"), BuyOnce(Config("missing.ini")))
+    plain._simulate_trading(bars, "X")
+    assert [t["action"] for t in plain.trades] == ["buy"]
+
+    engine = BacktestEngine(Config("missing.ini"), BuyOnce(Config("missing.ini")))
+    engine.intrabar = IntrabarExecutor(sub)
+    engine._simulate_trading(bars, "X")
+    exit_trade = engine.trades[-1]
+    assert exit_trade["reason"] == TAKE_PROFIT and exit_trade["price"] == 102.0
+    assert exit_trade["timestamp"] == bars.index[30]
@@ -0,0 +1,15 @@
+from src.utils.leader_lock import LeaderLock
+
+
+def test_one_holder_until_released(tmp_path):
+    path = str(tmp_path / "svc.lock")
+    calls = []
+    first = LeaderLock(path, on_acquire=lambda: calls.append("first"))
+    second = LeaderLock(path, on_acquire=lambda: calls.append("second"))
+
+    assert first.acquire() and first.acquire() and first.held
+    assert not second.acquire() and not second.held
+
+    first.release()
+    assert second.acquire() and not first.acquire()
+    assert calls == ["first", "second"]
@@ -0,0 +1,94 @@
+from datetime import UTC, datetime
+
+import numpy as np
+
+from src.data.lot_ledger import LotLedger, LotLedgerStore
+
+DAY1 = datetime(2024, 1, 1, tzinfo=UTC).timestamp()
+DAY2 = datetime(2024, 1, 2, tzinfo=UTC).timestamp()
+DAY3 = datetime(2024, 2, 3, tzinfo=UTC).timestamp()
+
+FILLS = [
+    # OKXAdapter.get_trades shape, fee in quote
+    {"id": "b1", "symbol": "PEPE/USDT", "side": "BUY", "quantity": 100, "price": 1.0, "fee": 1.0,
+     "fee_currency": "USDT", "timestamp": int(DAY1 * 1000)},
+    # ccxt shape, fee charged in the base asset
+    {"id": "b2", "symbol": "PEPE/USDT", "side": "buy", "amount": 101, "price": 2.0,
+     "fee": {"cost": 1.0, "currency": "PEPE"}, "datetime": "2024-01-01T12:00:00Z"},
+    # Raw OKX fill
+    {"fillId": "s1", "instId": "PEPE-USDT", "side": "sell", "fillSz": "150", "fillPx": "3", "fee": "-1.5",
+     "feeCcy": "USDT", "ts": str(int(DAY2 * 1000))},
+    # trades table row
+    {"id": 7, "symbol": "PEPE/USDT", "action": "sell", "size": 80, "price": 4.0, "commission": 0.0,
+     "timestamp": "2024-02-03 00:00:00"},
+]
+
+
+def test_fifo_and_average_cost_realize_incrementally():
+    ledger = LotLedger()
+    assert ledger.ingest(FILLS[:3]) == 3 and ledger.ingest(FILLS[:3]) == 0
+
+    # The base-asset fee keeps the 202 USDT paid on 100 net PEPE: 2.02 per unit
+    lot = ledger.open_lot("b2")
+    assert lot[0] == 50.0 and np.isclose(lot[1], 2.02) and ledger.open_lot("b1") is None
+    # FIFO: 100 @ 1.01 then 50 of the 2.02 lot; proceeds 450 - 1.5
+    assert np.isclose(ledger.fill_pnl("s1")[0], 448.5 - 101 - 101)
+    # Average cost: 150 of 200 @ 303 / 200
+    assert np.isclose(ledger.fill_pnl("s1", "average")[0], 448.5 - 150 * 1.515)
+    assert np.isclose(ledger.unrealized("PEPE", 4.0), 50 * (4.0 - 2.02))
+    assert np.isclose(ledger.unrealized("PEPE", 4.0, "average"), 50 * (4.0 - 1.515))
+
+    ledger.ingest(FILLS[3:])
+    pos = ledger.position("PEPE-USDT")
+    assert pos["quantity"] == 0.0 and pos["unmatched_qty"] == 30.0
+    assert np.isclose(ledger.realized("PEPE", period="day", at=DAY2), 246.5)
+    assert np.isclose(ledger.realized(period="month", at=DAY3), 50 * (4.0 - 2.02))
+    assert np.isclose(ledger.realized(), 246.5 + 99.0) and ledger.realized(period="day", at=DAY1) == 0.0
+    assert np.isclose(ledger.realized(period="week", at=DAY1), 246.5)
+
+
+def test_ledger_replays_stored_fills_once(tmp_path):
+    store = LotLedgerStore(str(tmp_path / "ledger.db"))
+    first = LotLedger(store)
+    first.ingest(FILLS[:2])
+    first.ingest(FILLS[2:3])
+
+    restarted = LotLedger(store)
+    assert restarted.position("PEPE", "average") == first.position("PEPE", "average")
+    assert restarted.ingest(FILLS) == 1
+    assert np.isclose(restarted.realized("PEPE"), 345.5)
+
+
+def test_cost_field_and_quote_currency():
+    ledger = LotLedger()
+    fills = [
+        # ccxt order: cost is what was paid, price is rounded
+        {"id": "c1", "symbol": "BTC/USDT", "side": "buy", "amount": 2.0, "price": 100.0, "cost": 201.0,
+         "fee": {"cost": 0.01, "currency": "BTC"}, "timestamp": int(DAY1 * 1000)},
+        # Other quote currencies must not share the USDT lots
+        {"id": "e1", "symbol": "BTC/EUR", "side": "buy", "amount": 5.0, "price": 90.0, "timestamp": int(DAY1 * 1000)},
+        {"id": "e2", "instId": "ETH-BTC", "side": "buy", "fillSz": "1", "fillPx": "0.05", "ts": str(int(DAY1 * 1000))},
+    ]
+    assert ledger.ingest(fills) == 1
+    pos = ledger.position("BTC")
+    assert np.isclose(pos["quantity"], 1.99) and np.isclose(pos["cost_basis"], 201.0)
+    assert ledger.position("ETH")["quantity"] == 0.0
+
+
+def test_late_fills_replay_the_asset_in_time_order(tmp_path):
+    def fill(fid, side, price, ts):
+        return {"id": fid, "symbol": "BTC/USDT", "side": side, "quantity": 1, "price": price, "fee": 0.0,
+                "fee_currency": "USDT", "timestamp": int(ts * 1000)}
+
+    b1, b2, s1 = fill("b1", "buy", 100.0, DAY1), fill("b2", "buy", 200.0, DAY1 + 60), fill("s1", "sell", 150.0, DAY2)
+    store = LotLedgerStore(str(tmp_path / "ledger.db"))
+    ledger = LotLedger(store)
+    # A limit=N fetch first sees only the newest fills, a wider one the older buy
+    ledger.ingest([b2, s1])
+    assert ledger.ingest([b1, b2, s1]) == 1
+
+    assert ledger.realized("BTC") == 50.0 and ledger.realized("BTC", period="day", at=DAY2) == 50.0
+    assert ledger.open_lot("b2") == (1.0, 200.0) and ledger.open_lot("b1") is None
+    assert ledger.fill_pnl("s1") == (50.0, 100.0)
+    restarted = LotLedger(store)
+    assert restarted.realized("BTC") == 50.0 and restarted.position("BTC") == ledger.position("BTC")
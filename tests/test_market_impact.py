@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from src.backtesting import walk_forward
+from src.backtesting.engine import BacktestEngine
+from src.config import Config
+from src.data.market_impact import MarketImpactModel, MarketImpactStore, book_levels, walk_cost
+from src.services.order_book_sampler import OrderBookSampler
+from src.strategies.base import Signal
+from src.strategies.enhanced_bollinger_strategy import EnhancedBollingerBandsStrategy
+
+
+def _book(mid=1e-5, tick=1e-8, size=2e7, levels=20):
+    # Thin meme-coin book: ~200 USDT per level
+    return {"bids": [[mid - tick * (i + 1), size] for i in range(levels)],
+            "asks": [[mid + tick * (i + 1), size] for i in range(levels)]}
+
+
+def test_walked_costs_fit_a_curve_that_grows_past_the_book(tmp_path):
+    buy, _ = walk_cost(book_levels(_book()), np.array([100.0, 1000.0, 1e5]))
+    assert np.isclose(buy[0], 1e-3, rtol=1e-3) and buy[1] > buy[0] and np.isnan(buy[2])
+
+    store = MarketImpactStore(str(tmp_path / "impact.db"))
+    sampler = OrderBookSampler(store, ["PEPE"], fetch_book=lambda symbol: _book(), refit_seconds=0)
+    assert sampler.sample_once(now=1000.0) == 1 and sampler.sample_once(now=1060.0) == 1
+    assert len(store.snapshots("PEPE/USDT")) == 2
+
+    model = MarketImpactModel(store)
+    slip = [model.slippage("PEPE-USDT", n, "buy") for n in (100.0, 1000.0, 4000.0, 20000.0)]
+    assert np.isclose(slip[0], 1e-3, rtol=1e-3) and slip == sorted(slip) and slip[3] > 2 * slip[2]
+    assert model.slippage("BTC/USDT", 1000.0, "buy", default=0.0005) == 0.0005
+
+
+def test_backtest_and_strategy_price_fills_off_the_curve(tmp_path, monkeypatch):
+    store = MarketImpactStore(str(tmp_path / "impact.db"))
+    for ts in (1.0, 2.0):
+        store.add_snapshot("PEPE", book_levels(_book()), ts=ts)
+    sampler = OrderBookSampler(store, ["PEPE"], fetch_book=lambda symbol: _book())
+    sampler.refit(["PEPE"], now=3.0)
+
+    config = Config("missing.ini")
+    engine = BacktestEngine(config, EnhancedBollingerBandsStrategy(config))
+    engine.impact = MarketImpactModel(store)
+    small = engine._fill_price("PEPE/USDT", 1e-5, 100.0, "buy")
+    large = engine._fill_price("PEPE/USDT", 1e-5, 3000.0, "buy")
+    assert small < large and engine._fill_price("BTC/USDT", 100.0, 1e6, "sell") == 100.0 * (1 - engine.slippage)
+
+    # Curves are part of the result cache key, so a refit invalidates cached runs
+    data = pd.DataFrame({"close": [1.0]}, index=pd.date_range("2024-01-01", periods=1, tz="UTC"))
+    keyed = engine._cache_key("PEPE/USDT", "1h", data)
+    engine.impact = None
+    assert keyed != engine._cache_key("PEPE/USDT", "1h", data)
+    # ...and so are walk-forward fold keys
+    monkeypatch.setattr(walk_forward, "get_market_impact_model", lambda: MarketImpactModel(store))
+    assert walk_forward._engine_settings(config, "PEPE/USDT")["impact"] == 3.0
+    assert "impact" not in walk_forward._engine_settings(config, "BTC/USDT")
+
+    strategy = EnhancedBollingerBandsStrategy(config)
+    strategy.symbol = "PEPE/USDT"
+    assert strategy._impact_slippage(1000.0, "buy", 0.0) == 0.0
+    strategy.impact = MarketImpactModel(store)
+    qty = strategy.calculate_position_size(Signal("buy", 1e-5, 0.1), 10000.0, 1e-5)
+    assert np.isclose(qty * 1e-5, 1000.0 / (1 + strategy._impact_slippage(1000.0, "buy", 0.0)))
+    assert strategy._impact_slippage(1000.0, "buy", 0.0) > 1e-3
+
+
+def test_backtest_strategy_uses_only_the_engine_impact_model(tmp_path):
+    store = MarketImpactStore(str(tmp_path / "impact.db"))
+    for ts in (1.0, 2.0):
+        store.add_snapshot("PEPE", book_levels(_book()), ts=ts)
+    OrderBookSampler(store, ["PEPE"], fetch_book=lambda symbol: _book()).refit(["PEPE"], now=3.0)
+
+    config = walk_forward.apply_params(Config("missing.ini"), {"backtesting.order_book_slippage": False})
+    strategy = EnhancedBollingerBandsStrategy(config)
+    strategy.impact = MarketImpactModel(store)
+    engine = BacktestEngine(config, strategy)
+    assert engine.impact is None
+
+    close = np.full(60, 1e-5)
+    data = pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": 1.0},
+                        index=pd.date_range("2024-01-01", periods=60, freq="1h", tz="UTC"))
+    engine._simulate_trading(data, "PEPE/USDT")
+    # With impact disabled the strategy sizes without curves, matching the cache key
+    assert strategy.impact is None and strategy._impact_slippage(1000.0, "buy", 0.0) == 0.0
+
+
+def test_reading_curves_never_creates_the_database(tmp_path):
+    path = tmp_path / "absent.db"
+    store = MarketImpactStore(str(path))
+    assert MarketImpactModel(store).slippage("PEPE", 1000.0, "buy", default=0.002) == 0.002
+    assert store.snapshots("PEPE") == [] and not path.exists()
+    store.add_snapshot("PEPE", book_levels(_book()), ts=1.0)
+    assert len(store.snapshots("PEPE")) == 1
@@ -0,0 +1,43 @@
+import os
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+from src.ml.model_service import ModelService, PackedForest
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(0, 100, 300), rng.uniform(0, 1, 300)])
+    return X, X[:, 0] / 100 * 0.04 + X[:, 1] * 0.03 + rng.normal(0, 0.01, 300)
+
+
+def test_packed_forest_matches_sklearn():
+    X, y = _data()
+    reg = RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+    clf = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y > np.median(y))
+
+    assert np.allclose(PackedForest.from_estimator(reg).predict(X), reg.predict(X))
+    packed_clf = PackedForest.from_estimator(clf)
+    assert np.allclose(packed_clf.predict_proba(X), clf.predict_proba(X))
+    assert (packed_clf.predict(X) == clf.predict(X)).all()
+
+
+def test_model_hot_swaps_on_file_change(tmp_path):
+    X, y = _data()
+    path = tmp_path / "model.pkl"
+    joblib.dump(RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y), path)
+
+    service = ModelService({"m": path}, check_interval=0)
+    first = service.predict_many("m", X[:3])
+    assert service.status()["m"]["packed"] is True
+
+    joblib.dump(RandomForestRegressor(n_estimators=5, random_state=0).fit(X, -y), path)
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    second = service.predict_many("m", X[:3])
+
+    assert service.status()["m"]["loads"] == 2
+    assert np.allclose(first, -second)
+    assert service.predict_many("missing", X) is None
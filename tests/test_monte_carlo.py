@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from src.backtesting.monte_carlo import run_monte_carlo, trade_returns
+from src.config import Config
+from src.indicators.technical import TechnicalIndicators
+from src.risk.manager import RiskManager
+
+
+def test_trade_returns_from_backtest_and_ledger():
+    fills = [
+        {"action": "buy", "price": 100.0, "size": 1.0, "commission": 0.0},
+        {"action": "sell", "price": 110.0, "size": 1.0, "commission": 0.0},
+        {"action": "sell", "price": 50.0, "size": 2.0, "commission": 0.0},
+        {"action": "buy", "price": 55.0, "size": 2.0, "commission": 0.0},
+    ]
+    np.testing.assert_allclose(trade_returns(fills), [0.10, -0.10])
+
+    ledger = pd.DataFrame({
+        "timestamp": pd.to_datetime(["2024-01-03", "2024-01-01", "2024-01-02"]),
+        "action": ["sell", "buy", "sell"],
+        "price": [90.0, 100.0, 120.0],
+        "size": [1.0, 1.0, 1.0],
+        "pnl": [-10.0, None, 20.0],
+    })
+    np.testing.assert_allclose(trade_returns(ledger), [0.2, -0.1])
+
+
+def test_shuffle_keeps_final_equity_and_chunks_match():
+    rng = np.random.default_rng(1)
+    returns = rng.normal(0.01, 0.05, 60)
+    whole = run_monte_carlo(returns, n_paths=2000, method="shuffle", fraction=0.5, seed=3)
+    chunked = run_monte_carlo(returns, n_paths=2000, method="shuffle", fraction=0.5, seed=3, max_cells=600)
+
+    np.testing.assert_allclose(whole.final_return, np.prod(1 + 0.5 * returns) - 1)
+    assert whole.max_drawdown.std() > 0 and (whole.max_drawdown <= 0).all()
+    assert chunked.n_paths == 2000 and whole.summary()["paths"] == 2000
+
+
+def test_bootstrap_feeds_kelly_sizing():
+    returns = np.random.default_rng(5).normal(0.01, 0.04, 80)
+    result = run_monte_carlo(returns, n_paths=5000, block_size=4, fraction=0.2, seed=7)
+    inputs = result.kelly_inputs(0.95)
+
+    assert inputs["win_rate"] < result.observed["win_rate"]
+    assert inputs["avg_loss"] > result.observed["avg_loss"]
+    assert result.ruin_probability == 0.0 and 0 < result.drawdown_probability(0.01) <= 1
+
+    risk = RiskManager(Config("missing.ini"))
+    robust = risk.calculate_position_size_monte_carlo(result, 10000)
+    observed = result.observed
+    naive = risk.calculate_position_size_kelly(observed["win_rate"], observed["avg_win"], observed["avg_loss"], 10000)
+    assert 0.01 <= robust < naive
+    assert 0 <= TechnicalIndicators.fractional_kelly(inputs["expected_return"], inputs["volatility"]) <= 0.25
+
+    risky = run_monte_carlo(np.array([0.5, -0.6] * 20), n_paths=2000, fraction=1.0, seed=7)
+    assert risky.ruin_probability > 0.5
+    assert risk.calculate_position_size_monte_carlo(risky, 10000) == 0.01
@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.utils.performance_metrics import (
+    StreamingMetrics,
+    compute_metrics,
+    max_drawdown,
+    periods_per_year,
+    rolling_max_drawdown,
+    rolling_sharpe,
+)
+
+
+def _equity(n=500, seed=7):
+    rng = np.random.default_rng(seed)
+    return 1000 * np.cumprod(1 + rng.normal(0.0005, 0.01, n))
+
+
+def test_streaming_matches_batch():
+    values = _equity()
+    positions = (np.arange(len(values)) % 3 != 0).astype(float)
+    pnls = np.array([12.0, -4.0, 7.5, -10.0, 3.0])
+    ts = 1_700_000_000 + 14400 * np.arange(len(values))
+
+    batch = compute_metrics(values, pnls, positions, timestamps=ts)
+    stream = StreamingMetrics()
+    for value, position, t in zip(values, positions, ts, strict=True):
+        stream.update(value, t, exposed=position != 0)
+    for pnl in pnls:
+        stream.record_trade(pnl)
+    live = stream.snapshot()
+
+    assert batch["periods_per_year"] == periods_per_year("4h")
+    assert set(live) == set(batch)
+    for key, value in batch.items():
+        assert math.isclose(live[key], value, rel_tol=1e-9, abs_tol=1e-12), key
+    assert batch["win_rate"] == 0.6 and batch["profit_factor"] == 22.5 / 14
+
+
+def test_drawdown_depth_and_duration():
+    values = np.array([100, 120, 90, 110, 125, 100, 130.0])
+    assert max_drawdown(values) == (-0.25, 2)
+    windowed = rolling_max_drawdown(values, 3)
+    assert np.isnan(windowed[:2]).all() and windowed[2] == -0.25 and windowed[-1] == -0.2
+
+
+def test_rolling_sharpe_matches_window_by_window():
+    returns = np.diff(_equity(200)) / _equity(200)[:-1]
+    rolled = rolling_sharpe(returns, 30, periods_per_year("1d"))
+    window = pd.Series(returns).rolling(30)
+    expected = window.mean() / window.std() * math.sqrt(365)
+    np.testing.assert_allclose(rolled[29:], expected.to_numpy()[29:], rtol=1e-6)
+    assert np.isnan(rolled[:29]).all()
+
+
+def test_backtest_win_rate_counts_losses():
+    from src.backtesting.engine import BacktestEngine
+    from src.config import Config
+
+    engine = BacktestEngine(Config("missing.ini"), None)
+    engine.trades = [{"action": a} for a in ("buy", "sell", "buy", "sell")]
+    results = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=4, freq="1D", tz="UTC"),
+        "portfolio_value": [10000, 10100, 10100, 10050.0],
+        "position": [1.0, 0.0, 1.0, 0.0],
+        "trade_pnl": [0.0, 100.0, 0.0, -50.0],
+    })
+    metrics = engine._calculate_metrics(results)
+    assert metrics["win_rate"] == 0.5 and metrics["avg_loss"] == -50.0
+    assert metrics["total_trades"] == 4 and metrics["closed_trades"] == 2
+    assert metrics["periods_per_year"] == 365 and metrics["exposure"] == 0.5
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.backtesting.portfolio_engine import PortfolioBacktestEngine
+from src.config import Config
+
+
+def _flat(n_bars, price=100.0, start="2024-01-01"):
+    index = pd.date_range(start, periods=n_bars, freq="1h", tz="UTC")
+    return pd.DataFrame({"close": np.full(n_bars, price)}, index=index)
+
+
+def test_symbols_share_one_cash_ledger():
+    # Everything buys on bar 1 and sells on bar 3
+    def signals(symbol, data):
+        action = np.zeros(len(data), dtype=int)
+        action[1], action[3] = 1, -1
+        confidence = np.full(len(data), float(symbol[1:]))
+        return pd.DataFrame({"action": action, "confidence": confidence}, index=data.index)
+
+    histories = {f"S{i}": _flat(5) for i in range(20)}
+    engine = PortfolioBacktestEngine(Config("missing.ini"), signals, position_fraction=0.08)
+    result = engine.run(histories)
+
+    buys = result["trades"][result["trades"]["action"] == "buy"]
+    # 8% of equity per position: 12 full entries, a 13th with the remaining cash,
+    # then the balance is below the $100 minimum
+    assert len(buys) == 13
+    assert list(buys["symbol"]) == [f"S{i}" for i in range(19, 6, -1)]
+    assert buys["size"].iloc[-1] < buys["size"].iloc[0] / 2
+    assert result["rejections"]["min_usdt"] == 7
+    assert result["events"] == 100 and len(result["equity_curve"]) == 5
+    # Round trip at a flat price only loses slippage and commission
+    assert result["open_positions"] == 0 and 0.99 < result["final_value"] / 10000 < 1.0
+
+
+def test_merged_timeline_handles_unaligned_calendars():
+    def buy_and_hold(symbol, data):
+        action = np.zeros(len(data), dtype=int)
+        action[0] = 1
+        return action
+
+    histories = {"A": _flat(4, 10.0), "B": _flat(4, 20.0, start="2024-01-01 02:00")}
+    result = PortfolioBacktestEngine(Config("missing.ini"), buy_and_hold).run(histories)
+
+    assert len(result["equity_curve"]) == 6
+    assert list(result["trades"]["symbol"]) == ["A", "B"]
+    assert result["trades"]["timestamp"].iloc[1] == pd.Timestamp("2024-01-01 02:00", tz="UTC")
@@ -0,0 +1,31 @@
+from src.data.portfolio_timeseries import PortfolioTimeSeries, drawdown_curve, equity_metrics
+
+DAY = 86400
+T0 = 1_700_000_000 - (1_700_000_000 % DAY)
+
+
+def test_rollups_are_maintained_incrementally(tmp_path):
+    ts = PortfolioTimeSeries(str(tmp_path / "t.db"))
+    for i, value in enumerate([100.0, 120.0, 90.0, 110.0]):
+        ts.record(value, 10.0, {"BTC": value - 10.0}, ts=T0 + i * 60)
+
+    hourly = ts.series("7d", now=T0 + 3600)
+    assert len(hourly) == 1
+    assert hourly[0]["equity"] == 110.0
+    assert (hourly[0]["high"], hourly[0]["low"]) == (120.0, 90.0)
+    assert len(ts.series("24h", now=T0 + 3600)) == 4
+    assert ts.latest_assets() == {"BTC": 100.0}
+
+    assert ts.prune(now=T0 + 3 * DAY) == 4  # only the 1m tier has expired
+
+
+def test_drawdown_curve_metrics():
+    points = [
+        {"ts": T0 + i * DAY, "date": f"2023-11-{15 + i}T00:00:00+00:00", "equity": v}
+        for i, v in enumerate([100.0, 120.0, 90.0, 130.0])
+    ]
+    curve, metrics = drawdown_curve(points)
+    assert [round(p["drawdown_percent"], 2) for p in curve] == [0, 0, 25.0, 0]
+    assert metrics["max_drawdown_percent"] == 25.0
+    assert metrics["recovery_periods"] == 1
+    assert round(equity_metrics(points)["total_return_percent"], 6) == 30.0
@@ -0,0 +1,58 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting import replay
+from src.backtesting.replay import run_replay
+from src.config import Config
+from src.exchanges.replay_adapter import ReplayExchange, ReplayPortfolioService
+from src.utils.virtual_clock import VirtualClock
+
+
+def _candles(n, seed=3):
+    close = 100 * np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.012, n))
+    index = pd.date_range("2024-01-01", periods=n, freq="1h", tz="UTC")
+    return pd.DataFrame({"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+                         "volume": 1.0}, index=index)
+
+
+def test_exchange_sees_only_closed_candles_and_fills_orders():
+    candles = _candles(10)
+    clock = VirtualClock(datetime(2024, 1, 1, 3))
+    exchange = ReplayExchange({"BTC/USDT": candles}, clock, "1h", initial_cash=1000.0, fee_rate=0.001)
+
+    assert len(exchange.get_ohlcv("BTC/USDT", "1h")) == 3
+    order = exchange.place_order("BTC/USDT", "buy", 2.0)
+    price = candles["close"].iat[2]
+    assert order["average"] == price and np.isclose(exchange.balances["USDT"], 1000.0 - 2 * price * 1.001)
+
+    limit = exchange.place_order("BTC/USDT", "sell", 1.0, "limit", price=candles["high"].iloc[3:].max())
+    assert exchange.get_open_orders() and exchange.get_balance()["BTC"]["free"] == 1.0
+    clock.sleep(7 * 3600)
+    assert not exchange.get_open_orders() and exchange.balances["BTC"] == 1.0
+    assert exchange.fills[-1]["id"] == limit["id"]
+
+    holding = ReplayPortfolioService(exchange).get_portfolio_data()["holdings"][0]
+    assert holding["symbol"] == "BTC" and holding["quantity"] == 1.0
+    assert np.isclose(holding["avg_entry_price"], price * 1.001)
+
+
+def test_replay_drives_live_loop_on_virtual_time():
+    candles = _candles(400)
+    began = time.monotonic()
+    result = run_replay(Config("missing.ini"), candles, "BTC/USDT", "1h", warmup=100)
+
+    assert result.bars == 301 and time.monotonic() - began < 60
+    assert result.statistics["last_update"] == result.end.isoformat()
+    assert result.equity_curve.index[0] == result.start + pd.Timedelta(hours=1)
+
+
+def test_replay_never_patches_a_shared_process():
+    # The test runner stands in for the web server: the replay must not run in it
+    with pytest.raises(RuntimeError, match="dedicated process"):
+        replay._replay_in_process(Config("missing.ini"), _candles(200), warmup=100)
+    from src.trading import enhanced_trader
+    assert enhanced_trader.time is time and enhanced_trader.datetime is datetime
@@ -0,0 +1,87 @@
+from datetime import UTC, datetime
+
+import numpy as np
+import pandas as pd
+
+from src.data.manager import DataManager
+from src.data.resampler import CandleResampler, get_candle_resampler
+
+AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+def _minutes(start, n, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.2, n))
+    index = pd.date_range(start, periods=n, freq="1min", tz="UTC")
+    return pd.DataFrame({"open": close - 0.05, "high": close + rng.uniform(0, 0.3, n),
+                         "low": close - rng.uniform(0, 0.3, n), "close": close,
+                         "volume": rng.uniform(1, 2, n)}, index=index)
+
+
+def test_incremental_buckets_match_pandas_resample_without_double_counting():
+    bars = _minutes("2024-01-01 00:00", 200)
+    resampler = CandleResampler(("5m", "15m", "1h"))
+    # Fed in overlapping chunks, as repeated fetches of the live tail arrive
+    for stop in range(20, 201, 20):
+        resampler.ingest("BTC/USDT", bars.iloc[max(0, stop - 35):stop])
+
+    # The newest minute of every fetch stays pending and is shown once
+    for tf, rule in (("5m", "5min"), ("15m", "15min"), ("1h", "1h")):
+        expected = bars.resample(rule).agg(AGG)
+        got = resampler.get("BTC/USDT", tf, limit=1000)
+        pd.testing.assert_frame_equal(got, expected, check_freq=False, check_names=False,
+                                      check_index_type=False)
+
+    closed = resampler.get("BTC/USDT", "1h", include_pending=False)
+    assert closed["volume"].sum() == bars["volume"].iloc[:-1].sum()
+
+
+def test_live_minute_is_not_folded_until_the_exchange_moves_past_it():
+    bars = _minutes("2024-01-01 00:00", 12)
+    resampler = CandleResampler(("5m",))
+    # The newest minute is still live, however late the local clock thinks it is
+    partial = bars.iloc[:11].copy()
+    partial.iloc[-1, partial.columns.get_loc("high")] -= 0.2
+    partial.iloc[-1, partial.columns.get_loc("volume")] = 0.1
+    assert resampler.ingest("BTC/USDT", partial) == 10
+    assert resampler.ingest("BTC/USDT", bars) == 1
+
+    expected = bars.resample("5min").agg(AGG)
+    pd.testing.assert_frame_equal(resampler.get("BTC/USDT", "5m"), expected, check_freq=False,
+                                  check_names=False, check_index_type=False)
+
+
+def test_resamplers_are_kept_per_exchange():
+    okx, kraken = get_candle_resampler("OKXAdapter"), get_candle_resampler("KrakenAdapter")
+    assert okx is get_candle_resampler("OKXAdapter") and okx is not kraken and kraken.exchange == "KrakenAdapter"
+
+
+class _MinuteExchange:
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = []
+
+    def get_ohlcv(self, symbol, timeframe, limit=100):
+        self.calls.append((timeframe, limit))
+        if timeframe == "1m":
+            return self.bars.iloc[-limit:]
+        return self.bars.resample(timeframe.replace("m", "min")).agg(AGG).iloc[-limit:]
+
+
+def test_data_manager_serves_all_timeframes_from_one_minute_stream():
+    now = pd.Timestamp(datetime.now(UTC)).floor("1min")
+    exchange = _MinuteExchange(_minutes(now - pd.Timedelta(minutes=599), 600))
+    manager = DataManager(exchange, cache_enabled=False, resampler=CandleResampler(("5m", "15m")))
+
+    five = manager.get_ohlcv("BTC/USDT", "5m", limit=50)
+    fifteen = manager.get_ohlcv("BTC/USDT", "15m", limit=30)
+    manager.get_ohlcv("BTC/USDT", "15m", limit=30)
+
+    # One 1m fetch (refresh is throttled); 5m fits in it, 15m is seeded once
+    assert [tf for tf, _ in exchange.calls] == ["1m", "15m"]
+    assert len(five) == 50 and len(fifteen) == 30
+    expected = exchange.bars.resample("15min").agg(AGG).iloc[-30:]
+    pd.testing.assert_frame_equal(fifteen, expected, check_freq=False, check_names=False, check_index_type=False)
+    assert five.attrs == {"symbol": "BTC/USDT", "timeframe": "5m", "exchange": "default"}
+    assert five.index[-1] == exchange.bars.index[-1].floor("5min")
+    assert np.isclose(five["close"].iloc[-1], exchange.bars["close"].iloc[-1])
@@ -0,0 +1,71 @@
+import math
+
+from src.data.signal_journal import SignalJournal
+
+
+def _fill(journal, n, start=1_700_000_000.0, symbols=("BTC", "ETH", "SOL")):
+    for i in range(n):
+        journal.append({"ts": start + i, "symbol": symbols[i % len(symbols)],
+                        "confidence_score": float(i % 100), "timing_signal": "BUY"})
+
+
+def test_batched_segments_answer_per_symbol_queries(tmp_path):
+    journal = SignalJournal(tmp_path, batch_size=50, flush_seconds=3600)
+    _fill(journal, 230)
+    # 4 full batches flushed, 30 rows still buffered
+    assert len(journal._segments()) == 4 and journal.count() == 230
+
+    last = journal.last("SOL", 5)
+    assert list(last["ts"]) == [1_700_000_000.0 + i for i in (215, 218, 221, 224, 227)]
+    assert set(last["symbol"]) == {"SOL"}
+    window = journal.query("ETH", start=1_700_000_010, end=1_700_000_030)
+    assert list(window["ts"] - 1_700_000_000) == [10, 13, 16, 19, 22, 25, 28]
+    assert journal.latest_per_symbol()["BTC"]["ts"] == 1_700_000_000.0 + 228
+    assert math.isnan(journal.query("BTC", limit=1)["rsi"].iloc[0])
+
+    # Another process reopening the directory sees the flushed segments
+    assert len(SignalJournal(tmp_path).query()) == 200
+
+
+def test_compaction_merges_segments_and_applies_retention(tmp_path):
+    journal = SignalJournal(tmp_path, batch_size=10, flush_seconds=3600, segment_rows=1000,
+                            retention_days=1)
+    _fill(journal, 100, start=0.0)
+    _fill(journal, 100, start=200_000.0)
+    assert len(journal._segments()) == 20
+
+    stats = journal.compact(now=200_000.0 + 3600)
+    assert stats["dropped"] == 10 and stats["expired_rows"] == 100
+    assert len(journal._segments()) == 1
+    assert len(journal.query()) == 100 and journal.query()["ts"].min() == 200_000.0
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("seg-")) == \
+        [journal._segments()[0]["name"]]
+    assert list(journal.last("SOL", 2)["ts"]) == [200_095.0, 200_098.0]
+
+
+def test_last_n_ignores_other_symbols_in_the_buffer(tmp_path):
+    journal = SignalJournal(tmp_path, batch_size=1000, flush_seconds=3600)
+    for batch in ([100.0], [95.0, 50.0], [90.0]):
+        for ts in batch:
+            journal.append({"ts": ts, "symbol": "SOL"})
+        journal.flush()
+    for _ in range(3):
+        journal.append({"ts": 200.0, "symbol": "BTC"})
+
+    assert list(journal.last("SOL", 3)["ts"]) == [90.0, 95.0, 100.0]
+    assert list(journal.query(start=92, limit=2)["ts"]) == [200.0, 200.0]
+
+
+def test_csv_export_streams_overlapping_segments_in_time_order(tmp_path):
+    journal = SignalJournal(tmp_path, batch_size=1000, flush_seconds=3600)
+    for batch in ([5.0, 1.0, 9.0], [3.0, 7.0], [2.0, 8.0]):
+        for ts in batch:
+            journal.append({"ts": ts, "symbol": "ETH" if ts % 2 else "BTC", "confidence_score": ts})
+        journal.flush()
+    journal.append({"ts": 4.0, "symbol": "SOL"})
+
+    lines = "".join(journal.iter_csv(chunk_rows=2)).splitlines()
+    assert lines[0].startswith("timestamp,symbol,")
+    assert [float(line.split(",")[5]) for line in lines[1:4]] == [1.0, 2.0, 3.0]
+    stamps = [line.split(",")[0] for line in lines[1:]]
+    assert len(stamps) == 8 and stamps == sorted(stamps) and stamps[0] == "1970-01-01T00:00:01.000000+0000"
@@ -0,0 +1,87 @@
+import sqlite3
+import time
+
+from src.utils.target_price_manager import LOCK_DURATION, TargetPriceManager
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.calls = []
+
+    def calculate_confidence(self, symbol, current_price):
+        self.calls.append(symbol)
+        return {'suggested_target_price': current_price * 0.9, 'confidence_score': 70.0}
+
+
+def _rows(db):
+    with sqlite3.connect(db) as conn:
+        return dict(conn.execute('SELECT symbol, target_price FROM target_prices').fetchall())
+
+
+class ScaledAnalyzer(FakeAnalyzer):
+    def __init__(self, factor):
+        super().__init__()
+        self.factor = factor
+
+    def calculate_confidence(self, symbol, current_price):
+        self.calls.append(symbol)
+        return {'suggested_target_price': current_price * self.factor, 'confidence_score': 70.0}
+
+
+def test_targets_are_served_from_memory_and_shared_through_sqlite(tmp_path):
+    db = str(tmp_path / "targets.db")
+    analyzer = FakeAnalyzer()
+    manager = TargetPriceManager(db, analyzer=analyzer)
+
+    assert manager.get_locked_target_price("BTC", 100.0) == (90.0, True)
+    assert manager.get_locked_target_price("BTC", 99.0) == (90.0, True)
+    assert analyzer.calls == ["BTC"]
+    assert _rows(db) == {"BTC": 90.0}
+
+    # Another worker (or a restart) picks up the locked target without recomputing it
+    other = TargetPriceManager(db, analyzer=FakeAnalyzer())
+    assert other.get_locked_target_price("BTC", 100.0) == (90.0, True)
+    assert list(other.get_all_locked_targets()) == ["BTC"]
+
+    # A reset in one worker is seen by the others on their next sync
+    other.reset_target_price("BTC")
+    assert _rows(db) == {} and manager._sync() and manager.get_all_locked_targets() == {}
+
+
+def test_racing_workers_converge_on_the_first_committed_target(tmp_path):
+    db = str(tmp_path / "targets.db")
+    first = TargetPriceManager(db, analyzer=ScaledAnalyzer(0.9))
+    second = TargetPriceManager(db, analyzer=ScaledAnalyzer(0.8))
+
+    # The second worker missed before the first one committed, so it computes too
+    assert first.get_locked_target_price("ETH", 10.0) == (9.0, True)
+    assert second._calculate_new_target("ETH", 10.0) == (9.0, True)
+    assert _rows(db) == {"ETH": 9.0}
+
+    # A worker that misses after the commit re-reads the table instead of computing
+    assert second.get_locked_target_price("ETH", 10.0) == (9.0, True)
+    assert second.confidence_analyzer.calls == ["ETH"]
+
+    # A >5% drop is recalculated once and the other worker adopts the new row
+    assert second.get_locked_target_price("ETH", 9.0) == (7.2, True)
+    assert first.get_locked_target_price("ETH", 9.0) == (7.2, True)
+    assert first.confidence_analyzer.calls == ["ETH"]
+
+
+def test_refresher_renews_used_targets_before_expiry(tmp_path):
+    analyzer = FakeAnalyzer()
+    manager = TargetPriceManager(str(tmp_path / "targets.db"), analyzer=analyzer)
+    manager.get_locked_target_price("BTC", 100.0)
+    manager.get_locked_target_price("ETH", 10.0)
+    expires = time.time() + LOCK_DURATION.total_seconds()
+
+    assert manager.refresh_due(now=expires - 3600) == 0
+    # Only BTC is looked up again during its lock
+    manager.get_locked_target_price("BTC", 120.0)
+    assert manager.refresh_due(now=expires - 60) == 1
+    assert analyzer.calls == ["BTC", "ETH", "BTC"]
+    assert manager.get_locked_target_price("BTC", 120.0) == (108.0, True)
+
+    # ETH expires unused and is dropped
+    manager.refresh_due(now=expires + 1)
+    assert set(manager._targets) == {"BTC"}
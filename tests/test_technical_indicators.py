@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.indicators.technical import TechnicalIndicators
+
+
+def _pandas_bollinger(data, period, std_dev):
+    middle = data.rolling(window=period).mean()
+    std = data.rolling(window=period).std()
+    return middle + std * std_dev, middle, middle - std * std_dev
+
+
+def _pandas_atr(high, low, close, period):
+    tr = pd.concat([high - low, abs(high - close.shift()), abs(low - close.shift())], axis=1).max(axis=1)
+    return tr.ewm(span=period).mean()
+
+
+def _prices(n=500, seed=3):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(100 + np.cumsum(rng.normal(0, 1, n)), name="close",
+                      index=pd.date_range("2024-01-01", periods=n, freq="1h", tz="UTC"))
+    return close, close + rng.uniform(0, 2, n), close - rng.uniform(0, 2, n)
+
+
+@pytest.mark.parametrize("period,std_dev", [(20, 2.0), (5, 1.5), (50, 2.5)])
+def test_bollinger_bands_match_pandas_rolling(period, std_dev):
+    close, _, _ = _prices()
+    close.iloc[[50, 51, 300]] = np.nan
+    got = TechnicalIndicators.bollinger_bands(close, period, std_dev)
+    for actual, expected in zip(got, _pandas_bollinger(close, period, std_dev), strict=True):
+        pd.testing.assert_series_equal(actual, expected, rtol=1e-9)
+
+    short = close.iloc[:period - 1]
+    for actual, expected in zip(TechnicalIndicators.bollinger_bands(short, period, std_dev),
+                                _pandas_bollinger(short, period, std_dev), strict=True):
+        pd.testing.assert_series_equal(actual, expected)
+
+
+def test_atr_matches_pandas_true_range():
+    close, high, low = _prices()
+    high.iloc[10] = np.nan
+    expected = _pandas_atr(high, low, close, 14)
+    pd.testing.assert_series_equal(TechnicalIndicators.atr(high, low, close, 14), expected, rtol=1e-12)
+
+    close, high, low = (s.round().astype(int) for s in _prices(seed=4))
+    pd.testing.assert_series_equal(TechnicalIndicators.atr(high, low, close), _pandas_atr(high, low, close, 14),
+                                   rtol=1e-12)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.ml.labels import CandleIndex, forward_returns
+from src.ml.registry import ModelRegistry
+from src.ml.training import build_training_set, train_incremental
+
+HOUR = 3600
+T0 = 1_700_000_000 - (1_700_000_000 % HOUR)
+
+
+def test_forward_returns_asof_lookup():
+    # Close of each hourly bar becomes known at T0 + (i + 1) h
+    candles = CandleIndex(["BTC"] * 5 + ["ETH"] * 5,
+                          [T0 + (i + 1) * HOUR for i in range(5)] * 2,
+                          [100, 101, 102, 103, 104, 10, 9, 8, 7, 6])
+    out = forward_returns(["BTC", "ETH", "ETH", "XRP"],
+                          [T0 + HOUR + 1800, T0 + 2 * HOUR, T0 + 4 * HOUR, T0 + 2 * HOUR],
+                          candles, {"1h": HOUR, "2h": 2 * HOUR})
+
+    assert np.allclose(out["entry_price"][:3], [100, 9, 7])
+    assert np.allclose(out["ret_1h"][:2], [0.01, 8 / 9 - 1])
+    assert np.isnan(out["ret_2h"][2])  # exit after the last candle: not realized yet
+    assert np.isnan(out["entry_price"][3]) and np.isnan(out["ret_1h"][3])
+
+
+def test_incremental_training_registers_versions(tmp_path):
+    rng = np.random.default_rng(0)
+    n_bars = 400
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    candles = pd.DataFrame({"symbol": "BTC", "available_at": T0 + np.arange(1, n_bars + 1) * HOUR,
+                            "close": closes})
+    signals = pd.DataFrame({"symbol": "BTC", "ts": T0 + np.arange(1, n_bars - 30) * HOUR,
+                            "confidence_score": rng.uniform(0, 100, n_bars - 31),
+                            "ml_probability": rng.uniform(0, 1, n_bars - 31)})
+    dataset = build_training_set(signals, candles, timeframe="1h")
+    registry = ModelRegistry(tmp_path)
+
+    first = train_incremental(dataset.iloc[:200], registry, trees_per_update=5)
+    second = train_incremental(dataset, registry, trees_per_update=5)
+
+    assert (first["mode"], second["mode"]) == ("full", "warm_start")
+    assert second["n_estimators"] == first["n_estimators"] + 5
+    assert second["trained_through"] > first["trained_through"]
+    assert registry.versions("buy_regression") == [1, 2]
+    assert registry.load("buy_regression").n_estimators == second["n_estimators"]
+    # Only the previous holdout is new now
+    assert train_incremental(dataset, registry, min_rows=second["holdout_rows"] + 1) is None
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from src.backtesting.walk_forward import WalkForwardEngine, WindowIndicatorCache, apply_params, generate_folds
+from src.config import Config
+from src.indicators.technical import TechnicalIndicators
+from src.strategies.base import BaseStrategy, Signal
+
+
+class SmaCrossStrategy(BaseStrategy):
+    def __init__(self, config):
+        super().__init__(config)
+        self.fast = config.get_int('strategy', 'fast_period', 5)
+        self.slow = config.get_int('strategy', 'slow_period', 20)
+        self.indicators = TechnicalIndicators()
+
+    def generate_signals(self, data):
+        fast = self.indicators.sma(data['close'], self.fast)
+        slow = self.indicators.sma(data['close'], self.slow)
+        price = data['close'].iloc[-1]
+        if fast.iloc[-1] > slow.iloc[-1]:
+            return [Signal('buy', price, 0.5)]
+        return [Signal('sell', price, 0.5)]
+
+    def calculate_position_size(self, signal, portfolio_value, current_price):
+        return portfolio_value * signal.size / current_price
+
+    def validate_signal(self, signal):
+        return True
+
+
+def _candles(n_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    index = pd.date_range("2024-01-01", periods=n_bars, freq="1h", tz="UTC")
+    return pd.DataFrame({"open": close, "high": close * 1.01, "low": close * 0.99,
+                         "close": close, "volume": 1.0}, index=index)
+
+
+def test_folds_stay_on_a_stable_grid():
+    folds = generate_folds("2024-01-01", "2024-02-01", train_period="7D", test_period="3D")
+    later = generate_folds("2024-01-04", "2024-02-04", train_period="7D", test_period="3D")
+
+    assert all(f.train_end - f.train_start == pd.Timedelta("7D") for f in folds)
+    assert all(a.test_end == b.train_end for a, b in zip(folds, folds[1:], strict=False))
+    # A later run reuses the earlier windows and adds new ones at the end
+    assert {f.train_end for f in folds[1:]} <= {f.train_end for f in later}
+    assert later[-1].test_end > folds[-1].test_end
+
+
+def test_window_cache_serves_prefixes():
+    window = _candles(100)
+    cache = WindowIndicatorCache(window)
+    for n in (30, 60, 100):
+        got = cache.sma(window["close"].iloc[:n], 10)
+        pd.testing.assert_series_equal(got, TechnicalIndicators.sma(window["close"].iloc[:n], 10))
+    assert (cache.misses, cache.hits) == (1, 2)
+    # Derived series with the same name are not served from the cache
+    changes = window["close"].pct_change().iloc[:50]
+    pd.testing.assert_series_equal(cache.rsi(changes, 14), TechnicalIndicators.rsi(changes, 14))
+
+
+def test_walk_forward_runs_folds_and_reuses_results(tmp_path):
+    histories = {"BTC": _candles(24 * 14), "ETH": _candles(24 * 14, seed=1)}
+    params = [{"strategy.fast_period": 5}, {"strategy.fast_period": 10}]
+    rng = np.random.default_rng(2)
+    ts = ((histories["BTC"].index - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1))[::2]
+    dataset = pd.DataFrame({"symbol": "BTC", "ts": ts, "confidence_score": rng.uniform(0, 100, len(ts)),
+                            "ml_probability": rng.uniform(0, 1, len(ts)), "ret_24h": rng.normal(0, 0.02, len(ts))})
+
+    def engine(workers):
+        return WalkForwardEngine(Config("missing.ini"), SmaCrossStrategy, param_sets=params,
+                                 train_period="5D", test_period="3D", max_workers=workers,
+                                 cache_dir=tmp_path)
+
+    first = engine(2).run(histories, model_dataset=dataset)
+    stats = first["stats"]
+    assert stats["failed"] == 0 and stats["reused"] == 0 and stats["computed"] == stats["tasks"]
+    assert {r["symbol"] for r in first["folds"]} == {"BTC", "ETH"}
+    assert all(r["params"] in params and r["out_of_sample"] for r in first["folds"])
+    assert all(r["indicator_cache"]["hits"] > 0 for r in first["folds"])
+    assert "total_return" in first["summary"]["out_of_sample"]
+    assert first["model"]["folds"] and "hit_rate" in first["model"]["summary"]
+
+    second = engine(1).run(histories, model_dataset=dataset)
+    assert second["stats"]["computed"] == 0 and second["stats"]["reused"] == stats["tasks"]
+    assert [r["out_of_sample"] for r in second["folds"]] == [r["out_of_sample"] for r in first["folds"]]
+
+
+def test_fold_cache_follows_base_strategy_config(tmp_path):
+    histories = {"BTC": _candles(24 * 14)}
+    params = [{"strategy.fast_period": 5}]
+
+    def run(config):
+        return WalkForwardEngine(config, SmaCrossStrategy, param_sets=params, train_period="5D",
+                                 test_period="3D", max_workers=1, cache_dir=tmp_path).run(histories)
+
+    first = run(Config("missing.ini"))
+    assert run(Config("missing.ini"))["stats"]["computed"] == 0
+    changed = run(apply_params(Config("missing.ini"), {"strategy.slow_period": 60}))
+    assert changed["stats"]["reused"] == 0 and changed["stats"]["computed"] == first["stats"]["tasks"]
+    fresh = WalkForwardEngine(apply_params(Config("missing.ini"), {"strategy.slow_period": 60}), SmaCrossStrategy,
+                              param_sets=params, train_period="5D", test_period="3D", max_workers=1,
+                              cache_dir=None).run(histories)
+    assert [r["out_of_sample"] for r in changed["folds"]] == [r["out_of_sample"] for r in fresh["folds"]]